@@ -411,8 +411,20 @@ def _elements_to_dict(data, position, obj_end, opts):
     return result
 
 
+def _to_bytes(data):
+    """Get bytes from a bytes-like object, e.g. a memoryview or bytearray.
+
+    The pure Python decoder slices and indexes its input, which requires
+    bytes. The C extension decodes bytes-like objects without a copy.
+    """
+    if isinstance(data, bytes):
+        return data
+    return memoryview(data).tobytes()
+
+
 def _bson_to_dict(data, opts):
     """Decode a BSON string to document_class."""
+    data = _to_bytes(data)
     try:
         obj_size = _UNPACK_INT(data[:4])[0]
     except struct.error as exc:
@@ -847,14 +859,19 @@ _CODEC_OPTIONS_TYPE_ERROR = TypeError(
 def decode_all(data, codec_options=DEFAULT_CODEC_OPTIONS):
     """Decode BSON data to multiple documents.
 
-    `data` must be a string of concatenated, valid, BSON-encoded
-    documents.
+    `data` must be a bytes-like object (e.g. :class:`bytes`,
+    :class:`bytearray` or :class:`memoryview`) of concatenated, valid,
+    BSON-encoded documents.
 
     :Parameters:
       - `data`: BSON data
       - `codec_options` (optional): An instance of
         :class:`~bson.codec_options.CodecOptions`.
 
+    .. versionchanged:: 3.8
+       Accept any bytes-like object. With the C extension the documents are
+       decoded without copying `data`.
+
     .. versionchanged:: 3.0
        Removed `compile_re` option: PyMongo now always represents BSON regular
        expressions as :class:`~bson.regex.Regex` objects. Use
@@ -876,6 +893,7 @@ def decode_all(data, codec_options=DEFAULT_CODEC_OPTIONS):
     if not isinstance(codec_options, CodecOptions):
         raise _CODEC_OPTIONS_TYPE_ERROR
 
+    data = _to_bytes(data)
     docs = []
     position = 0
     end = len(data) - 1
@@ -917,14 +935,18 @@ def decode_iter(data, codec_options=DEFAULT_CODEC_OPTIONS):
     Works similarly to the decode_all function, but yields one document at a
     time.
 
-    `data` must be a string of concatenated, valid, BSON-encoded
-    documents.
+    `data` must be a bytes-like object (e.g. :class:`bytes`,
+    :class:`bytearray` or :class:`memoryview`) of concatenated, valid,
+    BSON-encoded documents.
 
     :Parameters:
       - `data`: BSON data
       - `codec_options` (optional): An instance of
         :class:`~bson.codec_options.CodecOptions`.
 
+    .. versionchanged:: 3.8
+       Accept any bytes-like object.
+
     .. versionchanged:: 3.0
        Replaced `as_class`, `tz_aware`, and `uuid_subtype` options with
        `codec_options`.
@@ -934,6 +956,9 @@ def decode_iter(data, codec_options=DEFAULT_CODEC_OPTIONS):
     if not isinstance(codec_options, CodecOptions):
         raise _CODEC_OPTIONS_TYPE_ERROR
 
+    if not isinstance(data, bytes):
+        # Slicing a memoryview doesn't copy.
+        data = memoryview(data) if PY3 else _to_bytes(data)
     position = 0
     end = len(data) - 1
     while position < end:
@@ -2687,35 +2687,50 @@ static PyObject* elements_to_dict(PyObject* self, const char* string,
     return result;
 }
 
+/* Get a read-only, C-contiguous view of a bytes-like object: bytes,
+ * bytearray, memoryview, mmap, etc. Decoding from a view avoids copying
+ * the data out of the socket's receive buffer.
+ *
+ * Returns 0 and sets TypeError on failure. On success the caller must call
+ * PyBuffer_Release(view). */
+static int _get_buffer(PyObject* obj, Py_buffer* view, const char* func_name) {
+    if (!PyObject_CheckBuffer(obj) ||
+            PyObject_GetBuffer(obj, view, PyBUF_SIMPLE) == -1) {
+        PyErr_Clear();
+        PyErr_Format(PyExc_TypeError,
+#if PY_MAJOR_VERSION >= 3
+                     "argument to %s must be a bytes-like object",
+#else
+                     "argument to %s must be a string or buffer",
+#endif
+                     func_name);
+        return 0;
+    }
+    return 1;
+}
+
 static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
     int32_t size;
     Py_ssize_t total_size;
     const char* string;
     PyObject* bson;
     codec_options_t options;
-    PyObject* result;
+    PyObject* result = NULL;
     PyObject* options_obj;
+    Py_buffer view;
 
     if (! (PyArg_ParseTuple(args, "OO", &bson, &options_obj) &&
             convert_codec_options(options_obj, &options))) {
         return NULL;
     }
 
-#if PY_MAJOR_VERSION >= 3
-    if (!PyBytes_Check(bson)) {
-        PyErr_SetString(PyExc_TypeError, "argument to _bson_to_dict must be a bytes object");
-#else
-    if (!PyString_Check(bson)) {
-        PyErr_SetString(PyExc_TypeError, "argument to _bson_to_dict must be a string");
-#endif
+    if (!_get_buffer(bson, &view, "_bson_to_dict")) {
         destroy_codec_options(&options);
         return NULL;
     }
-#if PY_MAJOR_VERSION >= 3
-    total_size = PyBytes_Size(bson);
-#else
-    total_size = PyString_Size(bson);
-#endif
+    total_size = view.len;
+    string = (const char*)view.buf;
+
     if (total_size < BSON_MIN_SIZE) {
         PyObject* InvalidBSON = _error("InvalidBSON");
         if (InvalidBSON) {
@@ -2723,18 +2738,7 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
                             "not enough data for a BSON document");
             Py_DECREF(InvalidBSON);
         }
-        destroy_codec_options(&options);
-        return NULL;
-    }
-
-#if PY_MAJOR_VERSION >= 3
-    string = PyBytes_AsString(bson);
-#else
-    string = PyString_AsString(bson);
-#endif
-    if (!string) {
-        destroy_codec_options(&options);
-        return NULL;
+        goto done;
     }
 
     memcpy(&size, string, 4);
@@ -2745,8 +2749,7 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
             PyErr_SetString(InvalidBSON, "invalid message size");
             Py_DECREF(InvalidBSON);
         }
-        destroy_codec_options(&options);
-        return NULL;
+        goto done;
     }
 
     if (total_size < size || total_size > BSON_MAX_SIZE) {
@@ -2755,8 +2758,7 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
             PyErr_SetString(InvalidBSON, "objsize too large");
             Py_DECREF(InvalidBSON);
         }
-        destroy_codec_options(&options);
-        return NULL;
+        goto done;
     }
 
     if (size != total_size || string[size - 1]) {
@@ -2765,18 +2767,20 @@ static PyObject* _cbson_bson_to_dict(PyObject* self, PyObject* args) {
             PyErr_SetString(InvalidBSON, "bad eoo");
             Py_DECREF(InvalidBSON);
         }
-        destroy_codec_options(&options);
-        return NULL;
+        goto done;
     }
 
     /* No need to decode fields if using RawBSONDocument */
     if (options.is_raw_bson) {
-        return PyObject_CallFunction(
+        result = PyObject_CallFunction(
             options.document_class, BYTES_FORMAT_STRING "O", string, size,
             options_obj);
+        goto done;
     }
 
     result = elements_to_dict(self, string + 4, (unsigned)size - 5, &options);
+done:
+    PyBuffer_Release(&view);
     destroy_codec_options(&options);
     return result;
 }
@@ -2787,9 +2791,10 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
     const char* string;
     PyObject* bson;
     PyObject* dict;
-    PyObject* result;
+    PyObject* result = NULL;
     codec_options_t options;
     PyObject* options_obj;
+    Py_buffer view;
 
     if (!PyArg_ParseTuple(args, "O|O", &bson, &options_obj)) {
         return NULL;
@@ -2802,31 +2807,15 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
         return NULL;
     }
 
-#if PY_MAJOR_VERSION >= 3
-    if (!PyBytes_Check(bson)) {
-        PyErr_SetString(PyExc_TypeError, "argument to decode_all must be a bytes object");
-#else
-    if (!PyString_Check(bson)) {
-        PyErr_SetString(PyExc_TypeError, "argument to decode_all must be a string");
-#endif
-        destroy_codec_options(&options);
-        return NULL;
-    }
-#if PY_MAJOR_VERSION >= 3
-    total_size = PyBytes_Size(bson);
-    string = PyBytes_AsString(bson);
-#else
-    total_size = PyString_Size(bson);
-    string = PyString_AsString(bson);
-#endif
-    if (!string) {
+    if (!_get_buffer(bson, &view, "decode_all")) {
         destroy_codec_options(&options);
         return NULL;
     }
+    total_size = view.len;
+    string = (const char*)view.buf;
 
     if (!(result = PyList_New(0))) {
-        destroy_codec_options(&options);
-        return NULL;
+        goto done;
     }
 
     while (total_size > 0) {
@@ -2837,9 +2826,8 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
                                 "not enough data for a BSON document");
                 Py_DECREF(InvalidBSON);
             }
-            destroy_codec_options(&options);
-            Py_DECREF(result);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
 
         memcpy(&size, string, 4);
@@ -2850,9 +2838,8 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
                 PyErr_SetString(InvalidBSON, "invalid message size");
                 Py_DECREF(InvalidBSON);
             }
-            destroy_codec_options(&options);
-            Py_DECREF(result);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
 
         if (total_size < size) {
@@ -2861,9 +2848,8 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
                 PyErr_SetString(InvalidBSON, "objsize too large");
                 Py_DECREF(InvalidBSON);
             }
-            destroy_codec_options(&options);
-            Py_DECREF(result);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
 
         if (string[size - 1]) {
@@ -2872,9 +2858,8 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
                 PyErr_SetString(InvalidBSON, "bad eoo");
                 Py_DECREF(InvalidBSON);
             }
-            destroy_codec_options(&options);
-            Py_DECREF(result);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
 
         /* No need to decode fields if using RawBSONDocument. */
@@ -2886,21 +2871,21 @@ static PyObject* _cbson_decode_all(PyObject* self, PyObject* args) {
             dict = elements_to_dict(self, string + 4, (unsigned)size - 5, &options);
         }
         if (!dict) {
-            Py_DECREF(result);
-            destroy_codec_options(&options);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
         if (PyList_Append(result, dict) < 0) {
             Py_DECREF(dict);
-            Py_DECREF(result);
-            destroy_codec_options(&options);
-            return NULL;
+            Py_CLEAR(result);
+            goto done;
         }
         Py_DECREF(dict);
         string += size;
         total_size -= size;
     }
 
+done:
+    PyBuffer_Release(&view);
     destroy_codec_options(&options);
     return result;
 }
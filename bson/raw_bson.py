@@ -37,14 +37,22 @@ class RawBSONDocument(abc.Mapping):
         """Create a new :class:`RawBSONDocument`.
 
         :Parameters:
-          - `bson_bytes`: the BSON bytes that compose this document
+          - `bson_bytes`: the BSON bytes that compose this document, or
+            any other bytes-like object such as a :class:`memoryview`
           - `codec_options` (optional): An instance of
             :class:`~bson.codec_options.CodecOptions`.
 
+        .. versionchanged:: 3.8
+          `bson_bytes` may be any bytes-like object.
+
         .. versionchanged:: 3.5
           If a :class:`~bson.codec_options.CodecOptions` is passed in, its
           `document_class` must be :class:`RawBSONDocument`.
         """
+        if not isinstance(bson_bytes, bytes):
+            # Copy out of the (possibly much larger) receive buffer so that
+            # this document doesn't keep the whole batch alive.
+            bson_bytes = memoryview(bson_bytes).tobytes()
         self.__raw = bson_bytes
         self.__inflated_doc = None
         # Can't default codec_options to DEFAULT_RAW_BSON_OPTIONS in signature,
@@ -0,0 +1,767 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you
+# may not use this file except in compliance with the License.  You
+# may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.  See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""An asyncio-native client for MongoDB.
+
+:class:`AsyncMongoClient` runs operations as coroutines on an asyncio event
+loop. Connections are :mod:`asyncio` streams held in a non-blocking pool, so
+no operation ever blocks the loop or needs a thread of its own::
+
+  >>> async def main():
+  ...     client = AsyncMongoClient()
+  ...     await client.test.things.insert_one({'x': 1})
+  ...     async for doc in client.test.things.find({'x': 1}):
+  ...         print(doc)
+  ...     client.close()
+
+Commands are encoded and replies are parsed by the same code as
+:class:`~pymongo.mongo_client.MongoClient`, and server discovery and
+monitoring are shared with it: the client's topology is monitored by the
+usual background threads.
+
+Requires Python 3.5+ and MongoDB 3.6+; this module and the other asyncio
+modules are not installed on older Pythons. Sessions, transactions and
+retryable writes are not supported.
+
+.. versionadded:: 3.8
+"""
+
+import asyncio
+import datetime
+
+from bson.codec_options import DEFAULT_CODEC_OPTIONS
+from bson.objectid import ObjectId
+from bson.py3compat import string_type
+from bson.raw_bson import RawBSONDocument
+from bson.son import SON
+from pymongo import common, helpers, message
+from pymongo.async_cursor import AsyncCommandCursor, AsyncCursor
+from pymongo.async_pool import AsyncPool
+from pymongo.bulk import _merge_command, _raise_bulk_write_error, _Run
+from pymongo.collation import validate_collation_or_none
+from pymongo.database import _check_name
+from pymongo.errors import (ConnectionFailure,
+                            InvalidName,
+                            InvalidOperation,
+                            NetworkTimeout,
+                            NotMasterError,
+                            OperationFailure,
+                            ServerSelectionTimeoutError)
+from pymongo.helpers import _check_write_command_response
+from pymongo.mongo_client import MongoClient
+from pymongo.read_preferences import ReadPreference
+from pymongo.results import (DeleteResult,
+                             InsertManyResult,
+                             InsertOneResult,
+                             UpdateResult)
+from pymongo.server_selectors import (any_server_selector,
+                                      writable_server_selector)
+from pymongo.topology_description import TOPOLOGY_TYPE
+
+
+class _SocketContext(object):
+    """Async context manager that selects a server and checks out a socket.
+
+    Errors raised inside the block update the topology the same way
+    :meth:`pymongo.mongo_client.MongoClient._get_socket` does.
+    """
+
+    def __init__(self, client, selector, read_preference=None, address=None):
+        self._client = client
+        self._selector = selector
+        self._read_preference = read_preference
+        self._address = address
+        self._server_address = None
+        self._checkout = None
+
+    async def __aenter__(self):
+        client = self._client
+        server = await client._select_server(self._selector, self._address)
+        self._server_address = server.description.address
+        self._checkout = client._get_pool(server).get_socket(
+            client._all_credentials)
+        try:
+            sock_info = await self._checkout.__aenter__()
+        except BaseException as exc:
+            client._handle_error(self._server_address, exc)
+            raise
+        read_preference = self._read_preference
+        if read_preference is None:
+            return sock_info
+        # See MongoClient._socket_for_reads.
+        single = (client._topology.description.topology_type ==
+                  TOPOLOGY_TYPE.Single)
+        slave_ok = (single and not sock_info.is_mongos) or (
+            read_preference != ReadPreference.PRIMARY)
+        return sock_info, slave_ok
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._checkout.__aexit__(exc_type, exc_val, exc_tb)
+        if exc_val is not None:
+            self._client._handle_error(self._server_address, exc_val)
+
+
+class AsyncMongoClient(common.BaseObject):
+    """An asyncio client for a MongoDB instance, replica set, or cluster.
+
+    Takes the same arguments as :class:`~pymongo.mongo_client.MongoClient`.
+    The client must be used, and closed, on a single event loop.
+    """
+
+    def __init__(self, host=None, port=None, document_class=dict,
+                 tz_aware=None, connect=None, **kwargs):
+        self._delegate = MongoClient(
+            host, port, document_class, tz_aware, connect, **kwargs)
+        delegate = self._delegate
+        super(AsyncMongoClient, self).__init__(
+            delegate.codec_options, delegate.read_preference,
+            delegate.write_concern, delegate.read_concern)
+        self._topology = delegate._topology
+        self._pool_options = self._topology._settings.pool_options
+        # Map server address to (AsyncPool, pool_id of the blocking pool).
+        self._pools = {}
+
+    @property
+    def _all_credentials(self):
+        return self._delegate._MongoClient__all_credentials
+
+    @property
+    def address(self):
+        """See :attr:`pymongo.mongo_client.MongoClient.address`."""
+        return self._delegate.address
+
+    @property
+    def delegate(self):
+        """The :class:`~pymongo.mongo_client.MongoClient` that monitors this
+        client's topology."""
+        return self._delegate
+
+    async def _select_server(self, selector, address=None):
+        """Select a server without blocking the event loop.
+
+        Raises ServerSelectionTimeoutError after serverSelectionTimeoutMS.
+        """
+        topology = self._delegate._get_topology()
+        try:
+            return topology.select_server(selector, 0, address)
+        except ServerSelectionTimeoutError:
+            pass
+        # Wait on the topology's condition variable in a worker thread, so
+        # we wake as soon as a monitor reports a change.
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, topology.select_server, selector,
+            self._delegate.server_selection_timeout, address)
+
+    def _get_pool(self, server):
+        """Get the AsyncPool for a Server, creating it if needed.
+
+        The async pool is reset whenever the server's blocking pool is, that
+        is, whenever the monitor or an operation marks the server Unknown.
+        """
+        address = server.description.address
+        pool_id = server.pool.pool_id
+        pool, last_pool_id = self._pools.get(address, (None, None))
+        if pool is None:
+            pool = AsyncPool(address, self._pool_options)
+        elif pool_id != last_pool_id:
+            pool.reset()
+        self._pools[address] = (pool, pool_id)
+        return pool
+
+    def _reset_pool(self, address):
+        pool, _ = self._pools.get(address, (None, None))
+        if pool is not None:
+            pool.reset()
+
+    def _handle_error(self, address, error):
+        """Update the topology after an operation fails with `error`."""
+        if isinstance(error, NetworkTimeout):
+            # The socket has been closed. Don't reset the server.
+            return
+        if isinstance(error, NotMasterError):
+            self._reset_pool(address)
+            self._delegate._reset_server_and_request_check(address)
+        elif isinstance(error, ConnectionFailure):
+            self._reset_pool(address)
+            self._topology.reset_server(address)
+        elif (isinstance(error, OperationFailure) and
+              error.code in helpers._RETRYABLE_ERROR_CODES):
+            self._reset_pool(address)
+            self._topology.reset_server(address)
+
+    def _socket_for_writes(self):
+        return _SocketContext(self, writable_server_selector)
+
+    def _socket_for_reads(self, read_preference):
+        assert read_preference is not None, "read_preference must not be None"
+        return _SocketContext(self, read_preference, read_preference)
+
+    def _socket_for_address(self, address,
+                            read_preference=ReadPreference.PRIMARY):
+        return _SocketContext(
+            self, any_server_selector, read_preference, address)
+
+    def close(self):
+        """Close all connections and stop monitoring.
+
+        Must be called on the client's event loop.
+        """
+        for pool, _ in self._pools.values():
+            pool.close()
+        self._pools.clear()
+        self._delegate.close()
+
+    async def server_info(self):
+        """Get information about the MongoDB server we're connected to."""
+        return await self.admin.command(
+            "buildinfo", read_preference=ReadPreference.PRIMARY)
+
+    async def list_database_names(self):
+        """Get a list of the names of all databases on the connected server.
+        """
+        res = await self.admin.command(
+            "listDatabases", nameOnly=True,
+            read_preference=ReadPreference.PRIMARY)
+        return [db["name"] for db in res["databases"]]
+
+    async def drop_database(self, name_or_database):
+        """Drop a database.
+
+        :Parameters:
+          - `name_or_database`: the name of a database to drop, or a
+            :class:`AsyncDatabase` instance representing the database to drop
+        """
+        name = name_or_database
+        if isinstance(name, AsyncDatabase):
+            name = name.name
+
+        if not isinstance(name, string_type):
+            raise TypeError("name_or_database must be an instance "
+                            "of %s or an AsyncDatabase" %
+                            (string_type.__name__,))
+
+        await self[name].command(
+            "dropDatabase", read_preference=ReadPreference.PRIMARY,
+            write_concern=self._write_concern_for(None),
+            parse_write_concern_error=True)
+
+    def get_database(self, name=None, codec_options=None, read_preference=None,
+                     write_concern=None, read_concern=None):
+        """Get an :class:`AsyncDatabase` with the given name and options.
+
+        See :meth:`pymongo.mongo_client.MongoClient.get_database`.
+        """
+        if name is None:
+            name = self._delegate.get_database().name
+        return AsyncDatabase(
+            self, name, codec_options, read_preference,
+            write_concern, read_concern)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(
+                "AsyncMongoClient has no attribute %r. To access the %s"
+                " database, use client[%r]." % (name, name, name))
+        return self.__getitem__(name)
+
+    def __getitem__(self, name):
+        return AsyncDatabase(self, name)
+
+    def __repr__(self):
+        return "AsyncMongoClient(%s)" % (self._delegate._repr_helper(),)
+
+
+class AsyncDatabase(common.BaseObject):
+    """A MongoDB database accessed through an :class:`AsyncMongoClient`."""
+
+    def __init__(self, client, name, codec_options=None, read_preference=None,
+                 write_concern=None, read_concern=None):
+        super(AsyncDatabase, self).__init__(
+            codec_options or client.codec_options,
+            read_preference or client.read_preference,
+            write_concern or client.write_concern,
+            read_concern or client.read_concern)
+
+        if not isinstance(name, string_type):
+            raise TypeError("name must be an instance "
+                            "of %s" % (string_type.__name__,))
+
+        if name != '$external':
+            _check_name(name)
+
+        self.__name = name
+        self.__client = client
+
+    @property
+    def client(self):
+        """The client instance for this :class:`AsyncDatabase`."""
+        return self.__client
+
+    @property
+    def name(self):
+        """The name of this :class:`AsyncDatabase`."""
+        return self.__name
+
+    def get_collection(self, name, codec_options=None, read_preference=None,
+                       write_concern=None, read_concern=None):
+        """Get an :class:`AsyncCollection` with the given name and options.
+        """
+        return AsyncCollection(
+            self, name, codec_options, read_preference,
+            write_concern, read_concern)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(
+                "AsyncDatabase has no attribute %r. To access the %s"
+                " collection, use database[%r]." % (name, name, name))
+        return self.__getitem__(name)
+
+    def __getitem__(self, name):
+        return AsyncCollection(self, name)
+
+    def __eq__(self, other):
+        if isinstance(other, AsyncDatabase):
+            return (self.__client is other.client and
+                    self.__name == other.name)
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "AsyncDatabase(%r, %r)" % (self.__client, self.__name)
+
+    async def command(self, command, value=1, check=True,
+                      allowable_errors=None,
+                      read_preference=ReadPreference.PRIMARY,
+                      codec_options=DEFAULT_CODEC_OPTIONS,
+                      write_concern=None, parse_write_concern_error=False,
+                      **kwargs):
+        """Issue a MongoDB command.
+
+        See :meth:`pymongo.database.Database.command`.
+        """
+        if isinstance(command, string_type):
+            command = SON([(command, value)])
+        command.update(kwargs)
+
+        async with self.__client._socket_for_reads(
+                read_preference) as (sock_info, slave_ok):
+            return await sock_info.command(
+                self.__name, command, slave_ok, read_preference,
+                codec_options, check, allowable_errors,
+                write_concern=write_concern,
+                parse_write_concern_error=parse_write_concern_error,
+                client=self.__client._delegate)
+
+    async def list_collection_names(self, filter=None):
+        """Get a list of all the collection names in this database.
+
+        :Parameters:
+          - `filter` (optional):  A query document to filter the list of
+            collections returned from the listCollections command.
+        """
+        cmd = SON([("listCollections", 1),
+                   ("nameOnly", True),
+                   ("cursor", {})])
+        if filter is not None:
+            cmd["filter"] = filter
+        cursor = AsyncCommandCursor(
+            self["$cmd"], cmd, ReadPreference.PRIMARY)
+        return [result["name"] for result in await cursor.to_list()]
+
+    async def drop_collection(self, name_or_collection):
+        """Drop a collection.
+
+        :Parameters:
+          - `name_or_collection`: the name of a collection to drop or the
+            collection object itself
+        """
+        name = name_or_collection
+        if isinstance(name, AsyncCollection):
+            name = name.name
+
+        if not isinstance(name, string_type):
+            raise TypeError("name_or_collection must be an "
+                            "instance of %s" % (string_type.__name__,))
+
+        return await self.command(
+            'drop', value=name, allowable_errors=['ns not found'],
+            write_concern=self._write_concern_for(None),
+            parse_write_concern_error=True)
+
+
+class AsyncCollection(common.BaseObject):
+    """A MongoDB collection accessed through an :class:`AsyncMongoClient`.
+    """
+
+    def __init__(self, database, name, codec_options=None,
+                 read_preference=None, write_concern=None, read_concern=None):
+        super(AsyncCollection, self).__init__(
+            codec_options or database.codec_options,
+            read_preference or database.read_preference,
+            write_concern or database.write_concern,
+            read_concern or database.read_concern)
+
+        if not isinstance(name, string_type):
+            raise TypeError("name must be an instance "
+                            "of %s" % (string_type.__name__,))
+
+        if not name or ".." in name:
+            raise InvalidName("collection names cannot be empty")
+        if "$" in name and not name.startswith("$cmd"):
+            raise InvalidName("collection names must not "
+                              "contain '$': %r" % name)
+        if name[0] == "." or name[-1] == ".":
+            raise InvalidName("collection names must not start "
+                              "or end with '.': %r" % name)
+        if "\x00" in name:
+            raise InvalidName("collection names must not contain the "
+                              "null character")
+
+        self.__database = database
+        self.__name = name
+        self.__full_name = "%s.%s" % (database.name, name)
+        self.__write_response_codec_options = self.codec_options._replace(
+            unicode_decode_error_handler='replace',
+            document_class=dict)
+
+    @property
+    def database(self):
+        """The :class:`AsyncDatabase` that this collection is a part of."""
+        return self.__database
+
+    @property
+    def name(self):
+        """The name of this :class:`AsyncCollection`."""
+        return self.__name
+
+    @property
+    def full_name(self):
+        """The full name of this :class:`AsyncCollection`."""
+        return self.__full_name
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            full_name = "%s.%s" % (self.__name, name)
+            raise AttributeError(
+                "AsyncCollection has no attribute %r. To access the %s"
+                " collection, use database['%s']." % (
+                    name, full_name, full_name))
+        return self.__getitem__(name)
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.__database,
+                               "%s.%s" % (self.__name, name),
+                               self.codec_options,
+                               self.read_preference,
+                               self.write_concern,
+                               self.read_concern)
+
+    def __eq__(self, other):
+        if isinstance(other, AsyncCollection):
+            return (self.__database == other.database and
+                    self.__name == other.name)
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "AsyncCollection(%r, %r)" % (self.__database, self.__name)
+
+    def find(self, *args, **kwargs):
+        """Query the database.
+
+        Returns an :class:`~pymongo.async_cursor.AsyncCursor`. Takes the
+        `filter`, `projection`, `skip`, `limit`, `sort`, `batch_size`, `hint`,
+        `max_time_ms`, `comment` and `collation` arguments of
+        :meth:`pymongo.collection.Collection.find`.
+        """
+        return AsyncCursor(self, *args, **kwargs)
+
+    async def find_one(self, filter=None, *args, **kwargs):
+        """Get a single document from the database, or None."""
+        if (filter is not None and not
+                isinstance(filter, common.abc.Mapping)):
+            filter = {"_id": filter}
+        kwargs['limit'] = -1
+        docs = await self.find(filter, *args, **kwargs).to_list(1)
+        return docs[0] if docs else None
+
+    async def _write_command(self, command, write_concern):
+        client = self.__database.client
+        async with client._socket_for_writes() as sock_info:
+            result = await sock_info.command(
+                self.__database.name, command,
+                write_concern=write_concern,
+                codec_options=self.__write_response_codec_options,
+                client=client._delegate)
+        _check_write_command_response(result)
+        return result
+
+    async def insert_one(self, document, bypass_document_validation=False):
+        """Insert a single document.
+
+        See :meth:`pymongo.collection.Collection.insert_one`.
+        """
+        common.validate_is_document_type("document", document)
+        if not (isinstance(document, RawBSONDocument) or "_id" in document):
+            document["_id"] = ObjectId()
+        write_concern = self._write_concern_for(None)
+        command = SON([('insert', self.__name),
+                       ('ordered', True),
+                       ('documents', [document])])
+        if bypass_document_validation:
+            command['bypassDocumentValidation'] = True
+        await self._write_command(command, write_concern)
+        return InsertOneResult(document.get('_id'),
+                               write_concern.acknowledged)
+
+    async def insert_many(self, documents, ordered=True,
+                          bypass_document_validation=False):
+        """Insert an iterable of documents.
+
+        Documents are split into batches that fit the server's message and
+        batch size limits, like
+        :meth:`pymongo.collection.Collection.insert_many`.
+        """
+        if (not isinstance(documents, common.abc.Iterable)
+                or not documents):
+            raise TypeError("documents must be a non-empty list")
+        run = _Run(message._INSERT)
+        inserted_ids = []
+        for index, document in enumerate(documents):
+            common.validate_is_document_type("document", document)
+            if not isinstance(document, RawBSONDocument):
+                if "_id" not in document:
+                    document["_id"] = ObjectId()
+                inserted_ids.append(document["_id"])
+            run.add(index, document)
+
+        write_concern = self._write_concern_for(None)
+        acknowledged = write_concern.acknowledged
+        command = SON([('insert', self.__name), ('ordered', ordered)])
+        if not write_concern.is_server_default:
+            command['writeConcern'] = write_concern.document
+        if bypass_document_validation:
+            command['bypassDocumentValidation'] = True
+
+        full_result = {
+            "writeErrors": [],
+            "writeConcernErrors": [],
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+        }
+        client = self.__database.client
+        async with client._socket_for_writes() as sock_info:
+            ctx = message._BulkWriteContext(
+                self.__database.name, command, sock_info, message._randint(),
+                sock_info.listeners, None)
+            docs = run.ops
+            offset = 0
+            while offset < len(docs):
+                request_id, msg, to_send = message._do_bulk_write_command(
+                    self.__full_name, message._INSERT, command,
+                    docs[offset:], True,
+                    self.__write_response_codec_options, ctx)
+                if not to_send:
+                    raise InvalidOperation("cannot do an empty bulk write")
+                result = await self._send_batch(
+                    ctx, request_id, msg, to_send, acknowledged)
+                _merge_command(run, full_result, offset, result)
+                offset += len(to_send)
+                if ordered and full_result["writeErrors"]:
+                    break
+
+        if full_result["writeErrors"] or full_result["writeConcernErrors"]:
+            _raise_bulk_write_error(full_result)
+        return InsertManyResult(inserted_ids, acknowledged)
+
+    async def _send_batch(self, ctx, request_id, msg, docs, acknowledged):
+        """Send one encoded write batch, publishing command events."""
+        if ctx.publish:
+            duration = datetime.datetime.now() - ctx.start_time
+            ctx._start(request_id, docs)
+            start = datetime.datetime.now()
+        try:
+            if acknowledged:
+                reply = await ctx.sock_info.write_command(request_id, msg)
+            else:
+                await ctx.sock_info.send_message(msg, 0)
+                reply = {'ok': 1}
+            if ctx.publish:
+                ctx._succeed(request_id, reply,
+                             (datetime.datetime.now() - start) + duration)
+        except OperationFailure as exc:
+            if ctx.publish:
+                ctx._fail(request_id, exc.details,
+                          (datetime.datetime.now() - start) + duration)
+            raise
+        finally:
+            ctx.start_time = datetime.datetime.now()
+        return reply
+
+    async def _update(self, criteria, document, upsert=False, multi=False,
+                      bypass_doc_val=False, collation=None,
+                      array_filters=None):
+        """Internal update / replace helper."""
+        common.validate_boolean("upsert", upsert)
+        collation = validate_collation_or_none(collation)
+        write_concern = self._write_concern_for(None)
+        update_doc = SON([('q', criteria),
+                          ('u', document),
+                          ('multi', multi),
+                          ('upsert', upsert)])
+        if collation is not None:
+            update_doc['collation'] = collation
+        if array_filters is not None:
+            update_doc['arrayFilters'] = array_filters
+        command = SON([('update', self.__name),
+                       ('ordered', True),
+                       ('updates', [update_doc])])
+        if bypass_doc_val:
+            command['bypassDocumentValidation'] = True
+
+        # Copy the result before adding updatedExisting, see
+        # Collection._update.
+        result = (await self._write_command(command, write_concern)).copy()
+        if result.get('n') and 'upserted' not in result:
+            result['updatedExisting'] = True
+        else:
+            result['updatedExisting'] = False
+            if 'upserted' in result:
+                result['upserted'] = result['upserted'][0]['_id']
+
+        return UpdateResult(result, write_concern.acknowledged)
+
+    async def replace_one(self, filter, replacement, upsert=False,
+                          bypass_document_validation=False, collation=None):
+        """Replace a single document matching the filter.
+
+        See :meth:`pymongo.collection.Collection.replace_one`.
+        """
+        common.validate_is_mapping("filter", filter)
+        common.validate_ok_for_replace(replacement)
+        return await self._update(
+            filter, replacement, upsert,
+            bypass_doc_val=bypass_document_validation, collation=collation)
+
+    async def update_one(self, filter, update, upsert=False,
+                         bypass_document_validation=False, collation=None,
+                         array_filters=None):
+        """Update a single document matching the filter.
+
+        See :meth:`pymongo.collection.Collection.update_one`.
+        """
+        common.validate_is_mapping("filter", filter)
+        common.validate_ok_for_update(update)
+        common.validate_list_or_none('array_filters', array_filters)
+        return await self._update(
+            filter, update, upsert,
+            bypass_doc_val=bypass_document_validation, collation=collation,
+            array_filters=array_filters)
+
+    async def update_many(self, filter, update, upsert=False,
+                          array_filters=None,
+                          bypass_document_validation=False, collation=None):
+        """Update one or more documents that match the filter.
+
+        See :meth:`pymongo.collection.Collection.update_many`.
+        """
+        common.validate_is_mapping("filter", filter)
+        common.validate_ok_for_update(update)
+        common.validate_list_or_none('array_filters', array_filters)
+        return await self._update(
+            filter, update, upsert, multi=True,
+            bypass_doc_val=bypass_document_validation, collation=collation,
+            array_filters=array_filters)
+
+    async def _delete(self, criteria, multi, collation=None):
+        """Internal delete helper."""
+        common.validate_is_mapping("filter", criteria)
+        collation = validate_collation_or_none(collation)
+        write_concern = self._write_concern_for(None)
+        delete_doc = SON([('q', criteria),
+                          ('limit', int(not multi))])
+        if collation is not None:
+            delete_doc['collation'] = collation
+        command = SON([('delete', self.__name),
+                       ('ordered', True),
+                       ('deletes', [delete_doc])])
+        result = await self._write_command(command, write_concern)
+        return DeleteResult(result, write_concern.acknowledged)
+
+    async def delete_one(self, filter, collation=None):
+        """Delete a single document matching the filter."""
+        return await self._delete(filter, False, collation=collation)
+
+    async def delete_many(self, filter, collation=None):
+        """Delete one or more documents matching the filter."""
+        return await self._delete(filter, True, collation=collation)
+
+    def aggregate(self, pipeline, **kwargs):
+        """Perform an aggregation using the aggregation framework.
+
+        Returns an :class:`~pymongo.async_cursor.AsyncCommandCursor`; the
+        command is sent when the cursor is first iterated. Pipelines ending
+        in ``$out`` are not supported.
+
+        See :meth:`pymongo.collection.Collection.aggregate`.
+        """
+        common.validate_list('pipeline', pipeline)
+        batch_size = common.validate_non_negative_integer_or_none(
+            "batchSize", kwargs.pop("batchSize", None))
+        collation = validate_collation_or_none(kwargs.pop('collation', None))
+        cmd = SON([("aggregate", self.__name),
+                   ("pipeline", pipeline),
+                   ("cursor", {})])
+        if batch_size is not None:
+            cmd["cursor"]["batchSize"] = batch_size
+        if collation is not None:
+            cmd["collation"] = collation
+        if not self.read_concern.ok_for_legacy:
+            cmd["readConcern"] = self.read_concern.document
+        cmd.update(kwargs)
+        return AsyncCommandCursor(
+            self, cmd, self._read_preference_for(None), batch_size or 0)
+
+    async def count_documents(self, filter, **kwargs):
+        """Count the number of documents in this collection.
+
+        See :meth:`pymongo.collection.Collection.count_documents`.
+        """
+        pipeline = [{'$match': filter}]
+        if 'skip' in kwargs:
+            pipeline.append({'$skip': kwargs.pop('skip')})
+        if 'limit' in kwargs:
+            pipeline.append({'$limit': kwargs.pop('limit')})
+        pipeline.append({'$group': {'_id': None, 'n': {'$sum': 1}}})
+        if "hint" in kwargs and not isinstance(kwargs["hint"], string_type):
+            kwargs["hint"] = helpers._index_document(kwargs["hint"])
+        result = await self.aggregate(pipeline, **kwargs).to_list(1)
+        if not result:
+            return 0
+        return result[0]['n']
+
+    async def drop(self):
+        """Alias for :meth:`AsyncDatabase.drop_collection`."""
+        await self.__database.drop_collection(self.__name)
+
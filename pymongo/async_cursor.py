@@ -0,0 +1,325 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cursors for :class:`~pymongo.async_client.AsyncMongoClient`.
+
+Requires Python 3.5+.
+"""
+
+from collections import deque
+
+from bson.py3compat import integer_types
+from bson.son import SON
+from pymongo import helpers
+from pymongo.common import validate_is_mapping
+from pymongo.errors import (AutoReconnect,
+                            InvalidOperation,
+                            OperationFailure)
+from pymongo.message import (_CursorAddress,
+                             _gen_find_command,
+                             _gen_get_more_command)
+
+
+class AsyncCommandCursor(object):
+    """An asyncio cursor over the results of a command returning a cursor.
+
+    The command is not sent until the cursor is first iterated::
+
+        async for doc in collection.aggregate(pipeline):
+            print(doc)
+
+    Should not be called directly by application developers - see
+    :meth:`~pymongo.async_client.AsyncCollection.aggregate` instead.
+    """
+
+    def __init__(self, collection, command, read_preference, batch_size=0,
+                 max_await_time_ms=None):
+        # Initialize all attributes used in __del__ first.
+        self._id = None
+        self._killed = False
+
+        self._collection = collection
+        self._command = command
+        self._read_preference = read_preference
+        self._batch_size = batch_size
+        self._max_await_time_ms = max_await_time_ms
+        self._codec_options = collection.codec_options
+        self._address = None
+        self._data = deque()
+        self._retrieved = 0
+        self._ns = collection.full_name
+
+    def __del__(self):
+        if self._id and not self._killed:
+            # Kill the cursor from the client's background thread, we cannot
+            # await anything here.
+            self._killed = True
+            self._client._delegate._close_cursor(
+                self._id, _CursorAddress(self._address, self._ns))
+
+    @property
+    def _client(self):
+        return self._collection.database.client
+
+    def batch_size(self, batch_size):
+        """Limits the number of documents returned in one batch.
+
+        Raises :exc:`TypeError` if `batch_size` is not an integer.
+        Raises :exc:`ValueError` if `batch_size` is less than ``0``.
+
+        :Parameters:
+          - `batch_size`: The size of each batch of results requested.
+        """
+        if not isinstance(batch_size, integer_types):
+            raise TypeError("batch_size must be an integer")
+        if batch_size < 0:
+            raise ValueError("batch_size must be >= 0")
+        self._batch_size = batch_size
+        return self
+
+    @property
+    def alive(self):
+        """Does this cursor have the potential to return more data?"""
+        return bool(len(self._data) or (not self._killed))
+
+    @property
+    def cursor_id(self):
+        """Returns the id of the cursor, or None before it is executed."""
+        return self._id
+
+    @property
+    def address(self):
+        """The (host, port) of the server used, or None."""
+        return self._address
+
+    def _check_okay_to_chain(self):
+        """Check if it is okay to chain more options onto this cursor."""
+        if self._retrieved or self._id is not None:
+            raise InvalidOperation("cannot set options after executing query")
+
+    def _initial_command(self):
+        """The command document that creates the server cursor."""
+        return self._command
+
+    def _get_more_batch_size(self):
+        return self._batch_size
+
+    def _handle_batch(self, documents):
+        """Store a batch of documents returned by the server."""
+        self._data = deque(documents)
+        self._retrieved += len(documents)
+        if self._id == 0:
+            self._killed = True
+
+    async def _refresh(self):
+        """Refreshes the cursor with more data from the server.
+
+        Returns the length of self._data after refresh.
+        """
+        if len(self._data) or self._killed:
+            return len(self._data)
+
+        client = self._client
+        if self._id is None:
+            dbname = self._collection.database.name
+            cmd = self._initial_command()
+            batch_key = 'firstBatch'
+            socket_context = client._socket_for_reads(self._read_preference)
+        else:
+            dbname, collname = self._ns.split('.', 1)
+            cmd = _gen_get_more_command(
+                self._id, collname, self._get_more_batch_size(),
+                self._max_await_time_ms)
+            batch_key = 'nextBatch'
+            socket_context = client._socket_for_address(self._address)
+
+        try:
+            async with socket_context as (sock_info, slave_ok):
+                self._address = sock_info.address
+                reply = await sock_info.command(
+                    dbname, cmd, slave_ok, self._read_preference,
+                    self._codec_options, client=client._delegate)
+        except (AutoReconnect, OperationFailure):
+            # Don't try to kill the cursor on another socket or server.
+            self._killed = True
+            raise
+
+        cursor = reply['cursor']
+        self._id = cursor['id']
+        self._ns = cursor.get('ns', self._ns)
+        self._handle_batch(cursor[batch_key])
+        return len(self._data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """Advance the cursor."""
+        while not len(self._data) and not self._killed:
+            await self._refresh()
+        if len(self._data):
+            return self._data.popleft()
+        raise StopAsyncIteration
+
+    next = __anext__
+
+    async def to_list(self, length=None):
+        """Get a list of up to `length` documents from this cursor.
+
+        Returns all remaining documents if `length` is None.
+
+        :Parameters:
+          - `length`: maximum number of documents to return.
+        """
+        if length is not None and length < 0:
+            raise ValueError("length must be non-negative")
+        result = []
+        while length is None or len(result) < length:
+            if not len(self._data):
+                if self._killed:
+                    break
+                await self._refresh()
+                continue
+            n = len(self._data)
+            if length is not None:
+                n = min(n, length - len(result))
+            popleft = self._data.popleft
+            result.extend(popleft() for _ in range(n))
+        return result
+
+    async def close(self):
+        """Explicitly close / kill this cursor."""
+        already_killed = self._killed
+        self._killed = True
+        self._data = deque()
+        if self._id and not already_killed:
+            dbname, collname = self._ns.split('.', 1)
+            cmd = SON([('killCursors', collname), ('cursors', [self._id])])
+            async with self._client._socket_for_address(
+                    self._address) as (sock_info, _):
+                await sock_info.command(dbname, cmd, check=False,
+                                        client=self._client._delegate)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class AsyncCursor(AsyncCommandCursor):
+    """An asyncio cursor over the results of a find.
+
+    Should not be called directly by application developers - see
+    :meth:`~pymongo.async_client.AsyncCollection.find` instead.
+    """
+
+    def __init__(self, collection, filter=None, projection=None, skip=0,
+                 limit=0, sort=None, batch_size=0, hint=None,
+                 max_time_ms=None, comment=None, collation=None):
+        super(AsyncCursor, self).__init__(
+            collection, None,
+            collection._read_preference_for(None), batch_size)
+        spec = filter
+        if spec is None:
+            spec = {}
+        validate_is_mapping("filter", spec)
+        if not isinstance(skip, integer_types):
+            raise TypeError("skip must be an instance of int")
+        if not isinstance(limit, integer_types):
+            raise TypeError("limit must be an instance of int")
+        if projection is not None:
+            projection = helpers._fields_list_to_dict(projection, "projection")
+        self._spec = spec
+        self._projection = projection
+        self._skip = skip
+        self._limit = limit
+        self._ordering = sort and helpers._index_document(sort) or None
+        self._hint = hint
+        self._max_time_ms = max_time_ms
+        self._comment = comment
+        self._collation = collation
+        self._read_concern = collection.read_concern
+
+    def limit(self, limit):
+        """Limits the number of results to be returned by this cursor.
+
+        :Parameters:
+          - `limit`: the number of results to return
+        """
+        if not isinstance(limit, integer_types):
+            raise TypeError("limit must be an integer")
+        self._check_okay_to_chain()
+        self._limit = limit
+        return self
+
+    def skip(self, skip):
+        """Skips the first `skip` results of this cursor.
+
+        :Parameters:
+          - `skip`: the number of results to skip
+        """
+        if not isinstance(skip, integer_types):
+            raise TypeError("skip must be an integer")
+        if skip < 0:
+            raise ValueError("skip must be >= 0")
+        self._check_okay_to_chain()
+        self._skip = skip
+        return self
+
+    def sort(self, key_or_list, direction=None):
+        """Sorts this cursor's results.
+
+        See :meth:`pymongo.cursor.Cursor.sort`.
+        """
+        self._check_okay_to_chain()
+        keys = helpers._index_list(key_or_list, direction)
+        self._ordering = helpers._index_document(keys)
+        return self
+
+    def batch_size(self, batch_size):
+        self._check_okay_to_chain()
+        return super(AsyncCursor, self).batch_size(batch_size)
+    batch_size.__doc__ = AsyncCommandCursor.batch_size.__doc__
+
+    def _initial_command(self):
+        cmd = _gen_find_command(
+            self._collection.name, self._spec, self._projection, self._skip,
+            self._limit, self._batch_size, 0, self._read_concern,
+            self._collation)
+        if self._ordering:
+            cmd['sort'] = self._ordering
+        if self._hint is not None:
+            cmd['hint'] = self._hint
+        if self._max_time_ms is not None:
+            cmd['maxTimeMS'] = self._max_time_ms
+        if self._comment is not None:
+            cmd['comment'] = self._comment
+        return cmd
+
+    def _get_more_batch_size(self):
+        if self._limit:
+            limit = abs(self._limit) - self._retrieved
+            if self._batch_size:
+                limit = min(limit, self._batch_size)
+            return limit
+        return self._batch_size
+
+    def _handle_batch(self, documents):
+        super(AsyncCursor, self)._handle_batch(documents)
+        if self._limit and self._id and abs(self._limit) <= self._retrieved:
+            # The server doesn't know we are done, kill the cursor soon.
+            self._killed = True
+            self._client._delegate._close_cursor(
+                self._id, _CursorAddress(self._address, self._ns))
@@ -0,0 +1,132 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Internal asyncio network layer helper methods.
+
+The asyncio counterparts of :func:`pymongo.network.command` and
+:func:`pymongo.network.receive_message`. Messages are encoded and replies are
+parsed with the same helpers as the blocking network layer, only the socket
+I/O differs.
+
+Requires Python 3.5+.
+"""
+
+import asyncio
+import datetime
+
+from pymongo import message
+from pymongo.common import MAX_MESSAGE_SIZE
+from pymongo.compression_support import decompress
+from pymongo.errors import NotMasterError, OperationFailure
+from pymongo.network import (_check_header,
+                             _decode_command_reply,
+                             _encode_command,
+                             _unpack_reply,
+                             _UNPACK_COMPRESSION_HEADER)
+
+
+async def command(reader, writer, dbname, spec, slave_ok, is_mongos,
+                  read_preference, codec_options, session, client, check=True,
+                  allowable_errors=None, address=None,
+                  check_keys=False, listeners=None, max_bson_size=None,
+                  read_concern=None,
+                  parse_write_concern_error=False,
+                  collation=None,
+                  compression_ctx=None,
+                  unacknowledged=False,
+                  max_message_size=MAX_MESSAGE_SIZE,
+                  timeout=None):
+    """Execute a command over an asyncio stream using OP_MSG.
+
+    Takes the same parameters as :func:`pymongo.network.command` except
+    that `sock` is replaced by an :class:`asyncio.StreamReader` and
+    :class:`asyncio.StreamWriter` pair. `timeout` is the socket timeout in
+    seconds, or None.
+    """
+    name = next(iter(spec))
+    publish = listeners is not None and listeners.enabled_for_commands
+    if publish:
+        start = datetime.datetime.now()
+
+    request_id, msg = _encode_command(
+        name, dbname, spec, slave_ok, is_mongos, read_preference,
+        codec_options, session, check_keys, max_bson_size, read_concern,
+        collation, compression_ctx, True, unacknowledged)
+
+    if publish:
+        encoding_duration = datetime.datetime.now() - start
+        listeners.publish_command_start(spec, dbname, request_id, address)
+        start = datetime.datetime.now()
+
+    try:
+        await send_message(writer, msg, timeout)
+        if unacknowledged:
+            # Unacknowledged, fake a successful command response.
+            response_doc = {"ok": 1}
+        else:
+            reply = await receive_message(
+                reader, request_id, max_message_size, timeout)
+            response_doc = _decode_command_reply(
+                reply, codec_options, session, client, check,
+                allowable_errors, parse_write_concern_error)
+    except Exception as exc:
+        if publish:
+            duration = (datetime.datetime.now() - start) + encoding_duration
+            if isinstance(exc, (NotMasterError, OperationFailure)):
+                failure = exc.details
+            else:
+                failure = message._convert_exception(exc)
+            listeners.publish_command_failure(
+                duration, failure, name, request_id, address)
+        raise
+    if publish:
+        duration = (datetime.datetime.now() - start) + encoding_duration
+        listeners.publish_command_success(
+            duration, response_doc, name, request_id, address)
+    return response_doc
+
+
+async def send_message(writer, msg, timeout=None):
+    """Write a message and wait for the transport to drain."""
+    writer.write(msg)
+    if timeout is None:
+        await writer.drain()
+    else:
+        await asyncio.wait_for(writer.drain(), timeout)
+
+
+async def receive_message(reader, request_id,
+                          max_message_size=MAX_MESSAGE_SIZE, timeout=None):
+    """Receive a raw BSON message from an asyncio stream.
+
+    Raises asyncio.IncompleteReadError if the stream is closed, or
+    asyncio.TimeoutError if `timeout` elapses first.
+    """
+    if timeout is None:
+        return await _receive_message(reader, request_id, max_message_size)
+    return await asyncio.wait_for(
+        _receive_message(reader, request_id, max_message_size), timeout)
+
+
+async def _receive_message(reader, request_id, max_message_size):
+    length, op_code = _check_header(
+        await reader.readexactly(16), request_id, max_message_size)
+    if op_code == 2012:
+        op_code, _, compressor_id = _UNPACK_COMPRESSION_HEADER(
+            await reader.readexactly(9))
+        data = decompress(await reader.readexactly(length - 25),
+                          compressor_id)
+    else:
+        data = await reader.readexactly(length - 16)
+    return _unpack_reply(op_code, data)
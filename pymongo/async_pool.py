@@ -0,0 +1,540 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you
+# may not use this file except in compliance with the License.  You
+# may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.  See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Connection pooling over asyncio streams.
+
+Requires Python 3.5+.
+"""
+
+import asyncio
+import collections
+import os
+import socket
+
+from bson import DEFAULT_CODEC_OPTIONS
+from bson.son import SON
+from pymongo import async_network, auth, helpers
+from pymongo.client_session import _validate_session_write_concern
+from pymongo.common import ORDERED_TYPES
+from pymongo.errors import (ConfigurationError,
+                            ConnectionFailure,
+                            DocumentTooLarge,
+                            ExceededMaxWaiters,
+                            OperationFailure)
+from pymongo.ismaster import IsMaster
+from pymongo.message import query
+from pymongo.pool import (_HAVE_SNI,
+                          _PY37PLUS,
+                          _raise_connection_failure,
+                          _set_keepalive_times,
+                          is_ip_address,
+                          SocketInfo)
+from pymongo.read_preferences import ReadPreference
+from pymongo.ssl_match_hostname import match_hostname, CertificateError
+
+# AsyncMongoClient only speaks OP_MSG.
+_MIN_WIRE_VERSION = 6
+
+
+class _ThreadedSocketInfo(object):
+    """A blocking facade for an AsyncSocketInfo.
+
+    The functions in :mod:`pymongo.auth` call ``sock_info.command``
+    synchronously. Running them on an executor thread with this facade lets
+    every authentication mechanism work unchanged while the actual I/O, and
+    only the I/O, runs on the event loop.
+    """
+    def __init__(self, sock_info, loop):
+        self.__sock_info = sock_info
+        self.__loop = loop
+
+    def command(self, *args, **kwargs):
+        return asyncio.run_coroutine_threadsafe(
+            self.__sock_info.command(*args, **kwargs), self.__loop).result()
+
+    def __getattr__(self, name):
+        return getattr(self.__sock_info, name)
+
+
+class AsyncSocketInfo(SocketInfo):
+    """Store an asyncio stream pair with some metadata.
+
+    The I/O methods of :class:`~pymongo.pool.SocketInfo` are coroutines here.
+
+    :Parameters:
+      - `reader`: an asyncio.StreamReader
+      - `writer`: an asyncio.StreamWriter
+      - `pool`: an AsyncPool instance
+      - `address`: the server's (host, port)
+    """
+    def __init__(self, reader, writer, pool, address):
+        super(AsyncSocketInfo, self).__init__(None, pool, address)
+        self.reader = reader
+        self.writer = writer
+        self.socket_timeout = pool.opts.socket_timeout
+
+    async def ismaster(self, metadata, cluster_time):
+        cmd = self._ismaster_command(metadata, cluster_time)
+        # The handshake is always sent with OP_QUERY, op_msg_enabled is
+        # False until it completes.
+        ismaster = IsMaster(await self._legacy_command('admin', cmd))
+        return self._handle_ismaster(ismaster)
+
+    async def _legacy_command(self, dbname, spec):
+        """Run a command with OP_QUERY, only used for the handshake."""
+        request_id, msg, _ = _legacy_query(dbname, spec)
+        try:
+            await async_network.send_message(
+                self.writer, msg, self.socket_timeout)
+            reply = await async_network.receive_message(
+                self.reader, request_id, self.max_message_size,
+                self.socket_timeout)
+        except OperationFailure:
+            raise
+        except BaseException as error:
+            self._raise_connection_failure(error)
+        return reply.command_response()
+
+    async def command(self, dbname, spec, slave_ok=False,
+                      read_preference=ReadPreference.PRIMARY,
+                      codec_options=DEFAULT_CODEC_OPTIONS, check=True,
+                      allowable_errors=None, check_keys=False,
+                      read_concern=None,
+                      write_concern=None,
+                      parse_write_concern_error=False,
+                      collation=None,
+                      session=None,
+                      client=None,
+                      retryable_write=False,
+                      publish_events=True):
+        """Execute a command or raise an error.
+
+        See :meth:`pymongo.pool.SocketInfo.command` for the parameters.
+        """
+        self.validate_session(client, session)
+        session = _validate_session_write_concern(session, write_concern)
+
+        # Ensure command name remains in first place.
+        if not isinstance(spec, ORDERED_TYPES):
+            spec = SON(spec)
+
+        if not (write_concern is None or write_concern.acknowledged or
+                collation is None):
+            raise ConfigurationError(
+                'Collation is unsupported for unacknowledged writes.')
+        if write_concern and not write_concern.is_server_default:
+            spec['writeConcern'] = write_concern.document
+
+        if session:
+            session._apply_to(spec, retryable_write, read_preference)
+        self.send_cluster_time(spec, session, client)
+        listeners = self.listeners if publish_events else None
+        unacknowledged = write_concern and not write_concern.acknowledged
+        self._raise_if_not_writable(unacknowledged)
+        try:
+            return await async_network.command(
+                self.reader, self.writer, dbname, spec, slave_ok,
+                self.is_mongos, read_preference, codec_options, session,
+                client, check, allowable_errors, self.address, check_keys,
+                listeners, self.max_bson_size, read_concern,
+                parse_write_concern_error=parse_write_concern_error,
+                collation=collation,
+                compression_ctx=self.compression_context,
+                unacknowledged=unacknowledged,
+                max_message_size=self.max_message_size,
+                timeout=self.socket_timeout)
+        except OperationFailure:
+            raise
+        # Catch socket.error, CancelledError, etc. and close ourselves.
+        except BaseException as error:
+            self._raise_connection_failure(error)
+
+    async def send_message(self, message, max_doc_size):
+        """Send a raw BSON message or raise ConnectionFailure.
+
+        If a network exception is raised, the connection is closed.
+        """
+        if (self.max_bson_size is not None
+                and max_doc_size > self.max_bson_size):
+            raise DocumentTooLarge(
+                "BSON document too large (%d bytes) - the connected server "
+                "supports BSON document sizes up to %d bytes." %
+                (max_doc_size, self.max_bson_size))
+
+        try:
+            await async_network.send_message(
+                self.writer, message, self.socket_timeout)
+        except BaseException as error:
+            self._raise_connection_failure(error)
+
+    async def receive_message(self, request_id):
+        """Receive a raw BSON message or raise ConnectionFailure.
+
+        If any exception is raised, the connection is closed.
+        """
+        try:
+            return await async_network.receive_message(
+                self.reader, request_id, self.max_message_size,
+                self.socket_timeout)
+        except BaseException as error:
+            self._raise_connection_failure(error)
+
+    async def write_command(self, request_id, msg):
+        """Send "insert" etc. command, returning response as a dict.
+
+        Can raise ConnectionFailure or OperationFailure.
+        """
+        await self.send_message(msg, 0)
+        reply = await self.receive_message(request_id)
+        result = reply.command_response()
+
+        # Raises NotMasterError or OperationFailure.
+        helpers._check_command_response(result)
+        return result
+
+    async def check_auth(self, all_credentials):
+        """Update this connection's authentication.
+
+        The authentication conversation runs on an executor thread through a
+        blocking facade, so key derivation (e.g. SCRAM's PBKDF2) does not
+        block the event loop.
+        """
+        if all_credentials or self.authset:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(
+                None, SocketInfo.check_auth,
+                _ThreadedSocketInfo(self, loop), all_credentials)
+
+    async def authenticate(self, credentials):
+        """Log in to the server and store these credentials in `authset`."""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, auth.authenticate, credentials,
+            _ThreadedSocketInfo(self, loop))
+        self.authset.add(credentials)
+
+    def is_stale(self):
+        """True if the server closed this connection while it was idle."""
+        return self.reader.at_eof() or self.writer.transport.is_closing()
+
+    def close(self, reason=None):
+        self.closed = True
+        # Avoid exceptions on interpreter shutdown.
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+    def _raise_connection_failure(self, error):
+        self.close()
+        if isinstance(error, asyncio.IncompleteReadError):
+            _raise_connection_failure(
+                self.address, socket.error('connection closed'))
+        elif isinstance(error, asyncio.TimeoutError):
+            _raise_connection_failure(self.address, socket.timeout('timed out'))
+        super(AsyncSocketInfo, self)._raise_connection_failure(error)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return "AsyncSocketInfo(%r)%s at %s" % (
+            self.address,
+            self.closed and " CLOSED" or "",
+            id(self)
+        )
+
+
+def _legacy_query(dbname, spec):
+    return query(0, dbname + '.$cmd', 0, -1, spec, None,
+                 DEFAULT_CODEC_OPTIONS)
+
+
+async def _open_connection(address, options):
+    """Open an asyncio stream pair to `address`, with TLS if configured.
+
+    Can raise socket.error, asyncio.TimeoutError or CertificateError.
+    """
+    host, port = address
+    is_unix = host.endswith('.sock')
+    if is_unix:
+        coro = asyncio.open_unix_connection(host)
+    else:
+        ssl_context = options.ssl_context
+        kwargs = {}
+        if ssl_context is not None:
+            kwargs['ssl'] = ssl_context
+            # See _configured_socket for why IP addresses are excluded.
+            if _HAVE_SNI and (not is_ip_address(host) or _PY37PLUS):
+                kwargs['server_hostname'] = host
+            else:
+                kwargs['server_hostname'] = ''
+        # Don't try IPv6 if host is 'localhost', see _create_connection.
+        if host == 'localhost':
+            kwargs['family'] = socket.AF_INET
+        coro = asyncio.open_connection(host, port, **kwargs)
+
+    if options.connect_timeout is None:
+        reader, writer = await coro
+    else:
+        reader, writer = await asyncio.wait_for(coro, options.connect_timeout)
+
+    sock = writer.get_extra_info('socket')
+    if sock is not None and not is_unix:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE,
+                        options.socket_keepalive)
+        if options.socket_keepalive:
+            _set_keepalive_times(sock)
+
+    ssl_context = options.ssl_context
+    if (ssl_context is not None and ssl_context.verify_mode and not
+            getattr(ssl_context, "check_hostname", False) and
+            options.ssl_match_hostname):
+        try:
+            match_hostname(writer.get_extra_info('peercert'), hostname=host)
+        except CertificateError:
+            writer.close()
+            raise
+    return reader, writer
+
+
+class _Checkout(object):
+    """Async context manager returned by :meth:`AsyncPool.get_socket`."""
+
+    __slots__ = ('pool', 'all_credentials', 'checkout', 'sock_info')
+
+    def __init__(self, pool, all_credentials, checkout):
+        self.pool = pool
+        self.all_credentials = all_credentials
+        self.checkout = checkout
+        self.sock_info = None
+
+    async def __aenter__(self):
+        sock_info = await self.pool._get_socket_no_auth()
+        try:
+            await sock_info.check_auth(self.all_credentials)
+        except BaseException:
+            self.pool.return_socket(sock_info)
+            raise
+        self.sock_info = sock_info
+        return sock_info
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None or not self.checkout:
+            self.pool.return_socket(self.sock_info)
+
+
+class AsyncPool(object):
+    """A connection pool for one server, driven by an asyncio event loop.
+
+    Idle connections are reused LIFO, like :class:`pymongo.pool.Pool`. Tasks
+    that find the pool at ``maxPoolSize`` wait in a FIFO queue without
+    blocking the loop. A returned connection, or the right to open a new one,
+    is handed directly to the longest waiting task.
+
+    Not thread safe: all methods must be called on the event loop's thread.
+    """
+    def __init__(self, address, options, handshake=True):
+        """
+        :Parameters:
+          - `address`: a (hostname, port) tuple
+          - `options`: a PoolOptions instance
+          - `handshake`: whether to call ismaster for each new socket
+        """
+        self.sockets = collections.deque()
+        self.active_sockets = 0
+        # Futures of tasks waiting for a connection, in arrival order. Each is
+        # resolved with an AsyncSocketInfo, or None to open a new connection.
+        self._waiters = collections.deque()
+
+        self.pool_id = 0
+        self.pid = os.getpid()
+        self.address = address
+        self.opts = options
+        self.handshake = handshake
+        # asyncio streams buffer replies themselves.
+        self.receive_buffers = None
+        # Connection pool events are only published by the threaded Pool.
+        self.enabled_for_cmap = False
+
+        if (self.opts.wait_queue_multiple is None or
+                self.opts.max_pool_size is None):
+            self._max_waiters = None
+        else:
+            self._max_waiters = (
+                self.opts.max_pool_size * self.opts.wait_queue_multiple)
+
+    def reset(self):
+        """Close idle connections and stop reusing checked out ones."""
+        self.pool_id += 1
+        self.pid = os.getpid()
+        sockets, self.sockets = self.sockets, collections.deque()
+
+        for sock_info in sockets:
+            sock_info.close()
+
+    async def connect(self):
+        """Connect to Mongo and return a new AsyncSocketInfo.
+
+        Can raise ConnectionFailure, ConfigurationError, or CertificateError.
+        """
+        try:
+            reader, writer = await _open_connection(self.address, self.opts)
+        except (socket.error, asyncio.TimeoutError) as error:
+            if isinstance(error, asyncio.TimeoutError):
+                error = socket.timeout('timed out')
+            _raise_connection_failure(self.address, error)
+
+        sock_info = AsyncSocketInfo(reader, writer, self, self.address)
+        if self.handshake:
+            try:
+                await sock_info.ismaster(self.opts.metadata, None)
+            except BaseException:
+                sock_info.close()
+                raise
+            if sock_info.max_wire_version < _MIN_WIRE_VERSION:
+                sock_info.close()
+                raise ConfigurationError(
+                    "Server at %s:%d reports wire version %d, but "
+                    "AsyncMongoClient requires at least %d (MongoDB 3.6)" % (
+                        self.address[0], self.address[1] or 0,
+                        sock_info.max_wire_version, _MIN_WIRE_VERSION))
+        return sock_info
+
+    def get_socket(self, all_credentials, checkout=False):
+        """Get a socket from the pool. Use with an "async with" statement.
+
+        Returns a :class:`AsyncSocketInfo`::
+
+            async with pool.get_socket(credentials) as sock_info:
+                await sock_info.command('admin', {'ping': 1})
+
+        :Parameters:
+          - `all_credentials`: dict, maps auth source to MongoCredential.
+          - `checkout` (optional): keep socket checked out.
+        """
+        return _Checkout(self, all_credentials, checkout)
+
+    async def _get_socket_no_auth(self):
+        """Get or create an AsyncSocketInfo. Can raise ConnectionFailure."""
+        if self.pid != os.getpid():
+            self.reset()
+
+        max_size = self.opts.max_pool_size
+        if max_size is None or self.active_sockets < max_size:
+            self.active_sockets += 1
+            sock_info = None
+        else:
+            sock_info = await self._wait_for_socket()
+
+        # We now own a slot and must release it on error.
+        try:
+            while sock_info is None:
+                if self.sockets:
+                    sock_info = self._check(self.sockets.popleft())
+                else:
+                    sock_info = await self.connect()
+        except BaseException:
+            self._release_slot()
+            raise
+        return sock_info
+
+    async def _wait_for_socket(self):
+        """Wait in line for a connection or a free slot."""
+        if (self._max_waiters is not None and
+                len(self._waiters) >= self._max_waiters):
+            raise ExceededMaxWaiters(
+                'exceeded max waiters: %d threads already waiting' % (
+                    len(self._waiters),))
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            if self.opts.wait_queue_timeout is None:
+                return await waiter
+            return await asyncio.wait_for(
+                asyncio.shield(waiter), self.opts.wait_queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._raise_wait_queue_timeout()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter):
+        """Give up a place in line, passing on anything handed to us."""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            # Already handed a connection or a slot, hand it to the next task.
+            if not waiter.cancelled():
+                self._hand_off(waiter.result())
+        else:
+            waiter.cancel()
+
+    def return_socket(self, sock_info):
+        """Return the socket to the pool, or if it's closed discard it."""
+        if self.pid != os.getpid():
+            self.reset()
+        elif sock_info.pool_id != self.pool_id:
+            sock_info.close()
+        elif not sock_info.closed:
+            sock_info.update_last_checkin_time()
+            self._hand_off(sock_info)
+            return
+        self._hand_off(None)
+
+    def _release_slot(self):
+        self._hand_off(None)
+
+    def _hand_off(self, sock_info):
+        """Give a connection, or the slot of a discarded one, to the next
+        waiter. Without waiters, idle the connection and free the slot."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(sock_info)
+                return
+        if sock_info is not None:
+            self.sockets.appendleft(sock_info)
+        self.active_sockets -= 1
+
+    def _check(self, sock_info):
+        """Return `sock_info` if it's usable, otherwise close it and return
+        None so the caller opens a new connection."""
+        if (self.opts.max_idle_time_seconds is not None and
+                sock_info.idle_time_seconds() >
+                self.opts.max_idle_time_seconds):
+            sock_info.close()
+            return None
+        if sock_info.pool_id != self.pool_id or sock_info.is_stale():
+            sock_info.close()
+            return None
+        return sock_info
+
+    def _raise_wait_queue_timeout(self):
+        raise ConnectionFailure(
+            'Timed out waiting for socket from pool with max_size %r and'
+            ' wait_queue_timeout %r' % (
+                self.opts.max_pool_size, self.opts.wait_queue_timeout))
+
+    def close(self):
+        """Close all idle connections."""
+        self.reset()
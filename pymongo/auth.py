@@ -17,7 +17,12 @@
 import functools
 import hashlib
 import hmac
+import json
+import os
 import socket
+import tempfile
+import threading
+import warnings
 
 try:
     from urllib import quote
@@ -59,12 +64,14 @@ MECHANISMS = frozenset(
 
 
 class _Cache(object):
-    __slots__ = ("data",)
+    __slots__ = ("data", "shared")
 
     _hash_val = hash('_Cache')
 
-    def __init__(self):
+    def __init__(self, shared=None):
         self.data = None
+        # A _SharedScramKeyCache, or None.
+        self.shared = shared
 
     def __eq__(self, other):
         # Two instances must always compare equal.
@@ -81,6 +88,126 @@ class _Cache(object):
         return self._hash_val
 
 
+class _SharedScramKeyCache(object):
+    """Derived SCRAM keys shared by all clients in this process, and by all
+    processes that use the same cache file.
+
+    Deriving the keys runs PBKDF2 with the server's iteration count, which is
+    slow on purpose. Processes forked after authenticating inherit the keys
+    in memory. With a `path`, keys are also read from and written to that
+    file, which must be owned by the current user and not readable by
+    others: like a password, its contents let anyone authenticate.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__keys = {}
+        self.__version = None
+
+    @staticmethod
+    def key(mechanism, source, username, data, salt, iterations):
+        """Identify the keys derived from `data`, the SCRAM password, for a
+        user, salt, iteration count and mechanism.
+
+        The password is only included as an HMAC keyed by the salt, so keys
+        are only found for the password they were derived from.
+        """
+        digest = hashlib.sha256()
+        for part in (mechanism, source, username):
+            digest.update(part.encode('utf-8') + b'\x00')
+        digest.update(salt + b'\x00')
+        digest.update(str(iterations).encode('utf-8') + b'\x00')
+        digest.update(hmac.HMAC(salt, data, hashlib.sha256).digest())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return (client_key, server_key), or None."""
+        with self.__lock:
+            keys = self.__keys.get(key)
+            if keys is None and self.path is not None:
+                self.__load()
+                keys = self.__keys.get(key)
+            return keys
+
+    def put(self, key, client_key, server_key):
+        with self.__lock:
+            self.__keys[key] = (client_key, server_key)
+            if self.path is not None:
+                # Merge keys other processes added since we last looked.
+                self.__load()
+                self.__save()
+
+    def __load(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        # A replaced file has a new inode.
+        version = (stat.st_mtime, stat.st_ino)
+        if version == self.__version:
+            return
+        self.__version = version
+        if hasattr(os, 'getuid') and (
+                stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+            warnings.warn("Ignoring SCRAM key cache file %s: it must be "
+                          "owned by the current user and not accessible by "
+                          "others" % (self.path,), stacklevel=4)
+            return
+        try:
+            with open(self.path) as cache_file:
+                doc = json.load(cache_file)
+            for key, (client_key, server_key) in doc.items():
+                self.__keys.setdefault(key, (
+                    standard_b64decode(client_key.encode('ascii')),
+                    standard_b64decode(server_key.encode('ascii'))))
+        except (IOError, ValueError, TypeError, AttributeError):
+            # Missing, or written by something else. Recreated by __save.
+            pass
+
+    def __save(self):
+        doc = dict(
+            (key, (standard_b64encode(client_key).decode('ascii'),
+                   standard_b64encode(server_key).decode('ascii')))
+            for key, (client_key, server_key) in self.__keys.items())
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            # mkstemp creates the file readable and writable only by us.
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix='.scram-key-cache')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(doc, tmp_file)
+            # Replace the file atomically, readers see old or new keys.
+            getattr(os, 'replace', os.rename)(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self.__version = (stat.st_mtime, stat.st_ino)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+_shared_scram_key_caches = {}
+_shared_scram_key_caches_lock = threading.Lock()
+
+
+def _get_shared_scram_key_cache(path):
+    """Return the process-wide _SharedScramKeyCache for the file `path`, or
+    for memory only if `path` is None.
+    """
+    if path is not None:
+        path = os.path.abspath(path)
+    with _shared_scram_key_caches_lock:
+        cache = _shared_scram_key_caches.get(path)
+        if cache is None:
+            cache = _shared_scram_key_caches[path] = _SharedScramKeyCache(
+                path)
+        return cache
+
 
 MongoCredential = namedtuple(
     'MongoCredential',
@@ -135,8 +262,12 @@ def _build_credentials_tuple(mech, source, user, passwd, extra, database):
         source_database = source or database or 'admin'
         if passwd is None:
             raise ConfigurationError("A password is required.")
+        shared = None
+        if extra.get('scramkeycache') or extra.get('scramkeycachefile'):
+            shared = _get_shared_scram_key_cache(
+                extra.get('scramkeycachefile'))
         return MongoCredential(
-            mech, source_database, user, passwd, None, _Cache())
+            mech, source_database, user, passwd, None, _Cache(shared))
 
 
 if PY3:
@@ -234,6 +365,21 @@ def _parse_scram_response(response):
     return dict(item.split(b"=", 1) for item in response.split(b","))
 
 
+def _authenticate_scram_start(credentials, mechanism):
+    """Return (nonce, client-first-message-bare, saslStart command)."""
+    username = credentials.username
+    user = username.encode("utf-8").replace(b"=", b"=3D").replace(b",", b"=2C")
+    nonce = standard_b64encode(
+        (("%s" % (SystemRandom().random(),))[2:]).encode("utf-8"))
+    first_bare = b"n=" + user + b",r=" + nonce
+
+    cmd = SON([('saslStart', 1),
+               ('mechanism', mechanism),
+               ('payload', Binary(b"n,," + first_bare)),
+               ('autoAuthorize', 1)])
+    return nonce, first_bare, cmd
+
+
 def _authenticate_scram(credentials, sock_info, mechanism):
     """Authenticate using SCRAM."""
 
@@ -252,16 +398,16 @@ def _authenticate_scram(credentials, sock_info, mechanism):
     # Make local
     _hmac = hmac.HMAC
 
-    user = username.encode("utf-8").replace(b"=", b"=3D").replace(b",", b"=2C")
-    nonce = standard_b64encode(
-        (("%s" % (SystemRandom().random(),))[2:]).encode("utf-8"))
-    first_bare = b"n=" + user + b",r=" + nonce
-
-    cmd = SON([('saslStart', 1),
-               ('mechanism', mechanism),
-               ('payload', Binary(b"n,," + first_bare)),
-               ('autoAuthorize', 1)])
-    res = sock_info.command(source, cmd)
+    ctx = sock_info.auth_ctx.pop(credentials, None)
+    if (ctx is not None and ctx.mechanism == mechanism and
+            ctx.speculate_succeeded()):
+        # The server replied to saslStart in the ismaster handshake.
+        nonce, first_bare = ctx.scram_data
+        res = ctx.speculative_authenticate
+    else:
+        nonce, first_bare, cmd = _authenticate_scram_start(
+            credentials, mechanism)
+        res = sock_info.command(source, cmd)
 
     server_first = res['payload']
     parsed = _parse_scram_response(server_first)
@@ -282,10 +428,20 @@ def _authenticate_scram(credentials, sock_info, mechanism):
     # Salt and / or iterations could change for a number of different
     # reasons. Either changing invalidates the cache.
     if not client_key or salt != csalt or iterations != citerations:
-        salted_pass = _hi(
-            digest, data, standard_b64decode(salt), iterations)
-        client_key = _hmac(salted_pass, b"Client Key", digestmod).digest()
-        server_key = _hmac(salted_pass, b"Server Key", digestmod).digest()
+        keys = shared_key = None
+        if cache.shared is not None:
+            shared_key = cache.shared.key(
+                mechanism, source, username, data, salt, iterations)
+            keys = cache.shared.get(shared_key)
+        if keys is not None:
+            client_key, server_key = keys
+        else:
+            salted_pass = _hi(
+                digest, data, standard_b64decode(salt), iterations)
+            client_key = _hmac(salted_pass, b"Client Key", digestmod).digest()
+            server_key = _hmac(salted_pass, b"Server Key", digestmod).digest()
+            if cache.shared is not None:
+                cache.shared.put(shared_key, client_key, server_key)
         cache.data = (client_key, server_key, salt, iterations)
     stored_key = digestmod(client_key).digest()
     auth_msg = b",".join((first_bare, server_first, without_proof))
@@ -493,14 +649,24 @@ def _authenticate_cram_md5(credentials, sock_info):
     sock_info.command(source, cmd)
 
 
+def _x509_command(credentials):
+    cmd = SON([('authenticate', 1),
+               ('mechanism', 'MONGODB-X509')])
+    if credentials.username is not None:
+        cmd['user'] = credentials.username
+    return cmd
+
+
 def _authenticate_x509(credentials, sock_info):
     """Authenticate using MONGODB-X509.
     """
-    query = SON([('authenticate', 1),
-                 ('mechanism', 'MONGODB-X509')])
-    if credentials.username is not None:
-        query['user'] = credentials.username
-    elif sock_info.max_wire_version < 5:
+    ctx = sock_info.auth_ctx.pop(credentials, None)
+    if ctx is not None and ctx.speculate_succeeded():
+        # The server authenticated us in the ismaster handshake.
+        return
+    query = _x509_command(credentials)
+    if (credentials.username is None and
+            sock_info.max_wire_version < 5):
         raise ConfigurationError(
             "A username is required for MONGODB-X509 authentication "
             "when connected to MongoDB versions older than 3.4.")
@@ -528,12 +694,17 @@ def _authenticate_mongo_cr(credentials, sock_info):
 
 def _authenticate_default(credentials, sock_info):
     if sock_info.max_wire_version >= 7:
-        source = credentials.source
-        cmd = SON([
-            ('ismaster', 1),
-            ('saslSupportedMechs', source + '.' + credentials.username)])
-        mechs = sock_info.command(
-            source, cmd, publish_events=False).get('saslSupportedMechs', [])
+        if credentials in sock_info.negotiated_mechanisms:
+            # Sent in the ismaster handshake.
+            mechs = sock_info.negotiated_mechanisms[credentials]
+        else:
+            source = credentials.source
+            cmd = SON([
+                ('ismaster', 1),
+                ('saslSupportedMechs', source + '.' + credentials.username)])
+            mechs = sock_info.command(
+                source, cmd, publish_events=False).get(
+                    'saslSupportedMechs', [])
         if 'SCRAM-SHA-256' in mechs:
             return _authenticate_scram(credentials, sock_info, 'SCRAM-SHA-256')
         else:
@@ -558,6 +729,78 @@ _AUTH_MAP = {
 }
 
 
+class _AuthContext(object):
+    """The first step of an authentication conversation, sent speculatively
+    with the ismaster handshake of a new connection.
+
+    If the server replies with a speculativeAuthenticate document,
+    authenticate() continues the conversation from it instead of starting
+    a new one. Servers that don't support speculative authentication ignore
+    it, and authenticate() starts the conversation as usual.
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.speculative_authenticate = None
+
+    @staticmethod
+    def from_credentials(credentials):
+        """Return an _AuthContext for `credentials`, or None if its
+        mechanism doesn't support speculative authentication.
+        """
+        ctx_class = _SPECULATIVE_AUTH_MAP.get(credentials.mechanism)
+        if ctx_class is None:
+            return None
+        return ctx_class(credentials)
+
+    def speculate_command(self):
+        """The speculativeAuthenticate document for the ismaster command."""
+        raise NotImplementedError
+
+    def parse_response(self, ismaster):
+        self.speculative_authenticate = ismaster.speculative_authenticate
+
+    def speculate_succeeded(self):
+        return bool(self.speculative_authenticate)
+
+
+class _ScramContext(_AuthContext):
+    def __init__(self, credentials, mechanism):
+        super(_ScramContext, self).__init__(credentials)
+        self.mechanism = mechanism
+        # The nonce and client-first-message-bare, to finish the
+        # conversation.
+        self.scram_data = None
+
+    def speculate_command(self):
+        nonce, first_bare, cmd = _authenticate_scram_start(
+            self.credentials, self.mechanism)
+        # The 'db' field is included only on the speculative command.
+        cmd['db'] = self.credentials.source
+        self.scram_data = (nonce, first_bare)
+        return cmd
+
+
+class _X509Context(_AuthContext):
+    mechanism = 'MONGODB-X509'
+
+    def speculate_command(self):
+        cmd = _x509_command(self.credentials)
+        cmd['db'] = '$external'
+        return cmd
+
+
+_SPECULATIVE_AUTH_MAP = {
+    'MONGODB-X509': _X509Context,
+    'SCRAM-SHA-1': functools.partial(_ScramContext, mechanism='SCRAM-SHA-1'),
+    'SCRAM-SHA-256': functools.partial(
+        _ScramContext, mechanism='SCRAM-SHA-256'),
+    # MongoDB 4.0+ supports SCRAM-SHA-256, older servers ignore speculative
+    # authentication.
+    'DEFAULT': functools.partial(_ScramContext, mechanism='SCRAM-SHA-256'),
+}
+
+
 def authenticate(credentials, sock_info):
     """Authenticate sock_info."""
     mechanism = credentials.mechanism
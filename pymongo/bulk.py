@@ -17,15 +17,19 @@
 .. versionadded:: 2.7
 """
 import copy
+import threading
 
-from itertools import islice
+from itertools import chain, islice
 
+from bson import _dict_to_bson
 from bson.objectid import ObjectId
 from bson.raw_bson import RawBSONDocument
 from bson.son import SON
 from pymongo.client_session import _validate_session_write_concern
-from pymongo.common import (validate_is_mapping,
+from pymongo.common import (validate_boolean,
+                            validate_is_mapping,
                             validate_is_document_type,
+                            validate_positive_integer,
                             validate_ok_for_replace,
                             validate_ok_for_update)
 from pymongo.helpers import _RETRYABLE_ERROR_CODES
@@ -53,6 +57,10 @@ _WRITE_CONCERN_ERROR = 64
 
 _COMMANDS = ('insert', 'update', 'delete')
 
+# The limits of MongoDB 3.6+, for the first run of a streaming bulk write.
+_STREAM_MAX_BATCH_SIZE = 100000
+_STREAM_MAX_MESSAGE_SIZE = 48000000
+
 
 # These string literals are used when we create fake server return
 # documents client side. We use unicode literals in python 2.x to
@@ -70,6 +78,8 @@ class _Run(object):
         self.index_map = []
         self.ops = []
         self.idx_offset = 0
+        # The _EncodedOps for this run in a pipelined bulk write.
+        self.encoded = None
 
     def index(self, idx):
         """Get the original index of an operation in this run.
@@ -140,10 +150,146 @@ def _raise_bulk_write_error(full_result):
     raise BulkWriteError(full_result)
 
 
+class _EncodedOps(object):
+    """Encodes the operations of a _Run to BSON on a background thread.
+
+    The thread stays at most `max_bytes` of BSON ahead of the operations
+    the server has acknowledged, so the next batch is usually encoded by
+    the time the server replies to the current one. Operations are yielded
+    as RawBSONDocuments, which the batch splitting functions copy as is.
+    """
+
+    def __init__(self, ops, check_keys, codec_options, max_bytes):
+        self._ops = ops
+        self._check_keys = check_keys
+        self._codec_options = codec_options
+        self._max_bytes = max_bytes
+        self._cond = threading.Condition()
+        # Map of operation index to RawBSONDocument, from the lowest
+        # unreleased index up to the last one encoded.
+        self._encoded = {}
+        self._produced = 0
+        self._released = 0
+        self._buffered = 0
+        self._error = None
+        self._closed = False
+        thread = threading.Thread(
+            target=self._encode, name="pymongo bulk encoder")
+        thread.daemon = True
+        thread.start()
+
+    @property
+    def buffered(self):
+        """The number of bytes of encoded, unreleased operations."""
+        with self._cond:
+            return self._buffered
+
+    def _encode(self):
+        encode = _dict_to_bson
+        for op in self._ops:
+            with self._cond:
+                while self._buffered >= self._max_bytes and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            try:
+                raw = RawBSONDocument(
+                    encode(op, self._check_keys, self._codec_options))
+            except Exception as exc:
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                if self._closed:
+                    return
+                self._encoded[self._produced] = raw
+                self._produced += 1
+                self._buffered += len(raw.raw)
+                self._cond.notify_all()
+
+    def iter_from(self, offset):
+        """Yield encoded operations starting at index `offset`.
+
+        Blocks until each operation is encoded. Raises the encoding error,
+        InvalidDocument for example, when the failed operation is reached.
+        """
+        for idx in range(offset, len(self._ops)):
+            with self._cond:
+                while idx >= self._produced and self._error is None:
+                    self._cond.wait()
+                if idx >= self._produced:
+                    raise self._error
+                raw = self._encoded[idx]
+            yield raw
+
+    def release(self, offset):
+        """Discard the operations before index `offset`, they have been
+        acknowledged by the server.
+        """
+        with self._cond:
+            for idx in range(self._released, min(offset, self._produced)):
+                self._buffered -= len(self._encoded.pop(idx).raw)
+                self._released = idx + 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop encoding and discard all encoded operations."""
+        with self._cond:
+            self._closed = True
+            self._encoded.clear()
+            self._buffered = 0
+            self._cond.notify_all()
+
+
+class _EncodedBatch(object):
+    """The operations of a _Run, encoded to BSON while a streaming bulk
+    write split them into runs.
+
+    Has the same interface as _EncodedOps.
+    """
+
+    def __init__(self):
+        self._encoded = []
+        self._released = 0
+
+    def append(self, raw):
+        self._encoded.append(raw)
+
+    def iter_from(self, offset):
+        """Yield encoded operations starting at index `offset`."""
+        return islice(self._encoded, offset, None)
+
+    def release(self, offset):
+        """Discard the operations before index `offset`."""
+        for idx in range(self._released, offset):
+            self._encoded[idx] = None
+        self._released = max(self._released, offset)
+
+    def close(self):
+        del self._encoded[:]
+
+
+class _Lane(object):
+    """One connection's share of an unordered bulk write that keeps several
+    batches in flight.
+
+    A _Lane stands in for the _Bulk in MongoClient._retry_with_session so
+    each lane retries its own batch.
+    """
+
+    def __init__(self):
+        self.retrying = False
+        self.started_retryable_write = False
+        # The (run, offset, count) sent but not yet acknowledged.
+        self.pending = None
+
+
 class _Bulk(object):
     """The private guts of the bulk write API.
     """
-    def __init__(self, collection, ordered, bypass_document_validation):
+    def __init__(self, collection, ordered, bypass_document_validation,
+                 pipeline=False, max_batches_in_flight=1):
         """Initialize a _Bulk instance.
         """
         self.collection = collection.with_options(
@@ -163,6 +309,24 @@ class _Bulk(object):
         self.started_retryable_write = False
         # Extra state so that we know where to pick up on a retry attempt.
         self.current_run = None
+        # Encode the next batch on a background thread while the current
+        # batch is in flight.
+        self.pipeline = validate_boolean('pipeline', pipeline)
+        # The number of write commands an unordered bulk write can have in
+        # flight at once, each on its own connection.
+        self.max_batches_in_flight = validate_positive_integer(
+            'max_batches_in_flight', max_batches_in_flight)
+        if ordered and max_batches_in_flight > 1:
+            raise ConfigurationError(
+                'max_batches_in_flight > 1 requires ordered=False')
+        # An iterable of (op_type, operation) to consume lazily instead of
+        # ops, for a streaming bulk write.
+        self.stream_ops = None
+        # The maxWriteBatchSize and maxMessageSizeBytes used to split
+        # stream_ops into runs, updated from each connection used.
+        self.stream_limits = (_STREAM_MAX_BATCH_SIZE, _STREAM_MAX_MESSAGE_SIZE)
+        # Keep the _ids of upserted documents in the result.
+        self.collect_ids = True
 
     def add_insert(self, document):
         """Add an insert document to the list of ops.
@@ -244,6 +408,38 @@ class _Bulk(object):
             if run.ops:
                 yield run
 
+    def gen_stream(self):
+        """Generate batches of operations in the order provided, consuming
+        stream_ops lazily.
+
+        Each batch holds at most one write command's worth of operations,
+        which are encoded to BSON here to measure their size.
+        """
+        codec_options = self.collection.codec_options
+        max_batch_size, max_message_size = self.stream_limits
+        run = None
+        size = 0
+        for idx, (op_type, operation) in enumerate(self.stream_ops):
+            raw = RawBSONDocument(_dict_to_bson(
+                operation, op_type == _INSERT, codec_options))
+            if run is not None and (
+                    run.op_type != op_type or
+                    len(run.ops) >= max_batch_size or
+                    size + len(raw.raw) > max_message_size):
+                yield run
+                # Use the limits of the last server written to.
+                max_batch_size, max_message_size = self.stream_limits
+                run = None
+            if run is None:
+                run = _Run(op_type)
+                run.encoded = _EncodedBatch()
+                size = 0
+            run.add(idx, operation)
+            run.encoded.append(raw)
+            size += len(raw.raw)
+        if run is not None:
+            yield run
+
     def _execute_command(self, generator, write_concern, session,
                          sock_info, op_id, retryable, full_result):
         if sock_info.max_wire_version < 5 and self.uses_collation:
@@ -283,8 +479,16 @@ class _Bulk(object):
                         self.started_retryable_write = True
                     session._apply_to(cmd, retryable, ReadPreference.PRIMARY)
                 sock_info.send_cluster_time(cmd, session, client)
+                sock_info.apply_timeout(cmd)
                 check_keys = run.op_type == _INSERT
-                ops = islice(run.ops, run.idx_offset, None)
+                if self.pipeline and run.encoded is None:
+                    run.encoded = _EncodedOps(
+                        run.ops, check_keys, self.collection.codec_options,
+                        2 * sock_info.max_message_size)
+                if run.encoded is not None:
+                    ops = run.encoded.iter_from(run.idx_offset)
+                else:
+                    ops = islice(run.ops, run.idx_offset, None)
                 # Run as many ops as possible.
                 request_id, msg, to_send = _do_bulk_write_command(
                     self.namespace, run.op_type, cmd, ops, check_keys,
@@ -311,6 +515,8 @@ class _Bulk(object):
                 if self.ordered and "writeErrors" in result:
                     break
                 run.idx_offset += len(to_send)
+                if run.encoded is not None:
+                    run.encoded.release(run.idx_offset)
 
             # We're supposed to continue if errors are
             # at the write concern level (e.g. wtimeout)
@@ -340,11 +546,248 @@ class _Bulk(object):
                 generator, write_concern, session, sock_info, op_id,
                 retryable, full_result)
 
+        client = self.collection.database.client
+        try:
+            with client._tmp_session(session) as s:
+                client._retry_with_session(
+                    self.is_retryable, retryable_bulk, s, self,
+                    self.collection.timeout)
+        finally:
+            run = self.current_run
+            if run is not None and run.encoded is not None:
+                run.encoded.close()
+
+        if not self.collect_ids:
+            del full_result["upserted"]
+        if full_result["writeErrors"] or full_result["writeConcernErrors"]:
+            _raise_bulk_write_error(full_result)
+        return full_result
+
+    def execute_command_stream(self, generator, write_concern, session):
+        """Execute using write commands, one run at a time.
+
+        Each run is generated and then retried on its own, so the
+        operations of a streaming bulk write are consumed as they are sent.
+        """
+        full_result = {
+            "writeErrors": [],
+            "writeConcernErrors": [],
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+        }
+        op_id = _randint()
+
+        def retryable_bulk(session, sock_info, retryable):
+            self.stream_limits = (sock_info.max_write_batch_size,
+                                  sock_info.max_message_size)
+            self._execute_command(
+                iter(()), write_concern, session, sock_info, op_id,
+                retryable, full_result)
+
         client = self.collection.database.client
         with client._tmp_session(session) as s:
-            client._retry_with_session(
-                self.is_retryable, retryable_bulk, s, self)
+            for run in generator:
+                self.current_run = run
+                client._retry_with_session(
+                    self.is_retryable, retryable_bulk, s, self,
+                    self.collection.timeout)
+                if not self.collect_ids:
+                    del full_result["upserted"][:]
+                if self.ordered and full_result["writeErrors"]:
+                    break
 
+        if not self.collect_ids:
+            del full_result["upserted"]
+        if full_result["writeErrors"] or full_result["writeConcernErrors"]:
+            _raise_bulk_write_error(full_result)
+        return full_result
+
+    def execute_command_parallel(self, generator, write_concern):
+        """Execute an unordered bulk write with up to max_batches_in_flight
+        write commands in flight at once.
+
+        Each lane of execution uses its own connection and implicit session
+        and retries its own batch. The main thread is the first lane, the
+        others are started once there is more than one batch to send.
+        """
+        full_result = {
+            "writeErrors": [],
+            "writeConcernErrors": [],
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+        }
+        op_id = _randint()
+        db_name = self.collection.database.name
+        client = self.collection.database.client
+        listeners = client._event_listeners
+        runs = list(generator)
+        lock = threading.Lock()
+        lanes = [_Lane()]
+        threads = []
+        errors = []
+        # Use lists for state shared with the nested functions.
+        position = [0]
+
+        def next_run():
+            # Call with the lock held.
+            while position[0] < len(runs):
+                run = runs[position[0]]
+                if run.idx_offset < len(run.ops):
+                    return run
+                position[0] += 1
+            return None
+
+        def send_batch(lane, session, sock_info, retryable):
+            """Send the lane's pending batch, or claim and send the next
+            one. Returns False when there is nothing left to send.
+            """
+            with lock:
+                if errors:
+                    return False
+                if lane.pending is None:
+                    run = next_run()
+                    if run is None:
+                        return False
+                    offset = run.idx_offset
+                    ops = None
+                else:
+                    # Resend the unacknowledged batch.
+                    run, offset, count = lane.pending
+                    ops = islice(run.ops, offset, offset + count)
+                cmd = SON([(_COMMANDS[run.op_type], self.collection.name),
+                           ('ordered', False)])
+                if not write_concern.is_server_default:
+                    cmd['writeConcern'] = write_concern.document
+                if self.bypass_doc_val and sock_info.max_wire_version >= 4:
+                    cmd['bypassDocumentValidation'] = True
+                bwc = _BulkWriteContext(db_name, cmd, sock_info, op_id,
+                                        listeners, session)
+                if session:
+                    if retryable and not lane.started_retryable_write:
+                        session._start_retryable_write()
+                        lane.started_retryable_write = True
+                    session._apply_to(cmd, retryable, ReadPreference.PRIMARY)
+                sock_info.send_cluster_time(cmd, session, client)
+                sock_info.apply_timeout(cmd)
+                check_keys = run.op_type == _INSERT
+                if self.pipeline:
+                    if run.encoded is None:
+                        run.encoded = _EncodedOps(
+                            run.ops, check_keys,
+                            self.collection.codec_options,
+                            (self.max_batches_in_flight + 1) *
+                            sock_info.max_message_size)
+                    encoded = run.encoded.iter_from(offset)
+                    if ops is None:
+                        ops = encoded
+                    else:
+                        ops = islice(encoded, count)
+                elif ops is None:
+                    ops = islice(run.ops, offset, None)
+                request_id, msg, to_send = _do_bulk_write_command(
+                    self.namespace, run.op_type, cmd, ops, check_keys,
+                    self.collection.codec_options, bwc)
+                if not to_send:
+                    raise InvalidOperation("cannot do an empty bulk write")
+                if lane.pending is None:
+                    run.idx_offset += len(to_send)
+                    lane.pending = (run, offset, len(to_send))
+                start_helpers = (lane is lanes[0] and not threads and
+                                 next_run() is not None)
+            if start_helpers:
+                start_lanes()
+
+            result = bwc.write_command(request_id, msg, to_send)
+            client._receive_cluster_time(result, session)
+
+            with lock:
+                # Retryable writeConcernErrors are retried by this lane.
+                wce = result.get('writeConcernError', {})
+                if wce.get('code', 0) in _RETRYABLE_ERROR_CODES:
+                    full = copy.deepcopy(full_result)
+                    _merge_command(run, full, offset, result)
+                    _raise_bulk_write_error(full)
+                _merge_command(run, full_result, offset, result)
+                _, _, count = lane.pending
+                if len(to_send) < count:
+                    lane.pending = (run, offset + len(to_send),
+                                    count - len(to_send))
+                else:
+                    lane.pending = None
+                if run.encoded is not None:
+                    # Operations before every lane's unacknowledged batch
+                    # are no longer needed.
+                    low = run.idx_offset
+                    for other in lanes:
+                        if other.pending and other.pending[0] is run:
+                            low = min(low, other.pending[1])
+                    run.encoded.release(low)
+            lane.retrying = False
+            lane.started_retryable_write = False
+            return True
+
+        def run_lane(lane, timeout):
+            def lane_bulk(session, sock_info, retryable):
+                if sock_info.max_wire_version < 5 and self.uses_collation:
+                    raise ConfigurationError(
+                        'Must be connected to MongoDB 3.4+ to use a '
+                        'collation.')
+                if sock_info.max_wire_version < 6 and self.uses_array_filters:
+                    raise ConfigurationError(
+                        'Must be connected to MongoDB 3.6+ to use '
+                        'arrayFilters.')
+                sock_info.validate_session(client, session)
+                while send_batch(lane, session, sock_info, retryable):
+                    pass
+
+            try:
+                with client._tmp_session(None) as s:
+                    client._retry_with_session(
+                        self.is_retryable, lane_bulk, s, lane, timeout)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+
+        # Other threads don't see this thread's pymongo.timeout() block.
+        deadline = client._deadline(self.collection.timeout)
+
+        def start_lanes():
+            if deadline is None:
+                timeout = self.collection.timeout
+            else:
+                timeout = max(deadline.remaining(), 0.001)
+            for _ in range(1, self.max_batches_in_flight):
+                lane = _Lane()
+                with lock:
+                    lanes.append(lane)
+                thread = threading.Thread(
+                    target=run_lane, args=(lane, timeout),
+                    name="pymongo bulk write lane")
+                thread.daemon = True
+                threads.append(thread)
+                thread.start()
+
+        try:
+            run_lane(lanes[0], self.collection.timeout)
+        finally:
+            for thread in threads:
+                thread.join()
+            for run in runs:
+                if run.encoded is not None:
+                    run.encoded.close()
+
+        if errors:
+            raise errors[0]
+        if not self.collect_ids:
+            del full_result["upserted"]
         if full_result["writeErrors"] or full_result["writeConcernErrors"]:
             _raise_bulk_write_error(full_result)
         return full_result
@@ -388,7 +831,10 @@ class _Bulk(object):
 
             while run.idx_offset < len(run.ops):
                 check_keys = run.op_type == _INSERT
-                ops = islice(run.ops, run.idx_offset, None)
+                if run.encoded is not None:
+                    ops = run.encoded.iter_from(run.idx_offset)
+                else:
+                    ops = islice(run.ops, run.idx_offset, None)
                 # Run as many ops as possible.
                 request_id, msg, to_send = _do_bulk_write_command(
                     self.namespace, run.op_type, cmd, ops, check_keys,
@@ -499,24 +945,46 @@ class _Bulk(object):
     def execute(self, write_concern, session):
         """Execute operations.
         """
-        if not self.ops:
+        stream = self.stream_ops is not None
+        if not (stream or self.ops):
             raise InvalidOperation('No operations to execute')
         if self.executed:
             raise InvalidOperation('Bulk operations can '
                                    'only be executed once.')
+        if stream and (self.pipeline or self.max_batches_in_flight > 1):
+            raise ConfigurationError(
+                'A streaming bulk write cannot be combined with pipeline '
+                'or max_batches_in_flight > 1')
         self.executed = True
         write_concern = write_concern or self.collection.write_concern
         session = _validate_session_write_concern(session, write_concern)
 
-        if self.ordered:
+        if stream:
+            generator = self.gen_stream()
+            first = next(generator, None)
+            if first is None:
+                raise InvalidOperation('No operations to execute')
+            generator = chain([first], generator)
+        elif self.ordered:
             generator = self.gen_ordered()
         else:
             generator = self.gen_unordered()
 
         client = self.collection.database.client
         if not write_concern.acknowledged:
-            with client._socket_for_writes() as sock_info:
+            with client._socket_for_writes(
+                    self.collection.timeout) as sock_info:
                 self.execute_no_results(sock_info, generator)
+        elif stream:
+            return self.execute_command_stream(
+                generator, write_concern, session)
+        elif self.max_batches_in_flight > 1:
+            if session is not None:
+                # A session can't be used by several threads at once.
+                raise InvalidOperation(
+                    'max_batches_in_flight > 1 cannot be used with an '
+                    'explicit session')
+            return self.execute_command_parallel(generator, write_concern)
         else:
             return self.execute_command(generator, write_concern, session)
 
@@ -18,7 +18,9 @@ from bson.codec_options import _parse_codec_options
 from pymongo.auth import _build_credentials_tuple
 from pymongo.common import validate_boolean
 from pymongo import common
-from pymongo.compression_support import CompressionSettings
+from pymongo.compression_support import (COMPRESSION_MIN_SIZE,
+                                         CompressionSettings,
+                                         ZSTD_COMPRESSION_LEVEL)
 from pymongo.errors import ConfigurationError
 from pymongo.monitoring import _EventListeners
 from pymongo.pool import PoolOptions
@@ -125,7 +127,12 @@ def _parse_pool_options(options):
     driver = options.get('driver')
     compression_settings = CompressionSettings(
         options.get('compressors', []),
-        options.get('zlibcompressionlevel', -1))
+        options.get('zlibcompressionlevel', -1),
+        options.get('zstdcompressionlevel', ZSTD_COMPRESSION_LEVEL),
+        options.get('compressionminsize', COMPRESSION_MIN_SIZE))
+    receive_buffer_pool_size = options.get(
+        'receivebufferpoolsize', common.RECEIVE_BUFFER_POOL_SIZE)
+    max_connecting = options.get('maxconnecting', common.MAX_CONNECTING)
     ssl_context, ssl_match_hostname = _parse_ssl_options(options)
     return PoolOptions(max_pool_size,
                        min_pool_size,
@@ -136,7 +143,9 @@ def _parse_pool_options(options):
                        _EventListeners(event_listeners),
                        appname,
                        driver,
-                       compression_settings)
+                       compression_settings,
+                       receive_buffer_pool_size,
+                       max_connecting)
 
 
 class ClientOptions(object):
@@ -166,6 +175,7 @@ class ClientOptions(object):
         self.__retry_writes = options.get('retrywrites', common.RETRY_WRITES)
         self.__server_selector = options.get(
             'server_selector', any_server_selector)
+        self.__timeout = options.get('timeoutms')
 
     @property
     def _options(self):
@@ -197,6 +207,11 @@ class ClientOptions(object):
         """The server selection timeout for this instance in seconds."""
         return self.__server_selection_timeout
 
+    @property
+    def timeout(self):
+        """The timeout for each operation in seconds, or None."""
+        return self.__timeout
+
     @property
     def server_selector(self):
         return self.__server_selector
@@ -43,12 +43,14 @@ from pymongo.helpers import (_check_write_command_response,
                              _raise_last_error)
 from pymongo.message import _UNICODE_REPLACE_CODEC_OPTIONS
 from pymongo.operations import IndexModel
+from pymongo.parallel_find import ParallelFind
 from pymongo.read_preferences import ReadPreference
 from pymongo.results import (BulkWriteResult,
                              DeleteResult,
                              InsertOneResult,
                              InsertManyResult,
                              UpdateResult)
+from pymongo.write_coalescer import WriteCoalescer
 from pymongo.write_concern import WriteConcern
 
 _NO_OBJ_ERROR = "No matching object found"
@@ -74,7 +76,7 @@ class Collection(common.BaseObject):
 
     def __init__(self, database, name, create=False, codec_options=None,
                  read_preference=None, write_concern=None, read_concern=None,
-                 session=None, **kwargs):
+                 session=None, timeout=None, **kwargs):
         """Get / create a Mongo collection.
 
         Raises :class:`TypeError` if `name` is not an instance of
@@ -108,6 +110,9 @@ class Collection(common.BaseObject):
           - `read_concern` (optional): An instance of
             :class:`~pymongo.read_concern.ReadConcern`. If ``None`` (the
             default) database.read_concern is used.
+          - `timeout` (optional): The number of seconds each operation can
+            take, 0 for no limit. If ``None`` (the default) database.timeout
+            is used.
           - `collation` (optional): An instance of
             :class:`~pymongo.collation.Collation`. If a collation is provided,
             it will be passed to the create collection command. This option is
@@ -118,6 +123,9 @@ class Collection(common.BaseObject):
           - `**kwargs` (optional): additional keyword arguments will
             be passed as options for the create collection command
 
+        .. versionchanged:: 3.8
+           Added the ``timeout`` parameter.
+
         .. versionchanged:: 3.6
            Added ``session`` parameter.
 
@@ -153,7 +161,8 @@ class Collection(common.BaseObject):
             codec_options or database.codec_options,
             read_preference or database.read_preference,
             write_concern or database.write_concern,
-            read_concern or database.read_concern)
+            read_concern or database.read_concern,
+            database.timeout if timeout is None else timeout)
 
         if not isinstance(name, string_type):
             raise TypeError("name must be an instance "
@@ -185,15 +194,16 @@ class Collection(common.BaseObject):
 
     def _socket_for_reads(self, session):
         return self.__database.client._socket_for_reads(
-            self._read_preference_for(session))
+            self._read_preference_for(session), self.timeout)
 
     def _socket_for_primary_reads(self, session):
         read_pref = ((session and session._txn_read_preference())
                      or ReadPreference.PRIMARY)
-        return self.__database.client._socket_for_reads(read_pref), read_pref
+        return (self.__database.client._socket_for_reads(
+            read_pref, self.timeout), read_pref)
 
     def _socket_for_writes(self):
-        return self.__database.client._socket_for_writes()
+        return self.__database.client._socket_for_writes(self.timeout)
 
     def _command(self, sock_info, command, slave_ok=False,
                  read_preference=None,
@@ -280,7 +290,8 @@ class Collection(common.BaseObject):
                           self.codec_options,
                           self.read_preference,
                           self.write_concern,
-                          self.read_concern)
+                          self.read_concern,
+                          timeout=self.timeout)
 
     def __repr__(self):
         return "Collection(%r, %r)" % (self.__database, self.__name)
@@ -316,7 +327,7 @@ class Collection(common.BaseObject):
 
     def with_options(
             self, codec_options=None, read_preference=None,
-            write_concern=None, read_concern=None):
+            write_concern=None, read_concern=None, timeout=None):
         """Get a clone of this collection changing the specified settings.
 
           >>> coll1.read_preference
@@ -345,6 +356,12 @@ class Collection(common.BaseObject):
             :class:`~pymongo.read_concern.ReadConcern`. If ``None`` (the
             default) the :attr:`read_concern` of this :class:`Collection`
             is used.
+          - `timeout` (optional): The number of seconds each operation can
+            take, 0 for no limit. If ``None`` (the default) the
+            :attr:`timeout` of this :class:`Collection` is used.
+
+        .. versionchanged:: 3.8
+           Added the ``timeout`` parameter.
         """
         return Collection(self.__database,
                           self.__name,
@@ -352,7 +369,8 @@ class Collection(common.BaseObject):
                           codec_options or self.codec_options,
                           read_preference or self.read_preference,
                           write_concern or self.write_concern,
-                          read_concern or self.read_concern)
+                          read_concern or self.read_concern,
+                          timeout=self.timeout if timeout is None else timeout)
 
     def initialize_unordered_bulk_op(self, bypass_document_validation=False):
         """**DEPRECATED** - Initialize an unordered batch of write operations.
@@ -418,7 +436,9 @@ class Collection(common.BaseObject):
         return BulkOperationBuilder(self, True, bypass_document_validation)
 
     def bulk_write(self, requests, ordered=True,
-                   bypass_document_validation=False, session=None):
+                   bypass_document_validation=False, session=None,
+                   pipeline=False, max_batches_in_flight=1, stream=False,
+                   collect_ids=True):
         """Send a batch of write operations to the server.
 
         Requests are passed as a list of write operation instances (
@@ -467,6 +487,26 @@ class Collection(common.BaseObject):
             ``False``.
           - `session` (optional): a
             :class:`~pymongo.client_session.ClientSession`.
+          - `pipeline` (optional): If ``True``, encode the next batch of
+            operations to BSON on a background thread while the current
+            batch is sent to the server. Default is ``False``.
+          - `max_batches_in_flight` (optional): The number of batches an
+            unordered bulk write can send at once, each on its own pooled
+            connection and implicit session. Buffered memory is bounded by
+            about `max_batches_in_flight` + 1 times the server's
+            maxMessageSizeBytes. Requires ``ordered=False`` and no explicit
+            `session`. Default is 1.
+          - `stream` (optional): If ``True``, `requests` can be any iterable,
+            which is consumed lazily: each batch is sent as soon as it
+            reaches the server's maxWriteBatchSize or maxMessageSizeBytes, so
+            that `requests` can be unbounded and memory stays bounded.
+            Operations are sent in the order provided even if `ordered` is
+            ``False``. Each batch is retried on its own, and the client's or
+            collection's timeout applies to each batch. Default is ``False``.
+          - `collect_ids` (optional): If ``False``, don't keep the _ids of
+            upserted documents, the result's
+            :attr:`~pymongo.results.BulkWriteResult.upserted_ids` is
+            ``None``. Default is ``True``.
 
         :Returns:
           An instance of :class:`~pymongo.results.BulkWriteResult`.
@@ -476,6 +516,10 @@ class Collection(common.BaseObject):
         .. note:: `bypass_document_validation` requires server version
           **>= 3.2**
 
+        .. versionchanged:: 3.8
+           Added the ``pipeline``, ``max_batches_in_flight``, ``stream``,
+           and ``collect_ids`` parameters.
+
         .. versionchanged:: 3.6
            Added ``session`` parameter.
 
@@ -484,21 +528,59 @@ class Collection(common.BaseObject):
 
         .. versionadded:: 3.0
         """
-        common.validate_list("requests", requests)
+        if common.validate_boolean("stream", stream):
+            if not isinstance(requests, abc.Iterable):
+                raise TypeError("requests must be an iterable")
+        else:
+            common.validate_list("requests", requests)
+
+        blk = _Bulk(self, ordered, bypass_document_validation, pipeline,
+                    max_batches_in_flight)
+        blk.collect_ids = common.validate_boolean("collect_ids", collect_ids)
 
-        blk = _Bulk(self, ordered, bypass_document_validation)
-        for request in requests:
+        def add_to_bulk(request):
             try:
                 request._add_to_bulk(blk)
             except AttributeError:
                 raise TypeError("%r is not a valid request" % (request,))
 
+        def gen():
+            """Add each request to blk.ops, and take it out again."""
+            for request in requests:
+                add_to_bulk(request)
+                yield blk.ops.pop()
+
+        if stream:
+            blk.stream_ops = gen()
+        else:
+            for request in requests:
+                add_to_bulk(request)
+
         write_concern = self._write_concern_for(session)
         bulk_api_result = blk.execute(write_concern, session)
         if bulk_api_result is not None:
             return BulkWriteResult(bulk_api_result, True)
         return BulkWriteResult({}, False)
 
+    def write_coalescer(self, max_delay=0.001, max_batch_size=1000):
+        """Get a :class:`~pymongo.write_coalescer.WriteCoalescer` that sends
+        single writes from concurrent threads to this collection together.
+
+          >>> coalescer = db.test.write_coalescer(max_delay=0.0005)
+          >>> coalescer.insert_one({'x': 1}).inserted_id
+          ObjectId('54f112defba522406c9cc208')
+
+        :Parameters:
+          - `max_delay` (optional): The most seconds a write waits for
+            writes from other threads to send together with it. Defaults to
+            0.001.
+          - `max_batch_size` (optional): The most writes to send together.
+            Defaults to 1000.
+
+        .. versionadded:: 3.8
+        """
+        return WriteCoalescer(self, max_delay, max_batch_size)
+
     def _legacy_write(self, sock_info, name, cmd, op_id,
                       bypass_doc_val, func, *args):
         """Internal legacy unacknowledged write helper."""
@@ -592,7 +674,7 @@ class Collection(common.BaseObject):
             _check_write_command_response(result)
 
         self.__database.client._retryable_write(
-            acknowledged, _insert_command, session)
+            acknowledged, _insert_command, session, self.timeout)
 
         if not isinstance(doc, RawBSONDocument):
             return doc.get('_id')
@@ -694,7 +776,9 @@ class Collection(common.BaseObject):
             write_concern.acknowledged)
 
     def insert_many(self, documents, ordered=True,
-                    bypass_document_validation=False, session=None):
+                    bypass_document_validation=False, session=None,
+                    pipeline=False, max_batches_in_flight=1, stream=False,
+                    collect_ids=True):
         """Insert an iterable of documents.
 
           >>> db.test.count_documents({})
@@ -717,6 +801,27 @@ class Collection(common.BaseObject):
             ``False``.
           - `session` (optional): a
             :class:`~pymongo.client_session.ClientSession`.
+          - `pipeline` (optional): If ``True``, encode the next batch of
+            documents to BSON on a background thread while the current
+            batch is sent to the server. Default is ``False``.
+          - `max_batches_in_flight` (optional): The number of batches an
+            unordered insert can send at once, each on its own pooled
+            connection and implicit session. Buffered memory is bounded by
+            about `max_batches_in_flight` + 1 times the server's
+            maxMessageSizeBytes. Requires ``ordered=False`` and no explicit
+            `session`. Default is 1.
+          - `stream` (optional): If ``True``, consume `documents` lazily and
+            send each batch as soon as it reaches the server's
+            maxWriteBatchSize or maxMessageSizeBytes, so that `documents` can
+            be an unbounded iterable and memory stays bounded. Each batch is
+            retried on its own, and the client's or collection's timeout
+            applies to each batch. Default is ``False``.
+          - `collect_ids` (optional): If ``False``, don't keep the _ids of the
+            inserted documents, the result's
+            :attr:`~pymongo.results.InsertManyResult.inserted_ids` is
+            ``None`` and only
+            :attr:`~pymongo.results.InsertManyResult.inserted_count` is
+            available. Default is ``True``.
 
         :Returns:
           An instance of :class:`~pymongo.results.InsertManyResult`.
@@ -726,6 +831,11 @@ class Collection(common.BaseObject):
         .. note:: `bypass_document_validation` requires server version
           **>= 3.2**
 
+        .. versionchanged:: 3.8
+           Added the ``pipeline``, ``max_batches_in_flight``, ``stream``,
+           and ``collect_ids`` parameters, and
+           :attr:`~pymongo.results.InsertManyResult.inserted_count`.
+
         .. versionchanged:: 3.6
            Added ``session`` parameter.
 
@@ -736,7 +846,11 @@ class Collection(common.BaseObject):
         """
         if not isinstance(documents, abc.Iterable) or not documents:
             raise TypeError("documents must be a non-empty list")
-        inserted_ids = []
+        common.validate_boolean("stream", stream)
+        if common.validate_boolean("collect_ids", collect_ids):
+            inserted_ids = []
+        else:
+            inserted_ids = None
         def gen():
             """A generator that validates documents and handles _ids."""
             for document in documents:
@@ -744,14 +858,21 @@ class Collection(common.BaseObject):
                 if not isinstance(document, RawBSONDocument):
                     if "_id" not in document:
                         document["_id"] = ObjectId()
-                    inserted_ids.append(document["_id"])
+                    if inserted_ids is not None:
+                        inserted_ids.append(document["_id"])
                 yield (message._INSERT, document)
 
         write_concern = self._write_concern_for(session)
-        blk = _Bulk(self, ordered, bypass_document_validation)
-        blk.ops = [doc for doc in gen()]
-        blk.execute(write_concern, session=session)
-        return InsertManyResult(inserted_ids, write_concern.acknowledged)
+        blk = _Bulk(self, ordered, bypass_document_validation, pipeline,
+                    max_batches_in_flight)
+        if stream:
+            blk.stream_ops = gen()
+        else:
+            blk.ops = [doc for doc in gen()]
+        result = blk.execute(write_concern, session=session)
+        inserted_count = result["nInserted"] if result else None
+        return InsertManyResult(
+            inserted_ids, write_concern.acknowledged, inserted_count)
 
     def _update(self, sock_info, criteria, document, upsert=False,
                 check_keys=True, multi=False, manipulate=False,
@@ -848,7 +969,7 @@ class Collection(common.BaseObject):
 
         return self.__database.client._retryable_write(
             (write_concern or self.write_concern).acknowledged and not multi,
-            _update, session)
+            _update, session, self.timeout)
 
     def replace_one(self, filter, replacement, upsert=False,
                     bypass_document_validation=False, collation=None,
@@ -1151,7 +1272,7 @@ class Collection(common.BaseObject):
 
         return self.__database.client._retryable_write(
             (write_concern or self.write_concern).acknowledged and not multi,
-            _delete, session)
+            _delete, session, self.timeout)
 
     def delete_one(self, filter, collation=None, session=None):
         """Delete a single document matching the filter.
@@ -1514,6 +1635,9 @@ class Collection(common.BaseObject):
 
         .. note:: Requires server version **>= 2.5.5**.
 
+        .. seealso:: :meth:`parallel_find`, which replaces
+           :meth:`parallel_scan`.
+
         .. versionchanged:: 3.7
            Deprecated.
 
@@ -1558,6 +1682,59 @@ class Collection(common.BaseObject):
 
         return cursors
 
+    def parallel_find(self, filter=None, partitions=4, key="_id",
+                      bounds=None, max_workers=None, **kwargs):
+        """Find documents with concurrent finds over ranges of an index.
+
+        Splits the range of the indexed field `key` into `partitions`
+        ranges, at boundaries chosen from a ``$sample`` of this collection,
+        and runs one :meth:`find` with `filter` for each range. The finds
+        run on worker threads, each with its own connection from the pool,
+        and their results are merged into one
+        :class:`~pymongo.parallel_find.ParallelFind` iterator:
+
+          >>> with collection.parallel_find({'x': 1}, partitions=8) as docs:
+          ...     for doc in docs:
+          ...         process_document(doc)
+
+        Documents are returned in the order they arrive, not in index
+        order. As long as the collection is not modified during the scan,
+        each matching document is returned once. Unlike
+        :meth:`parallel_scan`, this works with sharded clusters and with
+        MongoDB 4.2.
+
+        :Parameters:
+          - `filter` (optional): a SON object specifying elements which
+            must be present for a document to be included in the
+            result set.
+          - `partitions` (optional): the number of ranges to split `key`
+            into. Fewer are used if the sample has fewer distinct values.
+            Defaults to 4.
+          - `key` (optional): the field whose range is split. It must have
+            an ascending single field index. Defaults to ``"_id"``.
+          - `bounds` (optional): a list of ascending values of `key` to
+            split the range at instead of sampling, for example the
+            boundaries of a sharded collection's chunks. `partitions` is
+            ignored.
+          - `max_workers` (optional): the most finds to run at once.
+            Defaults to the number of partitions.
+          - `**kwargs` (optional): any additional arguments to
+            :meth:`find` except `session`, `limit`, `skip`, `sort`, `hint`,
+            `min` and `max`, which apply to each partition rather than the
+            whole scan.
+
+        Raises :exc:`~pymongo.errors.InvalidOperation` if any of those
+        arguments is passed.
+
+        .. note:: Sampling the boundaries requires server version
+           **>= 3.2**, which added ``$sample``. Pass `bounds` with older
+           servers.
+
+        .. versionadded:: 3.8
+        """
+        return ParallelFind(self, filter, partitions, key, bounds,
+                            max_workers, kwargs)
+
     def _count(self, cmd, collation=None, session=None):
         """Internal count helper."""
         with self._socket_for_reads(session) as (sock_info, slave_ok):
@@ -2869,7 +3046,8 @@ class Collection(common.BaseObject):
             return out.get("value")
 
         return self.__database.client._retryable_write(
-            write_concern.acknowledged, _find_and_modify, session)
+            write_concern.acknowledged, _find_and_modify, session,
+            self.timeout)
 
     def find_one_and_delete(self, filter,
                             projection=None, sort=None, session=None, **kwargs):
@@ -3287,7 +3465,7 @@ class Collection(common.BaseObject):
             return result
 
         out = self.__database.client._retryable_write(
-            write_concern.acknowledged, _find_and_modify, None)
+            write_concern.acknowledged, _find_and_modify, None, self.timeout)
 
         if not out['ok']:
             if out["errmsg"] == _NO_OBJ_ERROR:
@@ -18,8 +18,16 @@ import datetime
 
 from collections import deque
 
+from bson.codec_options import _raw_document_class
 from bson.py3compat import integer_types
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS
 from pymongo import helpers
+from pymongo.common import validate_boolean, validate_non_negative_integer
+from pymongo.cursor import (_AdaptiveBatchSize,
+                            _Prefetcher,
+                            _batch_deque,
+                            _raw_batch,
+                            _reply_size)
 from pymongo.errors import (AutoReconnect,
                             InvalidOperation,
                             NotMasterError,
@@ -28,6 +36,7 @@ from pymongo.message import (_convert_exception,
                              _CursorAddress,
                              _GetMore,
                              _RawBatchGetMore)
+from pymongo.monotonic import time as _time
 
 
 class CommandCursor(object):
@@ -41,11 +50,15 @@ class CommandCursor(object):
 
         The parameter 'retrieved' is unused.
         """
+        self.__prefetcher = None
         self.__collection = collection
         self.__id = cursor_info['id']
         self.__address = address
         self.__data = deque(cursor_info['firstBatch'])
         self.__batch_size = batch_size
+        self.__adaptive = None
+        self.__raw_batches = False
+        self.__lazy = False
         self.__max_await_time_ms = max_await_time_ms
         self.__session = session
         self.__explicit_session = explicit_session
@@ -68,9 +81,19 @@ class CommandCursor(object):
         if self.__id and not self.__killed:
             self.__die()
 
+    def __stop_prefetch(self):
+        """Stop fetching batches in the background, if we are."""
+        prefetcher = self.__prefetcher
+        # The prefetch thread itself closes the cursor when it is exhausted,
+        # the batches it already fetched must still be returned.
+        if prefetcher is not None and not prefetcher.in_thread():
+            self.__prefetcher = None
+            prefetcher.close()
+
     def __die(self, synchronous=False):
         """Closes this cursor.
         """
+        self.__stop_prefetch()
         already_killed = self.__killed
         self.__killed = True
         if self.__id and not already_killed:
@@ -119,8 +142,95 @@ class CommandCursor(object):
         self.__batch_size = batch_size == 1 and 2 or batch_size
         return self
 
+    def prefetch(self, batches):
+        """Fetch up to `batches` batches of results in the background,
+        ahead of iteration.
+
+        The first getMore is sent at once, then a background thread sends
+        the next getMore as soon as a batch is returned from the server,
+        until `batches` batches are waiting to be iterated. Each waiting
+        batch is held in memory. A prefetch of ``0``, the default, fetches
+        each batch when it is needed. A cursor with an explicit
+        :class:`~pymongo.client_session.ClientSession` cannot prefetch. See
+        :meth:`~pymongo.cursor.Cursor.prefetch`.
+
+        Raises :exc:`TypeError` if `batches` is not an integer.
+        Raises :exc:`ValueError` if `batches` is less than ``0``.
+        Raises :exc:`~pymongo.errors.InvalidOperation` if prefetching has
+        already started or this cursor has an explicit session.
+
+        :Parameters:
+          - `batches`: The most batches to fetch ahead of iteration.
+
+        .. versionadded:: 3.8
+        """
+        if not isinstance(batches, integer_types):
+            raise TypeError("batches must be an integer")
+        if batches < 0:
+            raise ValueError("batches must be >= 0")
+        if self.__prefetcher is not None:
+            raise InvalidOperation("prefetching has already started")
+        if batches and self.__explicit_session:
+            raise InvalidOperation(
+                "cannot prefetch with an explicit session, a session cannot "
+                "be used by concurrent operations")
+
+        if batches and not self.__killed:
+            self.__prefetcher = _Prefetcher(self, batches)
+        return self
+
+    def adaptive_batch_size(self, target_bytes=4 * 1024 ** 2,
+                            target_latency=None, min_batch_size=1,
+                            max_batch_size=100000):
+        """Choose the size of each batch from the documents returned so
+        far.
+
+        Each getMore reply's size and round trip time are measured, and
+        the next getMore asks for as many documents as are expected to fit
+        in `target_bytes` and to arrive within `target_latency` seconds,
+        between `min_batch_size` and `max_batch_size` documents. Until a
+        getMore reply has been measured :meth:`batch_size` is used. See
+        :meth:`~pymongo.cursor.Cursor.adaptive_batch_size`.
+
+        Raises :exc:`TypeError` or :exc:`ValueError` if an argument is
+        invalid.
+
+        :Parameters:
+          - `target_bytes` (optional): The size in bytes to aim for in
+            each batch. Defaults to 4MiB.
+          - `target_latency` (optional): The seconds to aim for in each
+            round trip, or ``None`` (the default) to size batches by bytes
+            only.
+          - `min_batch_size` (optional): The fewest documents to ask for.
+          - `max_batch_size` (optional): The most documents to ask for.
+
+        .. versionadded:: 3.8
+        """
+        self.__adaptive = _AdaptiveBatchSize(target_bytes, target_latency,
+                                             min_batch_size, max_batch_size)
+        return self
+
+    def lazy_decode(self, lazy=True):
+        """Decode each document only when it is returned.
+
+        The batches fetched from then on are kept as BSON, and each
+        document is decoded when :meth:`next` reaches it. See
+        :meth:`~pymongo.cursor.Cursor.lazy_decode`.
+
+        Raises :exc:`TypeError` if `lazy` is not a boolean.
+
+        :Parameters:
+          - `lazy` (optional): If ``True`` (the default), decode lazily.
+
+        .. versionadded:: 3.8
+        """
+        validate_boolean("lazy", lazy)
+        self.__lazy = lazy
+        return self
+
     def __send_message(self, operation):
-        """Send a getmore message and handle the response.
+        """Send a getmore message, handle the response, and return the
+        batch of results.
         """
         def kill():
             self.__killed = True
@@ -133,9 +243,11 @@ class CommandCursor(object):
 
         def duration(): return datetime.datetime.now() - start
 
+        sent = _time()
         try:
             response = client._send_message_with_response(
-                operation, address=self.__address)
+                operation, address=self.__address,
+                timeout=self.__collection.timeout)
         except AutoReconnect:
             # Don't try to send kill cursors on another socket
             # or to another server. It can cause a _pinValue
@@ -147,11 +259,25 @@ class CommandCursor(object):
         rqst_id = response.request_id
         from_command = response.from_command
         reply = response.data
-
+        rtt = _time() - sent
+        adaptive = self.__adaptive
+        if adaptive is not None:
+            # Unpacking may release the receive buffer.
+            nbytes = _reply_size(reply)
+
+        codec_options = self.__collection.codec_options
+        if self.__raw_batches:
+            codec_options = DEFAULT_RAW_BSON_OPTIONS
         try:
-            docs = self._unpack_response(reply,
-                                         self.__id,
-                                         self.__collection.codec_options)
+            # Raw documents, including raw batches, are never decoded.
+            if (self.__lazy and
+                    not _raw_document_class(codec_options.document_class)):
+                docs = reply.lazy_response(self.__id, codec_options,
+                                           from_command)
+            else:
+                docs = self._unpack_response(reply,
+                                             self.__id,
+                                             codec_options)
             if from_command:
                 first = docs[0]
                 client._receive_cluster_time(first, self.__session)
@@ -204,9 +330,12 @@ class CommandCursor(object):
                 listeners.publish_command_success(
                     duration(), res, "getMore", rqst_id, self.__address)
 
+        if adaptive is not None:
+            ndocs = len(documents) if from_command else reply.number_returned
+            adaptive.record(nbytes, ndocs, rtt)
         if self.__id == 0:
             kill()
-        self.__data = deque(documents)
+        return documents
 
     def _unpack_response(self, response, cursor_id, codec_options):
         return response.unpack_response(cursor_id, codec_options)
@@ -218,28 +347,57 @@ class CommandCursor(object):
         self.__data is already non-empty. Raises OperationFailure when the
         cursor cannot be refreshed due to an error on the query.
         """
-        if len(self.__data) or self.__killed:
+        if len(self.__data):
+            return len(self.__data)
+
+        if self.__prefetcher is not None:
+            try:
+                batch = self.__prefetcher.next_batch()
+            except Exception:
+                self.__prefetcher = None
+                raise
+            if batch is not None:
+                self.__data = _batch_deque(batch)
+                return len(self.__data)
+            self.__prefetcher = None
+
+        if self.__killed:
             return len(self.__data)
 
         if self.__id:  # Get More
-            dbname, collname = self.__ns.split('.', 1)
-            read_pref = self.__collection._read_preference_for(self.session)
-            self.__send_message(
-                self._getmore_class(dbname,
-                                    collname,
-                                    self.__batch_size,
-                                    self.__id,
-                                    self.__collection.codec_options,
-                                    read_pref,
-                                    self.__session,
-                                    self.__collection.database.client,
-                                    self.__max_await_time_ms))
+            self.__data = _batch_deque(
+                self.__send_message(self.__get_more()))
         else:  # Cursor id is zero nothing else to return
             self.__killed = True
             self.__end_session(True)
 
         return len(self.__data)
 
+    def __get_more(self):
+        """Create the getMore operation for the next batch."""
+        dbname, collname = self.__ns.split('.', 1)
+        read_pref = self.__collection._read_preference_for(self.session)
+        batch_size = self.__batch_size
+        if self.__adaptive is not None:
+            batch_size = self.__adaptive.batch_size(batch_size)
+        return self._getmore_class(dbname,
+                                   collname,
+                                   batch_size,
+                                   self.__id,
+                                   self.__collection.codec_options,
+                                   read_pref,
+                                   self.__session,
+                                   self.__collection.database.client,
+                                   self.__max_await_time_ms)
+
+    def _prefetch_batch(self):
+        """Send the next getMore, called by the prefetch thread.
+
+        Returns the batch and whether the cursor may return more batches.
+        """
+        batch = self.__send_message(self.__get_more())
+        return batch, bool(self.__id and not self.__killed)
+
     @property
     def alive(self):
         """Does this cursor have the potential to return more data?
@@ -255,7 +413,9 @@ class CommandCursor(object):
           :meth:`next` fails to retrieve the next batch of results from the
           server.
         """
-        return bool(len(self.__data) or (not self.__killed))
+        prefetcher = self.__prefetcher
+        return bool(len(self.__data) or (not self.__killed) or
+                    (prefetcher is not None and prefetcher.pending))
 
     @property
     def cursor_id(self):
@@ -282,10 +442,73 @@ class CommandCursor(object):
     def __iter__(self):
         return self
 
+    def iter_batches(self, raw=False):
+        """Iterate over the results one batch at a time.
+
+        Yields each batch of documents returned by the server as a list,
+        or with `raw` as :class:`bytes` of concatenated BSON documents. In
+        raw mode the batches fetched from then on are not decoded; the
+        documents already returned with the command's reply are encoded
+        again. See :meth:`~pymongo.cursor.Cursor.iter_batches`.
+
+        :Parameters:
+          - `raw` (optional): If ``True``, yield batches as BSON bytes.
+
+        .. versionadded:: 3.8
+        """
+        if raw:
+            self.__raw_batches = True
+        return self.__iter_batches(raw)
+
+    def __iter_batches(self, raw):
+        coll = self.__collection
+        while len(self.__data) or self.alive:
+            if not len(self.__data):
+                self._refresh()
+                continue
+            batch, self.__data = self.__data, deque()
+            if raw:
+                yield _raw_batch(batch, coll.codec_options)
+            else:
+                yield coll.database._fix_outgoing_all(batch, coll)
+
+    def to_list(self, length=None):
+        """Get a list of up to `length` documents from this cursor.
+
+        Returns all remaining documents if `length` is ``None``. Documents
+        are taken from each batch at once, which is faster than iterating
+        the cursor.
+
+        Raises :exc:`ValueError` if `length` is negative.
+
+        :Parameters:
+          - `length` (optional): The most documents to return.
+
+        .. versionadded:: 3.8
+        """
+        if length is not None:
+            validate_non_negative_integer("length", length)
+        coll = self.__collection
+        result = []
+        while length is None or len(result) < length:
+            data = self.__data
+            if not len(data):
+                if not self.alive:
+                    break
+                self._refresh()
+                continue
+            if length is None or len(data) <= length - len(result):
+                batch, self.__data = data, deque()
+            else:
+                popleft = data.popleft
+                batch = [popleft() for _ in range(length - len(result))]
+            result.extend(coll.database._fix_outgoing_all(batch, coll))
+        return result
+
     def next(self):
         """Advance the cursor."""
         # Block until a document is returnable.
-        while not len(self.__data) and not self.__killed:
+        while not len(self.__data) and self.alive:
             self._refresh()
         if len(self.__data):
             coll = self.__collection
@@ -324,5 +547,8 @@ class RawBatchCommandCursor(CommandCursor):
     def _unpack_response(self, response, cursor_id, codec_options):
         return response.raw_response(cursor_id)
 
+    def lazy_decode(self, lazy=True):
+        raise InvalidOperation("Cannot call lazy_decode on RawBatchCursor")
+
     def __getitem__(self, index):
         raise InvalidOperation("Cannot call __getitem__ on RawBatchCursor")
@@ -26,7 +26,8 @@ from bson.py3compat import abc, integer_types, iteritems, string_type
 from bson.raw_bson import RawBSONDocument
 from pymongo.auth import MECHANISMS
 from pymongo.compression_support import (validate_compressors,
-                                         validate_zlib_compression_level)
+                                         validate_zlib_compression_level,
+                                         validate_zstd_compression_level)
 from pymongo.driver_info import DriverInfo
 from pymongo.errors import ConfigurationError
 from pymongo.monitoring import _validate_event_listeners
@@ -72,6 +73,9 @@ SERVER_SELECTION_TIMEOUT = 30
 # Spec requires at least 500ms between ismaster calls.
 MIN_HEARTBEAT_INTERVAL = 0.5
 
+# Minimum seconds between SRV record lookups for mongodb+srv:// URIs.
+MIN_SRV_RESCAN_INTERVAL = 60
+
 # Default connectTimeout in seconds.
 CONNECT_TIMEOUT = 20.0
 
@@ -81,9 +85,21 @@ MAX_POOL_SIZE = 100
 # Default value for minPoolSize.
 MIN_POOL_SIZE = 0
 
+# Default value for maxConnecting.
+MAX_CONNECTING = 2
+
 # Default value for maxIdleTimeMS.
 MAX_IDLE_TIME_MS = None
 
+# Default value for maxIdleTimeMS, in seconds.
+MAX_IDLE_TIME_SEC = None
+
+# Default value for waitQueueTimeoutMS, in seconds.
+WAIT_QUEUE_TIMEOUT = None
+
+# Default value for receiveBufferPoolSize, in bytes.
+RECEIVE_BUFFER_POOL_SIZE = 64 * (1024 ** 2)
+
 # Default value for localThresholdMS.
 LOCAL_THRESHOLD_MS = 15
 
@@ -315,6 +331,16 @@ def validate_timeout_or_zero(option, value):
     return validate_positive_float(option, value) / 1000.0
 
 
+def validate_timeout_or_none_or_zero(option, value):
+    """Validates a timeout specified in milliseconds returning
+    a value in floating point seconds. value=0 and value="0" are treated the
+    same as value=None which means unlimited timeout.
+    """
+    if value is None or value == 0 or value == "0":
+        return None
+    return validate_positive_float(option, value) / 1000.0
+
+
 def validate_max_staleness(option, value):
     """Validates maxStalenessSeconds according to the Max Staleness Spec."""
     if value == -1 or value == "-1":
@@ -552,16 +578,22 @@ URI_VALIDATORS = {
     'authmechanism': validate_auth_mechanism,
     'authsource': validate_string,
     'authmechanismproperties': validate_auth_mechanism_properties,
+    'scramkeycache': validate_boolean_or_string,
+    'scramkeycachefile': validate_string,
     'tz_aware': validate_boolean_or_string,
     'uuidrepresentation': validate_uuid_representation,
     'connect': validate_boolean_or_string,
     'minpoolsize': validate_non_negative_integer,
+    'maxconnecting': validate_positive_integer,
     'appname': validate_appname_or_none,
     'driver': validate_driver_or_none,
     'unicode_decode_error_handler': validate_unicode_decode_error_handler,
     'retrywrites': validate_boolean_or_string,
     'compressors': validate_compressors,
     'zlibcompressionlevel': validate_zlib_compression_level,
+    'zstdcompressionlevel': validate_zstd_compression_level,
+    'compressionminsize': validate_non_negative_integer,
+    'receivebufferpoolsize': validate_non_negative_integer,
 }
 
 TIMEOUT_VALIDATORS = {
@@ -572,6 +604,7 @@ TIMEOUT_VALIDATORS = {
     'heartbeatfrequencyms': validate_timeout_or_none,
     'maxidletimems': validate_timeout_or_none,
     'maxstalenessseconds': validate_max_staleness,
+    'timeoutms': validate_timeout_or_none_or_zero,
 }
 
 KW_VALIDATORS = {
@@ -589,7 +622,9 @@ VALIDATORS = URI_VALIDATORS.copy()
 VALIDATORS.update(KW_VALIDATORS)
 
 
-_AUTH_OPTIONS = frozenset(['authmechanismproperties'])
+_AUTH_OPTIONS = frozenset(['authmechanismproperties',
+                           'scramkeycache',
+                           'scramkeycachefile'])
 
 
 def validate_auth_option(option, value):
@@ -649,7 +684,7 @@ class BaseObject(object):
     """
 
     def __init__(self, codec_options, read_preference, write_concern,
-                 read_concern):
+                 read_concern, timeout=None):
 
         if not isinstance(codec_options, CodecOptions):
             raise TypeError("codec_options must be an instance of "
@@ -672,6 +707,10 @@ class BaseObject(object):
                             "pymongo.read_concern.ReadConcern")
         self.__read_concern = read_concern
 
+        if timeout is not None:
+            timeout = validate_positive_float_or_zero('timeout', timeout)
+        self.__timeout = timeout
+
     @property
     def codec_options(self):
         """Read only access to the :class:`~bson.codec_options.CodecOptions`
@@ -722,3 +761,12 @@ class BaseObject(object):
         .. versionadded:: 3.2
         """
         return self.__read_concern
+
+    @property
+    def timeout(self):
+        """The number of seconds that each operation on this instance can
+        take. ``None`` or 0 means no limit.
+
+        .. versionadded:: 3.8
+        """
+        return self.__timeout
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 import warnings
 
 try:
@@ -28,9 +29,17 @@ except ImportError:
     # Python built without zlib support.
     _HAVE_ZLIB = False
 
+try:
+    import zstandard
+    _HAVE_ZSTD = True
+except ImportError:
+    # zstandard isn't available.
+    _HAVE_ZSTD = False
+
 from pymongo.monitoring import _SENSITIVE_COMMANDS
+from pymongo.monotonic import time as _time
 
-_SUPPORTED_COMPRESSORS = set(["snappy", "zlib"])
+_SUPPORTED_COMPRESSORS = set(["snappy", "zlib", "zstd"])
 _NO_COMPRESSION = set(['ismaster'])
 _NO_COMPRESSION.update(_SENSITIVE_COMMANDS)
 
@@ -51,6 +60,11 @@ def validate_compressors(dummy, value):
             warnings.warn(
                 "Wire protocol compression with zlib is not available. "
                 "The zlib module is not available.")
+        elif compressor == "zstd" and not _HAVE_ZSTD:
+            compressors.remove(compressor)
+            warnings.warn(
+                "Wire protocol compression with zstandard is not available. "
+                "You must install the zstandard module for zstandard support.")
     return compressors
 
 
@@ -65,18 +79,184 @@ def validate_zlib_compression_level(option, value):
     return level
 
 
+def validate_zstd_compression_level(option, value):
+    try:
+        level = int(value)
+    except:
+        raise TypeError("%s must be an integer, not %r." % (option, value))
+    if level < 1 or level > 22:
+        raise ValueError(
+            "%s must be between 1 and 22, not %d." % (option, level))
+    return level
+
+
+# The zstandard library's default level.
+ZSTD_COMPRESSION_LEVEL = 3
+
+
+# Messages smaller than this many bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = 1024
+
+# The number of messages of one shape compressed before the policy decides
+# whether compressing that shape is worthwhile.
+_RATIO_SAMPLES = 8
+
+# A shape whose messages don't shrink below this fraction of their size
+# isn't worth compressing.
+_MAX_RATIO = 0.9
+
+# The number of messages of a poorly compressing shape sent uncompressed
+# before the policy samples that shape again.
+_SKIP_MESSAGES = 128
+
+
 class CompressionSettings(object):
-    def __init__(self, compressors, zlib_compression_level):
+    def __init__(self, compressors, zlib_compression_level,
+                 zstd_compression_level=ZSTD_COMPRESSION_LEVEL,
+                 compression_min_size=COMPRESSION_MIN_SIZE):
         self.compressors = compressors
         self.zlib_compression_level = zlib_compression_level
+        self.zstd_compression_level = zstd_compression_level
+        self.compression_min_size = compression_min_size
+        self.stats = CompressionStats()
 
     def get_compression_context(self, compressors):
         if compressors:
             chosen = compressors[0]
             if chosen == "snappy":
-                return SnappyContext()
+                ctx = SnappyContext()
             elif chosen == "zlib":
-                return ZlibContext(self.zlib_compression_level)
+                ctx = ZlibContext(self.zlib_compression_level)
+            elif chosen == "zstd":
+                ctx = ZstdContext(self.zstd_compression_level)
+            else:
+                return None
+            ctx.policy = CompressionPolicy(
+                self.compression_min_size, self.stats)
+            return ctx
+
+
+class CompressionStats(object):
+    """Compression ratio and time statistics, by command name.
+
+    Shared by every connection of a client, so recording is thread safe.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__commands = {}
+
+    def __counters(self, name):
+        counters = self.__commands.get(name)
+        if counters is None:
+            # compressed, uncompressed, bytes_in, bytes_out, time.
+            counters = self.__commands[name] = [0, 0, 0, 0, 0.0]
+        return counters
+
+    def record_compressed(self, name, size, compressed_size, duration):
+        """Record a message compressed from `size` to `compressed_size`."""
+        with self.__lock:
+            counters = self.__counters(name)
+            counters[0] += 1
+            counters[2] += size
+            counters[3] += compressed_size
+            counters[4] += duration
+
+    def record_uncompressed(self, name):
+        """Record a message sent uncompressed by the compression policy."""
+        with self.__lock:
+            self.__counters(name)[1] += 1
+
+    def snapshot(self):
+        """Return a dict mapping each command name to its statistics."""
+        with self.__lock:
+            items = [(name, list(counters))
+                     for name, counters in self.__commands.items()]
+        stats = {}
+        for name, (compressed, uncompressed, bytes_in, bytes_out,
+                   duration) in items:
+            stats[name] = {
+                'compressed': compressed,
+                'uncompressed': uncompressed,
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+                'ratio': float(bytes_out) / bytes_in if bytes_in else 1.0,
+                'compression_time': duration,
+            }
+        return stats
+
+
+class _ShapeRatio(object):
+    """The compression ratio sampled for one message shape."""
+
+    __slots__ = ('samples', 'bytes_in', 'bytes_out', 'skip')
+
+    def __init__(self):
+        self.samples = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.skip = 0
+
+
+class CompressionPolicy(object):
+    """Decides which messages on one connection are worth compressing.
+
+    Messages smaller than `min_size` are never compressed. Otherwise the
+    policy samples the ratio achieved for each message shape, a
+    (command name, collection name) pair, and stops compressing shapes that
+    don't compress, such as inserts of already compressed GridFS chunks.
+    Such shapes are sampled again after a while in case their contents
+    change. Like the connection, a policy is not thread safe.
+    """
+
+    def __init__(self, min_size, stats=None):
+        self.min_size = min_size
+        self.stats = stats
+        self.__ratios = {}
+
+    def should_compress(self, shape, size):
+        """Return True if a `size` byte message of `shape` is compressed."""
+        if size >= self.min_size:
+            ratio = self.__ratios.get(shape)
+            if ratio is None or not ratio.skip:
+                return True
+            ratio.skip -= 1
+        if self.stats is not None:
+            self.stats.record_uncompressed(shape[0])
+        return False
+
+    def record(self, shape, size, compressed_size, duration):
+        """Record the result of compressing a message of `shape`.
+
+        A message that didn't shrink is sent uncompressed.
+        """
+        ratio = self.__ratios.get(shape)
+        if ratio is None:
+            ratio = self.__ratios[shape] = _ShapeRatio()
+        ratio.samples += 1
+        ratio.bytes_in += size
+        ratio.bytes_out += compressed_size
+        if ratio.samples >= _RATIO_SAMPLES:
+            if ratio.bytes_out > ratio.bytes_in * _MAX_RATIO:
+                ratio.skip = _SKIP_MESSAGES
+            ratio.samples = ratio.bytes_in = ratio.bytes_out = 0
+        if self.stats is not None:
+            if compressed_size < size:
+                self.stats.record_compressed(
+                    shape[0], size, compressed_size, duration)
+            else:
+                self.stats.record_uncompressed(shape[0])
+
+    def compress(self, ctx, shape, data):
+        """Compress `data` with `ctx`, or return None if it isn't worth it."""
+        if not self.should_compress(shape, len(data)):
+            return None
+        start = _time()
+        compressed = ctx.compress(data)
+        self.record(shape, len(data), len(compressed), _time() - start)
+        if len(compressed) >= len(data):
+            return None
+        return compressed
 
 
 def _zlib_no_compress(data):
@@ -87,6 +267,7 @@ def _zlib_no_compress(data):
 
 class SnappyContext(object):
     compressor_id = 1
+    policy = None
 
     @staticmethod
     def compress(data):
@@ -95,6 +276,7 @@ class SnappyContext(object):
 
 class ZlibContext(object):
     compressor_id = 2
+    policy = None
 
     def __init__(self, level):
         # Jython zlib.compress doesn't support -1
@@ -107,18 +289,74 @@ class ZlibContext(object):
             self.compress = lambda data: zlib.compress(data, level)
 
 
-def decompress(data, compressor_id):
+class ZstdContext(object):
+    """Long-lived zstandard contexts for one connection.
+
+    Creating a zstandard context allocates its working memory, so each
+    connection keeps one compression and one decompression context for its
+    lifetime. Like the connection, a ZstdContext is not thread safe.
+    """
+    compressor_id = 3
+    policy = None
+
+    def __init__(self, level=ZSTD_COMPRESSION_LEVEL):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+
+def _zstd_decompress(decompressor, data, out):
+    """Decompress `data`, into the writable buffer `out` if not None.
+
+    Returns the decompressed bytes, or a memoryview of the part of `out`
+    that was filled.
+    """
+    if out is None:
+        # Unlike decompress(), decompressobj() doesn't require the frame to
+        # record its decompressed size.
+        return decompressor.decompressobj().decompress(data)
+    view = memoryview(out)
+    reader = decompressor.stream_reader(data)
+    length = 0
+    while length < len(view):
+        n = reader.readinto(view[length:])
+        if not n:
+            break
+        length += n
+    return view[:length]
+
+
+def decompress(data, compressor_id, ctx=None, out=None):
+    """Decompress a message body compressed with `compressor_id`.
+
+    If `ctx` is this connection's ZstdContext, zstd messages reuse its
+    decompression context. zstd also decompresses into the preallocated
+    buffer `out` if given, which must be large enough for the whole message;
+    other compressors ignore it.
+    """
     if compressor_id == SnappyContext.compressor_id:
-        # python-snappy doesn't support the buffer interface.
-        # https://github.com/andrix/python-snappy/issues/65
-        # This only matters when data is a memoryview since
-        # id(bytes(data)) == id(data) when data is a bytes.
-        # NOTE: bytes(memoryview) returns the memoryview repr
-        # in Python 2.7. The right thing to do in 2.7 is call
-        # memoryview.tobytes(), but we currently only use
-        # memoryview in Python 3.x.
-        return snappy.uncompress(bytes(data))
+        try:
+            return snappy.uncompress(data)
+        except TypeError:
+            # Older versions of python-snappy don't support the buffer
+            # interface, copy the data into a bytes object.
+            # https://github.com/andrix/python-snappy/issues/65
+            # This only matters when data is a memoryview since
+            # id(bytes(data)) == id(data) when data is a bytes.
+            # NOTE: bytes(memoryview) returns the memoryview repr
+            # in Python 2.7. The right thing to do in 2.7 is call
+            # memoryview.tobytes(), but we currently only use
+            # memoryview in Python 3.x.
+            return snappy.uncompress(bytes(data))
     elif compressor_id == ZlibContext.compressor_id:
         return zlib.decompress(data)
+    elif compressor_id == ZstdContext.compressor_id:
+        if isinstance(ctx, ZstdContext):
+            decompressor = ctx.decompressor
+        else:
+            decompressor = zstandard.ZstdDecompressor()
+        return _zstd_decompress(decompressor, data, out)
     else:
         raise ValueError("Unknown compressorId %d" % (compressor_id,))
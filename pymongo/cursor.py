@@ -16,18 +16,26 @@
 
 import copy
 import datetime
+import threading
 import warnings
+import weakref
 
 from collections import deque
 
-from bson import RE_TYPE
+from bson import RE_TYPE, _dict_to_bson
 from bson.code import Code
+from bson.codec_options import _raw_document_class
 from bson.py3compat import (iteritems,
                             integer_types,
                             string_type)
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS, RawBSONDocument
 from bson.son import SON
 from pymongo import helpers
-from pymongo.common import validate_boolean, validate_is_mapping
+from pymongo.common import (validate_boolean,
+                            validate_is_mapping,
+                            validate_non_negative_integer,
+                            validate_positive_float,
+                            validate_positive_integer)
 from pymongo.collation import validate_collation_or_none
 from pymongo.errors import (AutoReconnect,
                             ConnectionFailure,
@@ -37,9 +45,13 @@ from pymongo.errors import (AutoReconnect,
 from pymongo.message import (_convert_exception,
                              _CursorAddress,
                              _GetMore,
+                             _LazyBatch,
+                             _OpMsg,
                              _RawBatchGetMore,
                              _Query,
                              _RawBatchQuery)
+from pymongo.monitoring import ConnectionClosedReason
+from pymongo.monotonic import time as _time
 from pymongo.read_preferences import ReadPreference
 
 _QUERY_OPTIONS = {
@@ -86,9 +98,14 @@ class CursorType(object):
 class _SocketManager:
     """Used with exhaust cursors to ensure the socket is returned.
     """
-    def __init__(self, sock, pool):
+    def __init__(self, sock, pool, from_command=False):
         self.sock = sock
         self.pool = pool
+        # True when the cursor was opened with a find command over OP_MSG.
+        # The server then streams batches only after an exhaustAllowed
+        # getMore, while its replies have the moreToCome flag set.
+        self.from_command = from_command
+        self.more_to_come = False
         self.__closed = False
 
     def __del__(self):
@@ -103,6 +120,179 @@ class _SocketManager:
             self.sock, self.pool = None, None
 
 
+def _reply_size(reply):
+    """The number of bytes of BSON in an OP_MSG or OP_REPLY."""
+    if isinstance(reply, _OpMsg):
+        return len(reply.payload_document)
+    return len(reply.documents)
+
+
+def _batch_deque(batch):
+    """The documents for a cursor to return, `batch` itself if it is
+    decoded lazily.
+    """
+    if isinstance(batch, _LazyBatch):
+        return batch
+    return deque(batch)
+
+
+def _raw_batch(docs, codec_options):
+    """Concatenate a batch of documents as BSON.
+
+    RawBSONDocuments are copied as they are, others are encoded with
+    `codec_options`.
+    """
+    if isinstance(docs, _LazyBatch):
+        return docs.raw()
+    return b"".join(
+        doc.raw if isinstance(doc, RawBSONDocument)
+        else _dict_to_bson(doc, False, codec_options) for doc in docs)
+
+
+class _AdaptiveBatchSize(object):
+    """Chooses each getMore's batchSize from the replies so far.
+
+    Keeps moving averages of the bytes and the round trip time per
+    document, and asks for as many documents as fit both the target batch
+    size in bytes and the target latency.
+    """
+
+    # Weight of the latest reply in the moving averages.
+    WEIGHT = 0.5
+
+    def __init__(self, target_bytes, target_latency, min_batch_size,
+                 max_batch_size):
+        self.target_bytes = validate_positive_integer(
+            'target_bytes', target_bytes)
+        if target_latency is not None:
+            target_latency = validate_positive_float(
+                'target_latency', target_latency)
+        self.target_latency = target_latency
+        self.min_batch_size = validate_positive_integer(
+            'min_batch_size', min_batch_size)
+        self.max_batch_size = validate_positive_integer(
+            'max_batch_size', max_batch_size)
+        if max_batch_size < min_batch_size:
+            raise ValueError("max_batch_size must be >= min_batch_size")
+        self.doc_size = None
+        self.doc_time = None
+
+    def __average(self, average, sample):
+        if average is None:
+            return sample
+        return self.WEIGHT * sample + (1 - self.WEIGHT) * average
+
+    def record(self, nbytes, ndocs, rtt):
+        """Measure a reply of `nbytes` bytes and `ndocs` documents that
+        took `rtt` seconds.
+        """
+        # An empty batch, from a tailable cursor, tells us nothing.
+        if ndocs:
+            self.doc_size = self.__average(self.doc_size,
+                                           float(nbytes) / ndocs)
+            self.doc_time = self.__average(self.doc_time, float(rtt) / ndocs)
+
+    def batch_size(self, default):
+        """The batchSize for the next getMore, `default` until a reply
+        has been measured.
+        """
+        if self.doc_size is None:
+            return default
+        size = min(self.max_batch_size, self.target_bytes / self.doc_size)
+        if self.target_latency is not None and self.doc_time:
+            size = min(size, self.target_latency / self.doc_time)
+        return max(self.min_batch_size, int(size))
+
+
+class _Prefetcher(object):
+    """Sends a cursor's getMores on a background thread.
+
+    Keeps at most `max_batches` batches that the cursor has not taken yet.
+    The thread only holds a weak reference to the cursor between getMores,
+    so an abandoned cursor is still garbage collected and killed.
+    """
+
+    def __init__(self, cursor, max_batches):
+        self.__cursor_ref = weakref.ref(cursor, self.__collected)
+        self.__max_batches = max_batches
+        self.__cond = threading.Condition()
+        self.__batches = deque()
+        self.__error = None
+        self.__done = False
+        self.__thread = threading.Thread(target=self.__run,
+                                         name="pymongo cursor prefetch")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @property
+    def pending(self):
+        """Is there a batch waiting, or may one still arrive?"""
+        with self.__cond:
+            return bool(self.__batches) or not self.__done
+
+    def in_thread(self):
+        """Is this called from the prefetch thread?"""
+        return threading.current_thread() is self.__thread
+
+    def __collected(self, dummy):
+        with self.__cond:
+            self.__done = True
+            self.__cond.notify_all()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while (len(self.__batches) >= self.__max_batches and
+                       not self.__done):
+                    self.__cond.wait()
+                if self.__done:
+                    return
+            cursor = self.__cursor_ref()
+            if cursor is None:
+                return
+            batch, error = None, None
+            try:
+                batch, more = cursor._prefetch_batch()
+            except Exception as exc:
+                more, error = False, exc
+            # Don't keep the cursor alive while waiting.
+            del cursor
+            with self.__cond:
+                if batch is not None:
+                    self.__batches.append(batch)
+                self.__error = error
+                if not more:
+                    self.__done = True
+                self.__cond.notify_all()
+
+    def next_batch(self):
+        """Wait for the next batch and return it.
+
+        Returns None when there are no more batches, raises the error of a
+        failed getMore after returning the batches fetched before it.
+        """
+        with self.__cond:
+            while not self.__batches and not self.__done:
+                self.__cond.wait()
+            if self.__batches:
+                batch = self.__batches.popleft()
+                self.__cond.notify_all()
+                return batch
+            error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+        return None
+
+    def close(self):
+        """Stop fetching and wait for a getMore in progress to finish."""
+        with self.__cond:
+            self.__done = True
+            self.__batches.clear()
+            self.__cond.notify_all()
+        if not self.in_thread():
+            self.__thread.join()
+
+
 class Cursor(object):
     """A cursor / iterator over Mongo query results.
     """
@@ -130,6 +320,7 @@ class Cursor(object):
         self.__exhaust = False
         self.__exhaust_mgr = None
         self.__killed = False
+        self.__prefetcher = None
 
         if session:
             self.__session = session
@@ -173,6 +364,10 @@ class Cursor(object):
         self.__skip = skip
         self.__limit = limit
         self.__batch_size = batch_size
+        self.__adaptive = None
+        self.__prefetch = 0
+        self.__raw_batches = False
+        self.__lazy = False
         self.__modifiers = modifiers and modifiers.copy() or {}
         self.__ordering = sort and helpers._index_document(sort) or None
         self.__max_scan = max_scan
@@ -248,6 +443,7 @@ class Cursor(object):
         be sent to the server, even if the resultant data has already been
         retrieved by this cursor.
         """
+        self.__stop_prefetch()
         self.__data = deque()
         self.__id = None
         self.__address = None
@@ -277,13 +473,19 @@ class Cursor(object):
         values_to_clone = ("spec", "projection", "skip", "limit",
                            "max_time_ms", "max_await_time_ms", "comment",
                            "max", "min", "ordering", "explain", "hint",
-                           "batch_size", "max_scan", "manipulate",
+                           "batch_size", "prefetch", "lazy", "max_scan",
+                           "manipulate",
                            "query_flags", "modifiers", "collation")
         data = dict((k, v) for k, v in iteritems(self.__dict__)
                     if k.startswith('_Cursor__') and k[9:] in values_to_clone)
         if deepcopy:
             data = self._deepcopy(data)
         base.__dict__.update(data)
+        adaptive = self.__adaptive
+        if adaptive is not None:
+            base.adaptive_batch_size(
+                adaptive.target_bytes, adaptive.target_latency,
+                adaptive.min_batch_size, adaptive.max_batch_size)
         return base
 
     def _clone_base(self, session):
@@ -291,18 +493,36 @@ class Cursor(object):
         """
         return self.__class__(self.__collection, session=session)
 
+    def __stop_prefetch(self):
+        """Stop fetching batches in the background, if we are."""
+        prefetcher = self.__prefetcher
+        # The prefetch thread itself closes the cursor when it is exhausted,
+        # the batches it already fetched must still be returned.
+        if prefetcher is not None and not prefetcher.in_thread():
+            self.__prefetcher = None
+            prefetcher.close()
+
     def __die(self, synchronous=False):
         """Closes this cursor.
         """
+        self.__stop_prefetch()
         already_killed = self.__killed
         self.__killed = True
+        exhaust_mgr = self.__exhaust and self.__exhaust_mgr
+        # Is the server sending, or about to send, batches on the socket?
+        streaming = exhaust_mgr and (exhaust_mgr.more_to_come or
+                                     not exhaust_mgr.from_command)
         if self.__id and not already_killed:
-            if self.__exhaust and self.__exhaust_mgr:
+            if streaming:
                 # If this is an exhaust cursor and we haven't completely
                 # exhausted the result set we *must* close the socket
                 # to stop the server from sending more data.
-                self.__exhaust_mgr.sock.close()
+                exhaust_mgr.sock.close(ConnectionClosedReason.ERROR)
             else:
+                if exhaust_mgr:
+                    # Not streaming, return the socket before killing the
+                    # cursor, in case it is the only one in the pool.
+                    exhaust_mgr.close()
                 address = _CursorAddress(
                     self.__address, self.__collection.full_name)
                 if synchronous:
@@ -473,6 +693,114 @@ class Cursor(object):
         self.__batch_size = batch_size
         return self
 
+    def prefetch(self, batches):
+        """Fetch up to `batches` batches of results in the background,
+        ahead of iteration.
+
+        Without prefetch the next batch is only requested once the current
+        one has been iterated, so the application waits for a round trip
+        with every batch. With prefetch a background thread sends the next
+        getMore as soon as a batch is returned from the server, and keeps
+        fetching until `batches` batches are waiting to be iterated. Each
+        waiting batch is held in memory, see :meth:`batch_size`. A prefetch
+        of ``0``, the default, fetches each batch when it is needed.
+
+        A failed getMore raises its error once the batches fetched before
+        it have been iterated. Background getMores use the collection's
+        timeout, not an enclosing :func:`pymongo.timeout` block. Exhaust
+        cursors ignore this option; the server already streams their
+        batches. A cursor created with an explicit
+        :class:`~pymongo.client_session.ClientSession` cannot prefetch,
+        because a session must not be used by two threads at once.
+
+        Raises :exc:`TypeError` if `batches` is not an integer.
+        Raises :exc:`ValueError` if `batches` is less than ``0``.
+        Raises :exc:`~pymongo.errors.InvalidOperation` if this
+        :class:`Cursor` has already been used or has an explicit session.
+
+        :Parameters:
+          - `batches`: The most batches to fetch ahead of iteration.
+
+        .. versionadded:: 3.8
+        """
+        if not isinstance(batches, integer_types):
+            raise TypeError("batches must be an integer")
+        if batches < 0:
+            raise ValueError("batches must be >= 0")
+        self.__check_okay_to_chain()
+        if batches and self.__explicit_session:
+            raise InvalidOperation(
+                "cannot prefetch with an explicit session, a session cannot "
+                "be used by concurrent operations")
+
+        self.__prefetch = batches
+        return self
+
+    def adaptive_batch_size(self, target_bytes=4 * 1024 ** 2,
+                            target_latency=None, min_batch_size=1,
+                            max_batch_size=100000):
+        """Choose the size of each batch from the documents returned so
+        far.
+
+        A fixed :meth:`batch_size` suits only one document size: small
+        documents need many round trips, large ones make large batches.
+        With adaptive batch sizes each reply's size and round trip time
+        are measured, and each getMore asks for as many documents as are
+        expected to fit in `target_bytes` and to arrive within
+        `target_latency` seconds, between `min_batch_size` and
+        `max_batch_size` documents. The first batch uses
+        :meth:`batch_size`, if it is set, or the server's default.
+
+        Raises :exc:`TypeError` or :exc:`ValueError` if an argument is
+        invalid. Raises :exc:`~pymongo.errors.InvalidOperation` if this
+        :class:`Cursor` has already been used.
+
+        :Parameters:
+          - `target_bytes` (optional): The size in bytes to aim for in
+            each batch. Defaults to 4MiB.
+          - `target_latency` (optional): The seconds to aim for in each
+            round trip, or ``None`` (the default) to size batches by bytes
+            only.
+          - `min_batch_size` (optional): The fewest documents to ask for.
+          - `max_batch_size` (optional): The most documents to ask for.
+
+        .. versionadded:: 3.8
+        """
+        adaptive = _AdaptiveBatchSize(target_bytes, target_latency,
+                                      min_batch_size, max_batch_size)
+        self.__check_okay_to_chain()
+
+        self.__adaptive = adaptive
+        return self
+
+    def lazy_decode(self, lazy=True):
+        """Decode each document only when it is returned.
+
+        By default a batch of results is decoded as soon as it arrives.
+        With lazy decoding the batch is kept as BSON, with the offset of
+        each document, and a document is decoded when :meth:`next` reaches
+        it. Memory then holds one batch of BSON rather than a batch of
+        decoded documents, and leaving a loop early skips decoding the
+        rest of the batch. An invalid document raises
+        :exc:`~bson.errors.InvalidBSON` when it is reached. With a
+        `document_class` of :class:`~bson.raw_bson.RawBSONDocument`, whose
+        documents are never decoded, this has no effect.
+
+        Raises :exc:`TypeError` if `lazy` is not a boolean. Raises
+        :exc:`~pymongo.errors.InvalidOperation` if this :class:`Cursor` has
+        already been used.
+
+        :Parameters:
+          - `lazy` (optional): If ``True`` (the default), decode lazily.
+
+        .. versionadded:: 3.8
+        """
+        validate_boolean("lazy", lazy)
+        self.__check_okay_to_chain()
+
+        self.__lazy = lazy
+        return self
+
     def skip(self, skip):
         """Skips the first `skip` results of this cursor.
 
@@ -909,11 +1237,12 @@ class Cursor(object):
         return self
 
     def __send_message(self, operation):
-        """Send a query or getmore operation and handles the response.
+        """Send a query or getmore operation, handle the response, and
+        return the batch of results.
 
-        If operation is ``None`` this is an exhaust cursor, which reads
-        the next result batch off the exhaust socket instead of
-        sending getMore messages to the server.
+        If this is an exhaust cursor with a socket checked out, the next
+        result batch is read off the exhaust socket. A getMore is only sent,
+        on that socket, to start streaming batches over OP_MSG.
 
         Can raise ConnectionFailure.
         """
@@ -925,15 +1254,18 @@ class Cursor(object):
 
         def duration(): return datetime.datetime.now() - start
 
-        if operation:
+        sent = _time()
+        if not self.__exhaust_mgr:
             try:
                 response = client._send_message_with_response(
-                    operation, exhaust=self.__exhaust, address=self.__address)
+                    operation, exhaust=self.__exhaust, address=self.__address,
+                    timeout=self.__collection.timeout)
                 self.__address = response.address
                 if self.__exhaust:
                     # 'response' is an ExhaustResponse.
-                    self.__exhaust_mgr = _SocketManager(response.socket_info,
-                                                        response.pool)
+                    self.__exhaust_mgr = _SocketManager(
+                        response.socket_info, response.pool,
+                        response.from_command)
 
                 cmd_name = operation.name
                 reply = response.data
@@ -948,21 +1280,37 @@ class Cursor(object):
                 self.__die()
                 raise
         else:
-            # Exhaust cursor - no getMore message.
+            # Exhaust cursor - no getMore message, unless we need to ask the
+            # server to start streaming over OP_MSG.
+            exhaust_mgr = self.__exhaust_mgr
+            sock_info = exhaust_mgr.sock
+            from_command = exhaust_mgr.from_command
+            send_get_more = from_command and not exhaust_mgr.more_to_come
             rqst_id = 0
             cmd_name = 'getMore'
+            if send_get_more:
+                rqst_id, data, max_doc_size = operation.get_message(
+                    False, sock_info, True)
             if publish:
-                # Fake a getMore command.
-                cmd = SON([('getMore', self.__id),
-                           ('collection', self.__collection.name)])
-                if self.__batch_size:
-                    cmd['batchSize'] = self.__batch_size
-                if self.__max_time_ms:
-                    cmd['maxTimeMS'] = self.__max_time_ms
+                if send_get_more:
+                    cmd = operation.as_command(sock_info)[0]
+                else:
+                    # Fake a getMore command.
+                    cmd = SON([('getMore', self.__id),
+                               ('collection', self.__collection.name)])
+                    if self.__batch_size:
+                        cmd['batchSize'] = self.__batch_size
+                    if self.__max_time_ms:
+                        cmd['maxTimeMS'] = self.__max_time_ms
                 listeners.publish_command_start(
-                    cmd, self.__collection.database.name, 0, self.__address)
+                    cmd, self.__collection.database.name, rqst_id,
+                    self.__address)
             try:
-                reply = self.__exhaust_mgr.sock.receive_message(None)
+                if send_get_more:
+                    sock_info.send_message(data, max_doc_size)
+                reply = sock_info.receive_message(rqst_id or None)
+                if from_command:
+                    exhaust_mgr.more_to_come = reply.more_to_come
             except Exception as exc:
                 if publish:
                     listeners.publish_command_failure(
@@ -972,10 +1320,25 @@ class Cursor(object):
                     self.__die()
                 raise
 
+        rtt = _time() - sent
+        if self.__adaptive is not None:
+            # Unpacking may release the receive buffer.
+            nbytes = _reply_size(reply)
+
+        codec_options = self.__codec_options
+        if self.__raw_batches:
+            codec_options = DEFAULT_RAW_BSON_OPTIONS
+        # Raw documents, including raw batches, are never decoded.
+        lazy = (self.__lazy and cmd_name != "explain" and
+                not _raw_document_class(codec_options.document_class))
         try:
-            docs = self._unpack_response(response=reply,
-                                         cursor_id=self.__id,
-                                         codec_options=self.__codec_options)
+            if lazy:
+                docs = reply.lazy_response(self.__id, codec_options,
+                                           from_command)
+            else:
+                docs = self._unpack_response(response=reply,
+                                             cursor_id=self.__id,
+                                             codec_options=codec_options)
             if from_command:
                 first = docs[0]
                 client._receive_cluster_time(first, self.__session)
@@ -995,7 +1358,7 @@ class Cursor(object):
             # self.__killed to True ensures Cursor.alive will be
             # False. No need to re-raise.
             if self.__query_flags & _QUERY_OPTIONS["tailable_cursor"]:
-                return
+                return []
             raise
         except NotMasterError as exc:
             # Don't send kill cursors to another server after a "not master"
@@ -1043,16 +1406,19 @@ class Cursor(object):
                     documents = cursor['firstBatch']
                 else:
                     documents = cursor['nextBatch']
-                self.__data = deque(documents)
                 self.__retrieved += len(documents)
+                if self.__adaptive is not None:
+                    self.__adaptive.record(nbytes, len(documents), rtt)
             else:
                 self.__id = 0
-                self.__data = deque(docs)
+                documents = docs
                 self.__retrieved += len(docs)
         else:
             self.__id = reply.cursor_id
-            self.__data = deque(docs)
+            documents = docs
             self.__retrieved += reply.number_returned
+            if self.__adaptive is not None and cmd_name != "explain":
+                self.__adaptive.record(nbytes, reply.number_returned, rtt)
 
         if self.__id == 0:
             self.__killed = True
@@ -1063,6 +1429,8 @@ class Cursor(object):
         if self.__limit and self.__id and self.__limit <= self.__retrieved:
             self.__die()
 
+        return documents
+
     def _unpack_response(self, response, cursor_id, codec_options):
         return response.unpack_response(cursor_id, codec_options)
 
@@ -1080,7 +1448,21 @@ class Cursor(object):
         self.__data is already non-empty. Raises OperationFailure when the
         cursor cannot be refreshed due to an error on the query.
         """
-        if len(self.__data) or self.__killed:
+        if len(self.__data):
+            return len(self.__data)
+
+        if self.__prefetcher is not None:
+            try:
+                batch = self.__prefetcher.next_batch()
+            except Exception:
+                self.__prefetcher = None
+                raise
+            if batch is not None:
+                self.__data = _batch_deque(batch)
+                return len(self.__data)
+            self.__prefetcher = None
+
+        if self.__killed:
             return len(self.__data)
 
         if not self.__session:
@@ -1101,32 +1483,46 @@ class Cursor(object):
                                   self.__collation,
                                   self.__session,
                                   self.__collection.database.client)
-            self.__send_message(q)
+            self.__data = _batch_deque(self.__send_message(q))
+            if self.__prefetch and not self.__exhaust and not self.__killed:
+                self.__prefetcher = _Prefetcher(self, self.__prefetch)
         elif self.__id:  # Get More
-            if self.__limit:
-                limit = self.__limit - self.__retrieved
-                if self.__batch_size:
-                    limit = min(limit, self.__batch_size)
-            else:
-                limit = self.__batch_size
-
-            # Exhaust cursors don't send getMore messages.
-            if self.__exhaust:
-                self.__send_message(None)
-            else:
-                g = self._getmore_class(self.__collection.database.name,
-                                        self.__collection.name,
-                                        limit,
-                                        self.__id,
-                                        self.__codec_options,
-                                        self._read_preference(),
-                                        self.__session,
-                                        self.__collection.database.client,
-                                        self.__max_await_time_ms)
-                self.__send_message(g)
+            self.__data = _batch_deque(
+                self.__send_message(self.__get_more()))
 
         return len(self.__data)
 
+    def __get_more(self):
+        """Create the getMore operation for the next batch."""
+        batch_size = self.__batch_size
+        if self.__adaptive is not None:
+            batch_size = self.__adaptive.batch_size(batch_size)
+        if self.__limit:
+            limit = self.__limit - self.__retrieved
+            if batch_size:
+                limit = min(limit, batch_size)
+        else:
+            limit = batch_size
+
+        return self._getmore_class(self.__collection.database.name,
+                                   self.__collection.name,
+                                   limit,
+                                   self.__id,
+                                   self.__codec_options,
+                                   self._read_preference(),
+                                   self.__session,
+                                   self.__collection.database.client,
+                                   self.__max_await_time_ms,
+                                   self.__exhaust)
+
+    def _prefetch_batch(self):
+        """Send the next getMore, called by the prefetch thread.
+
+        Returns the batch and whether the cursor may return more batches.
+        """
+        batch = self.__send_message(self.__get_more())
+        return batch, bool(self.__id and not self.__killed)
+
     @property
     def alive(self):
         """Does this cursor have the potential to return more data?
@@ -1147,7 +1543,9 @@ class Cursor(object):
           return False after :meth:`next` fails to retrieve the next batch
           of results from the server.
         """
-        return bool(len(self.__data) or (not self.__killed))
+        prefetcher = self.__prefetcher
+        return bool(len(self.__data) or (not self.__killed) or
+                    (prefetcher is not None and prefetcher.pending))
 
     @property
     def cursor_id(self):
@@ -1182,6 +1580,85 @@ class Cursor(object):
     def __iter__(self):
         return self
 
+    def iter_batches(self, raw=False):
+        """Iterate over the results one batch at a time.
+
+        Yields each batch of documents returned by the server as a list,
+        instead of one document at a time::
+
+          for batch in collection.find().batch_size(10000).iter_batches():
+              process(batch)
+
+        With `raw` each batch is yielded as :class:`bytes` of concatenated
+        BSON documents, which are not decoded, for writing to a file or
+        handing to another BSON reader. The cursor then returns any
+        remaining documents as
+        :class:`~bson.raw_bson.RawBSONDocument` instances.
+
+        Batches can be mixed with calls to :meth:`next`. A batch that was
+        partly iterated with :meth:`next` yields its remaining documents.
+
+        Raises :exc:`~pymongo.errors.InvalidOperation` if `raw` is ``True``
+        and this :class:`Cursor` has already been used.
+
+        :Parameters:
+          - `raw` (optional): If ``True``, yield batches as BSON bytes.
+
+        .. versionadded:: 3.8
+        """
+        if raw:
+            self.__check_okay_to_chain()
+            self.__raw_batches = True
+        return self.__iter_batches(raw)
+
+    def __iter_batches(self, raw):
+        if self.__empty:
+            return
+        while len(self.__data) or self._refresh():
+            batch, self.__data = self.__data, deque()
+            if raw:
+                yield _raw_batch(batch, self.__codec_options)
+            else:
+                yield self.__fix_outgoing(batch)
+
+    def __fix_outgoing(self, docs):
+        """Apply manipulators to a batch of documents, return a list."""
+        if self.__manipulate:
+            return self.__collection.database._fix_outgoing_all(
+                docs, self.__collection)
+        return list(docs)
+
+    def to_list(self, length=None):
+        """Get a list of up to `length` documents from this cursor.
+
+        Returns all remaining documents if `length` is ``None``. Documents
+        are taken from each batch at once, which is faster than iterating
+        the cursor.
+
+        Raises :exc:`ValueError` if `length` is negative.
+
+        :Parameters:
+          - `length` (optional): The most documents to return.
+
+        .. versionadded:: 3.8
+        """
+        if length is not None:
+            validate_non_negative_integer("length", length)
+        result = []
+        if self.__empty:
+            return result
+        while length is None or len(result) < length:
+            if not (len(self.__data) or self._refresh()):
+                break
+            data = self.__data
+            if length is None or len(data) <= length - len(result):
+                batch, self.__data = data, deque()
+            else:
+                popleft = data.popleft
+                batch = [popleft() for _ in range(length - len(result))]
+            result.extend(self.__fix_outgoing(batch))
+        return result
+
     def next(self):
         """Advance the cursor."""
         if self.__empty:
@@ -1278,6 +1755,9 @@ class RawBatchCursor(Cursor):
     def _unpack_response(self, response, cursor_id, codec_options):
         return response.raw_response(cursor_id)
 
+    def lazy_decode(self, lazy=True):
+        raise InvalidOperation("Cannot call lazy_decode on RawBatchCursor")
+
     def explain(self):
         """Returns an explain plan record for this cursor.
 
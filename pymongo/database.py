@@ -56,7 +56,7 @@ class Database(common.BaseObject):
     """
 
     def __init__(self, client, name, codec_options=None, read_preference=None,
-                 write_concern=None, read_concern=None):
+                 write_concern=None, read_concern=None, timeout=None):
         """Get a database by client and name.
 
         Raises :class:`TypeError` if `name` is not an instance of
@@ -78,9 +78,15 @@ class Database(common.BaseObject):
           - `read_concern` (optional): An instance of
             :class:`~pymongo.read_concern.ReadConcern`. If ``None`` (the
             default) client.read_concern is used.
+          - `timeout` (optional): The number of seconds each operation can
+            take, 0 for no limit. If ``None`` (the default) client.timeout is
+            used.
 
         .. mongodoc:: databases
 
+        .. versionchanged:: 3.8
+           Added the timeout option.
+
         .. versionchanged:: 3.2
            Added the read_concern option.
 
@@ -100,7 +106,8 @@ class Database(common.BaseObject):
             codec_options or client.codec_options,
             read_preference or client.read_preference,
             write_concern or client.write_concern,
-            read_concern or client.read_concern)
+            read_concern or client.read_concern,
+            client.timeout if timeout is None else timeout)
 
         if not isinstance(name, string_type):
             raise TypeError("name must be an instance "
@@ -259,7 +266,7 @@ class Database(common.BaseObject):
         return Collection(self, name)
 
     def get_collection(self, name, codec_options=None, read_preference=None,
-                       write_concern=None, read_concern=None):
+                       write_concern=None, read_concern=None, timeout=None):
         """Get a :class:`~pymongo.collection.Collection` with the given name
         and options.
 
@@ -296,10 +303,16 @@ class Database(common.BaseObject):
             :class:`~pymongo.read_concern.ReadConcern`. If ``None`` (the
             default) the :attr:`read_concern` of this :class:`Database` is
             used.
+          - `timeout` (optional): The number of seconds each operation can
+            take, 0 for no limit. If ``None`` (the default) the
+            :attr:`timeout` of this :class:`Database` is used.
+
+        .. versionchanged:: 3.8
+           Added the ``timeout`` parameter.
         """
         return Collection(
             self, name, False, codec_options, read_preference,
-            write_concern, read_concern)
+            write_concern, read_concern, timeout=timeout)
 
     def create_collection(self, name, codec_options=None,
                           read_preference=None, write_concern=None,
@@ -404,6 +417,13 @@ class Database(common.BaseObject):
             son = manipulator.transform_outgoing(son, collection)
         return son
 
+    def _fix_outgoing_all(self, docs, collection):
+        """Apply manipulators to a batch of documents, return a list."""
+        if (self.__outgoing_manipulators or
+                self.__outgoing_copying_manipulators):
+            return [self._fix_outgoing(son, collection) for son in docs]
+        return list(docs)
+
     def watch(self, pipeline=None, full_document='default', resume_after=None,
               max_await_time_ms=None, batch_size=None, collation=None,
               start_at_operation_time=None, session=None):
@@ -608,7 +628,7 @@ class Database(common.BaseObject):
             read_preference = ((session and session._txn_read_preference())
                                or ReadPreference.PRIMARY)
         with self.__client._socket_for_reads(
-                read_preference) as (sock_info, slave_ok):
+                read_preference, self.timeout) as (sock_info, slave_ok):
             return self._command(sock_info, command, slave_ok, value,
                                  check, allowable_errors, read_preference,
                                  codec_options, session=session, **kwargs)
@@ -671,7 +691,7 @@ class Database(common.BaseObject):
         read_pref = ((session and session._txn_read_preference())
                      or ReadPreference.PRIMARY)
         with self.__client._socket_for_reads(
-                read_pref) as (sock_info, slave_okay):
+                read_pref, self.timeout) as (sock_info, slave_okay):
             return self._list_collections(
                 sock_info, slave_okay, session, read_preference=read_pref,
                 **kwargs)
@@ -745,7 +765,7 @@ class Database(common.BaseObject):
 
         self.__client._purge_index(self.__name, name)
 
-        with self.__client._socket_for_writes() as sock_info:
+        with self.__client._socket_for_writes(self.timeout) as sock_info:
             return self._command(
                 sock_info, 'drop', value=_unicode(name),
                 allowable_errors=['ns not found'],
@@ -826,7 +846,7 @@ class Database(common.BaseObject):
            Added ``session`` parameter.
         """
         cmd = SON([("currentOp", 1), ("$all", include_all)])
-        with self.__client._socket_for_writes() as sock_info:
+        with self.__client._socket_for_writes(self.timeout) as sock_info:
             if sock_info.max_wire_version >= 4:
                 with self.__client._tmp_session(session) as s:
                     return sock_info.command("admin", cmd, session=s,
@@ -1224,6 +1244,12 @@ class Database(common.BaseObject):
             authentication mechanism specific options. To specify the service
             name for GSSAPI authentication pass
             authMechanismProperties='SERVICE_NAME:<service name>'
+          - `scramKeyCache`, `scramKeyCacheFile` (optional): Share the keys
+            derived for SCRAM authentication with other clients and
+            processes, see :class:`~pymongo.mongo_client.MongoClient`.
+
+        .. versionchanged:: 3.8
+           Added the `scramKeyCache` and `scramKeyCacheFile` options.
 
         .. versionchanged:: 3.7
            Added support for SCRAM-SHA-256 with MongoDB 4.0 and later.
@@ -0,0 +1,134 @@
+# Copyright 2018-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you
+# may not use this file except in compliance with the License.  You
+# may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.  See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Client-side operation deadlines.
+
+An operation's deadline bounds server selection, waiting for a connection
+from the pool, socket reads and writes, and retries. The time that is left
+is also sent to the server as ``maxTimeMS``.
+
+The timeout for an operation is taken from the ``timeoutMS`` MongoClient
+option, the ``timeout`` of a :class:`~pymongo.database.Database` or
+:class:`~pymongo.collection.Collection`, or from an enclosing
+:func:`timeout` block, which takes precedence::
+
+  with pymongo.timeout(0.5):
+      coll.find_one({'_id': 1})
+      coll.update_one({'_id': 1}, {'$inc': {'n': 1}})
+
+.. versionadded:: 3.8
+"""
+
+import contextlib
+import threading
+
+from pymongo.common import validate_positive_float
+from pymongo.errors import ExecutionTimeout
+from pymongo.monotonic import time as _time
+
+# The server's error code for MaxTimeMSExpired.
+_MAX_TIME_MS_EXPIRED = 50
+
+_state = threading.local()
+
+
+class _Deadline(object):
+    """The time by which an operation must finish.
+
+    :Parameters:
+      - `timeout`: seconds the operation can take, starting now.
+    """
+
+    __slots__ = ('timeout', 'expires')
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires = _time() + timeout
+
+    def remaining(self):
+        """Seconds until the deadline, negative once it has passed."""
+        return self.expires - _time()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cap(self, timeout):
+        """Return `timeout` seconds, or the time remaining if that is less.
+
+        `timeout` None means no limit.
+        """
+        remaining = max(self.remaining(), 0)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def max_time_ms(self):
+        """The time remaining in whole milliseconds, at least 1."""
+        return max(int(self.remaining() * 1000), 1)
+
+    def check(self):
+        """Raise :exc:`~pymongo.errors.ExecutionTimeout` if the deadline
+        has passed.
+        """
+        if self.expired():
+            raise ExecutionTimeout(
+                'operation exceeded time limit of %ss' % (self.timeout,),
+                _MAX_TIME_MS_EXPIRED)
+
+
+def _get_deadline(timeout):
+    """Return the _Deadline for an operation, or None.
+
+    An enclosing :func:`timeout` block takes precedence over `timeout`, the
+    seconds configured on the client, database or collection. `timeout` None
+    or 0 means no limit.
+    """
+    deadline = getattr(_state, 'deadline', None)
+    if deadline is not None:
+        return deadline
+    if timeout:
+        return _Deadline(timeout)
+    return None
+
+
+@contextlib.contextmanager
+def timeout(seconds):
+    """Bound all operations in a with-block by one deadline.
+
+    Operations run by this thread inside the block must all finish within
+    `seconds` of entering it, overriding the ``timeoutMS`` of the client
+    and the ``timeout`` of databases and collections. A nested block can't
+    extend the deadline of an enclosing block.
+
+    Server selection, checking out a connection, and network I/O raise
+    their usual errors when the deadline passes first: for example
+    :exc:`~pymongo.errors.ServerSelectionTimeoutError` or
+    :exc:`~pymongo.errors.NetworkTimeout`. An operation started after the
+    deadline has passed raises :exc:`~pymongo.errors.ExecutionTimeout`.
+
+    :Parameters:
+      - `seconds`: a positive int or float.
+
+    .. versionadded:: 3.8
+    """
+    seconds = validate_positive_float('timeout', seconds)
+    previous = getattr(_state, 'deadline', None)
+    deadline = _Deadline(seconds)
+    if previous is not None and previous.expires < deadline.expires:
+        deadline = previous
+    _state.deadline = deadline
+    try:
+        yield
+    finally:
+        _state.deadline = previous
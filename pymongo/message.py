@@ -24,12 +24,17 @@ import datetime
 import random
 import struct
 
+from collections import deque
+from itertools import chain
+
 import bson
 from bson import (CodecOptions,
                   _dict_to_bson,
                   _make_c_string)
 from bson.codec_options import DEFAULT_CODEC_OPTIONS
-from bson.py3compat import b, StringIO
+from bson.errors import InvalidBSON
+from bson.raw_bson import RawBSONDocument
+from bson.py3compat import b, StringIO, PY3, string_type
 from bson.son import SON
 
 try:
@@ -254,7 +259,8 @@ class _Query(object):
     def use_command(self, sock_info, exhaust):
         use_find_cmd = False
         if sock_info.max_wire_version >= 4:
-            if not exhaust:
+            if not exhaust or sock_info.max_wire_version >= 8:
+                # MongoDB 4.2+ supports exhaust cursors over OP_MSG.
                 use_find_cmd = True
         elif not self.read_concern.ok_for_legacy:
             raise ConfigurationError(
@@ -284,6 +290,7 @@ class _Query(object):
             self.coll, self.spec, self.fields, self.ntoskip,
             self.limit, self.batch_size, self.flags, self.read_concern,
             self.collation, self.session)
+        sock_info.apply_timeout(cmd)
         if explain:
             self.name = 'explain'
             cmd = SON([('explain', cmd)])
@@ -347,12 +354,13 @@ class _GetMore(object):
 
     __slots__ = ('db', 'coll', 'ntoreturn', 'cursor_id', 'max_await_time_ms',
                  'codec_options', 'read_preference', 'session', 'client',
-                 '_as_command')
+                 'exhaust', '_as_command')
 
     name = 'getMore'
 
     def __init__(self, db, coll, ntoreturn, cursor_id, codec_options,
-                 read_preference, session, client, max_await_time_ms=None):
+                 read_preference, session, client, max_await_time_ms=None,
+                 exhaust=False):
         self.db = db
         self.coll = coll
         self.ntoreturn = ntoreturn
@@ -362,11 +370,14 @@ class _GetMore(object):
         self.session = session
         self.client = client
         self.max_await_time_ms = max_await_time_ms
+        self.exhaust = exhaust
         self._as_command = None
 
     def use_command(self, sock_info, exhaust):
         sock_info.validate_session(self.client, self.session)
-        return sock_info.max_wire_version >= 4 and not exhaust
+        if exhaust:
+            return sock_info.max_wire_version >= 8
+        return sock_info.max_wire_version >= 4
 
     def as_command(self, sock_info):
         """Return a getMore command document for this query."""
@@ -393,8 +404,10 @@ class _GetMore(object):
         if use_cmd:
             spec = self.as_command(sock_info)[0]
             if sock_info.op_msg_enabled:
+                # Ask the server to stream the remaining batches.
+                flags = _OpMsg.EXHAUST_ALLOWED if self.exhaust else 0
                 request_id, msg, size, _ = _op_msg(
-                    0, spec, self.db, ReadPreference.PRIMARY,
+                    flags, spec, self.db, ReadPreference.PRIMARY,
                     False, False, self.codec_options,
                     ctx=sock_info.compression_context)
                 return request_id, msg, size
@@ -459,9 +472,32 @@ class _CursorAddress(tuple):
 _pack_compression_header = struct.Struct("<iiiiiiB").pack
 _COMPRESSION_HEADER_SIZE = 25
 
-def _compress(operation, data, ctx):
-    """Takes message data, compresses it, and adds an OP_COMPRESSED header."""
-    compressed = ctx.compress(data)
+def _command_shape(command):
+    """The (command name, collection name) of a command document."""
+    name = next(iter(command))
+    if name == '$query':
+        command = command['$query']
+        name = next(iter(command))
+    target = command[name]
+    if not isinstance(target, string_type):
+        # getMore names its collection separately.
+        target = command.get('collection')
+    return name, target
+
+
+def _compress(operation, data, ctx, shape):
+    """Takes message data, compresses it, and adds an OP_COMPRESSED header.
+
+    `shape` is the (command name, collection name) the message is for. If
+    the connection's compression policy decides the message isn't worth
+    compressing it is sent uncompressed instead.
+    """
+    if ctx.policy is None:
+        compressed = ctx.compress(data)
+    else:
+        compressed = ctx.policy.compress(ctx, shape, data)
+        if compressed is None:
+            return __pack_message(operation, data)
     request_id = _randint()
 
     header = _pack_compression_header(
@@ -525,7 +561,8 @@ def _insert_compressed(
     """Internal compressed unacknowledged insert message helper."""
     op_insert, max_bson_size = _insert(
         collection_name, docs, check_keys, continue_on_error, opts)
-    rid, msg = _compress(2002, op_insert, ctx)
+    rid, msg = _compress(
+        2002, op_insert, ctx, ('insert', collection_name))
     return rid, msg, max_bson_size
 
 
@@ -575,7 +612,8 @@ def _update_compressed(
     """Internal compressed unacknowledged update message helper."""
     op_update, max_bson_size = _update(
         collection_name, upsert, multi, spec, doc, check_keys, opts)
-    rid, msg = _compress(2001, op_update, ctx)
+    rid, msg = _compress(
+        2001, op_update, ctx, ('update', collection_name))
     return rid, msg, max_bson_size
 
 
@@ -639,7 +677,7 @@ def _op_msg_compressed(flags, command, identifier, docs, check_keys, opts,
     """Internal OP_MSG message helper."""
     msg, total_size, max_bson_size = _op_msg_no_header(
         flags, command, identifier, docs, check_keys, opts)
-    rid, msg = _compress(2013, msg, ctx)
+    rid, msg = _compress(2013, msg, ctx, _command_shape(command))
     return rid, msg, total_size, max_bson_size
 
 
@@ -713,7 +751,11 @@ def _query_compressed(options, collection_name, num_to_skip,
         field_selector,
         opts,
         check_keys)
-    rid, msg = _compress(2004, op_query, ctx)
+    if collection_name.endswith('.$cmd'):
+        shape = _command_shape(query)
+    else:
+        shape = ('find', collection_name)
+    rid, msg = _compress(2004, op_query, ctx, shape)
     return rid, msg, max_bson_size
 
 
@@ -762,7 +804,8 @@ def _get_more(collection_name, num_to_return, cursor_id):
 def _get_more_compressed(collection_name, num_to_return, cursor_id, ctx):
     """Internal compressed getMore message helper."""
     return _compress(
-        2005, _get_more(collection_name, num_to_return, cursor_id), ctx)
+        2005, _get_more(collection_name, num_to_return, cursor_id), ctx,
+        ('getMore', collection_name))
 
 
 def _get_more_uncompressed(collection_name, num_to_return, cursor_id):
@@ -794,7 +837,8 @@ def _delete(collection_name, spec, opts, flags):
 def _delete_compressed(collection_name, spec, opts, flags, ctx):
     """Internal compressed unacknowledged delete message helper."""
     op_delete, max_bson_size = _delete(collection_name, spec, opts, flags)
-    rid, msg = _compress(2006, op_delete, ctx)
+    rid, msg = _compress(
+        2006, op_delete, ctx, ('delete', collection_name))
     return rid, msg, max_bson_size
 
 
@@ -873,7 +917,8 @@ class _BulkWriteContext(object):
             self, request_id, msg, max_doc_size, acknowledged, docs, compress):
         if compress:
             request_id, msg = _compress(
-                2002, msg, self.sock_info.compression_context)
+                2002, msg, self.sock_info.compression_context,
+                _command_shape(self.command))
         return self.legacy_write(
             request_id, msg, max_doc_size, acknowledged, docs)
 
@@ -1149,7 +1194,8 @@ def _batched_op_msg_compressed(
     request_id, msg = _compress(
         2013,
         data,
-        ctx.sock_info.compression_context)
+        ctx.sock_info.compression_context,
+        _command_shape(command))
     return request_id, msg, to_send
 
 
@@ -1178,6 +1224,88 @@ if _use_c:
     _batched_op_msg = _cmessage._batched_op_msg
 
 
+def _batched_op_msg_vectored(
+        operation, command, docs, check_keys, ack, opts, ctx):
+    """Create the next batched insert, update, or delete operation with
+    OP_MSG, as a list of buffers.
+
+    Each encoded document is its own buffer, for SocketInfo.send_message to
+    write with a single scatter/gather send instead of copying the documents
+    into one message. RawBSONDocuments are sent without any copy.
+    """
+    max_bson_size = ctx.max_bson_size
+    max_write_batch_size = ctx.max_write_batch_size
+    max_message_size = ctx.max_message_size
+
+    flags = b"\x00\x00\x00\x00" if ack else b"\x02\x00\x00\x00"
+    encoded_command = _dict_to_bson(command, False, opts)
+    try:
+        identifier = _OP_MSG_MAP[operation]
+    except KeyError:
+        raise InvalidOperation('Unknown command')
+
+    if operation in (_UPDATE, _DELETE):
+        check_keys = False
+
+    # Header, flags, type 0 section and type 1 section kind.
+    size_location = 16 + 4 + 1 + len(encoded_command) + 1
+    length = size_location + 4 + len(identifier)
+    # The first buffer is the message prefix, built last.
+    buffers = [None]
+    to_send = []
+    idx = 0
+    for doc in docs:
+        # Encode the current operation
+        value = _dict_to_bson(doc, check_keys, opts)
+        doc_length = len(value)
+        new_message_size = length + doc_length
+        # See _batched_op_msg_impl.
+        doc_too_large = (idx == 0 and (new_message_size > max_message_size))
+        unacked_doc_too_large = (not ack and (doc_length > max_bson_size))
+        if doc_too_large or unacked_doc_too_large:
+            write_op = list(_FIELD_MAP.keys())[operation]
+            _raise_document_too_large(
+                write_op, len(value), max_bson_size)
+        # We have enough data, return this batch.
+        if new_message_size > max_message_size:
+            break
+        buffers.append(value)
+        length = new_message_size
+        to_send.append(doc)
+        idx += 1
+        # We have enough documents, return this batch.
+        if idx == max_write_batch_size:
+            break
+
+    request_id = _randint()
+    buffers[0] = b"".join([
+        _pack_int(length), _pack_int(request_id),
+        # responseTo, opCode
+        b"\x00\x00\x00\x00\xdd\x07\x00\x00",
+        flags,
+        b"\x00", encoded_command,
+        b"\x01", _pack_int(length - size_location), identifier])
+    return request_id, buffers, to_send
+
+
+def _vectored(sock_info, docs):
+    """Return `docs` and whether to send their batch as a list of buffers.
+
+    The C extension encodes documents straight into one contiguous message,
+    which is faster than encoding them one at a time. With it, only batches
+    of already encoded RawBSONDocuments, like those of a pipelined bulk
+    write, are sent as a list of buffers, to avoid copying the documents.
+    """
+    if not sock_info.vectored_send:
+        return docs, False
+    if not _use_c:
+        return docs, True
+    docs = iter(docs)
+    for first in docs:
+        return chain([first], docs), isinstance(first, RawBSONDocument)
+    return docs, False
+
+
 def _do_batched_op_msg(
         namespace, operation, command, docs, check_keys, opts, ctx):
     """Create the next batched insert, update, or delete operation
@@ -1191,6 +1319,10 @@ def _do_batched_op_msg(
     if ctx.sock_info.compression_context:
         return _batched_op_msg_compressed(
             operation, command, docs, check_keys, ack, opts, ctx)
+    docs, vectored = _vectored(ctx.sock_info, docs)
+    if vectored:
+        return _batched_op_msg_vectored(
+            operation, command, docs, check_keys, ack, opts, ctx)
     return _batched_op_msg(
         operation, command, docs, check_keys, ack, opts, ctx)
 
@@ -1208,7 +1340,8 @@ def _batched_write_command_compressed(
     request_id, msg = _compress(
         2004,
         data,
-        ctx.sock_info.compression_context)
+        ctx.sock_info.compression_context,
+        _command_shape(command))
     return request_id, msg, to_send
 
 
@@ -1252,12 +1385,86 @@ if _use_c:
     _batched_write_command = _cmessage._batched_write_command
 
 
+def _batched_write_command_vectored(
+        namespace, operation, command, docs, check_keys, opts, ctx):
+    """Create the next batched insert, update, or delete command as a list
+    of buffers.
+
+    Like _batched_op_msg_vectored, each encoded document is its own buffer.
+    """
+    max_bson_size = ctx.max_bson_size
+    max_write_batch_size = ctx.max_write_batch_size
+    # Max BSON object size + 16k - 2 bytes for ending NUL bytes.
+    # Server guarantees there is enough room: SERVER-10643.
+    max_cmd_size = max_bson_size + _COMMAND_OVERHEAD
+
+    try:
+        op = _OP_MAP[operation]
+    except KeyError:
+        raise InvalidOperation('Unknown command')
+
+    if operation in (_UPDATE, _DELETE):
+        check_keys = False
+
+    namespace = b(namespace)
+    # Strip the command document's trailing NUL, the payload array follows.
+    encoded_command = bson.BSON.encode(command)[:-1]
+    # Header, flags, namespace and skip/limit.
+    command_start = 16 + 4 + len(namespace) + 1 + len(_SKIPLIM)
+    length = command_start + len(encoded_command) + len(op)
+    list_start = length - 4
+    # The first buffer is the message prefix, built last.
+    buffers = [None]
+    to_send = []
+    idx = 0
+    for doc in docs:
+        # Encode the current operation
+        key = b(str(idx))
+        value = _dict_to_bson(doc, check_keys, opts)
+        # Is there enough room to add this document? max_cmd_size accounts for
+        # the two trailing null bytes.
+        enough_data = (length + len(key) + len(value)) >= max_cmd_size
+        enough_documents = (idx >= max_write_batch_size)
+        if enough_data or enough_documents:
+            if not idx:
+                write_op = list(_FIELD_MAP.keys())[operation]
+                _raise_document_too_large(
+                    write_op, len(value), max_bson_size)
+            break
+        buffers.append(_BSONOBJ + key + _ZERO_8)
+        buffers.append(value)
+        length += len(key) + 2 + len(value)
+        to_send.append(doc)
+        idx += 1
+
+    # Close list and command documents
+    buffers.append(_ZERO_16)
+    length += 2
+
+    request_id = _randint()
+    buffers[0] = b"".join([
+        _pack_int(length), _pack_int(request_id),
+        # responseTo, opCode
+        b"\x00\x00\x00\x00\xd4\x07\x00\x00",
+        # No options
+        _ZERO_32,
+        namespace, _ZERO_8,
+        _SKIPLIM,
+        _pack_int(length - command_start), encoded_command[4:],
+        op[:-4], _pack_int(length - list_start - 1)])
+    return request_id, buffers, to_send
+
+
 def _do_batched_write_command(
         namespace, operation, command, docs, check_keys, opts, ctx):
     """Batched write commands entry point."""
     if ctx.sock_info.compression_context:
         return _batched_write_command_compressed(
             namespace, operation, command, docs, check_keys, opts, ctx)
+    docs, vectored = _vectored(ctx.sock_info, docs)
+    if vectored:
+        return _batched_write_command_vectored(
+            namespace, operation, command, docs, check_keys, opts, ctx)
     return _batched_write_command(
         namespace, operation, command, docs, check_keys, opts, ctx)
 
@@ -1344,10 +1551,153 @@ def _batched_write_command_impl(
     return to_send, length
 
 
+def _return_buffer(borrowed, view):
+    """Give a borrowed receive buffer back to its pool.
+
+    The reply's view of the buffer is released first so the reply can't
+    read the buffer after it has been lent out again.
+    """
+    buffer_pool, buf = borrowed
+    try:
+        view.release()
+    except BufferError:
+        # Still exported, don't reuse the buffer.
+        return
+    buffer_pool.put(buf)
+
+
+def _payload_view(msg, start):
+    """Return the reply payload beginning at `start` without copying it.
+
+    On Python 3 this is a memoryview over the receive buffer, which the BSON
+    decoder reads in place. On Python 2 we slice the reply string.
+    """
+    if PY3:
+        return memoryview(msg)[start:]
+    return msg[start:]
+
+
+_UNPACK_INT_FROM = struct.Struct("<i").unpack_from
+
+
+class _LazyBatch(object):
+    """A batch of documents from a reply, decoded one at a time.
+
+    Keeps the reply's BSON and the offsets of the documents in it. Used
+    by cursors in place of a deque of decoded documents.
+    """
+
+    __slots__ = ("data", "offsets", "codec_options")
+
+    def __init__(self, data, offsets, codec_options):
+        self.data = data
+        self.offsets = deque(offsets)
+        self.codec_options = codec_options
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __decode(self, offset):
+        start, end = offset
+        return bson._bson_to_dict(self.data[start:end], self.codec_options)
+
+    def __getitem__(self, index):
+        return self.__decode(self.offsets[index])
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield self.__decode(offset)
+
+    def popleft(self):
+        """Remove and decode the first document."""
+        return self.__decode(self.offsets.popleft())
+
+    def raw(self):
+        """The remaining documents as concatenated BSON."""
+        data = self.data
+        return b"".join(data[start:end] for start, end in self.offsets)
+
+
+def _lazy_documents(data, codec_options):
+    """A _LazyBatch of concatenated BSON documents."""
+    offsets = []
+    position = 0
+    end = len(data)
+    while position < end:
+        size = _UNPACK_INT_FROM(data, position)[0]
+        offsets.append((position, position + size))
+        position += size
+    if position != end:
+        raise InvalidBSON("invalid object size")
+    return _LazyBatch(data, offsets, codec_options)
+
+
+def _lazy_array(data, position, codec_options):
+    """A _LazyBatch of the documents in the BSON array at `position`.
+
+    Returns the batch and the position after the array.
+    """
+    end = position + _UNPACK_INT_FROM(data, position)[0] - 1
+    position += 4
+    offsets = []
+    while position < end:
+        if data[position:position + 1] != b"\x03":
+            raise InvalidBSON("cursor batch contains a non-document")
+        # Skip the array index.
+        position = data.index(b"\x00", position + 1) + 1
+        size = _UNPACK_INT_FROM(data, position)[0]
+        offsets.append((position, position + size))
+        position += size
+    if position != end:
+        raise InvalidBSON("bad array length")
+    return _LazyBatch(data, offsets, codec_options), end + 1
+
+
+def _decode_lazily(data, position, codec_options, lazy_fields):
+    """Decode the BSON document at `position`, except for `lazy_fields`.
+
+    `lazy_fields` maps (element type, name) to a function that decodes
+    that field's value instead. Returns the document and the position
+    after it.
+    """
+    end = position + _UNPACK_INT_FROM(data, position)[0] - 1
+    position += 4
+    result = codec_options.document_class()
+    while position < end:
+        name_end = data.index(b"\x00", position + 1)
+        decode = lazy_fields.get(
+            (data[position:position + 1], data[position + 1:name_end]))
+        if decode is None:
+            name, value, position = bson._element_to_dict(
+                data, position, end, codec_options)
+        else:
+            name = data[position + 1:name_end].decode("utf-8")
+            value, position = decode(data, name_end + 1, codec_options)
+        result[name] = value
+    if position != end:
+        raise InvalidBSON("bad object or element length")
+    return result, end + 1
+
+
+def _lazy_cursor(data, position, codec_options):
+    return _decode_lazily(data, position, codec_options, {
+        (b"\x04", b"firstBatch"): _lazy_array,
+        (b"\x04", b"nextBatch"): _lazy_array})
+
+
+def _lazy_cursor_reply(data, codec_options):
+    """Decode a find, aggregate, or getMore command reply, leaving its
+    batch of documents as a _LazyBatch.
+    """
+    return _decode_lazily(data, 0, codec_options, {
+        (b"\x03", b"cursor"): _lazy_cursor})[0]
+
+
 class _OpReply(object):
     """A MongoDB OP_REPLY response message."""
 
-    __slots__ = ("flags", "cursor_id", "number_returned", "documents")
+    __slots__ = ("flags", "cursor_id", "number_returned", "documents",
+                 "_borrowed")
 
     UNPACK_FROM = struct.Struct("<iqii").unpack_from
     OP_CODE = 1
@@ -1357,6 +1707,14 @@ class _OpReply(object):
         self.cursor_id = cursor_id
         self.number_returned = number_returned
         self.documents = documents
+        # (buffer pool, buffer) if documents is a view of a borrowed buffer.
+        self._borrowed = None
+
+    def _release_buffer(self):
+        """Give the receive buffer back, the reply can't be decoded again."""
+        if self._borrowed is not None:
+            borrowed, self._borrowed = self._borrowed, None
+            _return_buffer(borrowed, self.documents)
 
     def raw_response(self, cursor_id=None):
         """Check the response header from the database, without decoding BSON.
@@ -1371,6 +1729,16 @@ class _OpReply(object):
             used for raising an informative exception when we get cursor id not
             valid at server response.
         """
+        try:
+            self._check_response(cursor_id)
+            # Raw batches are handed to the application, don't expose a view
+            # of the receive buffer.
+            return [bytes(self.documents)]
+        finally:
+            self._release_buffer()
+
+    def _check_response(self, cursor_id):
+        """Raise an exception if the response flags indicate an error."""
         if self.flags & 1:
             # Shouldn't get this response if we aren't doing a getMore
             if cursor_id is None:
@@ -1395,7 +1763,6 @@ class _OpReply(object):
                                    error_object.get("$err"),
                                    error_object.get("code"),
                                    error_object)
-        return [self.documents]
 
     def unpack_response(self, cursor_id=None,
                         codec_options=_UNICODE_REPLACE_CODEC_OPTIONS):
@@ -1414,8 +1781,29 @@ class _OpReply(object):
           - `codec_options` (optional): an instance of
             :class:`~bson.codec_options.CodecOptions`
         """
-        self.raw_response(cursor_id)
-        return bson.decode_all(self.documents, codec_options)
+        try:
+            self._check_response(cursor_id)
+            return bson.decode_all(self.documents, codec_options)
+        finally:
+            self._release_buffer()
+
+    def lazy_response(self, cursor_id=None,
+                      codec_options=_UNICODE_REPLACE_CODEC_OPTIONS,
+                      from_command=False):
+        """Like :meth:`unpack_response`, but documents are decoded
+        only when they are taken from the returned :class:`_LazyBatch`.
+
+        With `from_command` the reply is a command reply whose cursor
+        batch is a :class:`_LazyBatch`.
+        """
+        try:
+            self._check_response(cursor_id)
+            data = bson._to_bytes(self.documents)
+        finally:
+            self._release_buffer()
+        if from_command:
+            return [_lazy_cursor_reply(data, codec_options)]
+        return _lazy_documents(data, codec_options)
 
     def command_response(self):
         """Unpack a command response."""
@@ -1429,23 +1817,41 @@ class _OpReply(object):
         # PYTHON-945: ignore starting_from field.
         flags, cursor_id, _, number_returned = cls.UNPACK_FROM(msg)
 
-        # Convert Python 3 memoryview to bytes. Note we should call
-        # memoryview.tobytes() if we start using memoryview in Python 2.7.
-        documents = bytes(msg[20:])
+        documents = _payload_view(msg, 20)
         return cls(flags, cursor_id, number_returned, documents)
 
 
 class _OpMsg(object):
     """A MongoDB OP_MSG response message."""
 
-    __slots__ = ("flags", "cursor_id", "number_returned", "payload_document")
+    __slots__ = ("flags", "cursor_id", "number_returned", "payload_document",
+                 "_borrowed")
 
     UNPACK_FROM = struct.Struct("<IBi").unpack_from
     OP_CODE = 2013
 
+    # Flag bits.
+    CHECKSUM_PRESENT = 1
+    MORE_TO_COME = 1 << 1
+    EXHAUST_ALLOWED = 1 << 16  # Only present on requests.
+
     def __init__(self, flags, payload_document):
         self.flags = flags
         self.payload_document = payload_document
+        # (buffer pool, buffer) if payload_document is a view of a borrowed
+        # buffer.
+        self._borrowed = None
+
+    def _release_buffer(self):
+        """Give the receive buffer back, the reply can't be decoded again."""
+        if self._borrowed is not None:
+            borrowed, self._borrowed = self._borrowed, None
+            _return_buffer(borrowed, self.payload_document)
+
+    @property
+    def more_to_come(self):
+        """Is the server going to send another reply without a request?"""
+        return bool(self.flags & self.MORE_TO_COME)
 
     def raw_response(self, cursor_id=None):
         raise NotImplementedError
@@ -1459,7 +1865,30 @@ class _OpMsg(object):
           - `codec_options` (optional): an instance of
             :class:`~bson.codec_options.CodecOptions`
         """
-        return bson.decode_all(self.payload_document, codec_options)
+        try:
+            return bson.decode_all(self.payload_document, codec_options)
+        finally:
+            self._release_buffer()
+
+    def lazy_response(self, cursor_id=None,
+                      codec_options=_UNICODE_REPLACE_CODEC_OPTIONS,
+                      from_command=True):
+        """Like :meth:`unpack_response`, but the documents of a cursor
+        batch are decoded only when they are taken from the
+        :class:`_LazyBatch` in the reply.
+
+        :Parameters:
+          - `cursor_id` (optional): Ignored, for compatibility with _OpReply.
+          - `codec_options` (optional): an instance of
+            :class:`~bson.codec_options.CodecOptions`
+          - `from_command` (optional): Ignored, for compatibility with
+            _OpReply.
+        """
+        try:
+            data = bson._to_bytes(self.payload_document)
+        finally:
+            self._release_buffer()
+        return [_lazy_cursor_reply(data, codec_options)]
 
     def command_response(self):
         """Unpack a command response."""
@@ -1469,7 +1898,7 @@ class _OpMsg(object):
     def unpack(cls, msg):
         """Construct an _OpMsg from raw bytes."""
         flags, first_payload_type, first_payload_size = cls.UNPACK_FROM(msg)
-        if flags != 0:
+        if flags & ~cls.MORE_TO_COME:
             raise ProtocolError("Unsupported OP_MSG flags (%r)" % (flags,))
         if first_payload_type != 0:
             raise ProtocolError(
@@ -1478,9 +1907,7 @@ class _OpMsg(object):
         if len(msg) != first_payload_size + 5:
             raise ProtocolError("Unsupported OP_MSG reply: >1 section")
 
-        # Convert Python 3 memoryview to bytes. Note we should call
-        # memoryview.tobytes() if we start using memoryview in Python 2.7.
-        payload_document = bytes(msg[5:])
+        payload_document = _payload_view(msg, 5)
         return cls(flags, payload_document)
 
 
@@ -54,6 +54,7 @@ from pymongo.change_stream import ClusterChangeStream
 from pymongo.client_options import ClientOptions
 from pymongo.command_cursor import CommandCursor
 from pymongo.cursor_manager import CursorManager
+from pymongo.deadline import _get_deadline
 from pymongo.errors import (AutoReconnect,
                             BulkWriteError,
                             ConfigurationError,
@@ -65,7 +66,8 @@ from pymongo.errors import (AutoReconnect,
                             PyMongoError,
                             ServerSelectionTimeoutError)
 from pymongo.read_preferences import ReadPreference
-from pymongo.server_selectors import (writable_preferred_server_selector,
+from pymongo.server_selectors import (any_server_selector,
+                                      writable_preferred_server_selector,
                                       writable_server_selector)
 from pymongo.server_type import SERVER_TYPE
 from pymongo.topology import Topology
@@ -204,6 +206,12 @@ class MongoClient(common.BaseObject):
           - `minPoolSize` (optional): The minimum required number of concurrent
             connections that the pool will maintain to each connected server.
             Default is 0.
+          - `maxConnecting` (optional): The maximum number of connections
+            that each pool can establish concurrently. Threads that need a new
+            connection wait while this many are being established, and take a
+            socket returned to the pool if one becomes available first.
+            Connections for `minPoolSize` are made on a background thread.
+            Defaults to 2.
           - `maxIdleTimeMS` (optional): The maximum number of milliseconds that
             a connection can remain idle in the pool before being removed and
             replaced. Defaults to `None` (no limit).
@@ -230,9 +238,23 @@ class MongoClient(common.BaseObject):
           - `waitQueueTimeoutMS`: (integer or None) How long (in milliseconds)
             a thread will wait for a socket from the pool if the pool has no
             free sockets. Defaults to ``None`` (no timeout).
+          - `timeoutMS`: (integer or None) Controls how long (in
+            milliseconds) each operation can take, in total, from server
+            selection and waiting for a socket from the pool to reading the
+            reply, including a retry. The time remaining is sent to the server
+            as ``maxTimeMS``, and limits `serverSelectionTimeoutMS`,
+            `waitQueueTimeoutMS` and `socketTimeoutMS`. Can be overridden for
+            a database or collection with their ``timeout`` option, or for a
+            block of code with :func:`pymongo.timeout`. Defaults to ``None``
+            (no timeout).
           - `waitQueueMultiple`: (integer or None) Multiplied by maxPoolSize
             to give the number of threads allowed to wait for a socket at one
             time. Defaults to ``None`` (no limit).
+          - `receiveBufferPoolSize`: (integer) The maximum number of bytes of
+            receive buffers each connection pool keeps for reading large
+            replies, so that iterating a cursor doesn't allocate a new buffer
+            for each batch. 0 disables buffer reuse. Defaults to ``67108864``
+            (64 MiB).
           - `heartbeatFrequencyMS`: (optional) The number of milliseconds
             between periodic server checks, or None to accept the default
             frequency of 10 seconds.
@@ -275,18 +297,28 @@ class MongoClient(common.BaseObject):
             https://docs.mongodb.com/manual/faq/diagnostics/#does-tcp-keepalive-time-affect-mongodb-deployments",
           - `compressors`: Comma separated list of compressors for wire
             protocol compression. The list is used to negotiate a compressor
-            with the server. Currently supported options are "snappy" and
-            "zlib". Support for snappy requires the
+            with the server. Currently supported options are "snappy", "zlib"
+            and "zstd". Support for snappy requires the
             `python-snappy <https://pypi.org/project/python-snappy/>`_ package.
             zlib support requires the Python standard library zlib module.
+            zstd requires the `zstandard
+            <https://pypi.org/project/zstandard/>`_ package.
             By default no compression is used. Compression support must also be
             enabled on the server. MongoDB 3.4+ supports snappy compression.
-            MongoDB 3.6+ supports snappy and zlib.
+            MongoDB 3.6+ supports snappy and zlib. MongoDB 4.2+ supports zstd.
           - `zlibCompressionLevel`: (int) The zlib compression level to use
             when zlib is used as the wire protocol compressor. Supported values
             are -1 through 9. -1 tells the zlib library to use its default
             compression level (usually 6). 0 means no compression. 1 is best
             speed. 9 is best compression. Defaults to -1.
+          - `zstdCompressionLevel`: (int) The zstd compression level to use
+            when zstd is used as the wire protocol compressor. Supported values
+            are 1 (best speed) through 22 (best compression). Defaults to 3.
+          - `compressionMinSize`: (int) Messages smaller than this many bytes
+            are sent uncompressed. Defaults to 1024. Larger messages are
+            compressed unless the compressor isn't shrinking messages of the
+            same command and collection, such as inserts of already
+            compressed GridFS chunks. See :meth:`compression_stats`.
 
           | **Write Concern options:**
           | (Only set if passed. No default values.)
@@ -363,6 +395,16 @@ class MongoClient(common.BaseObject):
             specific options. To specify the service name for GSSAPI
             authentication pass authMechanismProperties='SERVICE_NAME:<service
             name>'
+          - `scramKeyCache`: (boolean) If ``True``, the keys that SCRAM
+            authentication derives from the password are shared by all
+            clients in this process, and inherited by processes forked after
+            authenticating, so that pre-fork workers don't each repeat the
+            expensive key derivation. Defaults to ``False``.
+          - `scramKeyCacheFile`: (string) Also share the derived SCRAM keys
+            with other processes through this file. Implies
+            ``scramKeyCache=True``. The file is created readable only by the
+            current user and ignored if others can access it. Protect it like
+            a password: its contents allow authenticating as the user.
 
           .. seealso:: :doc:`/examples/authentication`
 
@@ -421,6 +463,16 @@ class MongoClient(common.BaseObject):
 
         .. versionchanged:: 3.8
            Added the ``server_selector`` keyword argument.
+           Added the ``receiveBufferPoolSize`` keyword argument and URI
+           option.
+           Added the ``maxConnecting`` keyword argument and URI option.
+           Added support for zstd wire protocol compression and the
+           ``zstdCompressionLevel`` keyword argument and URI option.
+           Added the ``compressionMinSize`` keyword argument and URI option.
+           Added the ``timeoutMS`` keyword argument and URI option.
+           Added the ``scramKeyCache`` and ``scramKeyCacheFile`` keyword
+           arguments and URI options.
+           Connections for ``minPoolSize`` are established in the background.
 
         .. versionchanged:: 3.7
            Added the ``driver`` keyword argument.
@@ -505,6 +557,7 @@ class MongoClient(common.BaseObject):
             raise TypeError("port must be an instance of int")
 
         seeds = set()
+        fqdn = None
         username = None
         password = None
         dbase = None
@@ -517,6 +570,7 @@ class MongoClient(common.BaseObject):
                 password = res["password"] or password
                 dbase = res["database"] or dbase
                 opts = res["options"]
+                fqdn = res["fqdn"]
             else:
                 seeds.update(uri_parser.split_hosts(entity, port))
         if not seeds:
@@ -567,7 +621,8 @@ class MongoClient(common.BaseObject):
         super(MongoClient, self).__init__(options.codec_options,
                                           options.read_preference,
                                           options.write_concern,
-                                          options.read_concern)
+                                          options.read_concern,
+                                          options.timeout)
 
         self.__all_credentials = {}
         creds = options.credentials
@@ -584,7 +639,8 @@ class MongoClient(common.BaseObject):
             local_threshold_ms=options.local_threshold_ms,
             server_selection_timeout=options.server_selection_timeout,
             server_selector=options.server_selector,
-            heartbeat_frequency=options.heartbeat_frequency)
+            heartbeat_frequency=options.heartbeat_frequency,
+            fqdn=fqdn)
 
         self._topology = Topology(self._topology_settings)
         if connect:
@@ -907,6 +963,56 @@ class MongoClient(common.BaseObject):
         """
         return self.__options.pool_options.min_pool_size
 
+    def wait_queue_stats(self):
+        """Statistics about operations waiting for a connection.
+
+        When all `max_pool_size` connections to a server are in use,
+        operations wait for one in first-in, first-out order. Returns a dict
+        mapping each known server's (host, port) to a dict of its pool's
+        statistics: ``checkouts``, ``timeouts``, ``queue_depth``,
+        ``max_queue_depth``, ``average_queue_depth``, ``total_wait_time``,
+        ``max_wait_time`` and ``average_wait_time`` (wait times are in
+        seconds, queue depths count the operations already waiting when a
+        checkout began). Useful for sizing ``maxPoolSize``.
+
+        .. versionadded:: 3.8
+        """
+        return self._topology.wait_queue_stats()
+
+    def tls_handshake_stats(self):
+        """Statistics about TLS handshakes.
+
+        Each connection pool caches a TLS session for its server, and new
+        TLS connections to the server resume it when possible, which is
+        cheaper than a full handshake for the client and the server. Returns
+        a dict mapping each known server's (host, port) to a dict with the
+        number of ``resumed`` and ``full`` handshakes by its pool. Session
+        resumption requires Python 3.6+.
+
+        .. versionadded:: 3.8
+        """
+        return self._topology.tls_handshake_stats()
+
+    def compression_stats(self):
+        """Statistics about wire protocol compression.
+
+        Returns a dict mapping each command name to a dict of statistics for
+        the messages sent for that command since the client was created:
+        ``compressed`` and ``uncompressed`` (the number of messages sent
+        compressed, and sent uncompressed because they were smaller than
+        ``compressionMinSize`` or didn't compress), ``bytes_in`` and
+        ``bytes_out`` (the size of compressed messages before and after
+        compression), ``ratio`` (``bytes_out`` / ``bytes_in``) and
+        ``compression_time`` (in seconds). Empty unless compression is
+        enabled with the ``compressors`` option.
+
+        .. versionadded:: 3.8
+        """
+        settings = self.__options.pool_options.compression_settings
+        if settings is None:
+            return {}
+        return settings.stats.snapshot()
+
     @property
     def max_idle_time_ms(self):
         """The maximum number of milliseconds that a connection can remain
@@ -1076,10 +1182,29 @@ class MongoClient(common.BaseObject):
             self._kill_cursors_executor.open()
         return self._topology
 
+    def _deadline(self, timeout=None):
+        """Return the _Deadline for an operation, or None.
+
+        `timeout` is the database or collection's timeout, if None this
+        client's timeout is used.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        return _get_deadline(timeout)
+
+    def _select_server(self, selector, deadline, address=None):
+        """Select a server, giving up when `deadline` passes."""
+        server_selection_timeout = self.server_selection_timeout
+        if deadline is not None:
+            server_selection_timeout = deadline.cap(server_selection_timeout)
+        return self._get_topology().select_server(
+            selector, server_selection_timeout, address)
+
     @contextlib.contextmanager
-    def _get_socket(self, server):
+    def _get_socket(self, server, deadline=None):
         try:
-            with server.get_socket(self.__all_credentials) as sock_info:
+            with server.get_socket(
+                    self.__all_credentials, deadline=deadline) as sock_info:
                 yield sock_info
         except NetworkTimeout:
             # The socket has been closed. Don't reset the server.
@@ -1105,12 +1230,13 @@ class MongoClient(common.BaseObject):
                 self.__reset_server(server.description.address)
             raise
 
-    def _socket_for_writes(self):
-        server = self._get_topology().select_server(writable_server_selector)
-        return self._get_socket(server)
+    def _socket_for_writes(self, timeout=None):
+        deadline = self._deadline(timeout)
+        server = self._select_server(writable_server_selector, deadline)
+        return self._get_socket(server, deadline)
 
     @contextlib.contextmanager
-    def _socket_for_reads(self, read_preference):
+    def _socket_for_reads(self, read_preference, timeout=None):
         assert read_preference is not None, "read_preference must not be None"
         # Get a socket for a server matching the read preference, and yield
         # sock_info, slave_ok. Server Selection Spec: "slaveOK must be sent to
@@ -1120,15 +1246,16 @@ class MongoClient(common.BaseObject):
         # Thread safe: if the type is single it cannot change.
         topology = self._get_topology()
         single = topology.description.topology_type == TOPOLOGY_TYPE.Single
-        server = topology.select_server(read_preference)
+        deadline = self._deadline(timeout)
+        server = self._select_server(read_preference, deadline)
 
-        with self._get_socket(server) as sock_info:
+        with self._get_socket(server, deadline) as sock_info:
             slave_ok = (single and not sock_info.is_mongos) or (
                 read_preference != ReadPreference.PRIMARY)
             yield sock_info, slave_ok
 
     def _send_message_with_response(self, operation, exhaust=False,
-                                    address=None):
+                                    address=None, timeout=None):
         """Send a message to MongoDB and return a Response.
 
         :Parameters:
@@ -1138,15 +1265,18 @@ class MongoClient(common.BaseObject):
             It is returned along with its Pool in the Response.
           - `address` (optional): Optional address when sending a message
             to a specific server, used for getMore.
+          - `timeout` (optional): The collection's timeout in seconds.
         """
         topology = self._get_topology()
+        deadline = self._deadline(timeout)
         if address:
-            server = topology.select_server_by_address(address)
+            server = self._select_server(any_server_selector, deadline,
+                                         address)
             if not server:
                 raise AutoReconnect('server %s:%d no longer available'
                                     % address)
         else:
-            server = topology.select_server(operation.read_preference)
+            server = self._select_server(operation.read_preference, deadline)
 
         # If this is a direct connection to a mongod, *always* set the slaveOk
         # bit. See bullet point 2 in server-selection.rst#topology-type-single.
@@ -1162,7 +1292,8 @@ class MongoClient(common.BaseObject):
             set_slave_ok,
             self.__all_credentials,
             self._event_listeners,
-            exhaust)
+            exhaust,
+            deadline)
 
     def _reset_on_error(self, server, func, *args, **kwargs):
         """Execute an operation. Reset the server on network error.
@@ -1181,11 +1312,12 @@ class MongoClient(common.BaseObject):
             self.__reset_server(server.description.address)
             raise
 
-    def _retry_with_session(self, retryable, func, session, bulk):
+    def _retry_with_session(self, retryable, func, session, bulk,
+                            timeout=None):
         """Execute an operation with at most one consecutive retries
 
         Returns func()'s return value on success. On error retries the same
-        command once.
+        command once, unless the operation's deadline has passed.
 
         Re-raises any exception thrown by func().
         """
@@ -1193,6 +1325,7 @@ class MongoClient(common.BaseObject):
                      and session and not session._in_transaction)
         last_error = None
         retrying = False
+        deadline = self._deadline(timeout)
 
         def is_retrying():
             return bulk.retrying if bulk else retrying
@@ -1205,13 +1338,16 @@ class MongoClient(common.BaseObject):
                 bulk.started_retryable_write = True
 
         while True:
+            if is_retrying() and deadline is not None and deadline.expired():
+                # No time is left to retry.
+                raise last_error
             try:
-                server = self._get_topology().select_server(
-                    writable_server_selector)
+                server = self._select_server(
+                    writable_server_selector, deadline)
                 supports_session = (
                     session is not None and
                     server.description.retryable_writes_supported)
-                with self._get_socket(server) as sock_info:
+                with self._get_socket(server, deadline) as sock_info:
                     if retryable and not supports_session:
                         if is_retrying():
                             # A retry is not possible because this server does
@@ -1262,10 +1398,11 @@ class MongoClient(common.BaseObject):
                     retrying = True
                 last_error = exc
 
-    def _retryable_write(self, retryable, func, session):
+    def _retryable_write(self, retryable, func, session, timeout=None):
         """Internal retryable write helper."""
         with self._tmp_session(session) as s:
-            return self._retry_with_session(retryable, func, s, None)
+            return self._retry_with_session(
+                retryable, func, s, None, timeout)
 
     def __reset_server(self, address):
         """Clear our connection pool for a server and mark it Unknown."""
@@ -1566,7 +1703,12 @@ class MongoClient(common.BaseObject):
 
     def _get_server_session(self):
         """Internal: start or resume a _ServerSession."""
-        return self._topology.get_server_session()
+        server_selection_timeout = None
+        deadline = self._deadline()
+        if deadline is not None:
+            server_selection_timeout = deadline.cap(
+                self.server_selection_timeout)
+        return self._topology.get_server_session(server_selection_timeout)
 
     def _return_server_session(self, server_session, lock):
         """Internal: return a _ServerSession to the pool."""
@@ -1769,7 +1911,7 @@ class MongoClient(common.BaseObject):
         return self[self.__default_database_name]
 
     def get_database(self, name=None, codec_options=None, read_preference=None,
-                     write_concern=None, read_concern=None):
+                     write_concern=None, read_concern=None, timeout=None):
         """Get a :class:`~pymongo.database.Database` with the given name and
         options.
 
@@ -1808,6 +1950,12 @@ class MongoClient(common.BaseObject):
             :class:`~pymongo.read_concern.ReadConcern`. If ``None`` (the
             default) the :attr:`read_concern` of this :class:`MongoClient` is
             used.
+          - `timeout` (optional): The number of seconds each operation can
+            take, 0 for no limit. If ``None`` (the default) the
+            :attr:`timeout` of this :class:`MongoClient` is used.
+
+        .. versionchanged:: 3.8
+           Added the ``timeout`` parameter.
 
         .. versionchanged:: 3.5
            The `name` parameter is now optional, defaulting to the database
@@ -1820,7 +1968,7 @@ class MongoClient(common.BaseObject):
 
         return database.Database(
             self, name, codec_options, read_preference,
-            write_concern, read_concern)
+            write_concern, read_concern, timeout)
 
     def _database_default_options(self, name):
         """Get a Database instance with the default settings."""
@@ -22,6 +22,7 @@ from pymongo.server_type import SERVER_TYPE
 from pymongo.monotonic import time as _time
 from pymongo.read_preferences import MovingAverage
 from pymongo.server_description import ServerDescription
+from pymongo.uri_parser import _get_dns_srv_hosts
 
 
 class Monitor(object):
@@ -182,3 +183,71 @@ class Monitor(object):
             self._topology.receive_cluster_time(
                 exc.details.get('$clusterTime'))
             raise
+
+
+class SrvMonitor(object):
+    def __init__(self, topology, topology_settings):
+        """Class to poll the SRV records of a mongodb+srv:// URI on a
+        background thread.
+
+        Looks up the hosts again when the records' TTL expires, but at most
+        once per common.MIN_SRV_RESCAN_INTERVAL, and applies added or
+        removed hosts to the Topology's seed list. Lookups are shared with
+        other clients through the cache in uri_parser.
+
+        The Topology is weakly referenced.
+        """
+        self._settings = topology_settings
+        self._fqdn = topology_settings.fqdn
+
+        # We strongly reference the executor and it weakly references us via
+        # this closure. When the monitor is freed, stop the executor soon.
+        def target():
+            monitor = self_ref()
+            if monitor is None:
+                return False  # Stop the executor.
+            SrvMonitor._run(monitor)
+            return True
+
+        executor = periodic_executor.PeriodicExecutor(
+            interval=common.MIN_SRV_RESCAN_INTERVAL,
+            min_interval=common.MIN_HEARTBEAT_INTERVAL,
+            target=target,
+            name="pymongo_srv_polling_thread")
+
+        self._executor = executor
+
+        # Avoid cycles. When self or topology is freed, stop executor soon.
+        self_ref = weakref.ref(self, executor.close)
+        self._topology = weakref.proxy(topology, executor.close)
+
+    def open(self):
+        """Start polling, or restart after a fork.
+
+        Multiple calls have no effect.
+        """
+        self._executor.open()
+
+    def close(self):
+        self._executor.close()
+
+    def join(self, timeout=None):
+        self._executor.join(timeout)
+
+    def _run(self):
+        try:
+            seedlist, ttl = _get_dns_srv_hosts(self._fqdn)
+        except Exception:
+            # Keep the current seed list and try again after
+            # heartbeatFrequencyMS. Errors are not cached.
+            self._executor.update_interval(self._settings.heartbeat_frequency)
+            return
+        self._executor.update_interval(
+            max(ttl, common.MIN_SRV_RESCAN_INTERVAL))
+        if not seedlist:
+            return
+        try:
+            self._topology.on_srv_update(seedlist)
+        except ReferenceError:
+            # Topology was garbage-collected.
+            self.close()
@@ -16,9 +16,9 @@
 
 import datetime
 import errno
+import os
 import select
 import struct
-import threading
 
 _HAS_POLL = True
 _EVENT_MASK = 0
@@ -38,7 +38,9 @@ from bson.py3compat import PY3
 
 from pymongo import helpers, message
 from pymongo.common import MAX_MESSAGE_SIZE
-from pymongo.compression_support import decompress, _NO_COMPRESSION
+from pymongo.compression_support import (decompress,
+                                         ZstdContext,
+                                         _NO_COMPRESSION)
 from pymongo.errors import (AutoReconnect,
                             NotMasterError,
                             OperationFailure,
@@ -58,7 +60,8 @@ def command(sock, dbname, spec, slave_ok, is_mongos,
             collation=None,
             compression_ctx=None,
             use_op_msg=False,
-            unacknowledged=False):
+            unacknowledged=False,
+            buffer_pool=None):
     """Execute a command over the socket, or raise socket.error.
 
     :Parameters:
@@ -81,13 +84,67 @@ def command(sock, dbname, spec, slave_ok, is_mongos,
       - `parse_write_concern_error`: Whether to parse the ``writeConcernError``
         field in the command response.
       - `collation`: The collation for this command.
+      - `buffer_pool`: optional pool of receive buffers to read the reply
+        into.
     """
     name = next(iter(spec))
+    publish = listeners is not None and listeners.enabled_for_commands
+    if publish:
+        start = datetime.datetime.now()
+
+    # Publish the original command document, perhaps with lsid and
+    # $clusterTime.
+    request_id, msg = _encode_command(
+        name, dbname, spec, slave_ok, is_mongos, read_preference,
+        codec_options, session, check_keys, max_bson_size, read_concern,
+        collation, compression_ctx, use_op_msg, unacknowledged)
+
+    if publish:
+        encoding_duration = datetime.datetime.now() - start
+        listeners.publish_command_start(spec, dbname, request_id, address)
+        start = datetime.datetime.now()
+
+    try:
+        sock.sendall(msg)
+        if use_op_msg and unacknowledged:
+            # Unacknowledged, fake a successful command response.
+            response_doc = {"ok": 1}
+        else:
+            reply = receive_message(sock, request_id,
+                                    buffer_pool=buffer_pool,
+                                    compression_ctx=compression_ctx)
+            response_doc = _decode_command_reply(
+                reply, codec_options, session, client, check,
+                allowable_errors, parse_write_concern_error)
+    except Exception as exc:
+        if publish:
+            duration = (datetime.datetime.now() - start) + encoding_duration
+            if isinstance(exc, (NotMasterError, OperationFailure)):
+                failure = exc.details
+            else:
+                failure = message._convert_exception(exc)
+            listeners.publish_command_failure(
+                duration, failure, name, request_id, address)
+        raise
+    if publish:
+        duration = (datetime.datetime.now() - start) + encoding_duration
+        listeners.publish_command_success(
+            duration, response_doc, name, request_id, address)
+    return response_doc
+
+
+def _encode_command(name, dbname, spec, slave_ok, is_mongos,
+                    read_preference, codec_options, session, check_keys,
+                    max_bson_size, read_concern, collation, compression_ctx,
+                    use_op_msg, unacknowledged):
+    """Add read concern and collation to `spec` and encode it.
+
+    Returns (request_id, msg). Shared by the blocking and asyncio network
+    layers, raises DocumentTooLarge.
+    """
     ns = dbname + '.$cmd'
     flags = 4 if slave_ok else 0
 
-    # Publish the original command document, perhaps with lsid and $clusterTime.
-    orig = spec
     if is_mongos and not use_op_msg:
         spec = message._maybe_add_read_preference(spec, read_preference)
     if read_concern and not (session and session._in_transaction):
@@ -100,10 +157,6 @@ def command(sock, dbname, spec, slave_ok, is_mongos,
     if collation is not None:
         spec['collation'] = collation
 
-    publish = listeners is not None and listeners.enabled_for_commands
-    if publish:
-        start = datetime.datetime.now()
-
     if compression_ctx and name.lower() in _NO_COMPRESSION:
         compression_ctx = None
 
@@ -126,51 +179,74 @@ def command(sock, dbname, spec, slave_ok, is_mongos,
             and size > max_bson_size + message._COMMAND_OVERHEAD):
         message._raise_document_too_large(
             name, size, max_bson_size + message._COMMAND_OVERHEAD)
+    return request_id, msg
 
-    if publish:
-        encoding_duration = datetime.datetime.now() - start
-        listeners.publish_command_start(orig, dbname, request_id, address)
-        start = datetime.datetime.now()
 
-    try:
-        sock.sendall(msg)
-        if use_op_msg and unacknowledged:
-            # Unacknowledged, fake a successful command response.
-            response_doc = {"ok": 1}
-        else:
-            reply = receive_message(sock, request_id)
-            unpacked_docs = reply.unpack_response(codec_options=codec_options)
-
-            response_doc = unpacked_docs[0]
-            if client:
-                client._receive_cluster_time(response_doc, session)
-            if check:
-                helpers._check_command_response(
-                    response_doc, None, allowable_errors,
-                    parse_write_concern_error=parse_write_concern_error)
-    except Exception as exc:
-        if publish:
-            duration = (datetime.datetime.now() - start) + encoding_duration
-            if isinstance(exc, (NotMasterError, OperationFailure)):
-                failure = exc.details
-            else:
-                failure = message._convert_exception(exc)
-            listeners.publish_command_failure(
-                duration, failure, name, request_id, address)
-        raise
-    if publish:
-        duration = (datetime.datetime.now() - start) + encoding_duration
-        listeners.publish_command_success(
-            duration, response_doc, name, request_id, address)
+def _decode_command_reply(reply, codec_options, session, client, check,
+                          allowable_errors, parse_write_concern_error):
+    """Decode a command reply, gossip $clusterTime, and check for errors."""
+    unpacked_docs = reply.unpack_response(codec_options=codec_options)
+
+    response_doc = unpacked_docs[0]
+    if client:
+        client._receive_cluster_time(response_doc, session)
+    if check:
+        helpers._check_command_response(
+            response_doc, None, allowable_errors,
+            parse_write_concern_error=parse_write_concern_error)
     return response_doc
 
 _UNPACK_COMPRESSION_HEADER = struct.Struct("<iiB").unpack
 
-def receive_message(sock, request_id, max_message_size=MAX_MESSAGE_SIZE):
-    """Receive a raw BSON message or raise socket.error."""
+def receive_message(sock, request_id, max_message_size=MAX_MESSAGE_SIZE,
+                    buffer_pool=None, compression_ctx=None):
+    """Receive a raw BSON message or raise socket.error.
+
+    If `buffer_pool` is given, large messages are read into a buffer
+    borrowed from it. The reply gives the buffer back once it is decoded.
+    A zstd compressed message is decompressed with `compression_ctx`, if it
+    is a ZstdContext, into a buffer borrowed from `buffer_pool`.
+    """
+    length, op_code = _check_header(
+        _receive_data_on_socket(sock, 16), request_id, max_message_size)
+    buf = None
+    if op_code == 2012:
+        op_code, uncompressed_size, compressor_id = (
+            _UNPACK_COMPRESSION_HEADER(_receive_data_on_socket(sock, 9)))
+        if uncompressed_size > max_message_size:
+            raise ProtocolError("Uncompressed message size (%r) is larger "
+                                "than server max message size (%r)" % (
+                                    uncompressed_size, max_message_size))
+        length -= 25
+        out = None
+        if PY3 and buffer_pool is not None:
+            buf = buffer_pool.get(length)
+            if compressor_id == ZstdContext.compressor_id:
+                out = buffer_pool.get(uncompressed_size)
+        data = decompress(
+            _receive_data_on_socket(sock, length, buf), compressor_id,
+            compression_ctx, out)
+        if buf is not None:
+            # The decompressed data is a copy, the buffer can be reused now.
+            buffer_pool.put(buf)
+        reply = _unpack_reply(op_code, data)
+        if out is not None:
+            reply._borrowed = (buffer_pool, out)
+        return reply
+
+    length -= 16
+    if PY3 and buffer_pool is not None:
+        buf = buffer_pool.get(length)
+    reply = _unpack_reply(op_code, _receive_data_on_socket(sock, length, buf))
+    if buf is not None:
+        reply._borrowed = (buffer_pool, buf)
+    return reply
+
+
+def _check_header(header, request_id, max_message_size):
+    """Validate a message header, return (message length, op code)."""
     # Ignore the response's request id.
-    length, _, response_to, op_code = _UNPACK_HEADER(
-        _receive_data_on_socket(sock, 16))
+    length, _, response_to, op_code = _UNPACK_HEADER(header)
     # No request_id for exhaust cursor "getMore".
     if request_id is not None:
         if request_id != response_to:
@@ -182,14 +258,11 @@ def receive_message(sock, request_id, max_message_size=MAX_MESSAGE_SIZE):
     if length > max_message_size:
         raise ProtocolError("Message length (%r) is larger than server max "
                             "message size (%r)" % (length, max_message_size))
-    if op_code == 2012:
-        op_code, _, compressor_id = _UNPACK_COMPRESSION_HEADER(
-            _receive_data_on_socket(sock, 9))
-        data = decompress(
-            _receive_data_on_socket(sock, length - 25), compressor_id)
-    else:
-        data = _receive_data_on_socket(sock, length - 16)
+    return length, op_code
 
+
+def _unpack_reply(op_code, data):
+    """Construct an _OpReply or _OpMsg from the message body."""
     try:
         unpack_reply = _UNPACK_REPLY[op_code]
     except KeyError:
@@ -204,7 +277,8 @@ def receive_message(sock, request_id, max_message_size=MAX_MESSAGE_SIZE):
 # In Jython, using slice assignment on a memoryview results in a
 # NullPointerException.
 if not PY3:
-    def _receive_data_on_socket(sock, length):
+    def _receive_data_on_socket(sock, length, buf=None):
+        # Receive buffers are not pooled on Python 2, ignore buf.
         buf = bytearray(length)
         i = 0
         while length:
@@ -223,9 +297,14 @@ if not PY3:
 
         return bytes(buf)
 else:
-    def _receive_data_on_socket(sock, length):
-        buf = bytearray(length)
-        mv = memoryview(buf)
+    def _receive_data_on_socket(sock, length, buf=None):
+        """Read `length` bytes into `buf`, or a new bytearray if None.
+
+        Returns a memoryview of the bytes read.
+        """
+        if buf is None:
+            buf = bytearray(length)
+        mv = memoryview(buf)[:length]
         bytes_read = 0
         while bytes_read < length:
             try:
@@ -242,6 +321,63 @@ else:
         return mv
 
 
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, OSError, ValueError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+def sendmsg_all(sock, buffers):
+    """Send a list of buffers with socket.sendmsg, or raise socket.error.
+
+    Like sendall for the concatenated buffers, without concatenating them.
+    """
+    buffers = list(buffers)
+    idx = 0
+    while idx < len(buffers):
+        try:
+            sent = sock.sendmsg(buffers[idx:idx + _IOV_MAX])
+        except (IOError, OSError) as exc:
+            if _errno_from_exception(exc) == errno.EINTR:
+                continue
+            raise
+        # Skip the buffers that were sent completely.
+        while idx < len(buffers) and sent >= len(buffers[idx]):
+            sent -= len(buffers[idx])
+            idx += 1
+        if sent:
+            buffers[idx] = memoryview(buffers[idx])[sent:]
+
+
+def select_writable(socks, timeout):
+    """Return the sockets in `socks` that are writable or in error.
+
+    Waits at most `timeout` seconds, or forever if `timeout` is None. Used
+    to wait for non-blocking connect calls to finish.
+    """
+    try:
+        if _HAS_POLL:
+            poller = poll()
+            by_fd = {}
+            for sock in socks:
+                fd = sock.fileno()
+                poller.register(
+                    fd, select.POLLOUT | select.POLLERR | select.POLLHUP)
+                by_fd[fd] = sock
+            if timeout is not None:
+                timeout = max(int(timeout * 1000), 0)
+            return [by_fd[fd] for fd, _ in poller.poll(timeout)]
+        _, writable, errored = select.select([], socks, socks, timeout)
+        return list(set(writable) | set(errored))
+    except (_SELECT_ERROR, IOError) as exc:
+        if _errno_from_exception(exc) in (errno.EINTR, errno.EAGAIN):
+            # The caller checks its timeouts and waits again.
+            return []
+        raise
+
+
 def _errno_from_exception(exc):
     if hasattr(exc, 'errno'):
         return exc.errno
@@ -252,46 +388,50 @@ def _errno_from_exception(exc):
 
 
 class SocketChecker(object):
+    """Check whether the server closed idle sockets.
 
-    def __init__(self):
-        if _HAS_POLL:
-            self._lock = threading.Lock()
-            self._poller = poll()
-        else:
-            self._lock = None
-            self._poller = None
+    Each call uses its own poll object, so threads checking sockets never
+    contend for a lock.
+    """
 
     def socket_closed(self, sock):
         """Return True if we know socket has been closed, False otherwise.
         """
+        return len(self.select_closed([sock])) > 0
+
+    def select_closed(self, socks):
+        """Return the sockets in `socks` that we know have been closed.
+
+        An idle socket has no reply to read, so one that is readable or in
+        error has been closed, or is unusable. All the sockets are checked
+        with one system call.
+        """
         while True:
             try:
-                if self._poller:
-                    with self._lock:
-                        self._poller.register(sock, _EVENT_MASK)
-                        try:
-                            rd = self._poller.poll(0)
-                        finally:
-                            self._poller.unregister(sock)
-                else:
-                    rd, _, _ = select.select([sock], [], [], 0)
-            except (RuntimeError, KeyError):
-                # RuntimeError is raised during a concurrent poll. KeyError
-                # is raised by unregister if the socket is not in the poller.
-                # These errors should not be possible since we protect the
-                # poller with a mutex.
-                raise
-            except ValueError:
-                # ValueError is raised by register/unregister/select if the
-                # socket file descriptor is negative or outside the range for
-                # select (> 1023).
-                return True
+                return self._select_closed(socks)
             except (_SELECT_ERROR, IOError) as exc:
                 if _errno_from_exception(exc) in (errno.EINTR, errno.EAGAIN):
                     continue
-                return True
             except Exception:
-                # Any other exceptions should be attributed to a closed
-                # or invalid socket.
-                return True
-            return len(rd) > 0
+                # ValueError is raised by register/select if the socket file
+                # descriptor is negative or outside the range for select
+                # (> 1023).
+                pass
+            break
+        # Any other exceptions should be attributed to a closed or invalid
+        # socket. Find out which.
+        if len(socks) == 1:
+            return list(socks)
+        return [sock for sock in socks if self.socket_closed(sock)]
+
+    def _select_closed(self, socks):
+        if _HAS_POLL:
+            poller = poll()
+            by_fd = {}
+            for sock in socks:
+                fd = sock.fileno()
+                poller.register(fd, _EVENT_MASK)
+                by_fd[fd] = sock
+            return [by_fd[fd] for fd, _ in poller.poll(0)]
+        rd, _, _ = select.select(socks, [], [], 0)
+        return rd
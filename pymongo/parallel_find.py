@@ -0,0 +1,291 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you
+# may not use this file except in compliance with the License.  You
+# may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.  See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Scan a collection with concurrent finds over ranges of an index.
+
+:meth:`~pymongo.collection.Collection.parallel_find` replaces
+:meth:`~pymongo.collection.Collection.parallel_scan`, whose
+parallelCollectionScan command is not supported by mongos and is removed in
+MongoDB 4.2. The range of an indexed key, ``_id`` by default, is split into
+partitions at boundaries sampled with ``$sample`` (MongoDB 3.2+), and each
+partition is read by its own find on a worker thread::
+
+  for doc in db.events.parallel_find({'type': 'click'}, partitions=8):
+      process(doc)
+
+Documents are returned in the order their batches arrive, not in index
+order. As long as the collection is not modified during the scan, each
+document that matches the filter is returned exactly once.
+
+.. versionadded:: 3.8
+"""
+
+import threading
+
+from collections import deque
+
+from pymongo import common
+from pymongo.errors import InvalidOperation
+from pymongo.helpers import _index_list
+
+# Documents sampled per partition to choose the boundaries.
+_SAMPLES_PER_PARTITION = 20
+
+# Batches buffered per worker thread before the workers wait.
+_BATCHES_PER_WORKER = 2
+
+# find() options that would apply to each partition, not the whole scan.
+_PARTITION_OPTIONS = ("limit", "skip", "sort", "hint", "min", "max")
+
+
+def _sample_bounds(collection, key, partitions):
+    """Choose up to `partitions` - 1 boundaries between partitions of
+    `key`'s range from a random sample of `collection`.
+    """
+    if partitions == 1:
+        return []
+    pipeline = [
+        {'$sample': {'size': partitions * _SAMPLES_PER_PARTITION}},
+        {'$project': {'_id': 0, 'bound': '$' + key}},
+        {'$sort': {'bound': 1}}]
+    values = [doc.get('bound') for doc in collection.aggregate(pipeline)]
+    bounds = []
+    for i in range(1, partitions):
+        if not values:
+            break
+        value = values[i * len(values) // partitions]
+        if not bounds or bounds[-1] != value:
+            bounds.append(value)
+    return bounds
+
+
+class _Merger(object):
+    """Reads cursors on worker threads and collects their batches.
+
+    Keeps at most `max_batches` batches that have not been taken yet. The
+    worker threads only reference the merger, so an abandoned
+    :class:`ParallelFind` is still garbage collected and closes it.
+    """
+
+    def __init__(self, cursors, max_workers, max_batches):
+        self.__cursors = deque(cursors)
+        self.__max_batches = max_batches
+        self.__cond = threading.Condition()
+        self.__batches = deque()
+        self.__error = None
+        self.__closed = False
+        self.__running = min(max_workers, len(self.__cursors))
+        self.__threads = []
+        for _ in range(self.__running):
+            thread = threading.Thread(target=self.__run,
+                                      name="pymongo parallel find")
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+    def __next_cursor(self):
+        with self.__cond:
+            if self.__closed or not self.__cursors:
+                self.__running -= 1
+                self.__cond.notify_all()
+                return None
+            return self.__cursors.popleft()
+
+    def __put(self, batch):
+        """Add a batch, return False if the merger is closed."""
+        with self.__cond:
+            while (len(self.__batches) >= self.__max_batches and
+                   not self.__closed):
+                self.__cond.wait()
+            if self.__closed:
+                return False
+            self.__batches.append(batch)
+            self.__cond.notify_all()
+            return True
+
+    def __run(self):
+        while True:
+            cursor = self.__next_cursor()
+            if cursor is None:
+                return
+            try:
+                for batch in cursor.iter_batches():
+                    if batch and not self.__put(batch):
+                        break
+            except Exception as exc:
+                with self.__cond:
+                    # Stop the other partitions, the scan has failed.
+                    if self.__error is None:
+                        self.__error = exc
+                    self.__closed = True
+                    self.__cond.notify_all()
+            finally:
+                cursor.close()
+
+    def next_batch(self):
+        """Wait for the next batch from any partition and return it.
+
+        Returns None when every partition is exhausted, raises the error of
+        a failed find or getMore after returning the batches fetched before
+        it.
+        """
+        with self.__cond:
+            while not self.__batches and self.__running:
+                self.__cond.wait()
+            if self.__batches:
+                batch = self.__batches.popleft()
+                self.__cond.notify_all()
+                return batch
+            error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+        return None
+
+    def close(self, wait=True):
+        """Stop the workers, with `wait` wait for them to close their
+        cursors.
+        """
+        with self.__cond:
+            self.__closed = True
+            self.__batches.clear()
+            self.__cond.notify_all()
+        if wait:
+            for thread in self.__threads:
+                thread.join()
+
+
+class ParallelFind(object):
+    """An iterator over the results of concurrent finds, one for each
+    partition of an indexed key's range.
+
+    Don't create instances directly, use
+    :meth:`~pymongo.collection.Collection.parallel_find`. The finds start
+    on the first call to :meth:`next` or :meth:`iter_batches`, and a
+    ParallelFind is meant to be iterated by one thread.
+    """
+
+    def __init__(self, collection, filter, partitions, key, bounds,
+                 max_workers, kwargs):
+        self.__merger = None
+        common.validate_positive_integer('partitions', partitions)
+        common.validate_string('key', key)
+        max_workers = common.validate_positive_integer_or_none(
+            'max_workers', max_workers)
+        if kwargs.get('session') is not None:
+            raise InvalidOperation(
+                "parallel_find cannot use a session, a session cannot be "
+                "used by concurrent operations")
+        for option in _PARTITION_OPTIONS:
+            if option in kwargs:
+                raise InvalidOperation(
+                    "parallel_find does not support %s, it would apply to "
+                    "each partition rather than the whole scan" % (option,))
+        if bounds is None:
+            bounds = _sample_bounds(collection, key, partitions)
+        elif not isinstance(bounds, (list, tuple)):
+            raise TypeError("bounds must be an instance of list or tuple")
+        self.__collection = collection
+        self.__key = key
+        self.__bounds = list(bounds)
+        self.__cursors = []
+        lower = [None] + self.__bounds
+        upper = self.__bounds + [None]
+        for i in range(len(lower)):
+            cursor = collection.find(filter, **kwargs)
+            cursor.hint(_index_list(key))
+            if i > 0:
+                cursor.min([(key, lower[i])])
+            if i < len(upper) - 1:
+                cursor.max([(key, upper[i])])
+            self.__cursors.append(cursor)
+        self.__max_workers = max_workers or len(self.__cursors)
+        self.__data = deque()
+
+    @property
+    def collection(self):
+        """The :class:`~pymongo.collection.Collection` being scanned."""
+        return self.__collection
+
+    @property
+    def key(self):
+        """The indexed key whose range is partitioned."""
+        return self.__key
+
+    @property
+    def bounds(self):
+        """The values of :attr:`key` that separate the partitions.
+
+        The first partition holds the documents whose key is less than
+        ``bounds[0]``, partition ``i`` those from ``bounds[i - 1]`` up to
+        but excluding ``bounds[i]``, the last those from ``bounds[-1]`` up.
+        """
+        return list(self.__bounds)
+
+    @property
+    def cursors(self):
+        """The :class:`~pymongo.cursor.Cursor` for each partition."""
+        return list(self.__cursors)
+
+    def __next_batch(self):
+        if self.__merger is None:
+            self.__merger = _Merger(
+                self.__cursors, self.__max_workers,
+                self.__max_workers * _BATCHES_PER_WORKER)
+        return self.__merger.next_batch()
+
+    def next(self):
+        """Advance to the next document from any partition."""
+        while not self.__data:
+            batch = self.__next_batch()
+            if batch is None:
+                raise StopIteration
+            self.__data = deque(batch)
+        return self.__data.popleft()
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+    def iter_batches(self):
+        """Iterate over the results a batch at a time.
+
+        Yields each batch returned by a partition's find or getMore as a
+        list of documents. Documents already taken with :meth:`next` are
+        not returned again.
+        """
+        if self.__data:
+            batch, self.__data = list(self.__data), deque()
+            yield batch
+        while True:
+            batch = self.__next_batch()
+            if batch is None:
+                return
+            yield batch
+
+    def close(self):
+        """Stop the finds and close their cursors."""
+        if self.__merger is not None:
+            self.__merger.close()
+        self.__data = deque()
+
+    def __del__(self):
+        if self.__merger is not None:
+            self.__merger.close(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
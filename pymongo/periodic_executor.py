@@ -102,6 +102,10 @@ class PeriodicExecutor(object):
         """Execute the target function soon."""
         self._event = True
 
+    def update_interval(self, new_interval):
+        """Change the seconds between calls, from the next call on."""
+        self._interval = new_interval
+
     def __should_stop(self):
         with self._lock:
             if self._stopped:
@@ -113,7 +117,11 @@ class PeriodicExecutor(object):
         while not self.__should_stop():
             try:
                 if not self._target():
-                    self._stopped = True
+                    # Like __should_stop, so open() joins this thread and
+                    # starts a new one instead of assuming we will run again.
+                    with self._lock:
+                        self._stopped = True
+                        self._thread_will_exit = True
                     break
             except:
                 with self._lock:
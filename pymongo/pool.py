@@ -14,19 +14,26 @@
 
 import contextlib
 import copy
+import errno
 import os
 import platform
 import socket
 import sys
 import threading
 import collections
+import weakref
 
 try:
     import ssl
     from ssl import SSLError
     _HAVE_SNI = getattr(ssl, 'HAS_SNI', False)
+    # TLS session resumption is new in Python 3.6.
+    _HAVE_TLS_SESSIONS = hasattr(ssl, 'SSLSession')
+    _SSLSocket = ssl.SSLSocket
 except ImportError:
     _HAVE_SNI = False
+    _HAVE_TLS_SESSIONS = False
+    _SSLSocket = ()
     class SSLError(socket.error):
         pass
 
@@ -40,13 +47,24 @@ except ImportError:
 from bson import DEFAULT_CODEC_OPTIONS
 from bson.py3compat import imap, itervalues, _unicode, integer_types
 from bson.son import SON
-from pymongo import auth, helpers, thread_util, __version__
+from pymongo import (auth,
+                     common,
+                     helpers,
+                     periodic_executor,
+                     thread_util,
+                     __version__)
 from pymongo.client_session import _validate_session_write_concern
 from pymongo.common import (MAX_BSON_SIZE,
+                            MAX_CONNECTING,
+                            MAX_IDLE_TIME_SEC,
                             MAX_MESSAGE_SIZE,
+                            MAX_POOL_SIZE,
                             MAX_WIRE_VERSION,
                             MAX_WRITE_BATCH_SIZE,
-                            ORDERED_TYPES)
+                            MIN_POOL_SIZE,
+                            ORDERED_TYPES,
+                            RECEIVE_BUFFER_POOL_SIZE,
+                            WAIT_QUEUE_TIMEOUT)
 from pymongo.errors import (AutoReconnect,
                             ConnectionFailure,
                             ConfigurationError,
@@ -56,9 +74,13 @@ from pymongo.errors import (AutoReconnect,
                             NotMasterError,
                             OperationFailure)
 from pymongo.ismaster import IsMaster
+from pymongo.monitoring import (ConnectionCheckOutFailedReason,
+                                ConnectionClosedReason)
 from pymongo.monotonic import time as _time
 from pymongo.network import (command,
                              receive_message,
+                             select_writable,
+                             sendmsg_all,
                              SocketChecker)
 from pymongo.read_preferences import ReadPreference
 from pymongo.server_type import SERVER_TYPE
@@ -291,7 +313,8 @@ class PoolOptions(object):
                  '__wait_queue_timeout', '__wait_queue_multiple',
                  '__ssl_context', '__ssl_match_hostname', '__socket_keepalive',
                  '__event_listeners', '__appname', '__driver', '__metadata',
-                 '__compression_settings')
+                 '__compression_settings', '__receive_buffer_pool_size',
+                 '__max_connecting')
 
     def __init__(self, max_pool_size=100, min_pool_size=0,
                  max_idle_time_seconds=None, connect_timeout=None,
@@ -299,7 +322,9 @@ class PoolOptions(object):
                  wait_queue_multiple=None, ssl_context=None,
                  ssl_match_hostname=True, socket_keepalive=True,
                  event_listeners=None, appname=None, driver=None,
-                 compression_settings=None):
+                 compression_settings=None,
+                 receive_buffer_pool_size=RECEIVE_BUFFER_POOL_SIZE,
+                 max_connecting=MAX_CONNECTING):
 
         self.__max_pool_size = max_pool_size
         self.__min_pool_size = min_pool_size
@@ -315,6 +340,8 @@ class PoolOptions(object):
         self.__appname = appname
         self.__driver = driver
         self.__compression_settings = compression_settings
+        self.__receive_buffer_pool_size = receive_buffer_pool_size
+        self.__max_connecting = max_connecting
         self.__metadata = copy.deepcopy(_METADATA)
         if appname:
             self.__metadata['application'] = {'name': appname}
@@ -338,6 +365,25 @@ class PoolOptions(object):
                 self.__metadata['platform'] = "%s|%s" % (
                     _METADATA['platform'], driver.platform)
 
+    @property
+    def non_default_options(self):
+        """The non-default options this pool was created with.
+
+        Published with the :class:`~pymongo.monitoring.PoolCreatedEvent`.
+        """
+        opts = {}
+        if self.__max_pool_size != MAX_POOL_SIZE:
+            opts['maxPoolSize'] = self.__max_pool_size
+        if self.__min_pool_size != MIN_POOL_SIZE:
+            opts['minPoolSize'] = self.__min_pool_size
+        if self.__max_idle_time_seconds != MAX_IDLE_TIME_SEC:
+            opts['maxIdleTimeMS'] = self.__max_idle_time_seconds * 1000
+        if self.__wait_queue_timeout != WAIT_QUEUE_TIMEOUT:
+            opts['waitQueueTimeoutMS'] = self.__wait_queue_timeout * 1000
+        if self.__max_connecting != MAX_CONNECTING:
+            opts['maxConnecting'] = self.__max_connecting
+        return opts
+
     @property
     def max_pool_size(self):
         """The maximum allowable number of concurrent connections to each
@@ -360,6 +406,15 @@ class PoolOptions(object):
         """
         return self.__min_pool_size
 
+    @property
+    def max_connecting(self):
+        """The maximum number of connections that each pool can establish
+        concurrently. Threads that need a new connection while this many are
+        in progress wait for one of them to finish, or for another thread to
+        return a socket to the pool. Defaults to 2.
+        """
+        return self.__max_connecting
+
     @property
     def max_idle_time_seconds(self):
         """The maximum number of seconds that a connection can remain
@@ -435,6 +490,13 @@ class PoolOptions(object):
     def compression_settings(self):
         return self.__compression_settings
 
+    @property
+    def receive_buffer_pool_size(self):
+        """The maximum number of bytes of receive buffers each pool keeps for
+        reuse. 0 disables buffer reuse.
+        """
+        return self.__receive_buffer_pool_size
+
     @property
     def metadata(self):
         """A dict of metadata about the application, driver, os, and platform.
@@ -442,6 +504,172 @@ class PoolOptions(object):
         return self.__metadata.copy()
 
 
+class _ReceiveBufferPool(object):
+    """Size-classed receive buffers shared by the sockets in a Pool.
+
+    A reply of at least MIN_SIZE bytes is read into a borrowed bytearray
+    whose size is the next power of two, and the buffer is given back once
+    the reply is decoded. At most `max_size` bytes of idle buffers are kept,
+    so steady-state cursor iteration does no large allocations.
+
+    :Parameters:
+      - `max_size`: maximum number of bytes of idle buffers to keep.
+    """
+    # Smaller replies are cheap to allocate.
+    MIN_SIZE = 64 * 1024
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.retained = 0
+        self.__lock = threading.Lock()
+        # Map size class to a list of idle buffers.
+        self.__free = {}
+
+    @property
+    def hit_rate(self):
+        """The fraction of borrowed buffers that were reused."""
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / float(total)
+
+    def get(self, length):
+        """Borrow a buffer of at least `length` bytes.
+
+        Returns None if `length` is too small to be worth pooling or the
+        pool is disabled.
+        """
+        if length < self.MIN_SIZE or not self.max_size:
+            return None
+        size = 1 << (length - 1).bit_length()
+        with self.__lock:
+            free = self.__free.get(size)
+            if free:
+                self.hits += 1
+                self.retained -= size
+                return free.pop()
+            self.misses += 1
+        return bytearray(size)
+
+    def put(self, buf):
+        """Give back a buffer returned by :meth:`get`."""
+        size = len(buf)
+        with self.__lock:
+            if self.retained + size > self.max_size:
+                # Over the cap, let the buffer be garbage collected.
+                return
+            self.retained += size
+            self.__free.setdefault(size, []).append(buf)
+
+    def clear(self):
+        """Drop all idle buffers."""
+        with self.__lock:
+            self.__free = {}
+            self.retained = 0
+
+
+class _WaitQueueStats(object):
+    """Accumulates how long checkouts wait for a slot in a Pool."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, wait_time, queue_depth):
+        """Record a checkout that waited `wait_time` seconds behind
+        `queue_depth` other threads.
+        """
+        with self.__lock:
+            self.checkouts += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+            self.total_queue_depth += queue_depth
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def record_timeout(self):
+        with self.__lock:
+            self.timeouts += 1
+
+    def snapshot(self, queue_depth):
+        """Return the statistics as a dict."""
+        with self.__lock:
+            checkouts = self.checkouts
+            return {
+                'checkouts': checkouts,
+                'timeouts': self.timeouts,
+                'queue_depth': queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'average_queue_depth': (
+                    self.total_queue_depth / float(checkouts)
+                    if checkouts else 0.0),
+                'total_wait_time': self.total_wait_time,
+                'max_wait_time': self.max_wait_time,
+                'average_wait_time': (
+                    self.total_wait_time / checkouts if checkouts else 0.0),
+            }
+
+
+class _TlsSessionCache(object):
+    """Keeps a TLS session for a Pool's server, so new connections resume
+    it instead of doing a full handshake, and counts both kinds.
+
+    With TLS 1.3 the server sends session tickets after the handshake, so
+    the session is taken again from a socket checked in to the pool until
+    one with a ticket is cached.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.session = None
+        self.resumed = 0
+        self.full = 0
+        # Look for a better session at the next checkin?
+        self.refresh = True
+
+    def record(self, sock):
+        """Count the handshake of a new SSLSocket and maybe keep its
+        session.
+        """
+        with self.__lock:
+            if sock.session_reused:
+                self.resumed += 1
+            else:
+                self.full += 1
+                # The cached session expired or was rejected.
+                self.refresh = True
+        self.update(sock)
+
+    def update(self, sock):
+        """Keep the session of an SSLSocket if it's better than ours."""
+        if not self.refresh:
+            return
+        session = sock.session
+        if session is None:
+            return
+        with self.__lock:
+            if session.has_ticket:
+                self.session = session
+                self.refresh = False
+            elif self.session is None:
+                # TLS 1.2 without tickets, or a TLS 1.3 session whose
+                # ticket hasn't arrived yet.
+                self.session = session
+            if sock.session_reused:
+                self.refresh = False
+
+    def snapshot(self):
+        """Return the counters as a dict."""
+        with self.__lock:
+            return {'resumed': self.resumed, 'full': self.full}
+
+
 class SocketInfo(object):
     """Store a socket with some metadata.
 
@@ -450,9 +678,10 @@ class SocketInfo(object):
       - `pool`: a Pool instance
       - `address`: the server's (host, port)
     """
-    def __init__(self, sock, pool, address):
+    def __init__(self, sock, pool, address, id=None):
         self.sock = sock
         self.address = address
+        self.id = id
         self.authset = set()
         self.closed = False
         self.last_checkin_time = _time()
@@ -466,14 +695,50 @@ class SocketInfo(object):
         self.is_mongos = False
         self.op_msg_enabled = False
         self.listeners = pool.opts.event_listeners
+        self.enabled_for_cmap = pool.enabled_for_cmap
         self.compression_settings = pool.opts.compression_settings
         self.compression_context = None
+        self.receive_buffers = pool.receive_buffers
+        self.socket_timeout = pool.opts.socket_timeout
+        # The _Deadline of the operation using this socket, or None.
+        self.deadline = None
+        # Map MongoCredential to the _AuthContext of a speculative
+        # authentication in the ismaster handshake, and to the mechanisms
+        # the server supports for the user.
+        self.auth_ctx = {}
+        self.negotiated_mechanisms = {}
+        # Can send_message write a list of buffers without joining them?
+        # SSLSocket.sendmsg raises NotImplementedError.
+        self.vectored_send = (hasattr(sock, 'sendmsg') and
+                              not isinstance(sock, _SSLSocket))
 
         # The pool's pool_id changes with each reset() so we can close sockets
         # created before the last reset.
         self.pool_id = pool.pool_id
 
-    def ismaster(self, metadata, cluster_time):
+    def ismaster(self, metadata, cluster_time, all_credentials=None):
+        cmd = self._ismaster_command(metadata, cluster_time)
+        creds = auth_ctx = None
+        if (not self.performed_handshake and all_credentials and
+                len(all_credentials) == 1):
+            # Start authenticating in the handshake, saving a round trip.
+            creds = next(itervalues(all_credentials))
+            if creds.mechanism == 'DEFAULT' and creds.username:
+                cmd['saslSupportedMechs'] = creds.source + '.' + creds.username
+            auth_ctx = auth._AuthContext.from_credentials(creds)
+            if auth_ctx is not None:
+                cmd['speculativeAuthenticate'] = auth_ctx.speculate_command()
+        ismaster = IsMaster(self.command('admin', cmd, publish_events=False))
+        if 'saslSupportedMechs' in cmd:
+            self.negotiated_mechanisms[creds] = ismaster.sasl_supported_mechs
+        if auth_ctx is not None:
+            auth_ctx.parse_response(ismaster)
+            if auth_ctx.speculate_succeeded():
+                self.auth_ctx[creds] = auth_ctx
+        return self._handle_ismaster(ismaster)
+
+    def _ismaster_command(self, metadata, cluster_time):
+        """Return the ismaster command to send on this connection."""
         cmd = SON([('ismaster', 1)])
         if not self.performed_handshake:
             cmd['client'] = metadata
@@ -482,8 +747,10 @@ class SocketInfo(object):
 
         if self.max_wire_version >= 6 and cluster_time is not None:
             cmd['$clusterTime'] = cluster_time
+        return cmd
 
-        ismaster = IsMaster(self.command('admin', cmd, publish_events=False))
+    def _handle_ismaster(self, ismaster):
+        """Update this connection's metadata from an IsMaster response."""
         self.is_writable = ismaster.is_writable
         self.max_wire_version = ismaster.max_wire_version
         self.max_bson_size = ismaster.max_bson_size
@@ -566,6 +833,9 @@ class SocketInfo(object):
         unacknowledged = write_concern and not write_concern.acknowledged
         if self.op_msg_enabled:
             self._raise_if_not_writable(unacknowledged)
+        if self.deadline is not None:
+            self._check_deadline()
+            self.apply_timeout(spec)
         try:
             return command(self.sock, dbname, spec, slave_ok,
                            self.is_mongos, read_preference, codec_options,
@@ -576,7 +846,8 @@ class SocketInfo(object):
                            collation=collation,
                            compression_ctx=self.compression_context,
                            use_op_msg=self.op_msg_enabled,
-                           unacknowledged=unacknowledged)
+                           unacknowledged=unacknowledged,
+                           buffer_pool=self.receive_buffers)
         except OperationFailure:
             raise
         # Catch socket.error, KeyboardInterrupt, etc. and close ourselves.
@@ -586,6 +857,9 @@ class SocketInfo(object):
     def send_message(self, message, max_doc_size):
         """Send a raw BSON message or raise ConnectionFailure.
 
+        `message` is bytes or, if :attr:`vectored_send` is True, may be a
+        list of buffers to send as one message.
+
         If a network exception is raised, the socket is closed.
         """
         if (self.max_bson_size is not None
@@ -595,8 +869,13 @@ class SocketInfo(object):
                 "supports BSON document sizes up to %d bytes." %
                 (max_doc_size, self.max_bson_size))
 
+        if self.deadline is not None:
+            self._check_deadline()
         try:
-            self.sock.sendall(message)
+            if isinstance(message, list):
+                sendmsg_all(self.sock, message)
+            else:
+                self.sock.sendall(message)
         except BaseException as error:
             self._raise_connection_failure(error)
 
@@ -605,12 +884,48 @@ class SocketInfo(object):
 
         If any exception is raised, the socket is closed.
         """
+        if self.deadline is not None:
+            self._check_deadline()
         try:
             return receive_message(self.sock, request_id,
-                                   self.max_message_size)
+                                   self.max_message_size,
+                                   self.receive_buffers,
+                                   self.compression_context)
         except BaseException as error:
             self._raise_connection_failure(error)
 
+    def set_deadline(self, deadline):
+        """Bound the operation using this socket by a _Deadline, or stop
+        bounding it if `deadline` is None.
+        """
+        if deadline is None and self.deadline is not None and not self.closed:
+            # Restore socketTimeoutMS.
+            self.sock.settimeout(self.socket_timeout)
+        self.deadline = deadline
+
+    def apply_timeout(self, cmd):
+        """Set maxTimeMS on a command to the time left before the deadline.
+
+        A smaller maxTimeMS that is already set is kept.
+        """
+        if self.deadline is None or next(iter(cmd)) == 'getMore':
+            # getMore's maxTimeMS is the await time of a tailable cursor.
+            return
+        max_time_ms = self.deadline.max_time_ms()
+        if cmd.get('maxTimeMS') is not None:
+            max_time_ms = min(cmd['maxTimeMS'], max_time_ms)
+        cmd['maxTimeMS'] = max_time_ms
+
+    def _check_deadline(self):
+        """Raise ExecutionTimeout if the deadline passed, otherwise limit the
+        next socket read or write to the time remaining.
+        """
+        self.deadline.check()
+        if not self.closed:
+            # A timeout of 0 would make the socket non-blocking.
+            self.sock.settimeout(
+                max(self.deadline.cap(self.socket_timeout), 0.001))
+
     def _raise_if_not_writable(self, unacknowledged):
         """Raise NotMasterError on unacknowledged write if this socket is not
         writable.
@@ -704,7 +1019,16 @@ class SocketInfo(object):
                     'Cannot use session after authenticating with different'
                     ' credentials')
 
-    def close(self):
+    def close(self, reason=None):
+        """Close this connection.
+
+        If `reason` is a :class:`~pymongo.monitoring.ConnectionClosedReason`,
+        publish a ConnectionClosedEvent the first time the connection is
+        closed.
+        """
+        if reason and not self.closed and self.enabled_for_cmap:
+            self.listeners.publish_connection_closed(
+                self.address, self.id, reason)
         self.closed = True
         # Avoid exceptions on interpreter shutdown.
         try:
@@ -738,7 +1062,7 @@ class SocketInfo(object):
         # ...) is called in Python code, which experiences the signal as a
         # KeyboardInterrupt from the start, rather than as an initial
         # socket.error, so we catch that, close the socket, and reraise it.
-        self.close()
+        self.close(ConnectionClosedReason.ERROR)
         if isinstance(error, socket.error):
             _raise_connection_failure(self.address, error)
         else:
@@ -792,59 +1116,192 @@ def _create_connection(address, options):
     if socket.has_ipv6 and host != 'localhost':
         family = socket.AF_UNSPEC
 
-    err = None
-    for res in socket.getaddrinfo(host, port, family, socket.SOCK_STREAM):
-        af, socktype, proto, dummy, sa = res
-        # SOCK_CLOEXEC was new in CPython 3.2, and only available on a limited
-        # number of platforms (newer Linux and *BSD). Starting with CPython 3.4
-        # all file descriptors are created non-inheritable. See PEP 446.
-        try:
-            sock = socket.socket(
-                af, socktype | getattr(socket, 'SOCK_CLOEXEC', 0), proto)
-        except socket.error:
-            # Can SOCK_CLOEXEC be defined even if the kernel doesn't support
-            # it?
-            sock = socket.socket(af, socktype, proto)
-        # Fallback when SOCK_CLOEXEC isn't available.
-        _set_non_inheritable_non_atomic(sock.fileno())
-        try:
-            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-            sock.settimeout(options.connect_timeout)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE,
-                            options.socket_keepalive)
-            if options.socket_keepalive:
-                _set_keepalive_times(sock)
-            sock.connect(sa)
-            return sock
-        except socket.error as e:
-            err = e
-            sock.close()
-
-    if err is not None:
-        raise err
-    else:
+    infos = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+    if not infos:
         # This likely means we tried to connect to an IPv6 only
         # host with an OS/kernel or Python interpreter that doesn't
         # support IPv6. The test case is Jython2.5.1 which doesn't
         # support IPv6 at all.
         raise socket.error('getaddrinfo failed')
 
+    if len(infos) == 1:
+        af, socktype, proto, dummy, sa = infos[0]
+        sock = _new_socket(af, socktype, proto, options)
+        try:
+            sock.settimeout(options.connect_timeout)
+            sock.connect(sa)
+        except socket.error:
+            sock.close()
+            raise
+        return sock
+
+    sock, sa = _connect_staggered(_order_addresses(address, infos), options)
+    _preferred_addresses[address] = (sock.family, sa[0])
+    return sock
+
+
+# RFC 8305's "Connection Attempt Delay": how long to wait for a connection
+# attempt before starting one to the next address.
+_CONNECTION_ATTEMPT_DELAY = 0.25
+
+# Map (host, port) to the (family, IP address) that last connected, so the
+# next connection tries it first.
+_preferred_addresses = {}
+
+
+def _new_socket(af, socktype, proto, options):
+    """Create a socket with the options from PoolOptions."""
+    # SOCK_CLOEXEC was new in CPython 3.2, and only available on a limited
+    # number of platforms (newer Linux and *BSD). Starting with CPython 3.4
+    # all file descriptors are created non-inheritable. See PEP 446.
+    try:
+        sock = socket.socket(
+            af, socktype | getattr(socket, 'SOCK_CLOEXEC', 0), proto)
+    except socket.error:
+        # Can SOCK_CLOEXEC be defined even if the kernel doesn't support
+        # it?
+        sock = socket.socket(af, socktype, proto)
+    # Fallback when SOCK_CLOEXEC isn't available.
+    _set_non_inheritable_non_atomic(sock.fileno())
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE,
+                        options.socket_keepalive)
+        if options.socket_keepalive:
+            _set_keepalive_times(sock)
+    except socket.error:
+        sock.close()
+        raise
+    return sock
+
+
+def _order_addresses(address, infos):
+    """Order getaddrinfo results for connecting to `address`.
+
+    The address that last connected comes first, then others of its family.
+    Address families are interleaved after that, as RFC 8305 recommends, so
+    an unreachable IPv6 or IPv4 network delays a connection by at most one
+    connection attempt delay.
+    """
+    preferred = _preferred_addresses.get(address)
+    if preferred is not None:
+        family, ip = preferred
+        infos = sorted(infos, key=lambda info: (info[4][0] != ip,
+                                                info[0] != family))
+    families = []
+    by_family = {}
+    for info in infos:
+        if info[0] not in by_family:
+            families.append(info[0])
+            by_family[info[0]] = []
+        by_family[info[0]].append(info)
+    ordered = []
+    while len(ordered) < len(infos):
+        for family in families:
+            if by_family[family]:
+                ordered.append(by_family[family].pop(0))
+    return ordered
+
+
+def _connect_staggered(infos, options):
+    """Connect to the first of `infos` that accepts, and return the socket
+    and its address.
+
+    Starts a non-blocking connection attempt to each address in turn, the
+    next one when the previous attempts haven't finished after
+    _CONNECTION_ATTEMPT_DELAY or have all failed. Each attempt times out
+    after connectTimeoutMS. The first successful connection wins, the other
+    attempts are cancelled. Can raise socket.error.
+    """
+    connect_timeout = options.connect_timeout
+    infos = list(infos)
+    # Maps each socket being connected to (address, start time).
+    pending = {}
+    err = None
+    next_attempt = _time()
+    try:
+        while infos or pending:
+            now = _time()
+            if infos and (not pending or now >= next_attempt):
+                af, socktype, proto, dummy, sa = infos.pop(0)
+                try:
+                    sock = _new_socket(af, socktype, proto, options)
+                except socket.error as exc:
+                    err = exc
+                    continue
+                sock.setblocking(False)
+                code = sock.connect_ex(sa)
+                if code == 0:
+                    break
+                if code not in (errno.EINPROGRESS, errno.EWOULDBLOCK,
+                                errno.EAGAIN, errno.EINTR):
+                    # For example ENETUNREACH, try the next address now.
+                    err = socket.error(code, os.strerror(code))
+                    sock.close()
+                    continue
+                pending[sock] = (sa, now)
+                next_attempt = now + _CONNECTION_ATTEMPT_DELAY
+                continue
+
+            # Wait for an attempt to finish, time out, or for the next one.
+            wakeups = []
+            if infos:
+                wakeups.append(next_attempt)
+            if connect_timeout is not None:
+                wakeups.extend(started + connect_timeout
+                               for _, started in pending.values())
+            timeout = max(min(wakeups) - now, 0) if wakeups else None
+            for ready in select_writable(list(pending), timeout):
+                code = ready.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code == 0:
+                    sock, sa = ready, pending.pop(ready)[0]
+                    break
+                err = socket.error(code, os.strerror(code))
+                pending.pop(ready)
+                ready.close()
+                # An attempt failed, start the next one now.
+                next_attempt = now
+            else:
+                if connect_timeout is not None:
+                    now = _time()
+                    for waiting, (dummy, started) in list(pending.items()):
+                        if now - started >= connect_timeout:
+                            err = socket.timeout('timed out')
+                            pending.pop(waiting)
+                            waiting.close()
+                            next_attempt = now
+                continue
+            break
+        else:
+            raise err
+    finally:
+        for waiting in pending:
+            waiting.close()
+
+    sock.settimeout(connect_timeout)
+    return sock, sa
+
 
 _PY37PLUS = sys.version_info[:2] >= (3, 7)
 
 
-def _configured_socket(address, options):
+def _configured_socket(address, options, tls_sessions=None):
     """Given (host, port) and PoolOptions, return a configured socket.
 
     Can raise socket.error, ConnectionFailure, or CertificateError.
 
-    Sets socket's SSL and timeout options.
+    Sets socket's SSL and timeout options. Resumes the TLS session cached in
+    `tls_sessions`, a _TlsSessionCache, if possible.
     """
     sock = _create_connection(address, options)
     ssl_context = options.ssl_context
 
     if ssl_context is not None:
         host = address[0]
+        kwargs = {}
+        if (tls_sessions is not None and _HAVE_TLS_SESSIONS and
+                tls_sessions.session is not None):
+            kwargs['session'] = tls_sessions.session
         try:
             # According to RFC6066, section 3, IPv4 and IPv6 literals are
             # not permitted for SNI hostname.
@@ -854,9 +1311,10 @@ def _configured_socket(address, options):
             # We have to pass hostname / ip address to wrap_socket
             # to use SSLContext.check_hostname.
             if _HAVE_SNI and (not is_ip_address(host) or _PY37PLUS):
-                sock = ssl_context.wrap_socket(sock, server_hostname=host)
+                sock = ssl_context.wrap_socket(
+                    sock, server_hostname=host, **kwargs)
             else:
-                sock = ssl_context.wrap_socket(sock)
+                sock = ssl_context.wrap_socket(sock, **kwargs)
         except _SSLCertificateError:
             sock.close()
             # Raise CertificateError directly like we do after match_hostname
@@ -876,6 +1334,8 @@ def _configured_socket(address, options):
             except CertificateError:
                 sock.close()
                 raise
+        if tls_sessions is not None and _HAVE_TLS_SESSIONS:
+            tls_sessions.record(sock)
 
     sock.settimeout(options.socket_timeout)
     return sock
@@ -908,6 +1368,12 @@ class Pool:
         self.address = address
         self.opts = options
         self.handshake = handshake
+        self.next_connection_id = 1
+        # Don't publish events from the Monitor's connection pool.
+        self.enabled_for_cmap = (
+            self.handshake and
+            self.opts.event_listeners is not None and
+            self.opts.event_listeners.enabled_for_cmap)
 
         if (self.opts.wait_queue_multiple is None or
                 self.opts.max_pool_size is None):
@@ -918,66 +1384,218 @@ class Pool:
 
         self._socket_semaphore = thread_util.create_semaphore(
             self.opts.max_pool_size, max_waiters)
+        # Notified when a socket is returned to the pool or a connection
+        # attempt finishes.
+        self._socket_returned = threading.Condition(self.lock)
+        # The number of connections being established, at most
+        # opts.max_connecting.
+        self._pending = 0
+        # Keeps minPoolSize sockets in the pool, started on demand.
+        self._filler = None
         self.socket_checker = SocketChecker()
+        # Receive buffers, shared by all sockets to this server.
+        self.receive_buffers = _ReceiveBufferPool(
+            self.opts.receive_buffer_pool_size)
+        self._wait_queue_stats = _WaitQueueStats()
+        self._tls_sessions = None
+        if self.opts.ssl_context is not None and _HAVE_TLS_SESSIONS:
+            self._tls_sessions = _TlsSessionCache()
+        if self.enabled_for_cmap:
+            self.opts.event_listeners.publish_pool_created(
+                self.address, self.opts.non_default_options)
+
+    def wait_queue_stats(self):
+        """Statistics about threads waiting to check out a socket.
+
+        Threads wait in a FIFO queue when all `maxPoolSize` sockets are in
+        use. Returns a dict with these keys:
+
+          - `checkouts`: the number of sockets checked out.
+          - `timeouts`: the number of checkouts that timed out after
+            `waitQueueTimeoutMS`.
+          - `queue_depth`: the number of threads waiting now.
+          - `max_queue_depth`, `average_queue_depth`: the number of threads
+            already waiting when a checkout began.
+          - `total_wait_time`, `max_wait_time`, `average_wait_time`: seconds
+            spent waiting in the queue per checkout.
+        """
+        return self._wait_queue_stats.snapshot(self._socket_semaphore.waiters)
+
+    def tls_handshake_stats(self):
+        """The number of TLS connections that resumed a cached session
+        (`resumed`) and that did a full handshake (`full`).
+        """
+        if self._tls_sessions is None:
+            return {'resumed': 0, 'full': 0}
+        return self._tls_sessions.snapshot()
 
     def reset(self):
         with self.lock:
+            if self.pid != os.getpid():
+                # After a fork, connections in progress belong to the parent.
+                self._pending = 0
             self.pool_id += 1
             self.pid = os.getpid()
             sockets, self.sockets = self.sockets, collections.deque()
             self.active_sockets = 0
 
+        if self.enabled_for_cmap:
+            self.opts.event_listeners.publish_pool_cleared(self.address)
         for sock_info in sockets:
-            sock_info.close()
+            sock_info.close(ConnectionClosedReason.STALE)
 
     def remove_stale_sockets(self):
-        """Removes stale sockets then adds new ones if pool is too small."""
+        """Removes stale sockets then adds new ones in the background if pool
+        is too small.
+        """
         if self.opts.max_idle_time_seconds is not None:
             with self.lock:
                 while (self.sockets and
                        self.sockets[-1].idle_time_seconds() > self.opts.max_idle_time_seconds):
                     sock_info = self.sockets.pop()
-                    sock_info.close()
-        while True:
-            with self.lock:
-                if (len(self.sockets) + self.active_sockets >=
-                        self.opts.min_pool_size):
-                    # There are enough sockets in the pool.
-                    break
+                    sock_info.close(ConnectionClosedReason.IDLE)
+        self._remove_closed_sockets()
+        with self.lock:
+            if (len(self.sockets) + self.active_sockets >=
+                    self.opts.min_pool_size):
+                # There are enough sockets in the pool.
+                return
+        self._start_filler()
 
+    def _remove_closed_sockets(self):
+        """Discard idle sockets that the server closed.
+
+        Checks all idle sockets with one system call, so checkouts seldom
+        find a closed socket.
+        """
+        if self._check_interval_seconds is None:
+            return
+        with self.lock:
+            idle = [(sock_info, sock_info.last_checkin_time)
+                    for sock_info in self.sockets]
+        if not idle:
+            return
+        closed = set(self.socket_checker.select_closed(
+            [sock_info.sock for sock_info, _ in idle]))
+        if not closed:
+            return
+        discarded = []
+        with self.lock:
+            for sock_info, checkin_time in idle:
+                # Skip sockets checked out since we looked, even if they
+                # were returned again: the result may be out of date.
+                if (sock_info.sock in closed and
+                        sock_info.last_checkin_time == checkin_time and
+                        sock_info in self.sockets):
+                    self.sockets.remove(sock_info)
+                    discarded.append(sock_info)
+        for sock_info in discarded:
+            sock_info.close(ConnectionClosedReason.ERROR)
+
+    def _start_filler(self):
+        """Start the background thread that connects minPoolSize sockets.
+
+        Not safe to call from multiple threads at once.
+        """
+        if self._filler is None:
+            # The executor weakly references the pool, like the Monitor.
+            def target():
+                pool = self_ref()
+                if pool is not None:
+                    pool._fill()
+                # Run once, remove_stale_sockets starts us again if needed.
+                return False
+
+            executor = periodic_executor.PeriodicExecutor(
+                interval=common.MIN_HEARTBEAT_INTERVAL,
+                min_interval=common.MIN_HEARTBEAT_INTERVAL,
+                target=target,
+                name="pymongo_pool_filler_thread")
+            self_ref = weakref.ref(self, executor.close)
+            self._filler = executor
+        self._filler.open()
+
+    def _fill(self):
+        """Connect sockets until the pool has minPoolSize sockets."""
+        while True:
             # We must acquire the semaphore to respect max_pool_size.
             if not self._socket_semaphore.acquire(False):
-                break
+                return
             try:
-                sock_info = self.connect()
+                with self.lock:
+                    if (len(self.sockets) + self.active_sockets >=
+                            self.opts.min_pool_size):
+                        # There are enough sockets in the pool.
+                        return
+                    if self._pending >= self.opts.max_connecting:
+                        # Let application threads connect first.
+                        return
+                    self._pending += 1
+                try:
+                    sock_info = self.connect()
+                except Exception:
+                    # The server is unavailable, try again on the next call
+                    # to remove_stale_sockets.
+                    return
+                finally:
+                    with self.lock:
+                        self._pending -= 1
+                        self._socket_returned.notify()
                 with self.lock:
                     self.sockets.appendleft(sock_info)
+                    # Hand the new socket to a thread waiting for one.
+                    self._socket_returned.notify()
             finally:
                 self._socket_semaphore.release()
 
-    def connect(self):
+    def connect(self, all_credentials=None):
         """Connect to Mongo and return a new SocketInfo.
 
         Can raise ConnectionFailure or CertificateError.
 
         Note that the pool does not keep a reference to the socket -- you
         must call return_socket() when you're done with it.
+
+        If `all_credentials` has one MongoCredential, the first step of
+        authenticating it is sent with the handshake. Call check_auth() to
+        finish.
         """
+        with self.lock:
+            conn_id = self.next_connection_id
+            self.next_connection_id += 1
+
+        listeners = self.opts.event_listeners
+        if self.enabled_for_cmap:
+            listeners.publish_connection_created(self.address, conn_id)
+
         sock = None
         try:
-            sock = _configured_socket(self.address, self.opts)
+            sock = _configured_socket(
+                self.address, self.opts, self._tls_sessions)
         except socket.error as error:
             if sock is not None:
                 sock.close()
+            if self.enabled_for_cmap:
+                listeners.publish_connection_closed(
+                    self.address, conn_id, ConnectionClosedReason.ERROR)
             _raise_connection_failure(self.address, error)
+        except BaseException:
+            # CertificateError, or ConnectionFailure if the TLS handshake
+            # failed.
+            if self.enabled_for_cmap:
+                listeners.publish_connection_closed(
+                    self.address, conn_id, ConnectionClosedReason.ERROR)
+            raise
 
-        sock_info = SocketInfo(sock, self, self.address)
+        sock_info = SocketInfo(sock, self, self.address, conn_id)
         if self.handshake:
-            sock_info.ismaster(self.opts.metadata, None)
+            sock_info.ismaster(self.opts.metadata, None, all_credentials)
+        if self.enabled_for_cmap:
+            listeners.publish_connection_ready(self.address, conn_id)
         return sock_info
 
     @contextlib.contextmanager
-    def get_socket(self, all_credentials, checkout=False):
+    def get_socket(self, all_credentials, checkout=False, deadline=None):
         """Get a socket from the pool. Use with a "with" statement.
 
         Returns a :class:`SocketInfo` object wrapping a connected
@@ -998,11 +1616,15 @@ class Pool:
         :Parameters:
           - `all_credentials`: dict, maps auth source to MongoCredential.
           - `checkout` (optional): keep socket checked out.
+          - `deadline` (optional): a _Deadline that bounds waiting for a
+            socket and, until it is returned, the socket's I/O.
         """
         # First get a socket, then attempt authentication. Simplifies
         # semaphore management in the face of network errors during auth.
-        sock_info = self._get_socket_no_auth()
+        sock_info = self._get_socket_no_auth(deadline, all_credentials)
         try:
+            # The deadline bounds authentication too.
+            sock_info.set_deadline(deadline)
             sock_info.check_auth(all_credentials)
             yield sock_info
         except:
@@ -1010,57 +1632,120 @@ class Pool:
             self.return_socket(sock_info)
             raise
         else:
-            if not checkout:
+            if checkout:
+                # Later replies of an exhaust cursor aren't bounded.
+                sock_info.set_deadline(None)
+            else:
                 self.return_socket(sock_info)
 
-    def _get_socket_no_auth(self):
-        """Get or create a SocketInfo. Can raise ConnectionFailure."""
+    def _get_socket_no_auth(self, deadline=None, all_credentials=None):
+        """Get or create a SocketInfo. Can raise ConnectionFailure.
+
+        A new SocketInfo starts authenticating with `all_credentials` in
+        its handshake, check_auth() finishes.
+        """
         # We use the pid here to avoid issues with fork / multiprocessing.
         # See test.test_client:TestClient.test_fork for an example of
         # what could go wrong otherwise
         if self.pid != os.getpid():
             self.reset()
 
-        # Get a free socket or create one.
-        if not self._socket_semaphore.acquire(
-                True, self.opts.wait_queue_timeout):
-            self._raise_wait_queue_timeout()
+        listeners = self.opts.event_listeners
+        if self.enabled_for_cmap:
+            listeners.publish_connection_check_out_started(self.address)
+
+        timeout = self.opts.wait_queue_timeout
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        if timeout is not None:
+            wait_deadline = _time() + timeout
+        else:
+            wait_deadline = None
+
+        # Get a free socket or create one. Waiters are served in FIFO order.
+        queue_depth = self._socket_semaphore.waiters
+        start = _time()
+        if not self._socket_semaphore.acquire(True, timeout):
+            self._raise_wait_queue_timeout(deadline)
+        self._wait_queue_stats.record(_time() - start, queue_depth)
         with self.lock:
             self.active_sockets += 1
 
         # We've now acquired the semaphore and must release it on error.
         try:
-            try:
-                # set.pop() isn't atomic in Jython less than 2.7, see
-                # http://bugs.jython.org/issue1854
-                with self.lock:
-                    # Can raise ConnectionFailure.
-                    sock_info = self.sockets.popleft()
-            except IndexError:
-                # Can raise ConnectionFailure or CertificateError.
-                sock_info = self.connect()
-            else:
-                # Can raise ConnectionFailure.
-                sock_info = self._check(sock_info)
+            sock_info = None
+            while sock_info is None:
+                sock_info = self._get_idle_socket(wait_deadline, deadline)
+                if sock_info is None:
+                    try:
+                        # Can raise ConnectionFailure or CertificateError.
+                        sock_info = self.connect(all_credentials)
+                    except BaseException:
+                        if self.enabled_for_cmap:
+                            listeners.publish_connection_check_out_failed(
+                                self.address,
+                                ConnectionCheckOutFailedReason.CONN_ERROR)
+                        raise
+                    finally:
+                        with self.lock:
+                            self._pending -= 1
+                            self._socket_returned.notify()
+                else:
+                    # Returns None if the socket is stale.
+                    sock_info = self._check(sock_info)
         except Exception:
             self._socket_semaphore.release()
             with self.lock:
                 self.active_sockets -= 1
             raise
 
+        if self.enabled_for_cmap:
+            listeners.publish_connection_checked_out(
+                self.address, sock_info.id)
         return sock_info
 
+    def _get_idle_socket(self, wait_deadline, deadline=None):
+        """Pop an idle socket, or return None if the caller should connect.
+
+        At most opts.max_connecting sockets are connected at once. While
+        that many connections are in progress, wait for one of them to
+        finish or for another thread to return a socket, whichever happens
+        first. Can raise ConnectionFailure if `wait_deadline` passes.
+        """
+        with self.lock:
+            while True:
+                if self.sockets:
+                    return self.sockets.popleft()
+                if self._pending < self.opts.max_connecting:
+                    self._pending += 1
+                    return None
+                if wait_deadline is None:
+                    self._socket_returned.wait()
+                else:
+                    timeout = wait_deadline - _time()
+                    if timeout <= 0:
+                        self._raise_wait_queue_timeout(deadline)
+                    self._socket_returned.wait(timeout)
+
     def return_socket(self, sock_info):
         """Return the socket to the pool, or if it's closed discard it."""
+        sock_info.set_deadline(None)
+        if self.enabled_for_cmap:
+            self.opts.event_listeners.publish_connection_checked_in(
+                self.address, sock_info.id)
         if self.pid != os.getpid():
             self.reset()
         else:
             if sock_info.pool_id != self.pool_id:
-                sock_info.close()
+                sock_info.close(ConnectionClosedReason.STALE)
             elif not sock_info.closed:
                 sock_info.update_last_checkin_time()
+                if self._tls_sessions is not None:
+                    self._tls_sessions.update(sock_info.sock)
                 with self.lock:
                     self.sockets.appendleft(sock_info)
+                    # Hand the socket to a thread waiting for one.
+                    self._socket_returned.notify()
 
         self._socket_semaphore.release()
         with self.lock:
@@ -1069,9 +1754,8 @@ class Pool:
     def _check(self, sock_info):
         """This side-effecty function checks if this socket has been idle for
         for longer than the max idle time, or if the socket has been closed by
-        some external network error, and if so, attempts to create a new
-        socket. If this connection attempt fails we raise the
-        ConnectionFailure.
+        some external network error, and if so, closes it and returns None.
+        The caller then gets another socket, subject to maxConnecting.
 
         Checking sockets lets us avoid seeing *some*
         :class:`~pymongo.errors.AutoReconnect` exceptions on server
@@ -1081,22 +1765,31 @@ class Pool:
         completely anyway.
         """
         idle_time_seconds = sock_info.idle_time_seconds()
-        # If socket is idle, open a new one.
+        # If socket is idle, close it.
         if (self.opts.max_idle_time_seconds is not None and
                 idle_time_seconds > self.opts.max_idle_time_seconds):
-            sock_info.close()
-            return self.connect()
+            sock_info.close(ConnectionClosedReason.IDLE)
+            return None
 
         if (self._check_interval_seconds is not None and (
                 0 == self._check_interval_seconds or
                 idle_time_seconds > self._check_interval_seconds)):
             if self.socket_checker.socket_closed(sock_info.sock):
-                sock_info.close()
-                return self.connect()
+                sock_info.close(ConnectionClosedReason.ERROR)
+                return None
 
         return sock_info
 
-    def _raise_wait_queue_timeout(self):
+    def _raise_wait_queue_timeout(self, deadline=None):
+        self._wait_queue_stats.record_timeout()
+        if self.enabled_for_cmap:
+            self.opts.event_listeners.publish_connection_check_out_failed(
+                self.address, ConnectionCheckOutFailedReason.TIMEOUT)
+        if deadline is not None and deadline.expired():
+            raise ConnectionFailure(
+                'Timed out waiting for socket from pool with max_size %r:'
+                ' operation exceeded time limit of %ss' % (
+                    self.opts.max_pool_size, deadline.timeout))
         raise ConnectionFailure(
             'Timed out waiting for socket from pool with max_size %r and'
             ' wait_queue_timeout %r' % (
@@ -73,16 +73,20 @@ class InsertManyResult(_WriteResult):
     """The return type for :meth:`~pymongo.collection.Collection.insert_many`.
     """
 
-    __slots__ = ("__inserted_ids", "__acknowledged")
+    __slots__ = ("__inserted_ids", "__inserted_count", "__acknowledged")
 
-    def __init__(self, inserted_ids, acknowledged):
+    def __init__(self, inserted_ids, acknowledged, inserted_count=None):
         self.__inserted_ids = inserted_ids
+        self.__inserted_count = inserted_count
         super(InsertManyResult, self).__init__(acknowledged)
 
     @property
     def inserted_ids(self):
         """A list of _ids of the inserted documents, in the order provided.
 
+        ``None`` if ``False`` was passed for the `collect_ids` parameter to
+        :meth:`~pymongo.collection.Collection.insert_many`.
+
         .. note:: If ``False`` is passed for the `ordered` parameter to
           :meth:`~pymongo.collection.Collection.insert_many` the server
           may have inserted the documents in a different order than what
@@ -90,6 +94,15 @@ class InsertManyResult(_WriteResult):
         """
         return self.__inserted_ids
 
+    @property
+    def inserted_count(self):
+        """The number of documents inserted.
+
+        .. versionadded:: 3.8
+        """
+        self._raise_if_unacknowledged("inserted_count")
+        return self.__inserted_count
+
 
 class UpdateResult(_WriteResult):
     """The return type for :meth:`~pymongo.collection.Collection.update_one`,
@@ -219,8 +232,12 @@ class BulkWriteResult(_WriteResult):
 
     @property
     def upserted_ids(self):
-        """A map of operation index to the _id of the upserted document."""
+        """A map of operation index to the _id of the upserted document.
+
+        ``None`` if ``False`` was passed for the `collect_ids` parameter to
+        :meth:`~pymongo.collection.Collection.bulk_write`.
+        """
         self._raise_if_unacknowledged("upserted_ids")
-        if self.__bulk_api_result:
+        if self.__bulk_api_result and "upserted" in self.__bulk_api_result:
             return dict((upsert["index"], upsert["_id"])
                         for upsert in self.bulk_api_result["upserted"])
@@ -69,7 +69,8 @@ class Server(object):
             set_slave_okay,
             all_credentials,
             listeners,
-            exhaust=False):
+            exhaust=False,
+            deadline=None):
         """Send a message to MongoDB and return a Response object.
 
         Can raise ConnectionFailure.
@@ -81,8 +82,10 @@ class Server(object):
           - `listeners`: Instance of _EventListeners or None.
           - `exhaust` (optional): If True, the socket used stays checked out.
             It is returned along with its Pool in the Response.
+          - `deadline` (optional): The operation's _Deadline or None.
         """
-        with self.get_socket(all_credentials, exhaust) as sock_info:
+        with self.get_socket(all_credentials, exhaust,
+                             deadline) as sock_info:
 
             duration = None
             publish = listeners.enabled_for_commands
@@ -133,8 +136,8 @@ class Server(object):
                     request_id=request_id,
                     from_command=use_find_cmd)
 
-    def get_socket(self, all_credentials, checkout=False):
-        return self.pool.get_socket(all_credentials, checkout)
+    def get_socket(self, all_credentials, checkout=False, deadline=None):
+        return self.pool.get_socket(all_credentials, checkout, deadline)
 
     @property
     def description(self):
@@ -36,10 +36,13 @@ class TopologySettings(object):
                  local_threshold_ms=LOCAL_THRESHOLD_MS,
                  server_selection_timeout=SERVER_SELECTION_TIMEOUT,
                  heartbeat_frequency=common.HEARTBEAT_FREQUENCY,
-                 server_selector=None):
+                 server_selector=None,
+                 fqdn=None):
         """Represent MongoClient's configuration.
 
         Take a list of (host, port) pairs and optional replica set name.
+        `fqdn` is the hostname of a mongodb+srv:// URI, to poll its SRV
+        records for changes to the seed list.
         """
         if heartbeat_frequency < common.MIN_HEARTBEAT_INTERVAL:
             raise ConfigurationError(
@@ -56,7 +59,11 @@ class TopologySettings(object):
         self._server_selection_timeout = server_selection_timeout
         self._server_selector = server_selector
         self._heartbeat_frequency = heartbeat_frequency
-        self._direct = (len(self._seeds) == 1 and not replica_set_name)
+        self._fqdn = fqdn
+        # The seeds of a mongodb+srv:// URI may change, even just one isn't
+        # a direct connection.
+        self._direct = (len(self._seeds) == 1 and not replica_set_name and
+                        fqdn is None)
         self._topology_id = ObjectId()
 
     @property
@@ -100,11 +107,16 @@ class TopologySettings(object):
     def heartbeat_frequency(self):
         return self._heartbeat_frequency
 
+    @property
+    def fqdn(self):
+        return self._fqdn
+
     @property
     def direct(self):
         """Connect directly to a single server, or use a set of servers?
 
-        True if there is one seed and no replica_set_name.
+        True if there is one seed, no replica_set_name, and the seed
+        doesn't come from SRV records.
         """
         return self._direct
 
@@ -14,6 +14,7 @@
 
 """Utilities for multi-threading support."""
 
+import collections
 import threading
 try:
     from time import monotonic as _time
@@ -24,47 +25,97 @@ from pymongo.monotonic import time as _time
 from pymongo.errors import ExceededMaxWaiters
 
 
-### Begin backport from CPython 3.2 for timeout support for Semaphore.acquire
-class Semaphore:
+class DummySemaphore(object):
+    def __init__(self, value=None):
+        pass
+
+    def acquire(self, blocking=True, timeout=None):
+        return True
+
+    def release(self):
+        pass
+
+    @property
+    def waiters(self):
+        return 0
+
 
-    # After Tim Peters' semaphore class, but not quite the same (no maximum)
+class _Waiter(object):
+    __slots__ = ('cond', 'granted')
 
-    def __init__(self, value=1):
-        if value < 0:
-            raise ValueError("semaphore initial value must be >= 0")
-        self._cond = threading.Condition(threading.Lock())
+    def __init__(self, lock):
+        self.cond = threading.Condition(lock)
+        self.granted = False
+
+
+class FairSemaphore(object):
+    """Bounded semaphore that grants permits in the order they're requested.
+
+    A released permit is handed directly to the thread that has waited
+    longest, so a thread can't take a permit ahead of earlier waiters. If
+    `max_waiters` is not None, acquire raises ExceededMaxWaiters instead of
+    waiting when that many threads are already waiting.
+    """
+    def __init__(self, value=1, max_waiters=None):
+        self._lock = threading.Lock()
         self._value = value
+        self._initial_value = value
+        self._max_waiters = max_waiters
+        self._waiters = collections.deque()
 
     def acquire(self, blocking=True, timeout=None):
         if not blocking and timeout is not None:
             raise ValueError("can't specify timeout for non-blocking acquire")
-        rc = False
-        endtime = None
-        self._cond.acquire()
-        while self._value == 0:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return True
             if not blocking:
-                break
+                return False
+            if (self._max_waiters is not None and
+                    len(self._waiters) >= self._max_waiters):
+                raise ExceededMaxWaiters(
+                    'exceeded max waiters: %d threads already waiting' % (
+                        len(self._waiters),))
+            waiter = _Waiter(self._lock)
+            self._waiters.append(waiter)
             if timeout is not None:
-                if endtime is None:
-                    endtime = _time() + timeout
+                endtime = _time() + timeout
+            try:
+                while not waiter.granted:
+                    if timeout is not None:
+                        timeout = endtime - _time()
+                        if timeout <= 0:
+                            self._waiters.remove(waiter)
+                            return False
+                    waiter.cond.wait(timeout)
+            except BaseException:
+                # Interrupted, e.g. by KeyboardInterrupt. Leave the line or,
+                # if the permit was already handed to us, pass it on.
+                if waiter.granted:
+                    self._release()
                 else:
-                    timeout = endtime - _time()
-                    if timeout <= 0:
-                        break
-            self._cond.wait(timeout)
-        else:
-            self._value = self._value - 1
-            rc = True
-        self._cond.release()
-        return rc
+                    self._waiters.remove(waiter)
+                raise
+            return True
 
     __enter__ = acquire
 
+    def _release(self):
+        # Must be called with the lock held.
+        if self._waiters:
+            # Hand the permit to the longest waiting thread.
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            waiter.cond.notify()
+        elif self._value >= self._initial_value:
+            raise ValueError("Semaphore released too many times")
+        else:
+            self._value += 1
+
     def release(self):
-        self._cond.acquire()
-        self._value = self._value + 1
-        self._cond.notify()
-        self._cond.release()
+        with self._lock:
+            self._release()
 
     def __exit__(self, t, v, tb):
         self.release()
@@ -73,59 +124,14 @@ class Semaphore:
     def counter(self):
         return self._value
 
-
-class BoundedSemaphore(Semaphore):
-    """Semaphore that checks that # releases is <= # acquires"""
-    def __init__(self, value=1):
-        Semaphore.__init__(self, value)
-        self._initial_value = value
-
-    def release(self):
-        if self._value >= self._initial_value:
-            raise ValueError("Semaphore released too many times")
-        return Semaphore.release(self)
-### End backport from CPython 3.2
-
-
-class DummySemaphore(object):
-    def __init__(self, value=None):
-        pass
-
-    def acquire(self, blocking=True, timeout=None):
-        return True
-
-    def release(self):
-        pass
-
-
-class MaxWaitersBoundedSemaphore(object):
-    def __init__(self, semaphore_class, value=1, max_waiters=1):
-        self.waiter_semaphore = semaphore_class(max_waiters)
-        self.semaphore = semaphore_class(value)
-
-    def acquire(self, blocking=True, timeout=None):
-        if not self.waiter_semaphore.acquire(False):
-            raise ExceededMaxWaiters()
-        try:
-            return self.semaphore.acquire(blocking, timeout)
-        finally:
-            self.waiter_semaphore.release()
-
-    def __getattr__(self, name):
-        return getattr(self.semaphore, name)
-
-
-class MaxWaitersBoundedSemaphoreThread(MaxWaitersBoundedSemaphore):
-    def __init__(self, value=1, max_waiters=1):
-        MaxWaitersBoundedSemaphore.__init__(
-            self, BoundedSemaphore, value, max_waiters)
+    @property
+    def waiters(self):
+        """The number of threads waiting for a permit."""
+        return len(self._waiters)
 
 
 def create_semaphore(max_size, max_waiters):
     if max_size is None:
         return DummySemaphore()
     else:
-        if max_waiters is None:
-            return BoundedSemaphore(max_size)
-        else:
-            return MaxWaitersBoundedSemaphoreThread(max_size, max_waiters)
+        return FairSemaphore(max_size, max_waiters)
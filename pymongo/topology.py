@@ -29,10 +29,13 @@ else:
 from pymongo import common
 from pymongo import periodic_executor
 from pymongo.pool import PoolOptions
-from pymongo.topology_description import (updated_topology_description,
-                                          TOPOLOGY_TYPE,
-                                          TopologyDescription)
+from pymongo.topology_description import (
+    updated_topology_description,
+    _updated_topology_description_srv_polling,
+    TOPOLOGY_TYPE,
+    TopologyDescription)
 from pymongo.errors import ServerSelectionTimeoutError, ConfigurationError
+from pymongo.monitor import SrvMonitor
 from pymongo.monotonic import time as _time
 from pymongo.server import Server
 from pymongo.server_selectors import (any_server_selector,
@@ -44,6 +47,11 @@ from pymongo.server_selectors import (any_server_selector,
 from pymongo.client_session import _ServerSessionPool
 
 
+# Topology types whose seed list follows the SRV records of a mongodb+srv://
+# URI. Replica sets discover their members from the primary instead.
+_SRV_POLLING_TOPOLOGIES = (TOPOLOGY_TYPE.Unknown, TOPOLOGY_TYPE.Sharded)
+
+
 def process_events_queue(queue_ref):
     q = queue_ref()
     if not q:
@@ -112,6 +120,11 @@ class Topology(object):
         self._max_cluster_time = None
         self._session_pool = _ServerSessionPool()
 
+        self._srv_monitor = None
+        if (topology_settings.fqdn is not None and
+                topology_description.topology_type in _SRV_POLLING_TOPOLOGIES):
+            self._srv_monitor = SrvMonitor(self, topology_settings)
+
         if self._publish_server or self._publish_tp:
             def target():
                 return process_events_queue(weak)
@@ -205,7 +218,8 @@ class Topology(object):
             # change, or for a timeout. We won't miss any changes that
             # came after our most recent apply_selector call, since we've
             # held the lock until now.
-            self._condition.wait(common.MIN_HEARTBEAT_INTERVAL)
+            self._condition.wait(
+                min(common.MIN_HEARTBEAT_INTERVAL, end_time - now))
             self._description.check_compatible()
             now = _time()
             server_descriptions = self._description.apply_selector(
@@ -267,6 +281,12 @@ class Topology(object):
         self._update_servers()
         self._receive_cluster_time_no_lock(server_description.cluster_time)
 
+        if (self._srv_monitor is not None and
+                self._description.topology_type not in
+                _SRV_POLLING_TOPOLOGIES):
+            # A replica set was discovered, stop following the SRV records.
+            self._srv_monitor.close()
+
         if self._publish_tp:
             self._events.put((
                 self._listeners.publish_topology_description_changed,
@@ -291,6 +311,34 @@ class Topology(object):
                     self._description.has_server(server_description.address)):
                 self._process_change(server_description)
 
+    def _process_srv_update(self, seedlist):
+        """Process a new seedlist from an SRV lookup on an opened topology.
+
+        Hold the lock when calling this.
+        """
+        td_old = self._description
+        self._description = _updated_topology_description_srv_polling(
+            self._description, seedlist)
+        if self._description is td_old:
+            return
+
+        self._update_servers()
+
+        if self._publish_tp:
+            self._events.put((
+                self._listeners.publish_topology_description_changed,
+                (td_old, self._description, self._topology_id)))
+
+        # Wake waiters in select_servers().
+        self._condition.notify_all()
+
+    def on_srv_update(self, seedlist):
+        """Process a new list of (host, port) pairs from the SRV records."""
+        with self._lock:
+            if (self._opened and self._description.topology_type in
+                    _SRV_POLLING_TOPOLOGIES):
+                self._process_srv_update(seedlist)
+
     def get_server_by_address(self, address):
         """Get a Server or None.
 
@@ -387,6 +435,18 @@ class Topology(object):
             for server in self._servers.values():
                 server._pool.remove_stale_sockets()
 
+    def wait_queue_stats(self):
+        """Map each server's address to its pool's wait queue statistics."""
+        with self._lock:
+            return dict((address, server.pool.wait_queue_stats())
+                        for address, server in self._servers.items())
+
+    def tls_handshake_stats(self):
+        """Map each server's address to its pool's TLS handshake counters."""
+        with self._lock:
+            return dict((address, server.pool.tls_handshake_stats())
+                        for address, server in self._servers.items())
+
     def close(self):
         """Clear pools and terminate monitors. Topology reopens on demand."""
         with self._lock:
@@ -398,6 +458,9 @@ class Topology(object):
             self._update_servers()
             self._opened = False
 
+            if self._srv_monitor is not None:
+                self._srv_monitor.close()
+
         # Publish only after releasing the lock.
         if self._publish_tp:
             self._events.put((self._listeners.publish_topology_closed,
@@ -414,8 +477,10 @@ class Topology(object):
         with self._lock:
             return self._session_pool.pop_all()
 
-    def get_server_session(self):
+    def get_server_session(self, server_selection_timeout=None):
         """Start or resume a server session, or raise ConfigurationError."""
+        if server_selection_timeout is None:
+            server_selection_timeout = self._settings.server_selection_timeout
         with self._lock:
             session_timeout = self._description.logical_session_timeout_minutes
             if session_timeout is None:
@@ -424,12 +489,12 @@ class Topology(object):
                     if not self._description.has_known_servers:
                         self._select_servers_loop(
                             any_server_selector,
-                            self._settings.server_selection_timeout,
+                            server_selection_timeout,
                             None)
                 elif not self._description.readable_servers:
                     self._select_servers_loop(
                         readable_server_selector,
-                        self._settings.server_selection_timeout,
+                        server_selection_timeout,
                         None)
 
             session_timeout = self._description.logical_session_timeout_minutes
@@ -475,6 +540,10 @@ class Topology(object):
         for server in itervalues(self._servers):
             server.open()
 
+        if (self._srv_monitor is not None and
+                self._description.topology_type in _SRV_POLLING_TOPOLOGIES):
+            self._srv_monitor.open()
+
     def _reset_server(self, address):
         """Clear our pool for a server and mark it Unknown.
 
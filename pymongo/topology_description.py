@@ -335,7 +335,12 @@ def updated_topology_description(topology_description, server_description):
 
     if topology_type == TOPOLOGY_TYPE.Unknown:
         if server_type == SERVER_TYPE.Standalone:
-            sds.pop(address)
+            settings = topology_description._topology_settings
+            if settings is not None and len(settings.seeds) == 1:
+                # A single seed from SRV records.
+                topology_type = TOPOLOGY_TYPE.Single
+            else:
+                sds.pop(address)
 
         elif server_type not in (SERVER_TYPE.Unknown, SERVER_TYPE.RSGhost):
             topology_type = _SERVER_TYPE_TO_TOPOLOGY_TYPE[server_type]
@@ -400,6 +405,38 @@ def updated_topology_description(topology_description, server_description):
                                topology_description._topology_settings)
 
 
+def _updated_topology_description_srv_polling(topology_description,
+                                              seedlist):
+    """Return an updated copy of a TopologyDescription with the servers
+    from a new SRV lookup.
+
+    :Parameters:
+      - `topology_description`: the current TopologyDescription
+      - `seedlist`: a list of (host, port) pairs from the SRV records
+
+    Servers no longer in the SRV records are removed, new ones are added as
+    Unknown. Does not modify topology_description.
+    """
+    sds = topology_description.server_descriptions()
+    if set(sds) == set(seedlist):
+        return topology_description
+
+    for address in list(sds):
+        if address not in seedlist:
+            sds.pop(address)
+    for address in seedlist:
+        if address not in sds:
+            sds[address] = ServerDescription(address)
+
+    return TopologyDescription(
+        topology_description.topology_type,
+        sds,
+        topology_description.replica_set_name,
+        topology_description.max_set_version,
+        topology_description.max_election_id,
+        topology_description._topology_settings)
+
+
 def _update_rs_from_primary(
         sds,
         replica_set_name,
@@ -15,6 +15,7 @@
 
 """Tools to parse and validate a MongoDB URI."""
 import re
+import threading
 import warnings
 
 try:
@@ -32,6 +33,7 @@ else:
 
 from pymongo.common import get_validated_options
 from pymongo.errors import ConfigurationError, InvalidURI
+from pymongo.monotonic import time as _time
 
 
 SCHEME = 'mongodb://'
@@ -249,27 +251,82 @@ _ALLOWED_TXT_OPTS = frozenset(
     ['authsource', 'authSource', 'replicaset', 'replicaSet'])
 
 
-def _get_dns_srv_hosts(hostname):
+# Seconds to remember that a hostname has no TXT record.
+_NO_TXT_RECORD_TTL = 60
+
+# Process-wide cache of SRV and TXT lookups. Maps (rdtype, hostname) to
+# (result, expiry time), expiring after the record's TTL.
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+
+def _cached_dns_lookup(rdtype, hostname, lookup):
+    """Return (result, ttl) for `hostname`, from the cache if possible.
+
+    `lookup` is called with `hostname` on a miss and returns (result, ttl).
+    Errors are not cached.
+    """
+    key = (rdtype, hostname)
+    with _dns_cache_lock:
+        cached = _dns_cache.get(key)
+    if cached is not None:
+        result, expires = cached
+        ttl = expires - _time()
+        if ttl > 0:
+            return result, ttl
+    result, ttl = lookup(hostname)
+    with _dns_cache_lock:
+        _dns_cache[key] = (result, _time() + ttl)
+    return result, ttl
+
+
+def _resolve_srv_hosts(hostname):
+    try:
+        plist = hostname.split(".")[1:]
+    except Exception:
+        raise ConfigurationError("Invalid URI host")
+    slen = len(plist)
+    if slen < 2:
+        raise ConfigurationError("Invalid URI host")
     try:
         results = resolver.query('_mongodb._tcp.' + hostname, 'SRV')
     except Exception as exc:
         raise ConfigurationError(str(exc))
-    return [(maybe_decode(res.target.to_text(omit_final_dot=True)), res.port)
-            for res in results]
+    nodes = [(maybe_decode(res.target.to_text(omit_final_dot=True)), res.port)
+             for res in results]
+    for node in nodes:
+        try:
+            nlist = node[0].split(".")[1:][-slen:]
+        except Exception:
+            raise ConfigurationError("Invalid SRV host")
+        if plist != nlist:
+            raise ConfigurationError("Invalid SRV host")
+    return nodes, results.rrset.ttl
 
 
-def _get_dns_txt_options(hostname):
+def _resolve_txt_options(hostname):
     try:
         results = resolver.query(hostname, 'TXT')
     except (resolver.NoAnswer, resolver.NXDOMAIN):
         # No TXT records
-        return None
+        return None, _NO_TXT_RECORD_TTL
     except Exception as exc:
         raise ConfigurationError(str(exc))
     if len(results) > 1:
         raise ConfigurationError('Only one TXT record is supported')
-    return (
+    options = (
         b'&'.join([b''.join(res.strings) for res in results])).decode('utf-8')
+    return options, results.rrset.ttl
+
+
+def _get_dns_srv_hosts(hostname):
+    """Return (list of (host, port) pairs, seconds until they expire)."""
+    nodes, ttl = _cached_dns_lookup('SRV', hostname, _resolve_srv_hosts)
+    return list(nodes), ttl
+
+
+def _get_dns_txt_options(hostname):
+    return _cached_dns_lookup('TXT', hostname, _resolve_txt_options)[0]
 
 
 def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
@@ -283,11 +340,14 @@ def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
             'password': <password> or None,
             'database': <database name> or None,
             'collection': <collection name> or None,
-            'options': <dict of MongoDB URI options>
+            'options': <dict of MongoDB URI options>,
+            'fqdn': <hostname of a mongodb+srv:// URI> or None
         }
 
     If the URI scheme is "mongodb+srv://" DNS SRV and TXT lookups will be done
-    to build nodelist and options.
+    to build nodelist and options, and 'fqdn' is the hostname that was looked
+    up. The results are cached for the records' TTL and shared by all calls
+    in this process.
 
     :Parameters:
         - `uri`: The MongoDB URI to parse.
@@ -300,6 +360,9 @@ def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
           validation will error when options are unsupported or values are
           invalid.
 
+    .. versionchanged:: 3.8
+        Added 'fqdn' to the result. SRV and TXT lookups are cached.
+
     .. versionchanged:: 3.6
         Added support for mongodb+srv:// URIs
 
@@ -331,6 +394,7 @@ def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
     dbase = None
     collection = None
     options = {}
+    fqdn = None
 
     host_part, _, path_part = scheme_free.partition('/')
     if not host_part:
@@ -363,22 +427,7 @@ def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
         if port is not None:
             raise InvalidURI(
                 "%s URIs must not include a port number" % (SRV_SCHEME,))
-        nodes = _get_dns_srv_hosts(fqdn)
-
-        try:
-            plist = fqdn.split(".")[1:]
-        except Exception:
-            raise ConfigurationError("Invalid URI host")
-        slen = len(plist)
-        if slen < 2:
-            raise ConfigurationError("Invalid URI host")
-        for node in nodes:
-            try:
-                nlist = node[0].split(".")[1:][-slen:]
-            except Exception:
-                raise ConfigurationError("Invalid SRV host")
-            if plist != nlist:
-                raise ConfigurationError("Invalid SRV host")
+        nodes = _get_dns_srv_hosts(fqdn)[0]
 
         dns_options = _get_dns_txt_options(fqdn)
         if dns_options:
@@ -415,7 +464,8 @@ def parse_uri(uri, default_port=DEFAULT_PORT, validate=True, warn=False):
         'password': passwd,
         'database': dbase,
         'collection': collection,
-        'options': options
+        'options': options,
+        'fqdn': fqdn
     }
 
 
@@ -0,0 +1,263 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you
+# may not use this file except in compliance with the License.  You
+# may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.  See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Combine single writes from many threads into bulk writes.
+
+Applications that call :meth:`~pymongo.collection.Collection.insert_one`
+or :meth:`~pymongo.collection.Collection.update_one` from many threads at
+a high rate pay for one round trip per call. A :class:`WriteCoalescer`
+holds each write for at most `max_delay` seconds, or until `max_batch_size`
+writes are waiting, and sends them together as one unordered bulk write::
+
+  coalescer = db.events.write_coalescer(max_delay=0.0005)
+
+  # In each of many threads:
+  result = coalescer.insert_one({'event': 'click'})
+
+Each call blocks until its own write has been acknowledged and returns
+its own result, or raises its own error.
+
+.. versionadded:: 3.8
+"""
+
+import threading
+
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import common
+from pymongo.bulk import _Bulk
+from pymongo.errors import BulkWriteError
+from pymongo.helpers import _raise_last_write_error, _raise_write_concern_error
+from pymongo.message import _INSERT, _UPDATE
+from pymongo.monotonic import time as _time
+from pymongo.results import InsertOneResult, UpdateResult
+
+
+class _PendingWrite(object):
+    """A write waiting to be sent, and its outcome."""
+
+    __slots__ = ('op_type', 'args', 'result', 'error', 'done')
+
+    def __init__(self, op_type, args):
+        self.op_type = op_type
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def get(self):
+        """Wait for the write to be sent, return its result or raise its
+        error.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _error_from(raise_error, error):
+    """Return the exception raised by `raise_error(error)`."""
+    try:
+        raise_error(error)
+    except Exception as exc:
+        return exc
+
+
+class WriteCoalescer(object):
+    """Sends single writes from concurrent threads as bulk writes.
+
+    Don't create instances directly, use
+    :meth:`~pymongo.collection.Collection.write_coalescer`. A
+    WriteCoalescer is thread safe; share one between the threads that
+    write to its collection.
+
+    The first write to arrive waits for up to `max_delay` seconds for
+    others to join it, then sends every waiting write as one unordered bulk
+    write with the collection's write concern. Writes sent together are
+    independent: the failure of one does not prevent the others. A full
+    batch of `max_batch_size` writes is sent at once.
+    """
+
+    def __init__(self, collection, max_delay, max_batch_size):
+        self.__collection = collection
+        self.__max_delay = common.validate_positive_float(
+            'max_delay', max_delay)
+        self.__max_batch_size = common.validate_positive_integer(
+            'max_batch_size', max_batch_size)
+        self.__cond = threading.Condition()
+        self.__batch = []
+
+    @property
+    def collection(self):
+        """The :class:`~pymongo.collection.Collection` written to."""
+        return self.__collection
+
+    @property
+    def max_delay(self):
+        """The most seconds a write waits for others to join it."""
+        return self.__max_delay
+
+    @property
+    def max_batch_size(self):
+        """The most writes sent together."""
+        return self.__max_batch_size
+
+    def insert_one(self, document):
+        """Insert a single document, together with writes from other
+        threads.
+
+        :Parameters:
+          - `document`: The document to insert. Must be a mutable mapping
+            type. If the document does not have an _id field one will be
+            added automatically.
+
+        :Returns:
+          - An instance of :class:`~pymongo.results.InsertOneResult`.
+
+        Raises :exc:`~pymongo.errors.WriteError` or
+        :exc:`~pymongo.errors.WriteConcernError` like
+        :meth:`~pymongo.collection.Collection.insert_one`.
+        """
+        common.validate_is_document_type("document", document)
+        if not (isinstance(document, RawBSONDocument) or "_id" in document):
+            document["_id"] = ObjectId()
+        return self.__submit(_PendingWrite(_INSERT, (document,)))
+
+    def update_one(self, filter, update, upsert=False, collation=None,
+                   array_filters=None):
+        """Update a single document matching the filter, together with
+        writes from other threads.
+
+        :Parameters:
+          - `filter`: A query that matches the document to update.
+          - `update`: The modifications to apply.
+          - `upsert` (optional): If ``True``, perform an insert if no
+            documents match the filter.
+          - `collation` (optional): An instance of
+            :class:`~pymongo.collation.Collation`.
+          - `array_filters` (optional): A list of filters specifying which
+            array elements an update should apply.
+
+        :Returns:
+          - An instance of :class:`~pymongo.results.UpdateResult`. The
+            server reports the number of documents matched and modified by
+            all the updates sent together, so
+            :attr:`~pymongo.results.UpdateResult.matched_count` and
+            :attr:`~pymongo.results.UpdateResult.modified_count` are
+            ``None`` unless this update was the only one sent that neither
+            failed nor upserted.
+        """
+        common.validate_is_mapping("filter", filter)
+        common.validate_boolean("upsert", upsert)
+        common.validate_ok_for_update(update)
+        common.validate_list_or_none('array_filters', array_filters)
+        return self.__submit(_PendingWrite(
+            _UPDATE, (filter, update, False, upsert, collation,
+                      array_filters)))
+
+    def __submit(self, pending):
+        """Add a write to the current batch and wait for its outcome.
+
+        The thread that starts a batch sends it when it is full or
+        `max_delay` has passed.
+        """
+        with self.__cond:
+            batch = self.__batch
+            batch.append(pending)
+            leader = len(batch) == 1
+            if len(batch) >= self.__max_batch_size:
+                # Start a new batch, and wake this one's leader.
+                self.__batch = []
+                self.__cond.notify_all()
+            if leader:
+                deadline = _time() + self.__max_delay
+                while self.__batch is batch:
+                    remaining = deadline - _time()
+                    if remaining <= 0:
+                        self.__batch = []
+                        break
+                    self.__cond.wait(remaining)
+        if leader:
+            self.__flush(batch)
+        return pending.get()
+
+    def __flush(self, batch):
+        """Send a batch of writes and resolve each one."""
+        try:
+            blk = _Bulk(self.__collection, False, False)
+            for pending in batch:
+                if pending.op_type == _INSERT:
+                    blk.add_insert(*pending.args)
+                else:
+                    blk.add_update(*pending.args)
+            write_concern = self.__collection.write_concern
+            try:
+                result = blk.execute(write_concern, session=None)
+            except BulkWriteError as exc:
+                result = exc.details
+            self.__resolve(batch, result, write_concern.acknowledged)
+        except Exception as exc:
+            for pending in batch:
+                if pending.result is None and pending.error is None:
+                    pending.error = exc
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def __resolve(self, batch, result, acknowledged):
+        """Set each write's result or error from the bulk write result."""
+        if not acknowledged:
+            for pending in batch:
+                if pending.op_type == _INSERT:
+                    pending.result = InsertOneResult(
+                        pending.args[0].get("_id"), False)
+                else:
+                    pending.result = UpdateResult(None, False)
+            return
+
+        write_errors = dict(
+            (error["index"], error) for error in result["writeErrors"])
+        upserted = dict(
+            (doc["index"], doc["_id"]) for doc in result["upserted"])
+        wc_errors = result["writeConcernErrors"]
+        # The server's counts are exact for an update sent on its own.
+        plain_updates = [
+            idx for idx, pending in enumerate(batch)
+            if pending.op_type == _UPDATE and
+            idx not in write_errors and idx not in upserted]
+
+        for idx, pending in enumerate(batch):
+            if idx in write_errors:
+                # Report the error as if the write had been sent alone.
+                error = write_errors[idx].copy()
+                error.pop("op", None)
+                error["index"] = 0
+                pending.error = _error_from(_raise_last_write_error, [error])
+            elif wc_errors:
+                pending.error = _error_from(
+                    _raise_write_concern_error, wc_errors[-1])
+            elif pending.op_type == _INSERT:
+                pending.result = InsertOneResult(
+                    pending.args[0].get("_id"), True)
+            elif idx in upserted:
+                pending.result = UpdateResult(
+                    {"n": 1, "nModified": 0, "upserted": upserted[idx],
+                     "ok": 1.0}, True)
+            elif plain_updates == [idx]:
+                pending.result = UpdateResult(
+                    {"n": result["nMatched"],
+                     "nModified": result["nModified"], "ok": 1.0}, True)
+            else:
+                pending.result = UpdateResult(
+                    {"n": None, "nModified": None, "ok": 1.0}, True)
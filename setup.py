@@ -24,6 +24,7 @@ except ImportError:
     use_setuptools()
     from setuptools import setup
 
+from setuptools.command.build_py import build_py
 from distutils.cmd import Command
 from distutils.command.build_ext import build_ext
 from distutils.errors import CCompilerError, DistutilsOptionError
@@ -232,6 +233,27 @@ else:
     build_errors = (CCompilerError, DistutilsExecError, DistutilsPlatformError)
 
 
+# Modules that use async/await, which only Python 3.5+ can compile.
+_ASYNC_MODULES = ("async_client", "async_cursor", "async_network",
+                  "async_pool")
+
+
+class custom_build_py(build_py):
+    """Leave out the asyncio client on Pythons older than 3.5.
+
+    Nothing else in the package imports it, so skipping it avoids byte
+    compilation errors when installing.
+    """
+
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info[:2] < (3, 5) and package == "pymongo":
+            modules = [(pkg, module, filename)
+                       for pkg, module, filename in modules
+                       if module not in _ASYNC_MODULES]
+        return modules
+
+
 class custom_build_ext(build_ext):
     """Allow C extension building to fail.
 
@@ -317,7 +339,7 @@ ext_modules = [Extension('bson._cbson',
                          sources=['pymongo/_cmessagemodule.c',
                                   'bson/buffer.c'])]
 
-extras_require = {'snappy': ["python-snappy"]}
+extras_require = {'snappy': ["python-snappy"], 'zstd': ["zstandard"]}
 vi = sys.version_info
 if vi[0] == 2:
     extras_require.update(
@@ -384,6 +406,7 @@ setup(
         "Programming Language :: Python :: Implementation :: PyPy",
         "Topic :: Database"],
     cmdclass={"build_ext": custom_build_ext,
+              "build_py": custom_build_py,
               "doc": doc,
               "test": test},
     extras_require=extras_require,
@@ -0,0 +1,425 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the asyncio-native AsyncMongoClient.
+
+This module uses async/await, test_async_client imports it on Python 3.5+.
+"""
+
+import asyncio
+import struct
+import sys
+import time
+
+sys.path[0:0] = [""]
+
+from test import client_context, unittest
+
+from bson import BSON, decode_all
+from bson.son import SON
+from pymongo.async_client import AsyncMongoClient
+from pymongo.async_pool import AsyncPool
+from pymongo.errors import (BulkWriteError,
+                            ConfigurationError,
+                            ConnectionFailure,
+                            OperationFailure,
+                            ServerSelectionTimeoutError)
+from pymongo.pool import PoolOptions
+from pymongo.write_concern import WriteConcern
+from test import host, port
+from test.utils import rs_or_single_client
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class MockServer(object):
+    """A minimal server answering OP_QUERY ismaster and OP_MSG commands."""
+
+    def __init__(self, max_wire_version=6, responses=None):
+        self.max_wire_version = max_wire_version
+        self.responses = responses or {}
+        self.commands = []
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._handle, 'localhost', 0)
+        return self.server.sockets[0].getsockname()[:2]
+
+    def stop(self):
+        self.server.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(16)
+                length, request_id, _, op_code = struct.unpack(
+                    "<iiii", header)
+                body = await reader.readexactly(length - 16)
+                if op_code == 2004:
+                    # flags, cstring namespace, skip, limit, query.
+                    start = body.index(b'\x00', 4) + 9
+                    cmd = decode_all(body[start:])[0]
+                    reply = self._reply(cmd)
+                    data = struct.pack("<iqii", 0, 0, 0, 1) + BSON.encode(
+                        reply)
+                    op = 1
+                else:
+                    flags, size = struct.unpack_from("<Ixi", body)
+                    # The body section, ignore any document sequences.
+                    cmd = decode_all(body[5:5 + size])[0]
+                    if flags & 2:
+                        # moreToCome, an unacknowledged write has no reply.
+                        self.commands.append(cmd)
+                        continue
+                    data = b"\x00\x00\x00\x00\x00" + BSON.encode(
+                        self._reply(cmd))
+                    op = 2013
+                self.commands.append(cmd)
+                writer.write(struct.pack(
+                    "<iiii", 16 + len(data), 1, request_id, op) + data)
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    def _reply(self, cmd):
+        name = next(iter(cmd)).lower()
+        if name == 'ismaster':
+            return {'ok': 1, 'ismaster': True, 'minWireVersion': 0,
+                    'maxWireVersion': self.max_wire_version}
+        return self.responses.get(name, {'ok': 1})
+
+
+class TestAsyncPool(unittest.TestCase):
+
+    def test_command(self):
+        async def go():
+            server = MockServer(responses={'ping': {'ok': 1, 'pong': 42}})
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions())
+            try:
+                async with pool.get_socket({}) as sock_info:
+                    self.assertTrue(sock_info.op_msg_enabled)
+                    reply = await sock_info.command('admin', {'ping': 1})
+                self.assertEqual(42, reply['pong'])
+                self.assertEqual(1, len(pool.sockets))
+
+                # The idle socket is reused.
+                async with pool.get_socket({}) as sock_info2:
+                    self.assertIs(sock_info, sock_info2)
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+    def test_command_error(self):
+        async def go():
+            server = MockServer(responses={
+                'fail': {'ok': 0, 'errmsg': 'oops', 'code': 2}})
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions())
+            try:
+                async with pool.get_socket({}) as sock_info:
+                    with self.assertRaises(OperationFailure) as ctx:
+                        await sock_info.command('admin', {'fail': 1})
+                self.assertEqual(2, ctx.exception.code)
+                # The connection is still usable.
+                self.assertEqual(1, len(pool.sockets))
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+    def test_unacknowledged_command(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions())
+            try:
+                async with pool.get_socket({}) as sock_info:
+                    reply = await sock_info.command(
+                        'db', SON([('insert', 'test'), ('documents', [{}])]),
+                        write_concern=WriteConcern(w=0))
+                    self.assertEqual({'ok': 1}, reply)
+                    # Sent with OP_MSG and moreToCome, the connection is
+                    # not waiting for a reply.
+                    await sock_info.command('admin', {'ping': 1})
+                self.assertEqual(['insert', 'ping'],
+                                 [next(iter(cmd)) for cmd in
+                                  server.commands[1:]])
+                self.assertEqual({'w': 0}, server.commands[1]['writeConcern'])
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+    def test_old_server(self):
+        async def go():
+            server = MockServer(max_wire_version=5)
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions())
+            try:
+                with self.assertRaises(ConfigurationError):
+                    async with pool.get_socket({}):
+                        pass
+                self.assertEqual(0, pool.active_sockets)
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+    def test_connection_refused(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            server.stop()
+            await server.server.wait_closed()
+            pool = AsyncPool(address, PoolOptions(connect_timeout=1))
+            with self.assertRaises(ConnectionFailure):
+                async with pool.get_socket({}):
+                    pass
+            self.assertEqual(0, pool.active_sockets)
+
+        run(go())
+
+    def test_wait_queue_fifo(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions(max_pool_size=1))
+            order = []
+
+            async def task(i):
+                async with pool.get_socket({}) as sock_info:
+                    order.append(i)
+                    await sock_info.command('admin', {'ping': 1})
+
+            try:
+                await asyncio.gather(*[task(i) for i in range(5)])
+                self.assertEqual(list(range(5)), order)
+                self.assertEqual(1, len(pool.sockets))
+                self.assertEqual(0, pool.active_sockets)
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+    def test_wait_queue_timeout(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            pool = AsyncPool(address, PoolOptions(max_pool_size=1,
+                                                  wait_queue_timeout=0.01))
+            try:
+                async with pool.get_socket({}):
+                    with self.assertRaises(ConnectionFailure):
+                        async with pool.get_socket({}):
+                            pass
+                # The slot was released.
+                async with pool.get_socket({}):
+                    pass
+            finally:
+                pool.close()
+                server.stop()
+
+        run(go())
+
+
+class TestAsyncServerSelection(unittest.TestCase):
+
+    def test_select_server(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            start = time.time()
+            client = AsyncMongoClient(*address)
+            try:
+                await client.admin.command('ping')
+                # Woken by the monitor's first check, not by polling.
+                self.assertLess(time.time() - start, 0.4)
+            finally:
+                client.close()
+                server.stop()
+
+        run(go())
+
+    def test_select_server_timeout(self):
+        async def go():
+            server = MockServer()
+            address = await server.start()
+            server.stop()
+            await server.server.wait_closed()
+            client = AsyncMongoClient(*address, serverSelectionTimeoutMS=200)
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(1)
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.ensure_future(tick())
+            try:
+                with self.assertRaises(ServerSelectionTimeoutError):
+                    await client.admin.command('ping')
+                # The loop was not blocked while waiting.
+                self.assertGreater(len(ticks), 5)
+            finally:
+                ticker.cancel()
+                client.close()
+
+        run(go())
+
+
+class TestAsyncMongoClient(unittest.TestCase):
+
+    @classmethod
+    @client_context.require_connection
+    @client_context.require_version_min(3, 6)
+    def setUpClass(cls):
+        pass
+
+    def setUp(self):
+        self.sync_client = rs_or_single_client()
+        self.sync_client.pymongo_test.drop_collection('test')
+
+    def tearDown(self):
+        self.sync_client.pymongo_test.drop_collection('test')
+        self.sync_client.close()
+
+    def _client(self):
+        return AsyncMongoClient(
+            host, port, **client_context.default_client_options)
+
+    def test_crud(self):
+        async def go():
+            client = self._client()
+            coll = client.pymongo_test.test
+            try:
+                result = await coll.insert_one({'_id': 1, 'x': 1})
+                self.assertEqual(1, result.inserted_id)
+                result = await coll.insert_many(
+                    [{'_id': i, 'x': i} for i in range(2, 10)])
+                self.assertEqual(list(range(2, 10)), result.inserted_ids)
+                self.assertEqual(9, await coll.count_documents({}))
+
+                result = await coll.update_one({'_id': 1}, {'$inc': {'x': 1}})
+                self.assertEqual(1, result.modified_count)
+                self.assertEqual(2, (await coll.find_one(1))['x'])
+                result = await coll.update_many({}, {'$set': {'y': 1}})
+                self.assertEqual(9, result.matched_count)
+                result = await coll.replace_one(
+                    {'_id': 100}, {'z': 1}, upsert=True)
+                self.assertEqual(100, result.upserted_id)
+
+                result = await coll.delete_one({'_id': 100})
+                self.assertEqual(1, result.deleted_count)
+                result = await coll.delete_many({'x': {'$gt': 5}})
+                self.assertEqual(4, result.deleted_count)
+                self.assertIsNone(await coll.find_one({'x': 100}))
+            finally:
+                client.close()
+
+        run(go())
+
+    def test_insert_many_error(self):
+        async def go():
+            client = self._client()
+            coll = client.pymongo_test.test
+            try:
+                with self.assertRaises(BulkWriteError) as ctx:
+                    await coll.insert_many([{'_id': 1}, {'_id': 1}])
+                self.assertEqual(1, ctx.exception.details['nInserted'])
+            finally:
+                client.close()
+
+        run(go())
+
+    def test_find_and_aggregate(self):
+        self.sync_client.pymongo_test.test.insert_many(
+            [{'x': i} for i in range(100)])
+
+        async def go():
+            client = self._client()
+            coll = client.pymongo_test.test
+            try:
+                docs = [doc async for doc in coll.find(
+                    {}, batch_size=7).sort('x')]
+                self.assertEqual(list(range(100)), [d['x'] for d in docs])
+
+                cursor = coll.find({}, {'_id': False}).sort('x', -1).skip(10)
+                docs = await cursor.limit(15).batch_size(4).to_list()
+                self.assertEqual(list(range(89, 74, -1)),
+                                 [d['x'] for d in docs])
+                self.assertFalse(cursor.alive)
+
+                cursor = coll.aggregate([{'$match': {'x': {'$lt': 10}}}],
+                                        batchSize=3)
+                self.assertEqual(10, len(await cursor.to_list()))
+
+                cursor = coll.find(batch_size=2)
+                self.assertEqual(5, len(await cursor.to_list(5)))
+                self.assertTrue(cursor.alive)
+                await cursor.close()
+                self.assertFalse(cursor.alive)
+            finally:
+                client.close()
+
+        run(go())
+
+    def test_concurrent_operations(self):
+        async def go():
+            client = AsyncMongoClient(
+                host, port, maxPoolSize=2,
+                **client_context.default_client_options)
+            coll = client.pymongo_test.test
+            try:
+                await asyncio.gather(*[coll.insert_one({'x': i})
+                                       for i in range(50)])
+                self.assertEqual(50, await coll.count_documents({}))
+                for pool, _ in client._pools.values():
+                    self.assertLessEqual(len(pool.sockets), 2)
+            finally:
+                client.close()
+
+        run(go())
+
+    def test_database_commands(self):
+        async def go():
+            client = self._client()
+            try:
+                db = client.pymongo_test
+                await db.test.insert_one({})
+                self.assertIn('test', await db.list_collection_names())
+                self.assertIn('pymongo_test',
+                              await client.list_database_names())
+                info = await client.server_info()
+                self.assertEqual(info['version'],
+                                 self.sync_client.server_info()['version'])
+                await db.drop_collection('test')
+                self.assertNotIn('test', await db.list_collection_names())
+            finally:
+                client.close()
+
+        run(go())
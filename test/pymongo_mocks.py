@@ -15,15 +15,30 @@
 """Tools for mocking parts of PyMongo to test other parts."""
 
 import contextlib
+import hashlib
+import hmac
+import socket
+import struct
+import threading
+import time
+from base64 import standard_b64decode, standard_b64encode
 from functools import partial
 import weakref
 
+from bson import BSON, decode_all
+from bson.binary import Binary
+from bson.codec_options import CodecOptions
+from bson.son import SON
+
+from pymongo import auth
 from pymongo import common
 from pymongo import MongoClient
-from pymongo.errors import AutoReconnect, NetworkTimeout
+from pymongo.errors import AutoReconnect, NetworkTimeout, OperationFailure
 from pymongo.ismaster import IsMaster
+from pymongo.message import _OpMsg
 from pymongo.monitor import Monitor
-from pymongo.pool import Pool
+from pymongo.pool import Pool, PoolOptions, SocketInfo
+from pymongo.response import Response
 from pymongo.server_description import ServerDescription
 
 from test import client_context
@@ -40,7 +55,7 @@ class MockPool(Pool):
         Pool.__init__(self, (client_context.host, client_context.port), *args, **kwargs)
 
     @contextlib.contextmanager
-    def get_socket(self, all_credentials, checkout=False):
+    def get_socket(self, all_credentials, checkout=False, deadline=None):
         client = self.client
         host_and_port = '%s:%s' % (self.mock_host, self.mock_port)
         if host_and_port in client.mock_down_hosts:
@@ -51,7 +66,8 @@ class MockPool(Pool):
             + client.mock_members
             + client.mock_mongoses), "bad host: %s" % host_and_port
 
-        with Pool.get_socket(self, all_credentials) as sock_info:
+        with Pool.get_socket(
+                self, all_credentials, deadline=deadline) as sock_info:
             sock_info.mock_host = self.mock_host
             sock_info.mock_port = self.mock_port
             yield sock_info
@@ -199,3 +215,286 @@ class MockClient(MongoClient):
         # Avoid the background thread causing races, e.g. a surprising
         # reconnect while we're trying to test a disconnected client.
         pass
+
+
+class MockWriteServer(object):
+    """Records the write commands sent by MockWriteSocketInfos."""
+
+    def __init__(self, delay=0, max_write_batch_size=10):
+        self.delay = delay
+        self.max_write_batch_size = max_write_batch_size
+        self.lock = threading.Lock()
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class MockWriteSocketInfo(object):
+    """Runs write commands against a MockWriteServer."""
+
+    max_wire_version = 7
+    max_bson_size = 16 * 1024 ** 2
+    max_message_size = 48 * 1024 ** 2
+    compression_context = None
+    vectored_send = False
+    address = ('localhost', 27017)
+
+    def __init__(self, server):
+        self.server = server
+        self.max_write_batch_size = server.max_write_batch_size
+
+    def validate_session(self, client, session):
+        pass
+
+    def send_cluster_time(self, command, session, client):
+        pass
+
+    def apply_timeout(self, cmd):
+        pass
+
+    def write_command(self, request_id, msg):
+        server = self.server
+        # Skip the header, flags, and the type 0 section's kind.
+        pos = 21
+        cmd_len = struct.unpack_from('<i', msg, pos)[0]
+        cmd = BSON(msg[pos:pos + cmd_len]).decode(
+            CodecOptions(document_class=SON))
+        # Skip the type 1 section's kind, size, and identifier.
+        pos += cmd_len + 1
+        size = struct.unpack_from('<i', msg, pos)[0]
+        end = pos + size
+        pos = msg.index(b'\x00', pos + 4) + 1
+        docs = decode_all(msg[pos:end])
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight,
+                                       server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+            server.batches.append((next(iter(cmd)), docs))
+        errors = [{'index': i, 'code': 11000, 'errmsg': 'duplicate key'}
+                  for i, doc in enumerate(docs) if doc.get('dup')]
+        n = len(docs) - len(errors)
+        if errors and cmd['ordered']:
+            # An ordered write stops at the first error.
+            errors = errors[:1]
+            n = errors[0]['index']
+        reply = {'ok': 1, 'n': n}
+        if errors:
+            reply['writeErrors'] = errors
+        return reply
+
+
+class MockCursorServer(object):
+    """Replies to find and getMore commands from a list of documents."""
+
+    address = ('localhost', 27017)
+    cursor_id = 42
+
+    def __init__(self, client, docs, batch_size, delay=0, fail_at=None,
+                 doc_delay=0):
+        self.docs = docs
+        self.batch_size = batch_size
+        self.delay = delay
+        self.doc_delay = doc_delay
+        self.fail_at = fail_at
+        self.position = 0
+        self.get_mores = 0
+        # The batchSize of each find and getMore.
+        self.requested = []
+        self.killed = []
+        self.lock = threading.Lock()
+        client._ensure_session = lambda session=None: None
+        client._send_message_with_response = self.send_message_with_response
+        client._close_cursor_now = self.close_cursor
+        client._close_cursor = self.close_cursor
+
+    def close_cursor(self, cursor_id, address=None, session=None):
+        self.killed.append(cursor_id)
+
+    def next_batch(self, n=None):
+        n = min(n or self.batch_size, self.batch_size)
+        batch = self.docs[self.position:self.position + n]
+        self.position += len(batch)
+        cursor_id = self.cursor_id if self.position < len(self.docs) else 0
+        return batch, cursor_id
+
+    def send_message_with_response(self, operation, exhaust=False,
+                                   address=None, timeout=None):
+        with self.lock:
+            if operation.name == 'getMore':
+                self.get_mores += 1
+                self.requested.append(operation.ntoreturn)
+                if self.get_mores == self.fail_at:
+                    doc = {'ok': 0, 'errmsg': 'cursor killed', 'code': 43}
+                    return self.reply(doc)
+                batch, cursor_id = self.next_batch(operation.ntoreturn)
+            else:
+                self.requested.append(operation.batch_size)
+                batch, cursor_id = self.next_batch(operation.batch_size)
+        time.sleep(self.delay + self.doc_delay * len(batch))
+        key = 'firstBatch' if operation.name == 'find' else 'nextBatch'
+        return self.reply({'ok': 1, 'cursor': {
+            'id': cursor_id, 'ns': 'test.test', key: batch}})
+
+    def reply(self, doc):
+        return Response(_OpMsg(0, BSON.encode(doc)), self.address, 0, 0, True)
+
+
+# The salt and iteration count of MockAuthServer's users.
+SALT = b'mock salt'
+ITERATIONS = 4096
+
+
+class MockAuthServer(object):
+    """Plays a server's part of the ismaster and authentication commands.
+
+    Supports speculative authentication like MongoDB 4.4 if `speculative`.
+    """
+
+    def __init__(self, username, password, mechs, speculative=True):
+        self.username = username
+        self.password = password
+        self.mechs = mechs
+        self.speculative = speculative
+        self.commands = []
+        self.conversation = None
+        self.authenticated = False
+
+    def handle(self, dbname, spec):
+        name = next(iter(spec))
+        self.commands.append(name)
+        if name == 'ismaster':
+            reply = {'ok': 1, 'ismaster': True, 'maxWireVersion': 9}
+            if 'saslSupportedMechs' in spec:
+                reply['saslSupportedMechs'] = self.mechs
+            speculative = spec.get('speculativeAuthenticate')
+            if speculative is not None and self.speculative:
+                try:
+                    reply['speculativeAuthenticate'] = self.handle(
+                        speculative['db'], speculative)
+                except OperationFailure:
+                    # Authentication fails later with a saslStart.
+                    pass
+                self.commands.pop()
+            return reply
+        if name == 'saslStart':
+            return self.sasl_start(spec)
+        if name == 'saslContinue':
+            return self.sasl_continue(spec)
+        if name == 'authenticate':
+            self.authenticated = True
+            return {'ok': 1, 'dbname': '$external', 'user': 'CN=client'}
+        raise OperationFailure('no such command: %s' % (name,))
+
+    def sasl_start(self, spec):
+        mechanism = spec['mechanism']
+        if mechanism not in self.mechs:
+            raise OperationFailure('Unsupported mechanism')
+        first_bare = bytes(spec['payload'])[3:]
+        nonce = dict(item.split(b'=', 1)
+                     for item in first_bare.split(b','))[b'r']
+        server_first = (b'r=' + nonce + b'server,s=' +
+                        standard_b64encode(SALT) + b',i=' +
+                        str(ITERATIONS).encode())
+        self.conversation = (mechanism, first_bare, server_first)
+        return {'ok': 1, 'conversationId': 1, 'done': False,
+                'payload': Binary(server_first)}
+
+    def sasl_continue(self, spec):
+        mechanism, first_bare, server_first = self.conversation
+        if mechanism == 'SCRAM-SHA-256':
+            digestmod = hashlib.sha256
+            data = self.password.encode('utf-8')
+        else:
+            digestmod = hashlib.sha1
+            data = auth._password_digest(
+                self.username, self.password).encode('utf-8')
+        salted = hashlib.pbkdf2_hmac(
+            digestmod().name, data, SALT, ITERATIONS)
+        client_key = hmac.HMAC(salted, b'Client Key', digestmod).digest()
+        server_key = hmac.HMAC(salted, b'Server Key', digestmod).digest()
+
+        client_final = bytes(spec['payload'])
+        without_proof, _, proof = client_final.rpartition(b',p=')
+        auth_msg = b','.join((first_bare, server_first, without_proof))
+        stored_key = digestmod(client_key).digest()
+        client_sig = hmac.HMAC(stored_key, auth_msg, digestmod).digest()
+        if standard_b64decode(proof) != auth._xor(client_key, client_sig):
+            raise OperationFailure('Authentication failed.')
+        self.authenticated = True
+        server_sig = standard_b64encode(
+            hmac.HMAC(server_key, auth_msg, digestmod).digest())
+        return {'ok': 1, 'conversationId': 1, 'done': True,
+                'payload': Binary(b'v=' + server_sig)}
+
+
+class MockAuthSocketInfo(SocketInfo):
+    """A SocketInfo whose commands are run by a MockAuthServer."""
+
+    def __init__(self, server):
+        pool = Pool(('localhost', 27017), PoolOptions(), handshake=False)
+        sock, self.peer = socket.socketpair()
+        super(MockAuthSocketInfo, self).__init__(sock, pool, pool.address)
+        self.server = server
+
+    def command(self, dbname, spec, *args, **kwargs):
+        return self.server.handle(dbname, spec)
+
+    def close(self, reason=None):
+        super(MockAuthSocketInfo, self).close(reason)
+        self.peer.close()
+
+
+class MockIsMasterServer(object):
+    """Answers every request on every connection with an ismaster reply."""
+
+    reply = BSON.encode({'ok': 1, 'ismaster': True, 'maxWireVersion': 6})
+
+    def __init__(self):
+        self.listener = socket.socket()
+        self.listener.bind(('localhost', 0))
+        self.listener.listen(5)
+        self.address = self.listener.getsockname()[:2]
+        self.connections = []
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except socket.error:
+                return
+            self.connections.append(conn)
+            thread = threading.Thread(target=self._serve, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def _recv(self, conn, length):
+        data = b''
+        while len(data) < length:
+            chunk = conn.recv(length - len(data))
+            if not chunk:
+                raise socket.error('closed')
+            data += chunk
+        return data
+
+    def _serve(self, conn):
+        try:
+            while True:
+                length, request_id = struct.unpack(
+                    "<ii", self._recv(conn, 8))
+                self._recv(conn, length - 8)
+                body = struct.pack("<iqii", 0, 0, 0, 1) + self.reply
+                conn.sendall(struct.pack(
+                    "<iiii", 16 + len(body), 1, request_id, 1) + body)
+        except socket.error:
+            conn.close()
+
+    def close(self):
+        self.listener.close()
+        for conn in self.connections:
+            conn.close()
@@ -0,0 +1,136 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test adaptive cursor batch sizes without a server."""
+
+import sys
+
+sys.path[0:0] = [""]
+
+from pymongo import MongoClient
+from pymongo.command_cursor import CommandCursor
+from pymongo.cursor import _AdaptiveBatchSize
+from pymongo.errors import InvalidOperation
+from test import unittest
+from test.pymongo_mocks import MockCursorServer
+
+
+class TestAdaptiveBatchSize(unittest.TestCase):
+
+    def test_validation(self):
+        self.assertRaises(ValueError, _AdaptiveBatchSize, 0, None, 1, 10)
+        self.assertRaises(ValueError, _AdaptiveBatchSize, 100, 0, 1, 10)
+        self.assertRaises(ValueError, _AdaptiveBatchSize, 100, None, 0, 10)
+        self.assertRaises(ValueError, _AdaptiveBatchSize, 100, None, 10, 5)
+        self.assertRaises(TypeError, _AdaptiveBatchSize, 100, None, 1.5, 10)
+
+    def test_target_bytes(self):
+        adaptive = _AdaptiveBatchSize(1000, None, 1, 1000)
+        self.assertEqual(7, adaptive.batch_size(7))
+        adaptive.record(100, 10, 1)
+        self.assertEqual(100, adaptive.batch_size(7))
+        # Larger documents make smaller batches.
+        adaptive.record(300, 1, 1)
+        self.assertEqual(6, adaptive.batch_size(7))
+        # An empty batch is not measured.
+        adaptive.record(20, 0, 1)
+        self.assertEqual(6, adaptive.batch_size(7))
+
+    def test_target_latency(self):
+        adaptive = _AdaptiveBatchSize(10 ** 6, 0.1, 1, 1000)
+        adaptive.record(100, 10, 0.01)
+        self.assertEqual(100, adaptive.batch_size(0))
+        adaptive = _AdaptiveBatchSize(500, 0.1, 1, 1000)
+        adaptive.record(100, 10, 0.01)
+        self.assertEqual(50, adaptive.batch_size(0))
+
+    def test_bounds(self):
+        adaptive = _AdaptiveBatchSize(1000, None, 20, 50)
+        adaptive.record(10, 10, 1)
+        self.assertEqual(50, adaptive.batch_size(0))
+        adaptive = _AdaptiveBatchSize(1000, None, 20, 50)
+        adaptive.record(10 ** 6, 10, 1)
+        self.assertEqual(20, adaptive.batch_size(0))
+
+
+class TestCursorAdaptiveBatchSize(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MongoClient(connect=False)
+        self.addCleanup(self.client.close)
+        self.coll = self.client.test.test
+
+    def test_small_documents(self):
+        docs = [{'_id': i} for i in range(5000)]
+        server = MockCursorServer(self.client, docs, 10000)
+        cursor = self.coll.find().batch_size(10).adaptive_batch_size(
+            target_bytes=16 * 1024)
+        self.assertEqual(docs, list(cursor))
+        # The first batch is small, the getMores fill the target size.
+        self.assertEqual(10, server.requested[0])
+        self.assertGreater(server.requested[1], 500)
+        self.assertLess(len(server.requested), 10)
+
+    def test_large_documents(self):
+        docs = [{'_id': i, 'data': 'x' * 10000} for i in range(100)]
+        server = MockCursorServer(self.client, docs, 10000)
+        cursor = self.coll.find().batch_size(20).adaptive_batch_size(
+            target_bytes=50000, min_batch_size=2)
+        self.assertEqual(100, len(list(cursor)))
+        self.assertEqual([20] + [4] * 20, server.requested)
+
+    def test_target_latency(self):
+        docs = [{'_id': i} for i in range(300)]
+        server = MockCursorServer(self.client, docs, 10000, doc_delay=0.001)
+        cursor = self.coll.find().batch_size(20).adaptive_batch_size(
+            target_latency=0.04, max_batch_size=1000)
+        self.assertEqual(docs, list(cursor))
+        # About 40 documents arrive within 0.04 seconds.
+        for batch_size in server.requested[1:]:
+            self.assertGreater(batch_size, 10)
+            self.assertLess(batch_size, 50)
+
+    def test_limit(self):
+        docs = [{'_id': i} for i in range(5000)]
+        server = MockCursorServer(self.client, docs, 10000)
+        cursor = self.coll.find().batch_size(10).limit(100)
+        self.assertEqual(docs[:100], list(cursor.adaptive_batch_size()))
+        self.assertEqual([10, 90], server.requested)
+
+    def test_clone(self):
+        MockCursorServer(self.client, [{'_id': 1}], 10)
+        cursor = self.coll.find().adaptive_batch_size(target_bytes=100)
+        adaptive = cursor.clone()._Cursor__adaptive
+        self.assertEqual(100, adaptive.target_bytes)
+        self.assertIsNot(cursor._Cursor__adaptive, adaptive)
+        list(cursor)
+        self.assertRaises(InvalidOperation, cursor.adaptive_batch_size)
+        self.assertRaises(ValueError, self.coll.find().adaptive_batch_size,
+                          target_bytes=-1)
+
+    def test_command_cursor(self):
+        docs = [{'_id': i} for i in range(5000)]
+        server = MockCursorServer(self.client, docs, 10000)
+        batch, cursor_id = server.next_batch(10)
+        cursor = CommandCursor(
+            self.coll, {'id': cursor_id, 'firstBatch': batch},
+            server.address, batch_size=10)
+        cursor.adaptive_batch_size(target_bytes=16 * 1024)
+        self.assertEqual(docs, list(cursor))
+        self.assertEqual(10, server.requested[0])
+        self.assertGreater(server.requested[1], 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
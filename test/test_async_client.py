@@ -0,0 +1,30 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the asyncio-native AsyncMongoClient."""
+
+import sys
+
+sys.path[0:0] = [""]
+
+from test import unittest
+
+# AsyncMongoClient requires Python 3.5+. The tests use async/await, so they
+# live in a module that older Pythons never import.
+if sys.version_info[:2] >= (3, 5):
+    from test.async_client_tests import *
+
+
+if __name__ == "__main__":
+    unittest.main()
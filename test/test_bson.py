@@ -34,11 +34,12 @@ from bson import (BSON,
                   Regex)
 from bson.binary import Binary, UUIDLegacy
 from bson.code import Code
-from bson.codec_options import CodecOptions
+from bson.codec_options import CodecOptions, DEFAULT_CODEC_OPTIONS
 from bson.int64 import Int64
 from bson.objectid import ObjectId
 from bson.dbref import DBRef
 from bson.py3compat import abc, iteritems, PY3, StringIO, text_type
+from bson.raw_bson import RawBSONDocument
 from bson.son import SON
 from bson.timestamp import Timestamp
 from bson.tz_util import FixedOffset
@@ -283,6 +284,35 @@ class TestBSON(unittest.TestCase):
                             b"\x6f\x20\x77\x6F\x72\x6C\x64\x00\x00"
                             b"\x05\x00\x00\x00\x00"))))
 
+    def test_decode_buffers(self):
+        data = (b"\x1B\x00\x00\x00\x0E\x74\x65\x73\x74"
+                b"\x00\x0C\x00\x00\x00\x68\x65\x6C\x6C"
+                b"\x6f\x20\x77\x6F\x72\x6C\x64\x00\x00"
+                b"\x05\x00\x00\x00\x00")
+        expected = [{"test": u"hello world"}, {}]
+        # Leading garbage, as in a reply's header.
+        view = memoryview(bytearray(b"\xff" * 20 + data))[20:]
+        for buf in (bytearray(data), memoryview(data), view):
+            self.assertEqual(expected, decode_all(buf))
+            self.assertEqual(expected, list(decode_iter(buf)))
+            self.assertEqual(
+                expected[0],
+                bson._bson_to_dict(buf[:27], DEFAULT_CODEC_OPTIONS))
+
+        # Truncated data in a buffer is still invalid.
+        self.assertRaises(InvalidBSON, decode_all, memoryview(data)[:-1])
+        self.assertRaises(InvalidBSON, decode_all, bytearray(data[:-1]))
+
+        # Raw documents are copied out of the buffer.
+        opts = CodecOptions(document_class=RawBSONDocument)
+        docs = decode_all(view, opts)
+        self.assertIsInstance(docs[0].raw, bytes)
+        self.assertEqual(data[:27], docs[0].raw)
+
+    def test_decode_non_buffer(self):
+        self.assertRaises(TypeError, decode_all, 1)
+        self.assertRaises(TypeError, decode_all, None)
+
     def test_invalid_decodes(self):
         # Invalid object size (not enough bytes in document for even
         # an object size of first object.
@@ -0,0 +1,194 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test connection pool events against a minimal fake server."""
+
+import socket
+import sys
+
+sys.path[0:0] = [""]
+
+from pymongo import monitoring
+from pymongo.errors import ConnectionFailure
+from pymongo.monitoring import (ConnectionCheckedInEvent,
+                                ConnectionCheckedOutEvent,
+                                ConnectionCheckOutFailedEvent,
+                                ConnectionCheckOutFailedReason,
+                                ConnectionCheckOutStartedEvent,
+                                ConnectionClosedEvent,
+                                ConnectionClosedReason,
+                                ConnectionCreatedEvent,
+                                ConnectionReadyEvent,
+                                PoolClearedEvent,
+                                PoolCreatedEvent,
+                                _EventListeners)
+from pymongo.pool import Pool, PoolOptions
+from test import unittest
+from test.pymongo_mocks import MockIsMasterServer
+from test.utils import CMAPListener
+
+
+class TestCMAPEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockIsMasterServer()
+        self.addCleanup(self.server.close)
+        self.listener = CMAPListener()
+
+    def create_pool(self, address=None, **kwargs):
+        kwargs['event_listeners'] = _EventListeners([self.listener])
+        return Pool(address or self.server.address, PoolOptions(**kwargs))
+
+    def test_checkout_and_checkin(self):
+        pool = self.create_pool(max_pool_size=5)
+        self.assertEqual([PoolCreatedEvent], self.listener.event_types())
+        self.assertEqual(
+            {'maxPoolSize': 5}, self.listener.events[0].options)
+        self.assertEqual(self.server.address, self.listener.events[0].address)
+
+        for _ in range(2):
+            with pool.get_socket({}) as sock_info:
+                self.assertEqual(1, sock_info.id)
+        self.assertEqual([PoolCreatedEvent,
+                          ConnectionCheckOutStartedEvent,
+                          ConnectionCreatedEvent,
+                          ConnectionReadyEvent,
+                          ConnectionCheckedOutEvent,
+                          ConnectionCheckedInEvent,
+                          ConnectionCheckOutStartedEvent,
+                          ConnectionCheckedOutEvent,
+                          ConnectionCheckedInEvent],
+                         self.listener.event_types())
+        for event in self.listener.events[2:]:
+            self.assertEqual(self.server.address, event.address)
+            if hasattr(event, 'connection_id'):
+                self.assertEqual(1, event.connection_id)
+
+    def test_reset(self):
+        pool = self.create_pool()
+        with pool.get_socket({}):
+            pass
+        del self.listener.events[:]
+        pool.reset()
+        self.assertEqual([PoolClearedEvent, ConnectionClosedEvent],
+                         self.listener.event_types())
+        self.assertEqual(ConnectionClosedReason.STALE,
+                         self.listener.events[1].reason)
+
+        # A socket checked out before the reset is closed when returned.
+        pool = self.create_pool()
+        sock_info = pool._get_socket_no_auth()
+        pool.reset()
+        del self.listener.events[:]
+        pool.return_socket(sock_info)
+        self.assertEqual([ConnectionCheckedInEvent, ConnectionClosedEvent],
+                         self.listener.event_types())
+        self.assertEqual(ConnectionClosedReason.STALE,
+                         self.listener.events[1].reason)
+
+    def test_idle(self):
+        pool = self.create_pool(max_idle_time_seconds=0)
+        with pool.get_socket({}):
+            pass
+        with pool.get_socket({}) as sock_info:
+            self.assertEqual(2, sock_info.id)
+        closed = [event for event in self.listener.events
+                  if isinstance(event, ConnectionClosedEvent)]
+        self.assertEqual(1, len(closed))
+        self.assertEqual(1, closed[0].connection_id)
+        self.assertEqual(ConnectionClosedReason.IDLE, closed[0].reason)
+
+    def test_checkout_timeout(self):
+        pool = self.create_pool(max_pool_size=1, wait_queue_timeout=0.01)
+        with pool.get_socket({}):
+            with self.assertRaises(ConnectionFailure):
+                with pool.get_socket({}):
+                    pass
+        failed = self.listener.events[-2]
+        self.assertIsInstance(failed, ConnectionCheckOutFailedEvent)
+        self.assertEqual(ConnectionCheckOutFailedReason.TIMEOUT,
+                         failed.reason)
+
+    def test_connection_error(self):
+        # Connections to a bound socket that isn't listening are refused.
+        sock = socket.socket()
+        self.addCleanup(sock.close)
+        sock.bind(('localhost', 0))
+        pool = self.create_pool(sock.getsockname()[:2], connect_timeout=1)
+        with self.assertRaises(ConnectionFailure):
+            with pool.get_socket({}):
+                pass
+        self.assertEqual([PoolCreatedEvent,
+                          ConnectionCheckOutStartedEvent,
+                          ConnectionCreatedEvent,
+                          ConnectionClosedEvent,
+                          ConnectionCheckOutFailedEvent],
+                         self.listener.event_types())
+        self.assertEqual(ConnectionClosedReason.ERROR,
+                         self.listener.events[3].reason)
+        self.assertEqual(ConnectionCheckOutFailedReason.CONN_ERROR,
+                         self.listener.events[4].reason)
+
+    def test_socket_error(self):
+        pool = self.create_pool()
+        with pool.get_socket({}) as sock_info:
+            sock_info.sock.close()
+            with self.assertRaises(ConnectionFailure):
+                sock_info.command('admin', {'ismaster': 1})
+        closed = self.listener.events[-2]
+        self.assertIsInstance(closed, ConnectionClosedEvent)
+        self.assertEqual(ConnectionClosedReason.ERROR, closed.reason)
+        # The event is only published once.
+        sock_info.close(ConnectionClosedReason.ERROR)
+        self.assertIsInstance(self.listener.events[-1],
+                              ConnectionCheckedInEvent)
+
+    def test_disabled(self):
+        pool = Pool(self.server.address, PoolOptions(
+            event_listeners=_EventListeners([])))
+        self.assertFalse(pool.enabled_for_cmap)
+        with pool.get_socket({}) as sock_info:
+            self.assertFalse(sock_info.enabled_for_cmap)
+
+        # Monitors don't publish pool events.
+        pool = Pool(self.server.address, PoolOptions(
+            event_listeners=_EventListeners([self.listener])),
+            handshake=False)
+        self.assertFalse(pool.enabled_for_cmap)
+        with pool.get_socket({}):
+            pass
+        self.assertEqual([], self.listener.events)
+
+    def test_register(self):
+        saved_listeners = monitoring._LISTENERS
+        monitoring._LISTENERS = monitoring._Listeners([], [], [], [], [])
+        try:
+            monitoring.register(self.listener)
+            self.assertTrue(_EventListeners(None).enabled_for_cmap)
+            self.assertEqual([self.listener],
+                             _EventListeners(None).event_listeners()[4])
+        finally:
+            monitoring._LISTENERS = saved_listeners
+
+    def test_listeners_without_cmap(self):
+        # Each _Listeners built without cmap_listeners gets its own list.
+        listeners = monitoring._Listeners([], [], [], [])
+        self.assertEqual([], listeners.cmap_listeners)
+        listeners.cmap_listeners.append(self.listener)
+        self.assertEqual(
+            [], monitoring._Listeners([], [], [], []).cmap_listeners)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test wire protocol compression contexts."""
+
+import os
+import struct
+import sys
+
+sys.path[0:0] = [""]
+
+from bson.son import SON
+from pymongo import MongoClient, message
+from pymongo.compression_support import (_HAVE_ZSTD,
+                                         _RATIO_SAMPLES,
+                                         _SKIP_MESSAGES,
+                                         COMPRESSION_MIN_SIZE,
+                                         CompressionPolicy,
+                                         CompressionSettings,
+                                         CompressionStats,
+                                         ZlibContext,
+                                         ZstdContext,
+                                         decompress,
+                                         validate_zstd_compression_level)
+from test import unittest
+
+
+@unittest.skipUnless(_HAVE_ZSTD, "zstandard is not installed")
+class TestZstd(unittest.TestCase):
+
+    data = b'mongodb ' * 10000
+
+    def test_context(self):
+        settings = CompressionSettings(['zstd', 'zlib'], -1, 5)
+        ctx = settings.get_compression_context(['zstd'])
+        self.assertIsInstance(ctx, ZstdContext)
+        self.assertEqual(3, ctx.compressor_id)
+        # The contexts are reused for every message.
+        compressor = ctx.compressor
+        for _ in range(3):
+            compressed = ctx.compress(self.data)
+            self.assertLess(len(compressed), len(self.data))
+            self.assertEqual(self.data, decompress(compressed, 3, ctx))
+        self.assertIs(compressor, ctx.compressor)
+        # Another connection's context, or none, can decompress too.
+        self.assertEqual(self.data, decompress(compressed, 3))
+
+    def test_decompress_into(self):
+        ctx = ZstdContext(1)
+        out = bytearray(len(self.data) + 100)
+        view = decompress(memoryview(ctx.compress(self.data)), 3, ctx, out)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(len(self.data), len(view))
+        self.assertEqual(self.data, out[:len(self.data)])
+
+    def test_level(self):
+        self.assertEqual(1, validate_zstd_compression_level('level', '1'))
+        self.assertEqual(22, validate_zstd_compression_level('level', 22))
+        self.assertRaises(ValueError, validate_zstd_compression_level,
+                          'level', 0)
+        self.assertRaises(ValueError, validate_zstd_compression_level,
+                          'level', 23)
+        self.assertRaises(TypeError, validate_zstd_compression_level,
+                          'level', 'max')
+
+
+class TestCompressionPolicy(unittest.TestCase):
+
+    shape = ('insert', 'coll')
+
+    def setUp(self):
+        self.stats = CompressionStats()
+        self.ctx = ZlibContext(-1)
+        self.ctx.policy = CompressionPolicy(100, self.stats)
+
+    def opcode(self, msg):
+        return struct.unpack("<i", msg[12:16])[0]
+
+    def test_settings(self):
+        settings = CompressionSettings(['zlib'], -1)
+        self.assertEqual(COMPRESSION_MIN_SIZE, settings.compression_min_size)
+        ctx = settings.get_compression_context(['zlib'])
+        self.assertIsInstance(ctx.policy, CompressionPolicy)
+        self.assertIs(settings.stats, ctx.policy.stats)
+        # Each connection has its own policy.
+        self.assertIsNot(
+            ctx.policy, settings.get_compression_context(['zlib']).policy)
+        self.assertIsNone(settings.get_compression_context([]))
+
+    def test_client_options(self):
+        client = MongoClient(connect=False, compressors='zlib')
+        settings = client._topology_settings.pool_options.compression_settings
+        self.assertEqual(COMPRESSION_MIN_SIZE, settings.compression_min_size)
+        self.assertEqual({}, client.compression_stats())
+        client = MongoClient(
+            'mongodb://localhost/?compressors=zlib&compressionMinSize=0',
+            connect=False)
+        settings = client._topology_settings.pool_options.compression_settings
+        self.assertEqual(0, settings.compression_min_size)
+        self.assertRaises(ValueError, MongoClient, connect=False,
+                          compressionMinSize=-1)
+
+    def test_min_size(self):
+        _, msg = message._compress(2013, b'x' * 99, self.ctx, self.shape)
+        self.assertEqual(2013, self.opcode(msg))
+        _, msg = message._compress(2013, b'x' * 100, self.ctx, self.shape)
+        self.assertEqual(2012, self.opcode(msg))
+        stats = self.stats.snapshot()['insert']
+        self.assertEqual(1, stats['compressed'])
+        self.assertEqual(1, stats['uncompressed'])
+        self.assertEqual(100, stats['bytes_in'])
+        self.assertLess(stats['bytes_out'], 100)
+        self.assertEqual(
+            float(stats['bytes_out']) / 100, stats['ratio'])
+        self.assertGreaterEqual(stats['compression_time'], 0)
+
+    def test_incompressible_shape(self):
+        policy = self.ctx.policy
+        chunk = os.urandom(1000)
+        for _ in range(_RATIO_SAMPLES):
+            self.assertTrue(policy.should_compress(self.shape, len(chunk)))
+            _, msg = message._compress(2013, chunk, self.ctx, self.shape)
+            # Messages that grow are sent uncompressed.
+            self.assertEqual(2013, self.opcode(msg))
+        # The shape is no longer compressed, other shapes still are.
+        self.assertFalse(policy.should_compress(self.shape, len(chunk)))
+        self.assertTrue(policy.should_compress(('insert', 'other'), 1000))
+        for _ in range(_SKIP_MESSAGES - 1):
+            self.assertIsNone(policy.compress(self.ctx, self.shape, chunk))
+        # Then the shape is sampled again.
+        data = b'x' * 1000
+        self.assertIsNotNone(policy.compress(self.ctx, self.shape, data))
+        stats = self.stats.snapshot()['insert']
+        self.assertEqual(1, stats['compressed'])
+        self.assertEqual(_RATIO_SAMPLES + _SKIP_MESSAGES,
+                         stats['uncompressed'])
+
+    def test_compressible_shape(self):
+        policy = self.ctx.policy
+        for _ in range(_RATIO_SAMPLES * 2):
+            self.assertIsNotNone(
+                policy.compress(self.ctx, self.shape, b'x' * 1000))
+        self.assertEqual(
+            _RATIO_SAMPLES * 2, self.stats.snapshot()['insert']['compressed'])
+
+    def test_no_policy(self):
+        ctx = ZlibContext(-1)
+        _, msg = message._compress(2013, b'x', ctx, self.shape)
+        self.assertEqual(2012, self.opcode(msg))
+
+    def test_command_shape(self):
+        self.assertEqual(('insert', 'fs.chunks'), message._command_shape(
+            SON([('insert', 'fs.chunks'), ('ordered', True)])))
+        self.assertEqual(('getMore', 'coll'), message._command_shape(
+            SON([('getMore', 42), ('collection', 'coll')])))
+        self.assertEqual(('ping', None), message._command_shape({'ping': 1}))
+        self.assertEqual(('find', 'coll'), message._command_shape(
+            SON([('$query', {'find': 'coll'}), ('$readPreference', {})])))
+
+    def test_op_msg(self):
+        cmd = SON([('insert', 'coll'), ('documents', [{'x': 'y' * 2000}])])
+        _, msg, _, _ = message._op_msg(
+            0, cmd, 'db', message.ReadPreference.PRIMARY, False, False,
+            message.DEFAULT_CODEC_OPTIONS, self.ctx)
+        self.assertEqual(2012, self.opcode(msg))
+        _, msg, _, _ = message._op_msg(
+            0, SON([('ping', 1)]), 'db', message.ReadPreference.PRIMARY,
+            False, False, message.DEFAULT_CODEC_OPTIONS, self.ctx)
+        self.assertEqual(2013, self.opcode(msg))
+        self.assertEqual(['insert', 'ping'],
+                         sorted(self.stats.snapshot()))
+
+
+if __name__ == "__main__":
+    unittest.main()
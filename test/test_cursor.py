@@ -18,17 +18,19 @@ import gc
 import itertools
 import random
 import re
+import struct
 import sys
 import time
 import threading
 
 sys.path[0:0] = [""]
 
-from bson import decode_all
+from bson import BSON, decode_all
 from bson.code import Code
 from bson.py3compat import PY3
 from bson.son import SON
-from pymongo import (monitoring,
+from pymongo import (message,
+                     monitoring,
                      ASCENDING,
                      DESCENDING,
                      ALL,
@@ -38,13 +40,15 @@ from pymongo.cursor import CursorType
 from pymongo.errors import (ConfigurationError,
                             ExecutionTimeout,
                             InvalidOperation,
-                            OperationFailure)
+                            OperationFailure,
+                            ProtocolError)
 from pymongo.read_concern import ReadConcern
 from test import (client_context,
                   SkipTest,
                   unittest,
                   IntegrationTest, Version)
 from test.utils import (EventListener,
+                        get_pool,
                         ignore_deprecations,
                         rs_or_single_client,
                         WhiteListEventListener)
@@ -1375,6 +1379,128 @@ class TestCursor(IntegrationTest):
         else:
             self.assertEqual(0, len(results["started"]))
 
+    @client_context.require_version_min(4, 1, 8)
+    @client_context.require_no_mongos
+    def test_exhaust_op_msg(self):
+        self.db.test.drop()
+        self.db.test.insert_many([{'i': i} for i in range(150)])
+        listener = WhiteListEventListener("getMore")
+        client = rs_or_single_client(
+            maxPoolSize=1, event_listeners=[listener])
+        self.addCleanup(client.close)
+        socks = get_pool(client).sockets
+
+        cursor = client[self.db.name].test.find(
+            cursor_type=CursorType.EXHAUST, batch_size=10)
+        self.assertEqual(list(range(150)), [doc['i'] for doc in cursor])
+        self.assertEqual(1, len(socks))
+
+        # Only one getMore was sent, the rest were streamed. Each streamed
+        # batch is published as a getMore with request id 0.
+        started = listener.results['started']
+        self.assertEqual(14, len(started))
+        self.assertEqual(1, len([e for e in started if e.request_id]))
+        self.assertEqual(14, len(listener.results['succeeded']))
+
+    @client_context.require_version_min(4, 1, 8)
+    @client_context.require_no_mongos
+    def test_exhaust_op_msg_close(self):
+        self.db.test.drop()
+        self.db.test.insert_many([{'i': i} for i in range(150)])
+        client = rs_or_single_client(maxPoolSize=1)
+        self.addCleanup(client.close)
+        pool = get_pool(client)
+
+        # Close after the find, before streaming starts.
+        cursor = client[self.db.name].test.find(
+            cursor_type=CursorType.EXHAUST, batch_size=10)
+        next(cursor)
+        sock_info = cursor._Cursor__exhaust_mgr.sock
+        cursor.close()
+        self.assertFalse(sock_info.closed)
+        self.assertIn(sock_info, pool.sockets)
+
+        # Close while the server is streaming, the socket must be discarded.
+        cursor = client[self.db.name].test.find(
+            cursor_type=CursorType.EXHAUST, batch_size=10)
+        for _ in range(15):
+            next(cursor)
+        sock_info = cursor._Cursor__exhaust_mgr.sock
+        self.assertTrue(cursor._Cursor__exhaust_mgr.more_to_come)
+        cursor.close()
+        self.assertTrue(sock_info.closed)
+        self.assertEqual(150, client[self.db.name].test.count_documents({}))
+
+
+class TestOpMsgExhaustMessages(unittest.TestCase):
+
+    def _op_msg(self, flags, doc):
+        return struct.pack("<IB", flags, 0) + BSON.encode(doc)
+
+    def test_unpack_more_to_come(self):
+        reply = message._OpMsg.unpack(self._op_msg(0, {'ok': 1}))
+        self.assertFalse(reply.more_to_come)
+        reply = message._OpMsg.unpack(
+            self._op_msg(message._OpMsg.MORE_TO_COME, {'ok': 1}))
+        self.assertTrue(reply.more_to_come)
+        self.assertEqual({'ok': 1}, reply.command_response())
+
+    def test_unpack_unsupported_flags(self):
+        for flags in (message._OpMsg.CHECKSUM_PRESENT, 1 << 3):
+            self.assertRaises(ProtocolError, message._OpMsg.unpack,
+                              self._op_msg(flags, {'ok': 1}))
+
+    def test_get_more_exhaust_allowed(self):
+        class SockInfo(object):
+            max_wire_version = 8
+            op_msg_enabled = True
+            compression_context = None
+
+            def validate_session(self, client, session):
+                pass
+
+            def send_cluster_time(self, command, session, client):
+                pass
+
+        sock_info = SockInfo()
+        for exhaust in (False, True):
+            get_more = message._GetMore(
+                'db', 'coll', 0, 1234, message._UNICODE_REPLACE_CODEC_OPTIONS,
+                None, None, None, exhaust=exhaust)
+            self.assertTrue(get_more.use_command(sock_info, exhaust))
+            _, msg, _ = get_more.get_message(False, sock_info, True)
+            flags = struct.unpack("<I", msg[16:20])[0]
+            self.assertEqual(exhaust, bool(
+                flags & message._OpMsg.EXHAUST_ALLOWED))
+
+        # Older servers only support legacy exhaust cursors.
+        sock_info.max_wire_version = 7
+        self.assertFalse(get_more.use_command(sock_info, True))
+
+
+class TestReplyBuffers(unittest.TestCase):
+
+    def test_op_msg_unpack_buffer(self):
+        data = bytearray(struct.pack("<IB", 0, 0) + BSON.encode({'ok': 1}))
+        reply = message._OpMsg.unpack(memoryview(data))
+        if PY3:
+            # The payload is a view of the receive buffer, not a copy.
+            self.assertIsInstance(reply.payload_document, memoryview)
+        self.assertEqual({'ok': 1}, reply.command_response())
+
+    def test_op_reply_unpack_buffer(self):
+        docs = [{'_id': i} for i in range(3)]
+        data = bytearray(struct.pack("<iqii", 0, 0, 0, len(docs)) +
+                         b''.join(BSON.encode(doc) for doc in docs))
+        reply = message._OpReply.unpack(memoryview(data))
+        if PY3:
+            self.assertIsInstance(reply.documents, memoryview)
+        self.assertEqual(docs, reply.unpack_response())
+        # Raw batches are always bytes.
+        raw = reply.raw_response()[0]
+        self.assertIsInstance(raw, bytes)
+        self.assertEqual(docs, decode_all(raw))
+
 
 class TestRawBatchCursor(IntegrationTest):
     def test_find_raw(self):
@@ -0,0 +1,146 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test iterating cursors a batch at a time without a server."""
+
+import sys
+
+sys.path[0:0] = [""]
+
+from bson import BSON, decode_all
+from bson.raw_bson import RawBSONDocument
+from bson.son import SON
+from pymongo import MongoClient
+from pymongo.command_cursor import CommandCursor
+from pymongo.errors import InvalidOperation, OperationFailure
+from pymongo.son_manipulator import SONManipulator
+from test import unittest
+from test.pymongo_mocks import MockCursorServer
+from test.utils import ignore_deprecations
+
+
+class AddField(SONManipulator):
+    def will_copy(self):
+        return True
+
+    def transform_outgoing(self, son, collection):
+        son = SON(son)
+        son['added'] = True
+        return son
+
+
+class TestCursorBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MongoClient(connect=False)
+        self.addCleanup(self.client.close)
+        self.coll = self.client.test.test
+        self.docs = [{'_id': i} for i in range(25)]
+        self.server = MockCursorServer(self.client, self.docs, 10)
+
+    def command_cursor(self):
+        batch, cursor_id = self.server.next_batch()
+        return CommandCursor(
+            self.coll, {'id': cursor_id, 'firstBatch': batch},
+            self.server.address, batch_size=10)
+
+    def test_iter_batches(self):
+        cursor = self.coll.find().batch_size(10)
+        batches = list(cursor.iter_batches())
+        self.assertEqual(
+            [self.docs[:10], self.docs[10:20], self.docs[20:]], batches)
+        self.assertFalse(cursor.alive)
+
+    def test_iter_batches_after_next(self):
+        cursor = self.coll.find().batch_size(10)
+        self.assertEqual(self.docs[0], next(cursor))
+        batches = cursor.iter_batches()
+        self.assertEqual(self.docs[1:10], next(batches))
+        self.assertEqual(self.docs[10], next(cursor))
+        self.assertEqual(self.docs[11:20], next(batches))
+        self.assertEqual([self.docs[20:]], list(batches))
+
+    def test_raw(self):
+        cursor = self.coll.find().batch_size(10)
+        batches = list(cursor.iter_batches(raw=True))
+        self.assertEqual(3, len(batches))
+        self.assertEqual(b"".join(BSON.encode(doc) for doc in self.docs[:10]),
+                         batches[0])
+        self.assertEqual(self.docs, decode_all(b"".join(batches)))
+        self.server.position = 0
+        cursor = self.coll.find()
+        next(cursor)
+        self.assertRaises(InvalidOperation, cursor.iter_batches, raw=True)
+
+    def test_raw_then_next(self):
+        cursor = self.coll.find().batch_size(10)
+        batches = cursor.iter_batches(raw=True)
+        next(batches)
+        doc = next(cursor)
+        self.assertIsInstance(doc, RawBSONDocument)
+        self.assertEqual(10, doc['_id'])
+
+    @ignore_deprecations
+    def test_manipulators(self):
+        self.coll.database.add_son_manipulator(AddField())
+        batch = next(self.coll.find().iter_batches())
+        self.assertTrue(all(doc['added'] for doc in batch))
+        self.server.position = 0
+        docs = self.coll.find(manipulate=False).to_list()
+        self.assertEqual(self.docs, docs)
+        self.server.position = 0
+        batch = next(self.coll.find().iter_batches(raw=True))
+        self.assertEqual(b"".join(BSON.encode(doc) for doc in self.docs[:10]),
+                         batch)
+
+    def test_to_list(self):
+        cursor = self.coll.find().batch_size(10)
+        self.assertEqual([], cursor.to_list(0))
+        self.assertEqual(self.docs[:5], cursor.to_list(5))
+        self.assertEqual(self.docs[5:17], cursor.to_list(12))
+        self.assertEqual(self.docs[17:], cursor.to_list())
+        self.assertEqual([], cursor.to_list())
+        self.assertRaises(ValueError, cursor.to_list, -1)
+        self.assertEqual([], self.coll.find()[5:5].to_list())
+
+    def test_to_list_limit(self):
+        cursor = self.coll.find().batch_size(10).limit(15)
+        self.assertEqual(self.docs[:15], cursor.to_list(100))
+        self.assertEqual([self.server.cursor_id], self.server.killed)
+
+    def test_error(self):
+        self.server.fail_at = 2
+        batches = self.coll.find().batch_size(10).iter_batches()
+        self.assertEqual(self.docs[:10], next(batches))
+        self.assertEqual(self.docs[10:20], next(batches))
+        self.assertRaises(OperationFailure, next, batches)
+
+    def test_command_cursor(self):
+        self.assertEqual(
+            [self.docs[:10], self.docs[10:20], self.docs[20:]],
+            list(self.command_cursor().iter_batches()))
+        self.server.position = 0
+        cursor = self.command_cursor()
+        self.assertEqual(self.docs[:15], cursor.to_list(15))
+        self.assertEqual(self.docs[15:], cursor.to_list())
+
+    def test_command_cursor_raw(self):
+        cursor = self.command_cursor()
+        batches = list(cursor.iter_batches(raw=True))
+        self.assertEqual(3, len(batches))
+        self.assertEqual(self.docs, decode_all(b"".join(batches)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test prefetching cursor batches without a server."""
+
+import gc
+import sys
+import time
+
+sys.path[0:0] = [""]
+
+from pymongo import MongoClient
+from pymongo.client_session import (ClientSession,
+                                    SessionOptions,
+                                    _ServerSession)
+from pymongo.command_cursor import CommandCursor
+from pymongo.errors import InvalidOperation, OperationFailure
+from test import unittest
+from test.pymongo_mocks import MockCursorServer
+from test.utils import wait_until
+
+
+class TestCursorPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MongoClient(connect=False)
+        self.addCleanup(self.client.close)
+        self.coll = self.client.test.test
+        self.docs = [{'_id': i} for i in range(100)]
+
+    def server(self, **kwargs):
+        return MockCursorServer(self.client, self.docs, 10, **kwargs)
+
+    def test_prefetch(self):
+        server = self.server()
+        cursor = self.coll.find().batch_size(10).prefetch(3)
+        self.assertEqual(self.docs, list(cursor))
+        self.assertEqual(9, server.get_mores)
+        self.assertFalse(cursor.alive)
+        self.assertEqual([], server.killed)
+
+    def test_batches_ahead(self):
+        server = self.server()
+        cursor = self.coll.find().batch_size(10).prefetch(2)
+        self.assertEqual(self.docs[0], next(cursor))
+        # The next batches are fetched while the first one is iterated.
+        wait_until(lambda: server.get_mores == 2, 'prefetch 2 batches')
+        time.sleep(0.1)
+        self.assertEqual(2, server.get_mores)
+        for _ in range(10):
+            next(cursor)
+        wait_until(lambda: server.get_mores == 3, 'prefetch a batch')
+        time.sleep(0.1)
+        self.assertEqual(3, server.get_mores)
+        self.assertEqual(self.docs[11:], list(cursor))
+
+    def test_limit(self):
+        server = self.server()
+        cursor = self.coll.find().batch_size(10).limit(25).prefetch(5)
+        self.assertEqual(self.docs[:25], list(cursor))
+        self.assertEqual(2, server.get_mores)
+        self.assertEqual([server.cursor_id], server.killed)
+
+    def test_error(self):
+        self.server(fail_at=3)
+        cursor = self.coll.find().batch_size(10).prefetch(4)
+        docs = []
+        with self.assertRaises(OperationFailure):
+            for doc in cursor:
+                docs.append(doc)
+        # Batches fetched before the error were returned first.
+        self.assertEqual(self.docs[:30], docs)
+        self.assertFalse(cursor.alive)
+
+    def test_close(self):
+        server = self.server(delay=0.05)
+        cursor = self.coll.find().batch_size(10).prefetch(2)
+        next(cursor)
+        cursor.close()
+        get_mores = server.get_mores
+        self.assertEqual([server.cursor_id], server.killed)
+        # Only the batch already returned is left.
+        self.assertEqual(self.docs[1:10], list(cursor))
+        time.sleep(0.1)
+        self.assertEqual(get_mores, server.get_mores)
+
+    def test_rewind(self):
+        server = self.server()
+        cursor = self.coll.find().batch_size(10).prefetch(2)
+        next(cursor)
+        cursor.rewind()
+        server.position = 0
+        self.assertEqual(self.docs, list(cursor))
+
+    def test_garbage_collected(self):
+        server = self.server()
+        cursor = self.coll.find().batch_size(10).prefetch(1)
+        next(cursor)
+        wait_until(lambda: server.get_mores == 1, 'send a getMore')
+        del cursor
+        gc.collect()
+        wait_until(lambda: server.killed == [server.cursor_id],
+                   'kill the cursor')
+        time.sleep(0.1)
+        self.assertEqual(1, server.get_mores)
+
+    def test_validation(self):
+        self.server()
+        self.assertRaises(TypeError, self.coll.find().prefetch, 1.5)
+        self.assertRaises(ValueError, self.coll.find().prefetch, -1)
+        cursor = self.coll.find()
+        next(cursor)
+        self.assertRaises(InvalidOperation, cursor.prefetch, 1)
+        clone = self.coll.find().prefetch(3).clone()
+        self.assertEqual(3, clone._Cursor__prefetch)
+
+    def test_explicit_session(self):
+        self.server()
+        session = ClientSession(self.client, _ServerSession(),
+                                SessionOptions(), None, False)
+        cursor = self.coll.find(session=session).batch_size(10)
+        self.assertRaises(InvalidOperation, cursor.prefetch, 2)
+        # The cursor still works, fetching each batch when it is needed.
+        self.assertEqual(self.docs, list(cursor.prefetch(0)))
+        cursor = CommandCursor(
+            self.coll, {'id': 42, 'firstBatch': []}, ('localhost', 27017),
+            session=session, explicit_session=True)
+        self.assertRaises(InvalidOperation, cursor.prefetch, 2)
+        session.start_transaction()
+        self.assertRaises(InvalidOperation,
+                          self.coll.find(session=session).prefetch, 1)
+
+    def test_command_cursor(self):
+        server = self.server()
+        batch, cursor_id = server.next_batch()
+        cursor = CommandCursor(
+            self.coll, {'id': cursor_id, 'firstBatch': batch},
+            server.address, batch_size=10)
+        cursor.prefetch(2)
+        self.assertRaises(InvalidOperation, cursor.prefetch, 1)
+        # Prefetching starts with the first getMore.
+        wait_until(lambda: server.get_mores == 2, 'prefetch 2 batches')
+        self.assertEqual(self.docs, list(cursor))
+        self.assertEqual(9, server.get_mores)
+        self.assertFalse(cursor.alive)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test staggered parallel connection attempts."""
+
+import errno
+import socket
+import sys
+import time
+
+sys.path[0:0] = [""]
+
+from pymongo import pool
+from pymongo.pool import (_create_connection,
+                          _order_addresses,
+                          _preferred_addresses,
+                          PoolOptions)
+from test import unittest
+
+# Connection attempts to this address hang until they time out.
+BLACKHOLE = '192.0.2.1'
+
+
+class FakeSocket(object):
+    """Wraps a socket, connection attempts to BLACKHOLE never finish."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.peer = None
+
+    def connect_ex(self, address):
+        if address[0] != BLACKHOLE:
+            return self.sock.connect_ex(address)
+        self.sock.close()
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        # Fill the send buffer so the socket never polls as writable.
+        try:
+            while True:
+                self.sock.send(b'x' * 65536)
+        except socket.error:
+            pass
+        return errno.EINPROGRESS
+
+    def close(self):
+        self.sock.close()
+        if self.peer is not None:
+            self.peer.close()
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+def _info(family, ip, port=27017):
+    if family == socket.AF_INET6:
+        return (family, socket.SOCK_STREAM, 6, '', (ip, port, 0, 0))
+    return (family, socket.SOCK_STREAM, 6, '', (ip, port))
+
+
+class TestOrderAddresses(unittest.TestCase):
+
+    def setUp(self):
+        _preferred_addresses.clear()
+        self.addCleanup(_preferred_addresses.clear)
+
+    def test_interleave_families(self):
+        infos = [_info(socket.AF_INET6, '::1'),
+                 _info(socket.AF_INET6, '::2'),
+                 _info(socket.AF_INET, '1.1.1.1'),
+                 _info(socket.AF_INET, '2.2.2.2')]
+        ordered = _order_addresses(('host', 27017), infos)
+        self.assertEqual(['::1', '1.1.1.1', '::2', '2.2.2.2'],
+                         [info[4][0] for info in ordered])
+
+    def test_preferred_address(self):
+        infos = [_info(socket.AF_INET6, '::1'),
+                 _info(socket.AF_INET6, '::2'),
+                 _info(socket.AF_INET, '1.1.1.1'),
+                 _info(socket.AF_INET, '2.2.2.2')]
+        _preferred_addresses[('host', 27017)] = (socket.AF_INET, '2.2.2.2')
+        ordered = _order_addresses(('host', 27017), infos)
+        self.assertEqual(['2.2.2.2', '::1', '1.1.1.1', '::2'],
+                         [info[4][0] for info in ordered])
+        # Other hosts are unaffected.
+        ordered = _order_addresses(('other', 27017), infos)
+        self.assertEqual('::1', ordered[0][4][0])
+
+
+class TestStaggeredConnect(unittest.TestCase):
+
+    def setUp(self):
+        _preferred_addresses.clear()
+        self.addCleanup(_preferred_addresses.clear)
+        self.listener = socket.socket()
+        self.addCleanup(self.listener.close)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(5)
+        self.port = self.listener.getsockname()[1]
+
+    def patch_getaddrinfo(self, infos):
+        original_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = lambda *args, **kwargs: infos
+        original_new_socket = pool._new_socket
+
+        def new_socket(*args):
+            return FakeSocket(original_new_socket(*args))
+        pool._new_socket = new_socket
+
+        def restore():
+            socket.getaddrinfo = original_getaddrinfo
+            pool._new_socket = original_new_socket
+        self.addCleanup(restore)
+
+    def test_unreachable_first_address(self):
+        self.patch_getaddrinfo([
+            _info(socket.AF_INET, BLACKHOLE, self.port),
+            _info(socket.AF_INET, '127.0.0.1', self.port)])
+        start = time.time()
+        sock = _create_connection(('host', self.port),
+                                  PoolOptions(connect_timeout=10))
+        self.addCleanup(sock.close)
+        # Much less than connectTimeoutMS.
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(('127.0.0.1', self.port), sock.getpeername())
+        self.assertEqual(10, sock.gettimeout())
+        self.assertEqual((socket.AF_INET, '127.0.0.1'),
+                         _preferred_addresses[('host', self.port)])
+
+        # The next connection tries the address that worked first.
+        original = pool._CONNECTION_ATTEMPT_DELAY
+        pool._CONNECTION_ATTEMPT_DELAY = 10
+        self.addCleanup(setattr, pool, '_CONNECTION_ATTEMPT_DELAY', original)
+        start = time.time()
+        sock = _create_connection(('host', self.port),
+                                  PoolOptions(connect_timeout=10))
+        self.addCleanup(sock.close)
+        self.assertLess(time.time() - start, 5)
+
+    def test_all_fail(self):
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        closed_port = closed.getsockname()[1]
+        closed.close()
+        self.patch_getaddrinfo([
+            _info(socket.AF_INET, BLACKHOLE, closed_port),
+            _info(socket.AF_INET, '127.0.0.1', closed_port)])
+        start = time.time()
+        with self.assertRaises(socket.error):
+            _create_connection(('host', closed_port),
+                               PoolOptions(connect_timeout=0.5))
+        self.assertLess(time.time() - start, 5)
+        self.assertNotIn(('host', closed_port), _preferred_addresses)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test lazily decoded cursor batches without a server."""
+
+import struct
+import sys
+
+sys.path[0:0] = [""]
+
+import bson
+
+from bson import BSON, decode_all
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidBSON
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS, RawBSONDocument
+from bson.son import SON
+from pymongo import MongoClient
+from pymongo.command_cursor import CommandCursor
+from pymongo.errors import InvalidOperation
+from pymongo.message import _LazyBatch, _OpMsg, _OpReply
+from test import unittest
+from test.pymongo_mocks import MockCursorServer
+
+
+class CountDecodes(object):
+    """Counts the documents decoded with bson._bson_to_dict."""
+
+    def __init__(self, test):
+        self.count = 0
+        original = bson._bson_to_dict
+
+        def bson_to_dict(data, opts):
+            self.count += 1
+            return original(data, opts)
+
+        bson._bson_to_dict = bson_to_dict
+        test.addCleanup(setattr, bson, '_bson_to_dict', original)
+
+
+class TestLazyResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.docs = [{'_id': i, 'sub': {'a': [1, {'b': 'c'}]}}
+                     for i in range(5)]
+
+    def test_op_msg(self):
+        reply = {'cursor': {'id': 7, 'ns': 'db.coll',
+                            'nextBatch': self.docs},
+                 'ok': 1.0, 'operationTime': 5}
+        msg = _OpMsg(0, memoryview(BSON.encode(reply)))
+        docs = msg.lazy_response(None, CodecOptions())
+        self.assertEqual(1, len(docs))
+        cursor = docs[0]['cursor']
+        self.assertEqual(7, cursor['id'])
+        self.assertEqual(5, docs[0]['operationTime'])
+        batch = cursor['nextBatch']
+        self.assertIsInstance(batch, _LazyBatch)
+        self.assertEqual(5, len(batch))
+        self.assertEqual(self.docs[2], batch[2])
+        self.assertEqual(self.docs, list(batch))
+        self.assertEqual(self.docs[0], batch.popleft())
+        self.assertEqual(4, len(batch))
+        self.assertEqual(self.docs[1:], decode_all(batch.raw()))
+
+    def test_op_msg_codec_options(self):
+        reply = {'cursor': {'id': 0, 'firstBatch': self.docs}, 'ok': 1}
+        msg = _OpMsg(0, BSON.encode(reply))
+        opts = CodecOptions(document_class=SON)
+        docs = msg.lazy_response(None, opts)
+        self.assertIsInstance(docs[0], SON)
+        self.assertIsInstance(docs[0]['cursor']['firstBatch'][0], SON)
+
+    def test_error_reply(self):
+        reply = {'ok': 0, 'errmsg': 'failed', 'code': 2}
+        docs = _OpMsg(0, BSON.encode(reply)).lazy_response()
+        self.assertEqual([reply], docs)
+
+    def test_op_reply(self):
+        data = b"".join(BSON.encode(doc) for doc in self.docs)
+        reply = _OpReply(0, 7, len(self.docs), data)
+        batch = reply.lazy_response(7, CodecOptions())
+        self.assertIsInstance(batch, _LazyBatch)
+        self.assertEqual(self.docs, list(batch))
+        reply = _OpReply(0, 7, 1, data[:-1])
+        self.assertRaises(InvalidBSON, reply.lazy_response)
+
+    def test_op_reply_command(self):
+        reply = {'cursor': {'id': 0, 'firstBatch': self.docs}, 'ok': 1}
+        msg = _OpReply(0, 0, 1, BSON.encode(reply))
+        docs = msg.lazy_response(None, CodecOptions(), from_command=True)
+        self.assertEqual(self.docs, list(docs[0]['cursor']['firstBatch']))
+
+    def test_non_document(self):
+        reply = {'cursor': {'id': 0, 'firstBatch': [{}, 1]}, 'ok': 1}
+        msg = _OpMsg(0, BSON.encode(reply))
+        self.assertRaises(InvalidBSON, msg.lazy_response)
+
+    def test_decoded_on_demand(self):
+        decodes = CountDecodes(self)
+        reply = {'cursor': {'id': 0, 'firstBatch': self.docs}, 'ok': 1}
+        batch = _OpMsg(0, BSON.encode(reply)).lazy_response()[0][
+            'cursor']['firstBatch']
+        self.assertEqual(0, decodes.count)
+        batch.popleft()
+        self.assertEqual(1, decodes.count)
+
+    def test_invalid_document(self):
+        raw = BSON.encode({'_id': 1, 'x': 'y'})
+        # Corrupt the string's length, decoding fails only when reached.
+        bad = RawBSONDocument(raw[:16] + struct.pack('<i', 100) + raw[20:])
+        reply = {'cursor': {'id': 0, 'firstBatch': [{}, bad]}, 'ok': 1}
+        batch = _OpMsg(0, BSON.encode(reply)).lazy_response()[0][
+            'cursor']['firstBatch']
+        self.assertEqual({}, batch.popleft())
+        self.assertRaises(InvalidBSON, batch.popleft)
+
+
+class TestCursorLazyDecode(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MongoClient(connect=False)
+        self.addCleanup(self.client.close)
+        self.coll = self.client.test.test
+        self.docs = [{'_id': i, 'x': 'y' * i} for i in range(25)]
+        self.server = MockCursorServer(self.client, self.docs, 10)
+
+    def test_lazy_decode(self):
+        cursor = self.coll.find().batch_size(10).lazy_decode()
+        self.assertEqual(self.docs, list(cursor))
+
+    def test_early_exit(self):
+        decodes = CountDecodes(self)
+        cursor = self.coll.find().batch_size(10).lazy_decode()
+        for doc in cursor:
+            if doc['_id'] == 2:
+                break
+        self.assertEqual(3, decodes.count)
+        self.assertEqual(7, len(cursor._Cursor__data))
+
+    def test_batches(self):
+        cursor = self.coll.find().batch_size(10).lazy_decode()
+        next(cursor)
+        self.assertEqual(self.docs[1:10], next(cursor.iter_batches()))
+        self.assertEqual(self.docs[10:], cursor.to_list())
+
+    def test_prefetch(self):
+        cursor = self.coll.find().batch_size(10).lazy_decode().prefetch(2)
+        self.assertEqual(self.docs, list(cursor))
+
+    def test_options(self):
+        self.assertRaises(TypeError, self.coll.find().lazy_decode, 1)
+        cursor = self.coll.find().lazy_decode()
+        self.assertTrue(cursor.clone()._Cursor__lazy)
+        next(cursor)
+        self.assertRaises(InvalidOperation, cursor.lazy_decode)
+        self.assertRaises(InvalidOperation,
+                          self.coll.find_raw_batches().lazy_decode)
+
+    def test_raw_document_class(self):
+        coll = self.coll.with_options(codec_options=DEFAULT_RAW_BSON_OPTIONS)
+        docs = coll.find().batch_size(10).lazy_decode().to_list()
+        self.assertTrue(all(isinstance(doc, RawBSONDocument)
+                            for doc in docs))
+        self.assertEqual(self.docs,
+                         decode_all(b"".join(doc.raw for doc in docs)))
+        self.server.position = 0
+        cursor = CommandCursor(
+            coll, {'id': self.server.cursor_id, 'firstBatch': []},
+            self.server.address, batch_size=10).lazy_decode()
+        docs = cursor.to_list()
+        self.assertTrue(all(isinstance(doc, RawBSONDocument)
+                            for doc in docs))
+        self.assertEqual(self.docs,
+                         decode_all(b"".join(doc.raw for doc in docs)))
+
+    def test_command_cursor(self):
+        batch, cursor_id = self.server.next_batch()
+        cursor = CommandCursor(
+            self.coll, {'id': cursor_id, 'firstBatch': batch},
+            self.server.address, batch_size=10)
+        cursor.lazy_decode()
+        batches = cursor.iter_batches(raw=True)
+        self.assertEqual(self.docs[:10], decode_all(next(batches)))
+        self.assertEqual(self.docs[10:], decode_all(b"".join(batches)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test building batched write messages."""
+
+import socket
+import struct
+import sys
+import threading
+
+sys.path[0:0] = [""]
+
+from bson import BSON
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from bson.son import SON
+from pymongo import message
+from pymongo.errors import DocumentTooLarge
+from pymongo.monitoring import _EventListeners
+from pymongo.network import sendmsg_all
+from test import unittest
+
+
+class MockSocketInfo(object):
+    max_bson_size = 16 * 1024 ** 2
+    max_message_size = 48 * 1024 ** 2
+    max_write_batch_size = 100000
+    compression_context = None
+    vectored_send = True
+
+
+class MockSocket(object):
+    """Records the data sent, at most `max_send` bytes per sendmsg call."""
+
+    def __init__(self, max_send):
+        self.max_send = max_send
+        self.data = b''
+
+    def sendmsg(self, buffers):
+        data = b''.join(bytes(buf) for buf in buffers)[:self.max_send]
+        self.data += data
+        return len(data)
+
+
+def _without_request_id(msg):
+    return msg[:4] + msg[8:]
+
+
+class TestVectoredWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.sock_info = MockSocketInfo()
+        # Without the C extension every batch may be sent as buffers.
+        self.addCleanup(setattr, message, '_use_c', message._use_c)
+        message._use_c = False
+
+    def _ctx(self, cmd):
+        return message._BulkWriteContext(
+            'db', cmd, self.sock_info, 1, _EventListeners([]), None)
+
+    def _check(self, vectored, contiguous, operation, cmd, docs,
+               check_keys=True):
+        opts = CodecOptions()
+        cmd = SON(cmd)
+        rid, buffers, to_send = vectored(
+            'db.coll', operation, cmd.copy(), iter(docs), check_keys, opts,
+            self._ctx(cmd))
+        self.assertIsInstance(buffers, list)
+        _, expected, expected_to_send = contiguous(
+            'db.coll', operation, cmd.copy(), iter(docs), check_keys, opts,
+            self._ctx(cmd))
+        data = b''.join(buffers)
+        self.assertEqual(rid, struct.unpack("<i", data[4:8])[0])
+        self.assertEqual(_without_request_id(expected),
+                         _without_request_id(data))
+        self.assertEqual(expected_to_send, to_send)
+        return buffers, to_send
+
+    def _op_msg(self, vectored):
+        def do_batched_op_msg(*args):
+            self.sock_info.vectored_send = vectored
+            return message._do_batched_op_msg(*args)
+        return do_batched_op_msg
+
+    def _write_command(self, vectored):
+        def do_batched_write_command(*args):
+            self.sock_info.vectored_send = vectored
+            return message._do_batched_write_command(*args)
+        return do_batched_write_command
+
+    def test_op_msg(self):
+        docs = [{'_id': i, 'x': 'y' * i} for i in range(10)]
+        for ordered in (True, False):
+            for cmd, operation, ops in [
+                    ([('insert', 'coll'), ('ordered', ordered)],
+                     message._INSERT, docs),
+                    ([('update', 'coll'), ('ordered', ordered),
+                      ('writeConcern', {'w': 0})],
+                     message._UPDATE,
+                     [{'q': {}, 'u': {'$set': {'x': 1}}}]),
+                    ([('delete', 'coll')], message._DELETE,
+                     [{'q': {'_id': 1}, 'limit': 1}] * 3)]:
+                buffers, _ = self._check(
+                    self._op_msg(True), self._op_msg(False), operation, cmd,
+                    ops)
+                # The prefix and one buffer for each document.
+                self.assertEqual(len(ops) + 1, len(buffers))
+
+    def test_write_command(self):
+        docs = [{'_id': i, 'x': 'y' * i} for i in range(10)]
+        self._check(self._write_command(True), self._write_command(False),
+                    message._INSERT, [('insert', 'coll')], docs)
+        self._check(self._write_command(True), self._write_command(False),
+                    message._DELETE, [('delete', 'coll')],
+                    [{'q': {'_id': 1}, 'limit': 1}] * 3, False)
+
+    def test_raw_documents_not_copied(self):
+        raw = [RawBSONDocument(BSON.encode({'_id': i})) for i in range(3)]
+        buffers, _ = self._check(
+            self._op_msg(True), self._op_msg(False), message._INSERT,
+            [('insert', 'coll')], raw)
+        for doc, buf in zip(raw, buffers[1:]):
+            self.assertIs(doc.raw, buf)
+
+    def test_c_extension(self):
+        # With the C extension only encoded documents are sent as buffers.
+        message._use_c = True
+        docs = [{'_id': i} for i in range(3)]
+        raw = [RawBSONDocument(BSON.encode(doc)) for doc in docs]
+        cmd = SON([('insert', 'coll')])
+        for do_batched in (self._op_msg(True), self._write_command(True)):
+            _, msg, to_send = do_batched(
+                'db.coll', message._INSERT, cmd.copy(), iter(docs), True,
+                CodecOptions(), self._ctx(cmd))
+            self.assertIsInstance(msg, bytes)
+            self.assertEqual(docs, to_send)
+            _, msg, to_send = do_batched(
+                'db.coll', message._INSERT, cmd.copy(), iter(raw), True,
+                CodecOptions(), self._ctx(cmd))
+            self.assertIsInstance(msg, list)
+            self.assertEqual(raw, to_send)
+            _, msg, to_send = do_batched(
+                'db.coll', message._INSERT, cmd.copy(), iter([]), True,
+                CodecOptions(), self._ctx(cmd))
+            self.assertEqual([], to_send)
+
+    def test_split_batches(self):
+        self.sock_info.max_write_batch_size = 3
+        docs = [{'_id': i} for i in range(10)]
+        _, to_send = self._check(
+            self._op_msg(True), self._op_msg(False), message._INSERT,
+            [('insert', 'coll')], docs)
+        self.assertEqual(docs[:3], to_send)
+        _, to_send = self._check(
+            self._write_command(True), self._write_command(False),
+            message._INSERT, [('insert', 'coll')], docs)
+        self.assertEqual(docs[:3], to_send)
+
+        self.sock_info.max_write_batch_size = 100000
+        self.sock_info.max_message_size = 1000
+        docs = [{'_id': i, 's': 'x' * 100} for i in range(20)]
+        _, to_send = self._check(
+            self._op_msg(True), self._op_msg(False), message._INSERT,
+            [('insert', 'coll')], docs)
+        self.assertTrue(0 < len(to_send) < len(docs))
+
+    def test_document_too_large(self):
+        self.sock_info.max_bson_size = 100
+        self.sock_info.max_message_size = 200
+        # Write commands allow 16KiB of overhead above max_bson_size.
+        doc = {'s': 'x' * 20000}
+        cmd = SON([('insert', 'coll')])
+        with self.assertRaises(DocumentTooLarge):
+            message._batched_op_msg_vectored(
+                message._INSERT, cmd, [doc], True, True, CodecOptions(),
+                self._ctx(cmd))
+        with self.assertRaises(DocumentTooLarge):
+            message._batched_write_command_vectored(
+                'db.coll', message._INSERT, cmd, [doc], True,
+                CodecOptions(), self._ctx(cmd))
+
+
+@unittest.skipUnless(hasattr(socket.socket, 'sendmsg'),
+                     "socket.sendmsg is not available")
+class TestSendmsgAll(unittest.TestCase):
+
+    def test_partial_sends(self):
+        buffers = [b'abc', b'', b'defgh', bytearray(b'ij'), b'k' * 10]
+        expected = b''.join(bytes(buf) for buf in buffers)
+        for max_send in (1, 2, 4, 100):
+            sock = MockSocket(max_send)
+            sendmsg_all(sock, buffers)
+            self.assertEqual(expected, sock.data)
+        # The caller's list isn't modified.
+        self.assertEqual(b'abc', buffers[0])
+
+    def test_socket(self):
+        # More buffers than fit in one sendmsg call.
+        buffers = [b'x' * 4096, b'y' * 10] * 1200
+        expected_length = sum(len(buf) for buf in buffers)
+        server, client = socket.socketpair()
+        received = []
+
+        def receive():
+            length = 0
+            while length < expected_length:
+                chunk = server.recv(1024 * 1024)
+                received.append(chunk)
+                length += len(chunk)
+
+        receiver = threading.Thread(target=receive)
+        receiver.daemon = True
+        receiver.start()
+        try:
+            sendmsg_all(client, buffers)
+            receiver.join()
+        finally:
+            server.close()
+            client.close()
+        self.assertEqual(b''.join(buffers), b''.join(received))
+
+
+if __name__ == "__main__":
+    unittest.main()
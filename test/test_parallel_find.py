@@ -0,0 +1,258 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test parallel_find without a server."""
+
+import gc
+import itertools
+import sys
+import threading
+import time
+
+sys.path[0:0] = [""]
+
+from bson import BSON
+from pymongo import MongoClient
+from pymongo.errors import InvalidOperation, OperationFailure
+from pymongo.message import _OpMsg
+from pymongo.parallel_find import ParallelFind, _sample_bounds
+from pymongo.response import Response
+from test import unittest
+from test.utils import wait_until
+
+
+class MockRangeServer(object):
+    """Replies to finds with the documents between their $min and $max,
+    sorted by `key`.
+    """
+
+    address = ('localhost', 27017)
+
+    def __init__(self, client, docs, key='_id', batch_size=5, delay=0,
+                 fail_key=None):
+        self.docs = sorted(docs, key=lambda doc: doc.get(key))
+        self.key = key
+        self.batch_size = batch_size
+        self.delay = delay
+        self.fail_key = fail_key
+        self.specs = []
+        self.cursors = {}
+        self.killed = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        client._ensure_session = lambda session=None: None
+        client._send_message_with_response = self.send_message_with_response
+        client._close_cursor_now = self.close_cursor
+        client._close_cursor = self.close_cursor
+
+    def close_cursor(self, cursor_id, address=None, session=None):
+        with self.lock:
+            self.killed.append(cursor_id)
+
+    def matches(self, doc, spec):
+        value = doc.get(self.key)
+        if '$min' in spec and value < spec['$min'][self.key]:
+            return False
+        if '$max' in spec and value >= spec['$max'][self.key]:
+            return False
+        query = spec.get('$query') or {}
+        return all(doc.get(k) == v for k, v in query.items())
+
+    def send_message_with_response(self, operation, exhaust=False,
+                                   address=None, timeout=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            if operation.name == 'find':
+                spec = operation.spec
+                self.specs.append(spec)
+                cursor_id = next(self.ids)
+                excluded = [k for k, v in (operation.fields or {}).items()
+                            if not v]
+                self.cursors[cursor_id] = [
+                    dict((k, v) for k, v in doc.items() if k not in excluded)
+                    for doc in self.docs if self.matches(doc, spec)]
+            else:
+                cursor_id = operation.cursor_id
+            docs = self.cursors[cursor_id]
+            batch = docs[:self.batch_size]
+            del docs[:self.batch_size]
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        if self.fail_key is not None and any(
+                doc[self.key] == self.fail_key for doc in batch):
+            return self.reply({'ok': 0, 'errmsg': 'failed', 'code': 2})
+        key = 'firstBatch' if operation.name == 'find' else 'nextBatch'
+        return self.reply({'ok': 1, 'cursor': {
+            'id': cursor_id if docs else 0, 'ns': 'test.test', key: batch}})
+
+    def reply(self, doc):
+        return Response(_OpMsg(0, BSON.encode(doc)), self.address, 0, 0, True)
+
+
+class TestSampleBounds(unittest.TestCase):
+
+    def test_bounds(self):
+        pipelines = []
+
+        class Collection(object):
+            def aggregate(self, pipeline):
+                pipelines.append(pipeline)
+                return iter([{'bound': i} for i in range(80)])
+
+        self.assertEqual([20, 40, 60], _sample_bounds(Collection(), 'x', 4))
+        self.assertEqual(
+            [{'$sample': {'size': 80}},
+             {'$project': {'_id': 0, 'bound': '$x'}},
+             {'$sort': {'bound': 1}}], pipelines[0])
+        self.assertEqual([], _sample_bounds(Collection(), 'x', 1))
+        self.assertEqual(1, len(pipelines))
+
+    def test_duplicates(self):
+        class Collection(object):
+            def aggregate(self, pipeline):
+                return iter([{}] * 20 + [{'bound': 1}] * 20)
+
+        self.assertEqual([None, 1], _sample_bounds(Collection(), 'x', 4))
+
+        class Empty(object):
+            def aggregate(self, pipeline):
+                return iter([])
+
+        self.assertEqual([], _sample_bounds(Empty(), 'x', 4))
+
+
+class TestParallelFind(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MongoClient(connect=False)
+        self.addCleanup(self.client.close)
+        self.coll = self.client.test.test
+        self.docs = [{'_id': i, 'even': i % 2 == 0} for i in range(100)]
+
+    def sample(self, values):
+        self.coll.aggregate = lambda pipeline: iter(
+            [{'bound': value} for value in values])
+
+    def test_parallel_find(self):
+        server = MockRangeServer(self.client, self.docs, delay=0.01)
+        self.sample(range(0, 100, 5))
+        with self.coll.parallel_find(partitions=4) as docs:
+            self.assertEqual([25, 50, 75], docs.bounds)
+            self.assertEqual(4, len(docs.cursors))
+            results = list(docs)
+        self.assertEqual(self.docs, sorted(results, key=lambda d: d['_id']))
+        # The partitions were read concurrently.
+        self.assertEqual(4, server.max_running)
+        # The finds may start in any order.
+        self.assertEqual(
+            set([(None, 25), (25, 50), (50, 75), (75, None)]),
+            set((spec.get('$min', {}).get('_id'),
+                 spec.get('$max', {}).get('_id')) for spec in server.specs))
+        self.assertTrue(all(spec['$hint'] == {'_id': 1}
+                            for spec in server.specs))
+
+    def test_filter_and_options(self):
+        server = MockRangeServer(self.client, self.docs)
+        docs = self.coll.parallel_find({'even': True}, bounds=[30, 60],
+                                       projection={'even': False})
+        results = sorted(docs, key=lambda d: d['_id'])
+        self.assertEqual([{'_id': i} for i in range(0, 100, 2)], results)
+        self.assertEqual(3, len(server.specs))
+
+    def test_key(self):
+        docs = [{'_id': i, 'x': 100 - i} for i in range(50)]
+        server = MockRangeServer(self.client, docs, key='x')
+        results = list(self.coll.parallel_find(key='x', bounds=[60, 80]))
+        self.assertEqual(docs, sorted(results, key=lambda d: d['_id']))
+        self.assertTrue(all(spec['$hint'] == {'x': 1}
+                            for spec in server.specs))
+        self.assertEqual(
+            set([None, 60, 80]),
+            set(spec.get('$min', {}).get('x') for spec in server.specs))
+
+    def test_single_partition(self):
+        server = MockRangeServer(self.client, self.docs)
+        self.sample([])
+        docs = self.coll.parallel_find(partitions=8)
+        self.assertEqual([], docs.bounds)
+        self.assertEqual(self.docs, list(docs))
+        self.assertNotIn('$min', server.specs[0])
+        self.assertNotIn('$max', server.specs[0])
+
+    def test_max_workers(self):
+        server = MockRangeServer(self.client, self.docs, delay=0.01)
+        docs = self.coll.parallel_find(bounds=list(range(10, 100, 10)),
+                                       max_workers=2)
+        self.assertEqual(100, len(list(docs)))
+        self.assertEqual(10, len(server.specs))
+        self.assertEqual(2, server.max_running)
+
+    def test_iter_batches(self):
+        MockRangeServer(self.client, self.docs, batch_size=5)
+        docs = self.coll.parallel_find(bounds=[50])
+        first = next(docs)
+        batches = list(docs.iter_batches())
+        self.assertEqual(4, len(batches[0]))
+        self.assertTrue(all(len(batch) == 5 for batch in batches[1:]))
+        results = [first] + [doc for batch in batches for doc in batch]
+        self.assertEqual(self.docs, sorted(results, key=lambda d: d['_id']))
+
+    def test_error(self):
+        MockRangeServer(self.client, self.docs, fail_key=80)
+        docs = self.coll.parallel_find(bounds=[50])
+        self.assertRaises(OperationFailure, list, docs)
+        self.assertRaises(StopIteration, next, docs)
+
+    def test_close(self):
+        server = MockRangeServer(self.client, self.docs, batch_size=1)
+        docs = self.coll.parallel_find(bounds=[50])
+        next(docs)
+        # Wait for both finds so both cursors have been started.
+        wait_until(lambda: len(server.specs) == 2, 'start both finds')
+        docs.close()
+        # Both cursors were killed, no more getMores are sent.
+        self.assertEqual(2, len(server.killed))
+        self.assertRaises(StopIteration, next, docs)
+
+    def test_garbage_collected(self):
+        server = MockRangeServer(self.client, self.docs, batch_size=1)
+        docs = self.coll.parallel_find(bounds=[50])
+        next(docs)
+        wait_until(lambda: len(server.specs) == 2, 'start both finds')
+        del docs
+        gc.collect()
+        wait_until(lambda: len(server.killed) == 2, 'kill both cursors')
+
+    def test_validation(self):
+        MockRangeServer(self.client, self.docs)
+        self.assertRaises(ValueError, self.coll.parallel_find, partitions=0)
+        self.assertRaises(TypeError, self.coll.parallel_find, key=1)
+        self.assertRaises(TypeError, self.coll.parallel_find, bounds=1)
+        self.assertRaises(ValueError, self.coll.parallel_find, bounds=[],
+                          max_workers=0)
+        self.assertRaises(InvalidOperation, self.coll.parallel_find,
+                          bounds=[], session=object())
+        for option in ('limit', 'skip', 'sort', 'hint', 'min', 'max'):
+            self.assertRaises(InvalidOperation, self.coll.parallel_find,
+                              bounds=[], **{option: 1})
+        self.assertIsInstance(self.coll.parallel_find(bounds=[]),
+                              ParallelFind)
+
+
+if __name__ == "__main__":
+    unittest.main()
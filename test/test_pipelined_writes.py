@@ -0,0 +1,168 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test pipelined bulk writes without a server."""
+
+import sys
+import time
+
+sys.path[0:0] = [""]
+
+from bson import BSON
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidDocument
+from pymongo import DeleteOne, InsertOne, MongoClient
+from pymongo.bulk import _EncodedOps
+from pymongo.errors import (BulkWriteError,
+                            ConfigurationError,
+                            InvalidOperation)
+from test import unittest
+from test.pymongo_mocks import MockWriteServer, MockWriteSocketInfo
+
+
+class TestEncodedOps(unittest.TestCase):
+
+    def test_order(self):
+        docs = [{'_id': i, 'x': 'y' * i} for i in range(500)]
+        encoded = _EncodedOps(docs, True, CodecOptions(), 1024 ** 2)
+        self.addCleanup(encoded.close)
+        raws = [doc.raw for doc in encoded.iter_from(0)]
+        self.assertEqual([BSON.encode(doc) for doc in docs], raws)
+        raws = [doc.raw for doc in encoded.iter_from(490)]
+        self.assertEqual([BSON.encode(doc) for doc in docs[490:]], raws)
+
+    def test_bounded(self):
+        docs = [{'_id': i, 'x': 'y' * 1000} for i in range(1000)]
+        doc_size = len(BSON.encode(docs[0]))
+        encoded = _EncodedOps(docs, True, CodecOptions(), 10 * doc_size)
+        self.addCleanup(encoded.close)
+        it = encoded.iter_from(0)
+        for _ in range(5):
+            next(it)
+        time.sleep(0.1)
+        # The encoder waits for operations to be released.
+        self.assertEqual(10 * doc_size, encoded.buffered)
+        encoded.release(5)
+        time.sleep(0.1)
+        # Releasing operations lets the encoder continue.
+        self.assertEqual(10 * doc_size, encoded.buffered)
+        for i, doc in enumerate(it, 6):
+            encoded.release(i)
+            self.assertLessEqual(encoded.buffered, 10 * doc_size)
+        self.assertEqual(1000, i)
+        encoded.release(1000)
+        self.assertEqual(0, encoded.buffered)
+
+    def test_error(self):
+        docs = [{'_id': 0}, {'_id': 1}, {'$bad': 1}, {'_id': 3}]
+        encoded = _EncodedOps(docs, True, CodecOptions(), 1024 ** 2)
+        self.addCleanup(encoded.close)
+        it = encoded.iter_from(0)
+        self.assertEqual(BSON.encode({'_id': 0}), next(it).raw)
+        self.assertEqual(BSON.encode({'_id': 1}), next(it).raw)
+        self.assertRaises(InvalidDocument, next, it)
+
+
+class TestPipelinedWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockWriteServer()
+        client = MongoClient(connect=False)
+        self.addCleanup(client.close)
+
+        def retry_with_session(retryable, func, session, bulk, timeout=None):
+            return func(session, MockWriteSocketInfo(self.server), False)
+
+        client._ensure_session = lambda session=None: None
+        client._retry_with_session = retry_with_session
+        self.coll = client.test.test
+
+    def sent(self, op='insert'):
+        return [doc['_id'] for name, docs in self.server.batches
+                for doc in docs if name == op]
+
+    def test_pipeline(self):
+        docs = [{'_id': i} for i in range(95)]
+        result = self.coll.insert_many(docs, pipeline=True)
+        self.assertEqual(list(range(95)), result.inserted_ids)
+        self.assertEqual(list(range(95)), self.sent())
+        self.assertEqual(10, len(self.server.batches))
+
+    def test_pipeline_ordered_error(self):
+        docs = [{'_id': i} for i in range(30)]
+        docs[12]['dup'] = True
+        with self.assertRaises(BulkWriteError) as ctx:
+            self.coll.insert_many(docs, pipeline=True)
+        details = ctx.exception.details
+        self.assertEqual(12, details['nInserted'])
+        self.assertEqual(12, details['writeErrors'][0]['index'])
+        # The ordered insert stopped after the first batch with an error.
+        self.assertEqual(list(range(20)), self.sent())
+
+    def test_batches_in_flight(self):
+        self.server.delay = 0.05
+        docs = [{'_id': i} for i in range(200)]
+        result = self.coll.insert_many(
+            docs, ordered=False, max_batches_in_flight=4)
+        self.assertEqual(200, len(result.inserted_ids))
+        self.assertEqual(list(range(200)), sorted(self.sent()))
+        self.assertEqual(20, len(self.server.batches))
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 4)
+
+    def test_batches_in_flight_pipeline(self):
+        self.server.delay = 0.01
+        requests = [InsertOne({'_id': i}) for i in range(100)]
+        requests += [DeleteOne({'_id': i}) for i in range(25)]
+        result = self.coll.bulk_write(
+            requests, ordered=False, pipeline=True, max_batches_in_flight=3)
+        self.assertEqual(100, result.inserted_count)
+        self.assertEqual(25, result.deleted_count)
+        self.assertEqual(list(range(100)), sorted(self.sent()))
+        self.assertEqual(13, len(self.server.batches))
+
+    def test_batches_in_flight_write_errors(self):
+        self.server.delay = 0.01
+        docs = [{'_id': i} for i in range(100)]
+        for i in (73, 5, 41):
+            docs[i]['dup'] = True
+        with self.assertRaises(BulkWriteError) as ctx:
+            self.coll.insert_many(
+                docs, ordered=False, max_batches_in_flight=4)
+        details = ctx.exception.details
+        self.assertEqual(97, details['nInserted'])
+        self.assertEqual(
+            [5, 41, 73], [err['index'] for err in details['writeErrors']])
+        self.assertEqual(41, details['writeErrors'][1]['op']['_id'])
+        self.assertEqual(list(range(100)), sorted(self.sent()))
+
+    def test_validation(self):
+        docs = [{'_id': 1}]
+        self.assertRaises(ConfigurationError, self.coll.insert_many, docs,
+                          max_batches_in_flight=2)
+        self.assertRaises(ValueError, self.coll.insert_many, docs,
+                          ordered=False, max_batches_in_flight=0)
+        self.assertRaises(TypeError, self.coll.bulk_write,
+                          [InsertOne({})], pipeline='yes')
+
+        class Session(object):
+            _in_transaction = False
+
+        self.assertRaises(InvalidOperation, self.coll.insert_many, docs,
+                          ordered=False, max_batches_in_flight=2,
+                          session=Session())
+
+
+if __name__ == "__main__":
+    unittest.main()
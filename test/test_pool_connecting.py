@@ -0,0 +1,283 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test connection pool checkout without a server."""
+
+import sys
+import threading
+import time
+
+sys.path[0:0] = [""]
+
+from pymongo import MongoClient
+from pymongo.common import MAX_CONNECTING
+from pymongo.errors import ConnectionFailure
+from pymongo.pool import Pool, PoolOptions
+from test import unittest
+from test.utils import wait_until
+
+
+class MockSocketInfo(object):
+    def __init__(self, pool):
+        self.pool_id = pool.pool_id
+        self.closed = False
+        self.sock = None
+
+    def idle_time_seconds(self):
+        return 0
+
+    def update_last_checkin_time(self):
+        pass
+
+    def set_deadline(self, deadline):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class MockPool(Pool):
+    """A Pool whose connections take `delay` seconds to establish."""
+
+    def __init__(self, delay=0, **kwargs):
+        Pool.__init__(
+            self, ('localhost', 27017), PoolOptions(**kwargs),
+            handshake=False)
+        # MockSocketInfo has no socket to check.
+        self._check_interval_seconds = None
+        self.delay = delay
+        self.connecting = 0
+        self.max_seen = 0
+        self.connects = 0
+        self.fail = False
+        self.count_lock = threading.Lock()
+
+    def connect(self, all_credentials=None):
+        with self.count_lock:
+            self.connecting += 1
+            self.connects += 1
+            self.max_seen = max(self.max_seen, self.connecting)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise ConnectionFailure('mock connection failure')
+            return MockSocketInfo(self)
+        finally:
+            with self.count_lock:
+                self.connecting -= 1
+
+
+class TestMaxConnecting(unittest.TestCase):
+
+    def _checkout_all(self, pool, n, hold=0):
+        sockets = []
+        errors = []
+
+        def target():
+            try:
+                sock_info = pool._get_socket_no_auth()
+                sockets.append(sock_info)
+                time.sleep(hold)
+                pool.return_socket(sock_info)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=target) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        return sockets, errors
+
+    def test_default(self):
+        self.assertEqual(2, MAX_CONNECTING)
+        client = MongoClient(connect=False)
+        self.assertEqual(
+            MAX_CONNECTING,
+            client._topology_settings.pool_options.max_connecting)
+        client = MongoClient(connect=False, maxConnecting=5)
+        self.assertEqual(
+            5, client._topology_settings.pool_options.max_connecting)
+        client = MongoClient('mongodb://localhost/?maxConnecting=3',
+                             connect=False)
+        self.assertEqual(
+            3, client._topology_settings.pool_options.max_connecting)
+        self.assertRaises(ValueError, MongoClient, connect=False,
+                          maxConnecting=0)
+
+    def test_max_connecting(self):
+        pool = MockPool(delay=0.1, max_connecting=2)
+        sockets, errors = self._checkout_all(pool, 10)
+        self.assertEqual([], errors)
+        self.assertEqual(10, len(sockets))
+        self.assertEqual(2, pool.max_seen)
+        self.assertEqual(0, pool._pending)
+        self.assertEqual(0, pool.active_sockets)
+
+    def test_waiter_takes_returned_socket(self):
+        # Connecting is slow and sockets are returned quickly, so waiting
+        # threads reuse returned sockets instead of connecting their own.
+        pool = MockPool(delay=0.5, max_connecting=1)
+        sockets, errors = self._checkout_all(pool, 10)
+        self.assertEqual([], errors)
+        self.assertEqual(10, len(sockets))
+        self.assertEqual(1, pool.max_seen)
+        self.assertLess(pool.connects, 10)
+        self.assertEqual(pool.connects, len(pool.sockets))
+
+    def test_connection_failure(self):
+        pool = MockPool(max_connecting=1)
+        pool.fail = True
+        sockets, errors = self._checkout_all(pool, 5)
+        self.assertEqual([], sockets)
+        self.assertEqual(5, len(errors))
+        self.assertEqual(0, pool._pending)
+        self.assertEqual(0, pool.active_sockets)
+        # The pool's slots were all released.
+        pool.fail = False
+        sockets, errors = self._checkout_all(pool, 5)
+        self.assertEqual(5, len(sockets))
+
+    def test_wait_queue_timeout(self):
+        pool = MockPool(delay=0.5, max_connecting=1, wait_queue_timeout=0.1)
+        sockets, errors = self._checkout_all(pool, 2)
+        self.assertEqual(1, len(sockets))
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], ConnectionFailure)
+        self.assertEqual(0, pool._pending)
+
+    def test_stale_socket_reconnects(self):
+        pool = MockPool(max_connecting=1)
+        sock_info = pool._get_socket_no_auth()
+        pool.return_socket(sock_info)
+        sock_info.closed = True
+        pool._check = lambda sock_info: None
+        new_sock_info = pool._get_socket_no_auth()
+        self.assertIsNot(sock_info, new_sock_info)
+        self.assertEqual(2, pool.connects)
+        self.assertEqual(0, pool._pending)
+
+
+class TestMinPoolSize(unittest.TestCase):
+
+    def test_background_fill(self):
+        pool = MockPool(delay=0.05, min_pool_size=5, max_connecting=2)
+        pool.remove_stale_sockets()
+        wait_until(lambda: len(pool.sockets) == 5,
+                   'fill the pool to minPoolSize')
+        self.assertLessEqual(pool.max_seen, 2)
+        # The filler thread exits once the pool is full.
+        pool._filler.join(10)
+        self.assertEqual(5, pool.connects)
+
+        # Checked out sockets count toward minPoolSize.
+        sockets = [pool._get_socket_no_auth() for _ in range(5)]
+        pool.remove_stale_sockets()
+        time.sleep(0.2)
+        self.assertEqual(5, pool.connects)
+
+        # Discarded sockets are replaced.
+        for sock_info in sockets[:3]:
+            sock_info.closed = True
+        for sock_info in sockets:
+            pool.return_socket(sock_info)
+        pool.remove_stale_sockets()
+        wait_until(lambda: pool.connects == 8, 'replace closed sockets')
+
+    def test_fill_connection_failure(self):
+        pool = MockPool(min_pool_size=2)
+        pool.fail = True
+        pool.remove_stale_sockets()
+        pool._filler.join(10)
+        self.assertEqual(1, pool.connects)
+        self.assertEqual(0, len(pool.sockets))
+        self.assertEqual(0, pool._pending)
+
+    def test_fill_while_filler_exits(self):
+        pool = MockPool(min_pool_size=1)
+        pool.remove_stale_sockets()
+        pool._filler.join(10)
+        self.assertEqual(1, pool.connects)
+
+        # Simulate the filler thread after its last run but before it exits.
+        class ExitingThread(object):
+            alive = True
+
+            def is_alive(self):
+                return self.alive
+
+            def join(self, timeout=None):
+                self.alive = False
+
+        pool._filler._thread = ExitingThread()
+        pool.sockets.pop().closed = True
+        pool.remove_stale_sockets()
+        wait_until(lambda: pool.connects == 2, 'restart the filler')
+
+
+class TestWaitQueue(unittest.TestCase):
+
+    def test_stats(self):
+        pool = MockPool(max_pool_size=1)
+        stats = pool.wait_queue_stats()
+        self.assertEqual(0, stats['checkouts'])
+        self.assertEqual(0.0, stats['average_wait_time'])
+
+        sock_info = pool._get_socket_no_auth()
+        order = []
+
+        def target(i):
+            s = pool._get_socket_no_auth()
+            order.append(i)
+            pool.return_socket(s)
+
+        threads = []
+        for i in range(3):
+            t = threading.Thread(target=target, args=(i,))
+            t.start()
+            threads.append(t)
+            wait_until(lambda: pool.wait_queue_stats()['queue_depth'] == i + 1,
+                       'queue thread %d' % i)
+        time.sleep(0.1)
+        pool.return_socket(sock_info)
+        for t in threads:
+            t.join(10)
+
+        # Waiters were served in arrival order.
+        self.assertEqual([0, 1, 2], order)
+        stats = pool.wait_queue_stats()
+        self.assertEqual(4, stats['checkouts'])
+        self.assertEqual(0, stats['timeouts'])
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(2, stats['max_queue_depth'])
+        self.assertEqual(0.75, stats['average_queue_depth'])
+        self.assertGreaterEqual(stats['max_wait_time'], 0.1)
+        self.assertAlmostEqual(
+            stats['total_wait_time'] / 4, stats['average_wait_time'])
+
+    def test_timeout_stats(self):
+        pool = MockPool(max_pool_size=1, wait_queue_timeout=0.01)
+        pool._get_socket_no_auth()
+        self.assertRaises(ConnectionFailure, pool._get_socket_no_auth)
+        stats = pool.wait_queue_stats()
+        self.assertEqual(1, stats['checkouts'])
+        self.assertEqual(1, stats['timeouts'])
+
+    def test_client(self):
+        client = MongoClient(connect=False)
+        self.assertEqual({}, client.wait_queue_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
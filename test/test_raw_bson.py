@@ -51,6 +51,14 @@ class TestRawBSONDocument(unittest.TestCase):
     def test_raw(self):
         self.assertEqual(self.bson_string, self.document.raw)
 
+    def test_buffer(self):
+        for buf in (bytearray(self.bson_string),
+                    memoryview(self.bson_string)):
+            doc = RawBSONDocument(buf)
+            self.assertIsInstance(doc.raw, bytes)
+            self.assertEqual(self.bson_string, doc.raw)
+            self.assertEqual('Sherlock', doc['name'])
+
     @client_context.require_connection
     def test_round_trip(self):
         db = self.client.get_database(
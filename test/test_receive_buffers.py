@@ -0,0 +1,170 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the pool of receive buffers."""
+
+import socket
+import struct
+import sys
+import threading
+import zlib
+
+sys.path[0:0] = [""]
+
+from bson import BSON
+from bson.py3compat import PY3
+from pymongo import MongoClient
+from pymongo.common import RECEIVE_BUFFER_POOL_SIZE
+from pymongo.compression_support import _HAVE_ZSTD, ZstdContext
+from pymongo.errors import ProtocolError
+from pymongo.network import receive_message
+from pymongo.pool import _ReceiveBufferPool
+from test import unittest
+
+
+class TestReceiveBufferPool(unittest.TestCase):
+
+    def test_size_classes(self):
+        buffers = _ReceiveBufferPool(4 * 1024 ** 2)
+        # Small replies aren't pooled.
+        self.assertIsNone(buffers.get(_ReceiveBufferPool.MIN_SIZE - 1))
+        buf = buffers.get(100 * 1024)
+        self.assertEqual(128 * 1024, len(buf))
+        self.assertEqual(0, buffers.hits)
+        self.assertEqual(1, buffers.misses)
+        buffers.put(buf)
+        self.assertEqual(128 * 1024, buffers.retained)
+
+        # Any length in the same size class reuses the buffer.
+        self.assertIs(buf, buffers.get(128 * 1024))
+        self.assertEqual(1, buffers.hits)
+        self.assertEqual(0, buffers.retained)
+        self.assertEqual(0.5, buffers.hit_rate)
+        # A different size class doesn't.
+        buffers.put(buf)
+        self.assertEqual(256 * 1024, len(buffers.get(128 * 1024 + 1)))
+        self.assertEqual(2, buffers.misses)
+
+    def test_max_size(self):
+        buffers = _ReceiveBufferPool(1024 ** 2)
+        bufs = [buffers.get(512 * 1024) for _ in range(3)]
+        for buf in bufs:
+            buffers.put(buf)
+        self.assertEqual(1024 ** 2, buffers.retained)
+        buffers.clear()
+        self.assertEqual(0, buffers.retained)
+        self.assertIsNot(bufs[0], buffers.get(512 * 1024))
+
+    def test_disabled(self):
+        buffers = _ReceiveBufferPool(0)
+        self.assertIsNone(buffers.get(1024 ** 2))
+        self.assertEqual(0.0, buffers.hit_rate)
+
+    def test_client_option(self):
+        client = MongoClient(connect=False)
+        self.assertEqual(
+            RECEIVE_BUFFER_POOL_SIZE,
+            client._topology_settings.pool_options.receive_buffer_pool_size)
+        client = MongoClient(connect=False, receiveBufferPoolSize=0)
+        self.assertEqual(
+            0, client._topology_settings.pool_options.receive_buffer_pool_size)
+        self.assertRaises(ValueError, MongoClient, connect=False,
+                          receiveBufferPoolSize=-1)
+
+
+@unittest.skipUnless(PY3, "Receive buffers are only pooled on Python 3")
+class TestReceiveMessage(unittest.TestCase):
+
+    doc = {'ok': 1, 'data': 'a' * (200 * 1024)}
+
+    def setUp(self):
+        self.server, self.client = socket.socketpair()
+        self.buffers = _ReceiveBufferPool(RECEIVE_BUFFER_POOL_SIZE)
+
+    def tearDown(self):
+        self.server.close()
+        self.client.close()
+
+    def _send(self, op_code, body):
+        # The reply may not fit in the socket's buffer, send it from a thread.
+        msg = struct.pack("<iiii", 16 + len(body), 1, 0, op_code) + body
+        sender = threading.Thread(target=self.server.sendall, args=(msg,))
+        sender.daemon = True
+        sender.start()
+        self.addCleanup(sender.join)
+
+    def test_op_msg(self):
+        body = struct.pack("<IB", 0, 0) + BSON.encode(self.doc)
+        for _ in range(3):
+            self._send(2013, body)
+            reply = receive_message(self.client, None,
+                                    buffer_pool=self.buffers)
+            self.assertEqual(self.doc, reply.command_response())
+            # The reply can't read the buffer once it's given back.
+            self.assertRaises(ValueError, bytes, reply.payload_document)
+        self.assertEqual(1, self.buffers.misses)
+        self.assertEqual(2, self.buffers.hits)
+        self.assertEqual(256 * 1024, self.buffers.retained)
+
+    def test_op_reply_raw(self):
+        body = struct.pack("<iqii", 0, 0, 0, 1) + BSON.encode(self.doc)
+        self._send(1, body)
+        reply = receive_message(self.client, None, buffer_pool=self.buffers)
+        self.assertEqual([BSON.encode(self.doc)], reply.raw_response())
+        self.assertEqual(256 * 1024, self.buffers.retained)
+
+    def test_compressed(self):
+        body = struct.pack("<IB", 0, 0) + BSON.encode(self.doc)
+        # Level 0 keeps the compressed data above the minimum pooled size.
+        compressed = zlib.compress(body, 0)
+        self._send(2012, struct.pack(
+            "<iiB", 2013, len(body), 2) + compressed)
+        reply = receive_message(self.client, None, buffer_pool=self.buffers)
+        self.assertEqual(self.doc, reply.command_response())
+        # The compressed data was read into a pooled buffer, given back as
+        # soon as it was decompressed.
+        self.assertEqual(1, self.buffers.misses)
+        self.assertEqual(256 * 1024, self.buffers.retained)
+
+    def test_uncompressed_size_too_large(self):
+        body = struct.pack("<IB", 0, 0) + BSON.encode(self.doc)
+        self._send(2012, struct.pack(
+            "<iiB", 2013, 2 * len(body), 2) + zlib.compress(body))
+        with self.assertRaises(ProtocolError):
+            receive_message(self.client, None, max_message_size=len(body),
+                            buffer_pool=self.buffers)
+        self.assertEqual(0, self.buffers.misses)
+
+    @unittest.skipUnless(_HAVE_ZSTD, "zstandard is not installed")
+    def test_zstd(self):
+        ctx = ZstdContext()
+        body = struct.pack("<IB", 0, 0) + BSON.encode(self.doc)
+        # The compressed message is too small to pool, but the decompressed
+        # message isn't.
+        for _ in range(2):
+            self._send(2012, struct.pack(
+                "<iiB", 2013, len(body), 3) + ctx.compress(body))
+            reply = receive_message(self.client, None,
+                                    buffer_pool=self.buffers,
+                                    compression_ctx=ctx)
+            self.assertEqual(self.doc, reply.command_response())
+        # The decompressed reply was read into a pooled buffer and given
+        # back once decoded.
+        self.assertEqual(1, self.buffers.misses)
+        self.assertEqual(1, self.buffers.hits)
+        self.assertEqual(256 * 1024, self.buffers.retained)
+
+
+if __name__ == "__main__":
+    unittest.main()
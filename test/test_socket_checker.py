@@ -0,0 +1,132 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test checking whether idle sockets were closed."""
+
+import socket
+import sys
+import threading
+
+sys.path[0:0] = [""]
+
+from pymongo.monitoring import (ConnectionClosedEvent,
+                                ConnectionClosedReason,
+                                _EventListeners)
+from pymongo.network import SocketChecker
+from pymongo.pool import Pool, PoolOptions
+from test import unittest
+from test.pymongo_mocks import MockIsMasterServer
+from test.utils import CMAPListener, wait_until
+
+
+class TestSocketChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.pairs = [socket.socketpair() for _ in range(4)]
+        self.checker = SocketChecker()
+
+    def tearDown(self):
+        for pair in self.pairs:
+            for sock in pair:
+                sock.close()
+
+    def test_socket_closed(self):
+        local, remote = self.pairs[0]
+        self.assertFalse(self.checker.socket_closed(local))
+        remote.close()
+        self.assertTrue(self.checker.socket_closed(local))
+        local.close()
+        self.assertTrue(self.checker.socket_closed(local))
+
+    def test_unread_data(self):
+        # An idle socket with data to read is unusable.
+        local, remote = self.pairs[0]
+        remote.sendall(b'x')
+        self.assertTrue(self.checker.socket_closed(local))
+
+    def test_select_closed(self):
+        local = [pair[0] for pair in self.pairs]
+        self.assertEqual([], self.checker.select_closed(local))
+        self.pairs[1][1].close()
+        self.pairs[3][0].close()
+        self.assertEqual(set([local[1], local[3]]),
+                         set(self.checker.select_closed(local)))
+
+    def test_thread_safe(self):
+        local = [pair[0] for pair in self.pairs]
+        errors = []
+
+        def check_sockets():
+            try:
+                for _ in range(1000):
+                    assert not self.checker.socket_closed(local[0])
+                    assert not self.checker.select_closed(local)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=check_sockets) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+
+
+class TestPoolRemovesClosedSockets(unittest.TestCase):
+
+    def test_remove_stale_sockets(self):
+        server = MockIsMasterServer()
+        self.addCleanup(server.close)
+        listener = CMAPListener()
+        pool = Pool(server.address, PoolOptions(
+            event_listeners=_EventListeners([listener])))
+        sockets = [pool._get_socket_no_auth() for _ in range(3)]
+        for sock_info in sockets:
+            pool.return_socket(sock_info)
+        wait_until(lambda: len(server.connections) == 3, 'accept sockets')
+
+        # The server closes one connection.
+        server.connections[0].shutdown(socket.SHUT_RDWR)
+        wait_until(lambda: pool.socket_checker.socket_closed(
+            [s for s in pool.sockets if s.id == 1][0].sock),
+            'close the connection')
+        pool.remove_stale_sockets()
+        self.assertEqual(set([2, 3]), set(s.id for s in pool.sockets))
+        closed = [event for event in listener.events
+                  if isinstance(event, ConnectionClosedEvent)]
+        self.assertEqual(1, len(closed))
+        self.assertEqual(1, closed[0].connection_id)
+        self.assertEqual(ConnectionClosedReason.ERROR, closed[0].reason)
+
+    def test_checked_out_while_polling(self):
+        server = MockIsMasterServer()
+        self.addCleanup(server.close)
+        pool = Pool(server.address, PoolOptions())
+        sock_info = pool._get_socket_no_auth()
+        pool.return_socket(sock_info)
+
+        def checkout_and_select_closed(socks):
+            # Another thread uses the socket while it's polled and returns
+            # it, the poll's result is out of date.
+            pool.return_socket(pool._get_socket_no_auth())
+            return socks
+
+        pool.socket_checker.select_closed = checkout_and_select_closed
+        pool.remove_stale_sockets()
+        self.assertEqual([sock_info], list(pool.sockets))
+        self.assertFalse(sock_info.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
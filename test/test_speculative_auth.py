@@ -0,0 +1,101 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test speculative authentication in the connection handshake."""
+
+import sys
+
+sys.path[0:0] = [""]
+
+from pymongo import auth
+from pymongo.errors import OperationFailure
+from test import unittest
+from test.pymongo_mocks import MockAuthServer, MockAuthSocketInfo
+
+def credentials(mechanism, username='user', password='pencil'):
+    creds = auth._build_credentials_tuple(
+        mechanism, 'admin' if mechanism != 'MONGODB-X509' else None,
+        username, password, {}, None)
+    return {creds.source: creds}
+
+
+class TestSpeculativeAuth(unittest.TestCase):
+
+    def connect(self, server, all_credentials):
+        sock_info = MockAuthSocketInfo(server)
+        self.addCleanup(sock_info.close)
+        sock_info.ismaster({}, None, all_credentials)
+        sock_info.check_auth(all_credentials)
+        self.assertTrue(server.authenticated)
+        return sock_info
+
+    def test_scram(self):
+        for mechanism in ('SCRAM-SHA-1', 'SCRAM-SHA-256'):
+            server = MockAuthServer('user', 'pencil', [mechanism])
+            sock_info = self.connect(server, credentials(mechanism))
+            # saslStart was sent in the handshake.
+            self.assertEqual(['ismaster', 'saslContinue'], server.commands)
+            self.assertEqual({}, sock_info.auth_ctx)
+
+    def test_scram_fallback(self):
+        # Servers older than MongoDB 4.4 ignore speculativeAuthenticate.
+        server = MockAuthServer('user', 'pencil', ['SCRAM-SHA-256'],
+                                speculative=False)
+        self.connect(server, credentials('SCRAM-SHA-256'))
+        self.assertEqual(['ismaster', 'saslStart', 'saslContinue'],
+                         server.commands)
+
+    def test_default(self):
+        server = MockAuthServer('user', 'pencil',
+                                ['SCRAM-SHA-1', 'SCRAM-SHA-256'])
+        self.connect(server, credentials('DEFAULT'))
+        self.assertEqual(['ismaster', 'saslContinue'], server.commands)
+
+    def test_default_scram_sha_1(self):
+        # The speculative SCRAM-SHA-256 attempt fails, the supported
+        # mechanisms from the handshake save another ismaster.
+        server = MockAuthServer('user', 'pencil', ['SCRAM-SHA-1'])
+        self.connect(server, credentials('DEFAULT'))
+        self.assertEqual(['ismaster', 'saslStart', 'saslContinue'],
+                         server.commands)
+
+    def test_x509(self):
+        server = MockAuthServer('CN=client', None, [])
+        self.connect(server, credentials('MONGODB-X509', 'CN=client', None))
+        self.assertEqual(['ismaster'], server.commands)
+
+    def test_wrong_password(self):
+        server = MockAuthServer('user', 'pencil', ['SCRAM-SHA-256'])
+        sock_info = MockAuthSocketInfo(server)
+        self.addCleanup(sock_info.close)
+        all_credentials = credentials('SCRAM-SHA-256', password='wrong')
+        sock_info.ismaster({}, None, all_credentials)
+        self.assertRaises(OperationFailure, sock_info.check_auth,
+                          all_credentials)
+        self.assertFalse(server.authenticated)
+
+    def test_multiple_credentials(self):
+        # Only a single credential is authenticated speculatively.
+        server = MockAuthServer('user', 'pencil', ['SCRAM-SHA-256'])
+        all_credentials = credentials('SCRAM-SHA-256')
+        other = auth._build_credentials_tuple(
+            'SCRAM-SHA-256', 'other', 'user', 'pencil', {}, None)
+        all_credentials['other'] = other
+        self.connect(server, all_credentials)
+        self.assertEqual(['ismaster'] + ['saslStart', 'saslContinue'] * 2,
+                         server.commands)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test streaming bulk writes without a server."""
+
+import sys
+
+sys.path[0:0] = [""]
+
+from pymongo import DeleteOne, InsertOne, MongoClient, UpdateOne, bulk
+from pymongo.errors import (BulkWriteError,
+                            ConfigurationError,
+                            InvalidOperation)
+from test import unittest
+from test.pymongo_mocks import MockWriteServer, MockWriteSocketInfo
+
+
+class RecordingSocketInfo(MockWriteSocketInfo):
+    """Records how many operations were consumed when each batch is sent."""
+
+    def write_command(self, request_id, msg):
+        self.server.consumed_at_send.append(self.server.consumed)
+        reply = super(RecordingSocketInfo, self).write_command(
+            request_id, msg)
+        reply['nModified'] = 0
+        return reply
+
+
+class TestStreamingWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockWriteServer()
+        self.server.consumed = 0
+        self.server.consumed_at_send = []
+        client = MongoClient(connect=False)
+        self.addCleanup(client.close)
+
+        def retry_with_session(retryable, func, session, bulk, timeout=None):
+            return func(session, RecordingSocketInfo(self.server), False)
+
+        client._ensure_session = lambda session=None: None
+        client._retry_with_session = retry_with_session
+        self.coll = client.test.test
+
+        # Split the first run by the mock server's maxWriteBatchSize too.
+        limits = bulk._STREAM_MAX_BATCH_SIZE
+        bulk._STREAM_MAX_BATCH_SIZE = self.server.max_write_batch_size
+
+        def restore():
+            bulk._STREAM_MAX_BATCH_SIZE = limits
+        self.addCleanup(restore)
+
+    def generate(self, items):
+        for item in items:
+            self.server.consumed += 1
+            yield item
+
+    def sent(self, op='insert'):
+        return [doc['_id'] for name, docs in self.server.batches
+                for doc in docs if name == op]
+
+    def test_insert_many(self):
+        docs = self.generate({'_id': i} for i in range(95))
+        result = self.coll.insert_many(docs, stream=True)
+        self.assertEqual(list(range(95)), result.inserted_ids)
+        self.assertEqual(95, result.inserted_count)
+        self.assertEqual(list(range(95)), self.sent())
+        self.assertEqual(10, len(self.server.batches))
+        # Each batch was sent before the following documents were consumed.
+        for i, consumed in enumerate(self.server.consumed_at_send[:-1]):
+            self.assertEqual(10 * (i + 1) + 1, consumed)
+
+    def test_collect_ids(self):
+        docs = self.generate({'x': i} for i in range(25))
+        result = self.coll.insert_many(docs, stream=True, collect_ids=False)
+        self.assertIsNone(result.inserted_ids)
+        self.assertEqual(25, result.inserted_count)
+
+        result = self.coll.insert_many(
+            [{'x': i} for i in range(5)], collect_ids=False)
+        self.assertIsNone(result.inserted_ids)
+        self.assertEqual(5, result.inserted_count)
+
+        result = self.coll.bulk_write(
+            [UpdateOne({'x': 1}, {'$set': {'y': 1}}, upsert=True)],
+            collect_ids=False)
+        self.assertIsNone(result.upserted_ids)
+        self.assertEqual(0, result.upserted_count)
+
+    def test_bulk_write(self):
+        def requests():
+            for i in range(30):
+                yield InsertOne({'_id': i})
+                if i % 10 == 9:
+                    yield DeleteOne({'_id': i})
+
+        result = self.coll.bulk_write(
+            self.generate(requests()), ordered=False, stream=True)
+        self.assertEqual(30, result.inserted_count)
+        self.assertEqual(3, result.deleted_count)
+        self.assertEqual(list(range(30)), self.sent())
+        # Operations are sent in the order provided.
+        self.assertEqual(['insert', 'delete'] * 3,
+                         [name for name, _ in self.server.batches])
+        self.assertTrue(all(self.server.consumed_at_send[i] <= 11 * (i + 1)
+                            for i in range(6)))
+
+    def test_ordered_error(self):
+        docs = ({'_id': i, 'dup': i == 15} for i in range(100))
+        with self.assertRaises(BulkWriteError) as ctx:
+            self.coll.insert_many(self.generate(docs), stream=True)
+        details = ctx.exception.details
+        self.assertEqual(15, details['nInserted'])
+        self.assertEqual(15, details['writeErrors'][0]['index'])
+        # The remaining documents were never consumed.
+        self.assertEqual(21, self.server.consumed)
+
+    def test_unordered_errors(self):
+        docs = ({'_id': i, 'dup': i in (3, 47)} for i in range(50))
+        with self.assertRaises(BulkWriteError) as ctx:
+            self.coll.insert_many(
+                self.generate(docs), ordered=False, stream=True)
+        details = ctx.exception.details
+        self.assertEqual(48, details['nInserted'])
+        self.assertEqual(
+            [3, 47], [err['index'] for err in details['writeErrors']])
+        self.assertEqual(47, details['writeErrors'][1]['op']['_id'])
+
+    def test_validation(self):
+        self.assertRaises(InvalidOperation, self.coll.insert_many,
+                          iter([]), stream=True)
+        self.assertRaises(ConfigurationError, self.coll.insert_many,
+                          iter([{}]), stream=True, pipeline=True)
+        self.assertRaises(ConfigurationError, self.coll.insert_many,
+                          iter([{}]), ordered=False, stream=True,
+                          max_batches_in_flight=2)
+        self.assertRaises(TypeError, self.coll.bulk_write, 1, stream=True)
+        self.assertRaises(TypeError, self.coll.bulk_write, iter([{}]),
+                          stream=True)
+        # Without stream, requests must be a list.
+        self.assertRaises(TypeError, self.coll.bulk_write,
+                          iter([InsertOne({})]))
+        self.assertEqual(0, len(self.server.batches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the thread_util module."""
+
+import sys
+import threading
+import time
+
+sys.path[0:0] = [""]
+
+from pymongo import thread_util
+from pymongo.errors import ExceededMaxWaiters
+from pymongo.thread_util import FairSemaphore, create_semaphore
+from test import unittest
+from test.utils import wait_until
+
+
+class TestFairSemaphore(unittest.TestCase):
+
+    def test_acquire_release(self):
+        sem = FairSemaphore(2)
+        self.assertTrue(sem.acquire())
+        self.assertTrue(sem.acquire(False))
+        self.assertFalse(sem.acquire(False))
+        self.assertFalse(sem.acquire(True, 0.01))
+        self.assertEqual(0, sem.waiters)
+        sem.release()
+        sem.release()
+        self.assertRaises(ValueError, sem.release)
+        self.assertRaises(ValueError, sem.acquire, False, 1)
+
+    def test_fifo(self):
+        sem = FairSemaphore(1)
+        sem.acquire()
+        order = []
+
+        def target(i):
+            sem.acquire()
+            order.append(i)
+            sem.release()
+
+        threads = []
+        for i in range(10):
+            t = threading.Thread(target=target, args=(i,))
+            t.start()
+            threads.append(t)
+            # Wait until the thread is queued before starting the next one.
+            wait_until(lambda: sem.waiters == i + 1, 'queue thread %d' % i)
+
+        sem.release()
+        for t in threads:
+            t.join(10)
+        self.assertEqual(list(range(10)), order)
+        self.assertEqual(1, sem.counter)
+
+    def test_release_hands_off(self):
+        # A released permit goes to a waiter, not to a new caller.
+        sem = FairSemaphore(1)
+        sem.acquire()
+        acquired = []
+        t = threading.Thread(target=lambda: acquired.append(sem.acquire()))
+        t.start()
+        wait_until(lambda: sem.waiters == 1, 'queue a waiter')
+        sem.release()
+        self.assertFalse(sem.acquire(False))
+        t.join(10)
+        self.assertEqual([True], acquired)
+
+    def test_timeout(self):
+        sem = FairSemaphore(1)
+        sem.acquire()
+        start = time.time()
+        self.assertFalse(sem.acquire(True, 0.1))
+        self.assertGreaterEqual(time.time() - start, 0.1)
+        # The timed out waiter left the queue.
+        self.assertEqual(0, sem.waiters)
+        sem.release()
+        self.assertTrue(sem.acquire(False))
+
+    def test_max_waiters(self):
+        sem = create_semaphore(1, 1)
+        sem.acquire()
+        t = threading.Thread(target=sem.acquire)
+        t.start()
+        wait_until(lambda: sem.waiters == 1, 'queue a waiter')
+        with self.assertRaises(ExceededMaxWaiters) as ctx:
+            sem.acquire()
+        self.assertIn('1 threads already waiting', str(ctx.exception))
+        sem.release()
+        t.join(10)
+
+    def interrupt_wait(self, grant):
+        """Make waiting for a permit raise KeyboardInterrupt, after the
+        permit is handed to the waiter if `grant` is True.
+        """
+        class InterruptedWaiter(thread_util._Waiter):
+            def __init__(self, lock):
+                super(InterruptedWaiter, self).__init__(lock)
+                self.cond = self
+
+            def wait(waiter, timeout=None):
+                if grant:
+                    # What release() does while the waiter is waking up.
+                    self.assertIs(waiter, sem._waiters.popleft())
+                    waiter.granted = True
+                raise KeyboardInterrupt
+
+        sem = FairSemaphore(1)
+        sem.acquire()
+        self.addCleanup(setattr, thread_util, '_Waiter', thread_util._Waiter)
+        thread_util._Waiter = InterruptedWaiter
+        self.assertRaises(KeyboardInterrupt, sem.acquire)
+        return sem
+
+    def test_interrupted(self):
+        sem = self.interrupt_wait(grant=False)
+        # The waiter left the queue, releasing the permit makes it available.
+        self.assertEqual(0, sem.waiters)
+        sem.release()
+        self.assertEqual(1, sem.counter)
+
+    def test_interrupted_after_grant(self):
+        sem = self.interrupt_wait(grant=True)
+        # The permit handed to the waiter was released, not lost.
+        self.assertEqual(0, sem.waiters)
+        self.assertEqual(1, sem.counter)
+        self.assertRaises(ValueError, sem.release)
+
+    def test_unbounded(self):
+        sem = create_semaphore(None, None)
+        for _ in range(10):
+            self.assertTrue(sem.acquire(False))
+        self.assertEqual(0, sem.waiters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test client-side operation deadlines without a server."""
+
+import socket
+import sys
+import time
+
+sys.path[0:0] = [""]
+
+import pymongo
+
+from bson.son import SON
+from pymongo import auth, MongoClient
+from pymongo.deadline import _Deadline, _get_deadline
+from pymongo.errors import (ConnectionFailure,
+                            ExecutionTimeout,
+                            NetworkTimeout,
+                            ServerSelectionTimeoutError)
+from pymongo.pool import Pool, PoolOptions, SocketInfo
+from test import unittest
+
+
+class SocketPairPool(Pool):
+    """A Pool whose connections are one end of a socket pair."""
+
+    def __init__(self, **kwargs):
+        Pool.__init__(
+            self, ('localhost', 27017), PoolOptions(**kwargs),
+            handshake=False)
+        self._check_interval_seconds = None
+        self.peers = []
+
+    def connect(self, all_credentials=None):
+        sock, peer = socket.socketpair()
+        sock.settimeout(self.opts.socket_timeout)
+        self.peers.append(peer)
+        return SocketInfo(sock, self, self.address)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_cap(self):
+        deadline = _Deadline(10)
+        self.assertEqual(1, deadline.cap(1))
+        self.assertLessEqual(deadline.cap(20), 10)
+        self.assertLessEqual(deadline.cap(None), 10)
+        self.assertGreater(deadline.max_time_ms(), 9000)
+        self.assertFalse(deadline.expired())
+        deadline.check()
+
+        expired = _Deadline(0)
+        self.assertTrue(expired.expired())
+        self.assertEqual(0, expired.cap(None))
+        self.assertEqual(1, expired.max_time_ms())
+        self.assertRaises(ExecutionTimeout, expired.check)
+
+    def test_get_deadline(self):
+        self.assertIsNone(_get_deadline(None))
+        self.assertIsNone(_get_deadline(0))
+        self.assertEqual(5, _get_deadline(5).timeout)
+
+    def test_timeout_block(self):
+        with pymongo.timeout(10):
+            outer = _get_deadline(None)
+            self.assertEqual(10, outer.timeout)
+            # The block takes precedence over the collection's timeout.
+            self.assertIs(outer, _get_deadline(100))
+            self.assertIs(outer, _get_deadline(1))
+            with pymongo.timeout(1):
+                self.assertEqual(1, _get_deadline(None).timeout)
+            # A nested block can't extend the deadline.
+            with pymongo.timeout(100):
+                self.assertIs(outer, _get_deadline(None))
+            self.assertIs(outer, _get_deadline(None))
+        self.assertIsNone(_get_deadline(None))
+
+    def test_timeout_block_validation(self):
+        for value in (0, -1, None, 'foo'):
+            with self.assertRaises((TypeError, ValueError)):
+                with pymongo.timeout(value):
+                    pass
+
+
+class TestTimeoutOption(unittest.TestCase):
+
+    def test_inheritance(self):
+        client = MongoClient(connect=False)
+        self.assertIsNone(client.timeout)
+        self.assertIsNone(client.test.timeout)
+
+        client = MongoClient(connect=False, timeoutMS=500)
+        self.assertEqual(0.5, client.timeout)
+        db = client.test
+        self.assertEqual(0.5, db.timeout)
+        self.assertEqual(0.5, db.test.timeout)
+        self.assertEqual(0.5, db.test.sub.timeout)
+
+        db = client.get_database('test', timeout=2)
+        self.assertEqual(2, db.timeout)
+        coll = db.get_collection('test')
+        self.assertEqual(2, coll.timeout)
+        self.assertEqual(3, coll.with_options(timeout=3).timeout)
+        self.assertEqual(2, coll.with_options().timeout)
+        # 0 disables the client's timeout.
+        self.assertEqual(0, db.get_collection('test', timeout=0).timeout)
+        self.assertIsNone(client._deadline(0))
+        self.assertEqual(0.5, client._deadline(None).timeout)
+
+        self.assertRaises(ValueError, client.get_database, 'test',
+                          timeout=-1)
+
+    def test_uri_option(self):
+        client = MongoClient('mongodb://localhost/?timeoutMS=250',
+                             connect=False)
+        self.assertEqual(0.25, client.timeout)
+        client = MongoClient(connect=False, timeoutMS=0)
+        self.assertIsNone(client.timeout)
+        self.assertRaises(ValueError, MongoClient, connect=False,
+                          timeoutMS=-1)
+
+    def test_server_selection(self):
+        # Nothing listens on port 1. Server selection gives up after
+        # timeoutMS instead of serverSelectionTimeoutMS.
+        client = MongoClient('127.0.0.1', 1, timeoutMS=200,
+                             serverSelectionTimeoutMS=30000)
+        self.addCleanup(client.close)
+        start = time.time()
+        with self.assertRaises(ServerSelectionTimeoutError):
+            client.test.test.find_one()
+        self.assertLess(time.time() - start, 5)
+
+        start = time.time()
+        with self.assertRaises(ServerSelectionTimeoutError):
+            with pymongo.timeout(0.2):
+                client.get_database('test', timeout=0).test.insert_one({})
+        self.assertLess(time.time() - start, 5)
+
+
+class TestPoolDeadline(unittest.TestCase):
+
+    def test_wait_queue(self):
+        pool = SocketPairPool(max_pool_size=1)
+        with pool.get_socket({}):
+            start = time.time()
+            with self.assertRaises(ConnectionFailure) as ctx:
+                with pool.get_socket({}, deadline=_Deadline(0.2)):
+                    pass
+            self.assertLess(time.time() - start, 5)
+            self.assertIn('time limit', str(ctx.exception))
+        self.assertEqual(1, pool.wait_queue_stats()['timeouts'])
+
+    def test_socket_io(self):
+        pool = SocketPairPool()
+        start = time.time()
+        with self.assertRaises(NetworkTimeout):
+            with pool.get_socket({}, deadline=_Deadline(0.2)) as sock_info:
+                # The peer never replies.
+                sock_info.receive_message(1)
+        self.assertLess(time.time() - start, 5)
+
+    def test_authentication(self):
+        pool = SocketPairPool(socket_timeout=10)
+        creds = auth._build_credentials_tuple(
+            'SCRAM-SHA-256', 'admin', 'user', 'pencil', {}, None)
+        start = time.time()
+        with self.assertRaises(NetworkTimeout):
+            # The peer never replies to saslStart.
+            with pool.get_socket({'admin': creds}, deadline=_Deadline(0.2)):
+                pass
+        self.assertLess(time.time() - start, 5)
+
+    def test_restores_socket_timeout(self):
+        pool = SocketPairPool(socket_timeout=30)
+        with pool.get_socket({}, deadline=_Deadline(0.5)) as sock_info:
+            sock_info.send_message(b'x', 0)
+            self.assertLessEqual(sock_info.sock.gettimeout(), 0.5)
+        self.assertIsNone(sock_info.deadline)
+        self.assertEqual(30, sock_info.sock.gettimeout())
+
+    def test_expired(self):
+        pool = SocketPairPool()
+        with pool.get_socket({}, deadline=_Deadline(0)) as sock_info:
+            self.assertRaises(ExecutionTimeout, sock_info.send_message,
+                              b'x', 0)
+            self.assertFalse(sock_info.closed)
+
+    def test_apply_timeout(self):
+        pool = SocketPairPool()
+        with pool.get_socket({}, deadline=_Deadline(10)) as sock_info:
+            cmd = SON([('find', 'test')])
+            sock_info.apply_timeout(cmd)
+            self.assertGreater(cmd['maxTimeMS'], 9000)
+            self.assertLessEqual(cmd['maxTimeMS'], 10000)
+
+            # A smaller maxTimeMS is kept.
+            cmd = SON([('find', 'test'), ('maxTimeMS', 5)])
+            sock_info.apply_timeout(cmd)
+            self.assertEqual(5, cmd['maxTimeMS'])
+
+            cmd = SON([('getMore', 1), ('collection', 'test')])
+            sock_info.apply_timeout(cmd)
+            self.assertNotIn('maxTimeMS', cmd)
+
+        cmd = SON([('find', 'test')])
+        sock_info.apply_timeout(cmd)
+        self.assertNotIn('maxTimeMS', cmd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test TLS session resumption by connection pools."""
+
+import os
+import socket
+import sys
+import threading
+
+sys.path[0:0] = [""]
+
+from pymongo.pool import _HAVE_TLS_SESSIONS, Pool, PoolOptions
+from test import unittest
+
+try:
+    import ssl
+except ImportError:
+    pass
+
+CERT_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'certificates')
+SERVER_PEM = os.path.join(CERT_PATH, 'server.pem')
+
+
+class TlsServer(threading.Thread):
+    """Accepts TLS connections and sends each one byte."""
+
+    def __init__(self):
+        super(TlsServer, self).__init__()
+        self.daemon = True
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        # The test certificates use SHA-1.
+        self.context.set_ciphers('DEFAULT:@SECLEVEL=0')
+        self.context.load_cert_chain(SERVER_PEM)
+        self.listener = socket.socket()
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(5)
+        self.address = self.listener.getsockname()
+        self.stopped = False
+
+    def run(self):
+        while not self.stopped:
+            try:
+                sock, _ = self.listener.accept()
+            except socket.error:
+                return
+            try:
+                sock = self.context.wrap_socket(sock, server_side=True)
+                sock.sendall(b'x')
+            except (socket.error, ssl.SSLError):
+                pass
+
+    def stop(self):
+        self.stopped = True
+        self.listener.close()
+
+
+@unittest.skipUnless(_HAVE_TLS_SESSIONS, "TLS sessions require Python 3.6+")
+class TestTlsSessions(unittest.TestCase):
+
+    def setUp(self):
+        self.server = TlsServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def create_pool(self):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.set_ciphers('DEFAULT:@SECLEVEL=0')
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        pool = Pool(self.server.address,
+                    PoolOptions(ssl_context=context, connect_timeout=5,
+                                socket_timeout=5),
+                    handshake=False)
+        self.addCleanup(pool.reset)
+        return pool
+
+    def test_resume(self):
+        pool = self.create_pool()
+        self.assertEqual({'resumed': 0, 'full': 0},
+                         pool.tls_handshake_stats())
+        with pool.get_socket({}) as sock_info:
+            # Read the byte, and with TLS 1.3 the session tickets before it.
+            self.assertEqual(b'x', sock_info.sock.recv(1))
+            self.assertFalse(sock_info.sock.session_reused)
+        self.assertEqual({'resumed': 0, 'full': 1},
+                         pool.tls_handshake_stats())
+        # The session is cached when the socket is checked in.
+        self.assertIsNotNone(pool._tls_sessions.session)
+
+        sock_info = pool.connect()
+        self.addCleanup(sock_info.close)
+        self.assertTrue(sock_info.sock.session_reused)
+        self.assertEqual({'resumed': 1, 'full': 1},
+                         pool.tls_handshake_stats())
+
+        # Another pool has its own session.
+        other = self.create_pool()
+        sock_info = other.connect()
+        self.addCleanup(sock_info.close)
+        self.assertFalse(sock_info.sock.session_reused)
+        self.assertEqual({'resumed': 0, 'full': 1},
+                         other.tls_handshake_stats())
+
+    def test_no_tls(self):
+        pool = Pool(self.server.address, PoolOptions(), handshake=False)
+        self.assertIsNone(pool._tls_sessions)
+        self.assertEqual({'resumed': 0, 'full': 0},
+                         pool.tls_handshake_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
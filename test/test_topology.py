@@ -21,7 +21,7 @@ sys.path[0:0] = [""]
 import threading
 
 from bson.py3compat import imap
-from pymongo import common
+from pymongo import common, monitor
 from pymongo.read_preferences import ReadPreference, Secondary
 from pymongo.server_type import SERVER_TYPE
 from pymongo.topology import Topology
@@ -98,13 +98,15 @@ address = ('a', 27017)
 def create_mock_topology(
         seeds=None,
         replica_set_name=None,
-        monitor_class=MockMonitor):
+        monitor_class=MockMonitor,
+        fqdn=None):
     partitioned_seeds = list(imap(common.partition_node, seeds or ['a']))
     topology_settings = TopologySettings(
         partitioned_seeds,
         replica_set_name=replica_set_name,
         pool_class=MockPool,
-        monitor_class=monitor_class)
+        monitor_class=monitor_class,
+        fqdn=fqdn)
 
     t = Topology(topology_settings)
     t.open()
@@ -805,5 +807,94 @@ class TestServerSelectionErrors(TopologyTest):
         self.assertMessage('No mongoses available', t)
 
 
+class TestSrvPolling(TopologyTest):
+
+    def setUp(self):
+        super(TestSrvPolling, self).setUp()
+        self.seedlist = [('a', 27017), ('b', 27017)]
+        original = monitor._get_dns_srv_hosts
+
+        def get_dns_srv_hosts(hostname):
+            if self.seedlist is None:
+                raise ConfigurationError('lookup failed')
+            return self.seedlist, 60
+        monitor._get_dns_srv_hosts = get_dns_srv_hosts
+        self.addCleanup(setattr, monitor, '_get_dns_srv_hosts', original)
+
+    def create_topology(self):
+        t = create_mock_topology(seeds=['a', 'b'], fqdn='test.example.com')
+        self.addCleanup(t.close)
+        return t
+
+    def addresses(self, t):
+        return sorted(t.description.server_descriptions())
+
+    def test_update_seedlist(self):
+        t = self.create_topology()
+        self.assertIsNotNone(t._srv_monitor)
+
+        # Add and remove hosts.
+        self.seedlist = [('b', 27017), ('c', 27017)]
+        t._srv_monitor._run()
+        self.assertEqual([('b', 27017), ('c', 27017)], self.addresses(t))
+        self.assertIsNone(t.get_server_by_address(('a', 27017)))
+        self.assertIsNotNone(t.get_server_by_address(('c', 27017)))
+
+        # An unchanged seed list keeps the description.
+        description = t.description
+        t._srv_monitor._run()
+        self.assertIs(description, t.description)
+
+        # Keep the seed list after a failed lookup.
+        self.seedlist = None
+        t._srv_monitor._run()
+        self.assertEqual([('b', 27017), ('c', 27017)], self.addresses(t))
+
+    def test_sharded(self):
+        t = self.create_topology()
+        got_ismaster(t, ('a', 27017), {'ok': 1, 'msg': 'isdbgrid'})
+        self.assertEqual(TOPOLOGY_TYPE.Sharded, t.description.topology_type)
+        self.seedlist = [('a', 27017), ('c', 27017)]
+        t._srv_monitor._run()
+        self.assertEqual([('a', 27017), ('c', 27017)], self.addresses(t))
+        self.assertEqual(SERVER_TYPE.Mongos, get_type(t, 'a'))
+
+    def test_replica_set(self):
+        t = self.create_topology()
+        got_ismaster(t, ('a', 27017), {
+            'ok': 1,
+            'ismaster': True,
+            'setName': 'rs',
+            'hosts': ['a', 'b']})
+        # Replica set members come from the primary, not the SRV records.
+        self.seedlist = [('c', 27017)]
+        t.on_srv_update(self.seedlist)
+        self.assertEqual([('a', 27017), ('b', 27017)], self.addresses(t))
+
+    def test_single_record(self):
+        self.seedlist = [('a', 27017)]
+        t = create_mock_topology(seeds=['a'], fqdn='test.example.com')
+        self.addCleanup(t.close)
+        # One SRV record isn't a direct connection, it's polled.
+        self.assertEqual(TOPOLOGY_TYPE.Unknown, t.description.topology_type)
+        self.assertIsNotNone(t._srv_monitor)
+        got_ismaster(t, ('a', 27017), {'ok': 1, 'msg': 'isdbgrid'})
+        self.assertEqual(TOPOLOGY_TYPE.Sharded, t.description.topology_type)
+        self.seedlist = [('a', 27017), ('b', 27017)]
+        t._srv_monitor._run()
+        self.assertEqual([('a', 27017), ('b', 27017)], self.addresses(t))
+
+    def test_single_record_standalone(self):
+        t = create_mock_topology(seeds=['a'], fqdn='test.example.com')
+        self.addCleanup(t.close)
+        got_ismaster(t, ('a', 27017), {'ok': 1})
+        self.assertEqual(TOPOLOGY_TYPE.Single, t.description.topology_type)
+        self.assertEqual(SERVER_TYPE.Standalone, get_type(t, 'a'))
+
+    def test_no_fqdn(self):
+        t = create_mock_topology(seeds=['a', 'b'])
+        self.assertIsNone(t._srv_monitor)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -20,6 +20,7 @@ import warnings
 
 sys.path[0:0] = [""]
 
+from pymongo import uri_parser
 from pymongo.uri_parser import (parse_userinfo,
                                 split_hosts,
                                 split_options,
@@ -192,7 +193,8 @@ class TestURI(unittest.TestCase):
             'password': None,
             'database': None,
             'collection': None,
-            'options': {}
+            'options': {},
+            'fqdn': None
         }
 
         res = copy.deepcopy(orig)
@@ -449,7 +451,8 @@ class TestURI(unittest.TestCase):
              'nodelist': [('/MongoDB.sock', None)],
              'options': {'ssl_certfile': '/a/b'},
              'password': 'foo/bar',
-             'username': 'jesse'},
+             'username': 'jesse',
+             'fqdn': None},
             parse_uri(
                 'mongodb://jesse:foo%2Fbar@%2FMongoDB.sock/?ssl_certfile=/a/b',
                 validate=False))
@@ -460,11 +463,55 @@ class TestURI(unittest.TestCase):
              'nodelist': [('/MongoDB.sock', None)],
              'options': {'ssl_certfile': 'a/b'},
              'password': 'foo/bar',
-             'username': 'jesse'},
+             'username': 'jesse',
+             'fqdn': None},
             parse_uri(
                 'mongodb://jesse:foo%2Fbar@%2FMongoDB.sock/?ssl_certfile=a/b',
                 validate=False))
 
 
+class TestDnsCache(unittest.TestCase):
+
+    def setUp(self):
+        uri_parser._dns_cache.clear()
+        self.addCleanup(uri_parser._dns_cache.clear)
+        self.lookups = []
+        self.ttl = 60
+        original = uri_parser._resolve_srv_hosts
+
+        def resolve(hostname):
+            self.lookups.append(hostname)
+            if hostname == 'bad.example.com':
+                raise ConfigurationError('lookup failed')
+            return [('a.example.com', 27017)], self.ttl
+        uri_parser._resolve_srv_hosts = resolve
+        self.addCleanup(setattr, uri_parser, '_resolve_srv_hosts', original)
+
+    def test_cache(self):
+        nodes, ttl = uri_parser._get_dns_srv_hosts('test.example.com')
+        self.assertEqual([('a.example.com', 27017)], nodes)
+        self.assertEqual(60, ttl)
+        nodes, ttl = uri_parser._get_dns_srv_hosts('test.example.com')
+        self.assertEqual([('a.example.com', 27017)], nodes)
+        self.assertLessEqual(ttl, 60)
+        self.assertEqual(['test.example.com'], self.lookups)
+
+        uri_parser._get_dns_srv_hosts('other.example.com')
+        self.assertEqual(['test.example.com', 'other.example.com'],
+                         self.lookups)
+
+    def test_expired(self):
+        self.ttl = 0
+        uri_parser._get_dns_srv_hosts('test.example.com')
+        uri_parser._get_dns_srv_hosts('test.example.com')
+        self.assertEqual(['test.example.com'] * 2, self.lookups)
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            self.assertRaises(ConfigurationError,
+                              uri_parser._get_dns_srv_hosts, 'bad.example.com')
+        self.assertEqual(['bad.example.com'] * 2, self.lookups)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,254 @@
+# Copyright 2019-present MongoDB, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the write coalescer without a server."""
+
+import sys
+import threading
+import time
+
+sys.path[0:0] = [""]
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, write_coalescer
+from pymongo.errors import (AutoReconnect,
+                            BulkWriteError,
+                            DuplicateKeyError,
+                            WriteConcernError)
+from pymongo.write_concern import WriteConcern
+from test import unittest
+from test.pymongo_mocks import MockWriteServer, MockWriteSocketInfo
+
+
+class MockBulk(object):
+    """Stands in for _Bulk, replies like the server would."""
+
+    executed = []
+    write_concern_error = None
+    network_error = None
+
+    def __init__(self, collection, ordered, bypass_document_validation):
+        self.ordered = ordered
+        self.ops = []
+
+    def add_insert(self, document):
+        self.ops.append(('insert', document))
+
+    def add_update(self, selector, update, multi=False, upsert=False,
+                   collation=None, array_filters=None):
+        self.ops.append(('update', selector, upsert))
+
+    def execute(self, write_concern, session):
+        MockBulk.executed.append(self.ops)
+        if MockBulk.network_error:
+            raise MockBulk.network_error
+        result = {"writeErrors": [], "writeConcernErrors": [],
+                  "nInserted": 0, "nUpserted": 0, "nMatched": 0,
+                  "nModified": 0, "nRemoved": 0, "upserted": []}
+        for idx, op in enumerate(self.ops):
+            if op[0] == 'insert':
+                if op[1].get('dup'):
+                    result["writeErrors"].append(
+                        {"index": idx, "code": 11000, "errmsg": "dup",
+                         "op": op[1]})
+                else:
+                    result["nInserted"] += 1
+            elif op[2]:
+                result["upserted"].append({"index": idx, "_id": op[1]['_id']})
+                result["nUpserted"] += 1
+            else:
+                result["nMatched"] += 1
+                result["nModified"] += 1
+        if MockBulk.write_concern_error:
+            result["writeConcernErrors"].append(MockBulk.write_concern_error)
+        if not write_concern.acknowledged:
+            return None
+        if result["writeErrors"] or result["writeConcernErrors"]:
+            raise BulkWriteError(result)
+        return result
+
+
+class TestWriteCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        original = write_coalescer._Bulk
+        write_coalescer._Bulk = MockBulk
+        self.addCleanup(setattr, write_coalescer, '_Bulk', original)
+        MockBulk.executed = []
+        MockBulk.write_concern_error = None
+        MockBulk.network_error = None
+        client = MongoClient(connect=False)
+        self.addCleanup(client.close)
+        self.coll = client.test.test
+
+    def run_threads(self, func, n):
+        results = [None] * n
+
+        def target(i):
+            try:
+                results[i] = func(i)
+            except Exception as exc:
+                results[i] = exc
+
+        threads = [threading.Thread(target=target, args=(i,))
+                   for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_validation(self):
+        self.assertRaises(ValueError, self.coll.write_coalescer, max_delay=0)
+        self.assertRaises(ValueError, self.coll.write_coalescer,
+                          max_batch_size=0)
+        coalescer = self.coll.write_coalescer()
+        self.assertIs(self.coll, coalescer.collection)
+        self.assertEqual(0.001, coalescer.max_delay)
+        self.assertEqual(1000, coalescer.max_batch_size)
+        self.assertRaises(TypeError, coalescer.insert_one, 1)
+        self.assertRaises(ValueError, coalescer.update_one, {}, {'x': 1})
+        self.assertEqual([], MockBulk.executed)
+
+    def test_coalesces(self):
+        coalescer = self.coll.write_coalescer(max_delay=0.5)
+        start = time.time()
+        results = self.run_threads(
+            lambda i: coalescer.insert_one({'_id': i}), 20)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(list(range(20)), [r.inserted_id for r in results])
+        self.assertTrue(all(r.acknowledged for r in results))
+        # Every write was sent in one bulk write.
+        self.assertEqual(1, len(MockBulk.executed))
+        self.assertEqual(20, len(MockBulk.executed[0]))
+
+    def test_max_batch_size(self):
+        coalescer = self.coll.write_coalescer(max_delay=60, max_batch_size=5)
+        start = time.time()
+        results = self.run_threads(
+            lambda i: coalescer.insert_one({}).inserted_id, 20)
+        # Full batches are sent without waiting for max_delay.
+        self.assertLess(time.time() - start, 30)
+        self.assertTrue(all(isinstance(r, ObjectId) for r in results))
+        self.assertEqual([5] * 4, [len(ops) for ops in MockBulk.executed])
+
+    def test_max_delay(self):
+        coalescer = self.coll.write_coalescer(max_delay=0.05)
+        start = time.time()
+        coalescer.insert_one({'_id': 1})
+        elapsed = time.time() - start
+        self.assertGreaterEqual(elapsed, 0.04)
+        self.assertLess(elapsed, 5)
+
+    def test_errors_resolved_individually(self):
+        coalescer = self.coll.write_coalescer(max_delay=0.5,
+                                              max_batch_size=10)
+
+        def write(i):
+            if i % 2:
+                return coalescer.update_one(
+                    {'_id': i}, {'$set': {'x': 1}}, upsert=(i == 9))
+            return coalescer.insert_one({'_id': i, 'dup': i == 4})
+
+        results = self.run_threads(write, 10)
+        self.assertEqual(1, len(MockBulk.executed))
+        self.assertIsInstance(results[4], DuplicateKeyError)
+        self.assertEqual(0, results[4].details['index'])
+        self.assertNotIn('op', results[4].details)
+        for i in (0, 2, 6, 8):
+            self.assertEqual(i, results[i].inserted_id)
+        self.assertEqual(9, results[9].upserted_id)
+        self.assertEqual(0, results[9].matched_count)
+        # Counts are not known for an update sent with other updates.
+        self.assertIsNone(results[1].matched_count)
+        self.assertIsNone(results[1].upserted_id)
+
+    def test_single_update_counts(self):
+        coalescer = self.coll.write_coalescer()
+        result = coalescer.update_one({'_id': 1}, {'$set': {'x': 1}})
+        self.assertEqual(1, result.matched_count)
+        self.assertEqual(1, result.modified_count)
+        self.assertIsNone(result.upserted_id)
+
+    def test_write_concern_error(self):
+        MockBulk.write_concern_error = {'code': 64, 'errmsg': 'timed out'}
+        coalescer = self.coll.write_coalescer(max_delay=0.2,
+                                              max_batch_size=3)
+        results = self.run_threads(
+            lambda i: coalescer.insert_one({'dup': i == 0}), 3)
+        self.assertIsInstance(results[0], DuplicateKeyError)
+        self.assertIsInstance(results[1], WriteConcernError)
+        self.assertIsInstance(results[2], WriteConcernError)
+
+    def test_network_error(self):
+        MockBulk.network_error = AutoReconnect('connection closed')
+        coalescer = self.coll.write_coalescer(max_delay=0.2,
+                                              max_batch_size=3)
+        results = self.run_threads(lambda i: coalescer.insert_one({}), 3)
+        for result in results:
+            self.assertIsInstance(result, AutoReconnect)
+        # The coalescer keeps working after an error.
+        MockBulk.network_error = None
+        self.assertTrue(coalescer.insert_one({}).acknowledged)
+
+    def test_unacknowledged(self):
+        coll = self.coll.with_options(write_concern=WriteConcern(w=0))
+        coalescer = coll.write_coalescer()
+        result = coalescer.insert_one({'_id': 5})
+        self.assertFalse(result.acknowledged)
+        self.assertEqual(5, result.inserted_id)
+        self.assertFalse(coalescer.update_one({}, {'$set': {}}).acknowledged)
+
+
+class TestWriteCoalescerBulk(unittest.TestCase):
+    """Test the write coalescer with the real bulk write implementation."""
+
+    def test_insert_one(self):
+        server = MockWriteServer()
+        client = MongoClient(connect=False)
+        self.addCleanup(client.close)
+
+        def retry_with_session(retryable, func, session, bulk, timeout=None):
+            return func(session, MockWriteSocketInfo(server), False)
+
+        client._ensure_session = lambda session=None: None
+        client._retry_with_session = retry_with_session
+        coalescer = client.test.test.write_coalescer(max_delay=0.5,
+                                                     max_batch_size=8)
+        results = [None] * 8
+
+        def target(i):
+            try:
+                results[i] = coalescer.insert_one(
+                    {'_id': i, 'dup': i == 3}).inserted_id
+            except DuplicateKeyError as exc:
+                results[i] = exc
+
+        threads = [threading.Thread(target=target, args=(i,))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(server.batches))
+        self.assertEqual('insert', server.batches[0][0])
+        self.assertEqual(8, len(server.batches[0][1]))
+        self.assertIsInstance(results[3], DuplicateKeyError)
+        self.assertEqual([0, 1, 2, 4, 5, 6, 7],
+                         [r for r in results if not isinstance(r, Exception)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -120,6 +120,27 @@ class HeartbeatEventListener(monitoring.ServerHeartbeatListener):
         self.results.append(event)
 
 
+class CMAPListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.events = []
+
+    def add_event(self, event):
+        self.events.append(event)
+
+    pool_created = add_event
+    pool_cleared = add_event
+    connection_created = add_event
+    connection_ready = add_event
+    connection_closed = add_event
+    connection_check_out_started = add_event
+    connection_check_out_failed = add_event
+    connection_checked_out = add_event
+    connection_checked_in = add_event
+
+    def event_types(self):
+        return [type(event) for event in self.events]
+
+
 def _connection_string(h, p, authenticate):
     if h.startswith("mongodb://"):
         return h